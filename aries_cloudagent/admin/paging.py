@@ -0,0 +1,213 @@
+"""Pagination and streaming of admin list responses."""
+
+from typing import AsyncIterable, Callable, Iterable, Type, Union
+
+from aiohttp import web
+
+from ..messaging.models.base_record import BaseRecord
+from ..utils.json_codec import json_dumps, json_dumps_bytes
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_LIMIT = 1000
+
+FORMAT_PARAMETER = {
+    "name": "format",
+    "in": "query",
+    "schema": {"type": "string", "enum": ["json", "ndjson"]},
+    "required": False,
+    "description": "Stream the results as newline-delimited JSON",
+}
+
+PAGING_PARAMETERS = [
+    {
+        "name": "limit",
+        "in": "query",
+        "schema": {"type": "integer", "minimum": 1, "maximum": MAX_PAGE_LIMIT},
+        "required": False,
+        "description": "Return at most this many records, with a cursor for the"
+        " next page",
+    },
+    {
+        "name": "cursor",
+        "in": "query",
+        "schema": {"type": "string"},
+        "required": False,
+        "description": "The next_cursor value returned with the previous page",
+    },
+    {
+        "name": "sort",
+        "in": "query",
+        "schema": {"type": "string", "enum": list(BaseRecord.SORT_KEYS)},
+        "required": False,
+        "description": "The timestamp to sort a page of records by",
+    },
+    {
+        "name": "order",
+        "in": "query",
+        "schema": {"type": "string", "enum": ["asc", "desc"]},
+        "required": False,
+        "description": "The order of a page of records",
+    },
+    FORMAT_PARAMETER,
+]
+
+
+def is_ndjson_request(request: web.BaseRequest) -> bool:
+    """Check whether a newline-delimited JSON response was requested."""
+    if request.query.get("format") == "ndjson":
+        return True
+    return NDJSON_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+def paging_args(request: web.BaseRequest) -> dict:
+    """
+    Extract the pagination parameters of a list request.
+
+    Returns:
+        The keyword arguments for `BaseRecord.query_page`, or `None` if the
+        request is not paginated
+
+    Raises:
+        HTTPBadRequest: If the parameters are invalid
+
+    """
+    query = request.query
+    if not any(query.get(name) for name in ("limit", "cursor", "sort", "order")):
+        return None
+    try:
+        limit = int(query.get("limit") or MAX_PAGE_LIMIT)
+    except ValueError:
+        raise web.HTTPBadRequest(reason="Page limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise web.HTTPBadRequest(
+            reason=f"Page limit must be between 1 and {MAX_PAGE_LIMIT}"
+        )
+    sort = query.get("sort") or BaseRecord.SORT_KEYS[0]
+    if sort not in BaseRecord.SORT_KEYS:
+        raise web.HTTPBadRequest(reason=f"Unsupported sort key: {sort}")
+    order = query.get("order") or "asc"
+    if order not in ("asc", "desc"):
+        raise web.HTTPBadRequest(reason=f"Unsupported sort order: {order}")
+    return {
+        "limit": limit,
+        "cursor": query.get("cursor") or None,
+        "sort": sort,
+        "descending": order == "desc",
+    }
+
+
+async def ndjson_response(
+    request: web.BaseRequest,
+    rows: Union[AsyncIterable[dict], Iterable[dict]],
+    limit: int = None,
+    headers: dict = None,
+) -> web.StreamResponse:
+    """
+    Write rows to a newline-delimited JSON response as they are produced.
+
+    Args:
+        request: aiohttp request object
+        rows: The rows, which may be produced asynchronously
+        limit: The maximum number of rows to write
+        headers: Additional response headers
+
+    Returns:
+        The streamed response
+
+    """
+    response = web.StreamResponse(
+        headers={"Content-Type": NDJSON_CONTENT_TYPE, **(headers or {})}
+    )
+    await response.prepare(request)
+    if limit is None or limit > 0:
+        written = 0
+        if hasattr(rows, "__aiter__"):
+            try:
+                async for row in rows:
+                    await response.write(json_dumps_bytes(row) + b"\n")
+                    written += 1
+                    if written == limit:
+                        break
+            finally:
+                # release the search behind the rows without waiting for GC
+                if hasattr(rows, "aclose"):
+                    await rows.aclose()
+        else:
+            for row in rows:
+                await response.write(json_dumps_bytes(row) + b"\n")
+                written += 1
+                if written == limit:
+                    break
+    await response.write_eof()
+    return response
+
+
+async def serialized(records: AsyncIterable[BaseRecord]) -> AsyncIterable[dict]:
+    """Serialize records as they are produced."""
+    async for record in records:
+        yield record.serialize()
+
+
+async def record_list_response(
+    request: web.BaseRequest,
+    record_class: Type[BaseRecord],
+    tag_filter: dict = None,
+    post_filter: dict = None,
+    *,
+    sort_results: Callable = None,
+) -> web.StreamResponse:
+    """
+    Build the response to an admin request listing stored records.
+
+    The request may ask for one page of records with the `limit`, `cursor`,
+    `sort` and `order` parameters, and for newline-delimited JSON with the
+    `format` parameter or the Accept header. Unpaginated NDJSON responses are
+    written as the records are read from storage, in storage order.
+
+    Args:
+        request: aiohttp request object
+        record_class: The class of the records to list
+        tag_filter: An optional dictionary of tag filter clauses
+        post_filter: Additional value filters to apply
+        sort_results: Sort key for the serialized records of an unpaginated
+            JSON response
+
+    Returns:
+        The list response
+
+    """
+    context = request.app["request_context"]
+    paging = paging_args(request)
+    ndjson = is_ndjson_request(request)
+
+    records = None
+    next_cursor = None
+    if paging:
+        try:
+            records, next_cursor = await record_class.query_page(
+                context, tag_filter, post_filter, **paging
+            )
+        except ValueError as e:
+            raise web.HTTPBadRequest(reason=str(e))
+
+    if ndjson:
+        if records is None:
+            rows = serialized(record_class.iter_query(context, tag_filter, post_filter))
+        else:
+            rows = (record.serialize() for record in records)
+        return await ndjson_response(
+            request,
+            rows,
+            headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+        )
+
+    if records is None:
+        records = await record_class.query(context, tag_filter, post_filter)
+    results = [record.serialize() for record in records]
+    if sort_results and not paging:
+        results.sort(key=sort_results)
+    result = {"results": results}
+    if paging:
+        result["next_cursor"] = next_cursor
+    return web.json_response(result, dumps=json_dumps)
@@ -13,11 +13,13 @@ from marshmallow import fields, Schema
 
 from ..config.injection_context import InjectionContext
 from ..core.plugin_registry import PluginRegistry
+from ..ledger.base import BaseLedger
 from ..messaging.responder import BaseResponder
 from ..transport.queue.basic import BasicMessageQueue
 from ..transport.outbound.message import OutboundMessage
+from ..utils.json_codec import json_dumps
 from ..utils.stats import Collector
-from ..utils.task_queue import TaskQueue
+from ..utils.task_queue import TaskQueue, TASK_CLASS_ADMIN
 from ..version import __version__
 
 from .base_server import BaseAdminServer
@@ -42,19 +44,27 @@ class AdminResponder(BaseResponder):
     """Handle outgoing messages from message handlers."""
 
     def __init__(
-        self, context: InjectionContext, send: Coroutine, webhook: Coroutine, **kwargs
+        self,
+        context: InjectionContext,
+        send: Coroutine,
+        webhook: Coroutine,
+        broadcast: Coroutine = None,
+        **kwargs,
     ):
         """
         Initialize an instance of `AdminResponder`.
 
         Args:
             send: Function to send outbound message
+            webhook: Function to dispatch a webhook
+            broadcast: Function to send an outbound message to many connections
 
         """
         super().__init__(**kwargs)
         self._context = context
         self._send = send
         self._webhook = webhook
+        self._broadcast = broadcast
 
     async def send_outbound(self, message: OutboundMessage):
         """
@@ -65,6 +75,21 @@ class AdminResponder(BaseResponder):
         """
         await self._send(self._context, message)
 
+    async def send_broadcast(
+        self, message: OutboundMessage, connection_ids: Sequence[str]
+    ):
+        """
+        Send an outbound message to each of a set of connections.
+
+        Args:
+            message: The `OutboundMessage` to be sent
+            connection_ids: The identifiers of the connections to send it to
+        """
+        if self._broadcast:
+            await self._broadcast(self._context, message, connection_ids)
+        else:
+            await super().send_broadcast(message, connection_ids)
+
     async def send_webhook(self, topic: str, payload: dict):
         """
         Dispatch a webhook.
@@ -117,6 +142,7 @@ class AdminServer(BaseAdminServer):
         webhook_router: Callable,
         task_queue: TaskQueue = None,
         conductor_stats: Coroutine = None,
+        outbound_broadcast_router: Coroutine = None,
     ):
         """
         Initialize an AdminServer instance.
@@ -128,6 +154,9 @@ class AdminServer(BaseAdminServer):
             outbound_message_router: Coroutine for delivering outbound messages
             webhook_router: Callable for delivering webhooks
             task_queue: An optional task queue for handlers
+            conductor_stats: Coroutine for fetching the conductor statistics
+            outbound_broadcast_router: Coroutine for delivering outbound messages
+                to many connections
         """
         self.app = None
         self.host = host
@@ -142,7 +171,10 @@ class AdminServer(BaseAdminServer):
 
         self.context = context.start_scope("admin")
         self.responder = AdminResponder(
-            self.context, outbound_message_router, self.send_webhook
+            self.context,
+            outbound_message_router,
+            self.send_webhook,
+            outbound_broadcast_router,
         )
         self.context.injector.bind_instance(BaseResponder, self.responder)
 
@@ -183,7 +215,9 @@ class AdminServer(BaseAdminServer):
 
             @web.middleware
             async def apply_limiter(request, handler):
-                task = await self.task_queue.put(handler(request))
+                task = await self.task_queue.put(
+                    handler(request), task_class=TASK_CLASS_ADMIN
+                )
                 return await task
 
             middlewares.append(apply_limiter)
@@ -200,6 +234,7 @@ class AdminServer(BaseAdminServer):
         app = web.Application(middlewares=middlewares)
         app["request_context"] = self.context
         app["outbound_message_router"] = self.responder.send
+        app["outbound_broadcast_router"] = self.responder.broadcast
 
         app.add_routes(
             [
@@ -310,7 +345,11 @@ class AdminServer(BaseAdminServer):
             status["timing"] = collector.results
         if self.conductor_stats:
             status["conductor"] = await self.conductor_stats()
-        return web.json_response(status)
+        ledger: BaseLedger = await self.context.inject(BaseLedger, required=False)
+        read_cache = ledger and getattr(ledger, "read_cache", None)
+        if read_cache:
+            status["ledger_cache"] = read_cache.stats
+        return web.json_response(status, dumps=json_dumps)
 
     @docs(tags=["server"], summary="Reset statistics")
     @response_schema(AdminStatusSchema(), 200)
@@ -328,6 +367,10 @@ class AdminServer(BaseAdminServer):
         collector: Collector = await self.context.inject(Collector, required=False)
         if collector:
             collector.reset()
+        ledger: BaseLedger = await self.context.inject(BaseLedger, required=False)
+        read_cache = ledger and getattr(ledger, "read_cache", None)
+        if read_cache:
+            read_cache.reset_stats()
         return web.json_response({})
 
     async def redirect_handler(self, request: web.BaseRequest):
@@ -384,7 +427,7 @@ class AdminServer(BaseAdminServer):
                             msg = {"topic": "ping"}
                         if not closed:
                             if msg:
-                                await ws.send_json(msg)
+                                await ws.send_json(msg, dumps=json_dumps)
                             send = loop.create_task(queue.dequeue(timeout=5.0))
                 except asyncio.CancelledError:
                     closed = True
@@ -3,6 +3,7 @@ import asyncio
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop, unused_port
 from aiohttp import web
 from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
 from asynctest.mock import patch
 
 from ...config.default_context import DefaultContextBuilder
@@ -10,6 +11,8 @@ from ...config.injection_context import InjectionContext
 from ...config.provider import ClassProvider
 from ...core.plugin_registry import PluginRegistry
 from ...core.protocol_registry import ProtocolRegistry
+from ...ledger.base import BaseLedger
+from ...ledger.cache import LedgerReadCache
 from ...transport.outbound.message import OutboundMessage
 
 from ..server import AdminServer
@@ -70,6 +73,29 @@ class TestAdminServerBasic(AsyncTestCase):
         await admin_server.responder.send_outbound(message)
         assert self.message_results == [(admin_server.context, message)]
 
+    async def test_responder_broadcast(self):
+        message = OutboundMessage(payload="{}")
+        admin_server = self.get_admin_server()
+        await admin_server.responder.send_broadcast(message, ["a", "b", "a"])
+        assert [
+            (context, sent.connection_id, sent.payload)
+            for (context, sent) in self.message_results
+        ] == [(admin_server.context, "a", "{}"), (admin_server.context, "b", "{}")]
+
+        broadcast_router = async_mock.CoroutineMock()
+        admin_server = AdminServer(
+            "0.0.0.0",
+            unused_port(),
+            InjectionContext(),
+            self.outbound_message_router,
+            self.webhook_router,
+            outbound_broadcast_router=broadcast_router,
+        )
+        await admin_server.responder.send_broadcast(message, ["a", "b"])
+        broadcast_router.assert_awaited_once_with(
+            admin_server.context, message, ["a", "b"]
+        )
+
     @unittest_run_loop
     async def test_responder_webhook(self):
         admin_server = self.get_admin_server()
@@ -158,6 +184,21 @@ class TestAdminServerClient(AioHTTPTestCase):
         resp = await self.client.request("POST", "/status/reset")
         assert resp.status == 200
 
+    @unittest_run_loop
+    async def test_status_ledger_cache(self):
+        read_cache = LedgerReadCache()
+        await read_cache.get("schema", "missing")
+        ledger = async_mock.MagicMock(BaseLedger, read_cache=read_cache)
+        self.admin_server.context.injector.bind_instance(BaseLedger, ledger)
+        resp = await self.client.request("GET", "/status")
+        result = await resp.json()
+        assert result["ledger_cache"] == {
+            "schema": {"hits": 0, "misses": 1, "hit_ratio": 0.0}
+        }
+        resp = await self.client.request("POST", "/status/reset")
+        assert resp.status == 200
+        assert read_cache.stats == {}
+
     @unittest_run_loop
     async def test_websocket(self):
         async with self.client.ws_connect("/ws") as ws:
@@ -0,0 +1,126 @@
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+
+from ...config.injection_context import InjectionContext
+from ...connections.models.connection_record import ConnectionRecord
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
+
+from ..paging import (
+    NDJSON_CONTENT_TYPE,
+    NEXT_CURSOR_HEADER,
+    ndjson_response,
+    record_list_response,
+)
+
+
+class TestRecordListResponse(AioHTTPTestCase):
+    async def get_application(self):
+        self.context = InjectionContext(enforce_typing=False)
+        self.context.injector.bind_instance(BaseStorage, BasicStorage())
+
+        async def handler(request: web.BaseRequest):
+            post_filter = {}
+            if request.query.get("state"):
+                post_filter["state"] = request.query["state"]
+            return await record_list_response(
+                request, ConnectionRecord, None, post_filter
+            )
+
+        self.rows_closed = False
+
+        async def rows():
+            try:
+                for idx in range(10):
+                    yield {"row": idx}
+            finally:
+                self.rows_closed = True
+
+        async def rows_handler(request: web.BaseRequest):
+            return await ndjson_response(request, rows(), limit=2)
+
+        app = web.Application()
+        app["request_context"] = self.context
+        app.add_routes(
+            [web.get("/connections", handler), web.get("/rows", rows_handler)]
+        )
+        return app
+
+    async def add_records(self, count: int):
+        for idx in range(count):
+            record = ConnectionRecord(
+                their_label=str(idx),
+                state="active" if idx % 2 else ConnectionRecord.STATE_INVITATION,
+            )
+            await record.save(self.context)
+            record.created_at = f"2020-01-01 00:00:{idx:02}Z"
+            await record.save(self.context)
+
+    @unittest_run_loop
+    async def test_unpaginated(self):
+        await self.add_records(5)
+        async with self.client.get("/connections") as response:
+            assert response.status == 200
+            body = await response.json()
+        assert len(body["results"]) == 5
+        assert "next_cursor" not in body
+
+    @unittest_run_loop
+    async def test_pages(self):
+        await self.add_records(10)
+        labels = []
+        params = {"limit": "3", "order": "desc", "state": "active"}
+        while True:
+            async with self.client.get("/connections", params=params) as response:
+                assert response.status == 200
+                body = await response.json()
+            labels.extend(result["their_label"] for result in body["results"])
+            if not body["next_cursor"]:
+                break
+            params["cursor"] = body["next_cursor"]
+        assert labels == ["9", "7", "5", "3", "1"]
+
+    @unittest_run_loop
+    async def test_ndjson(self):
+        await self.add_records(4)
+        async with self.client.get(
+            "/connections", headers={"Accept": NDJSON_CONTENT_TYPE}
+        ) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"] == NDJSON_CONTENT_TYPE
+            lines = (await response.text()).splitlines()
+        assert sorted(json.loads(line)["their_label"] for line in lines) == [
+            "0",
+            "1",
+            "2",
+            "3",
+        ]
+
+        async with self.client.get(
+            "/connections", params={"format": "ndjson", "limit": "3"}
+        ) as response:
+            assert response.status == 200
+            assert response.headers[NEXT_CURSOR_HEADER]
+            lines = (await response.text()).splitlines()
+        assert [json.loads(line)["their_label"] for line in lines] == ["0", "1", "2"]
+
+    @unittest_run_loop
+    async def test_ndjson_limit_closes_rows(self):
+        async with self.client.get("/rows") as response:
+            lines = (await response.text()).splitlines()
+        assert [json.loads(line)["row"] for line in lines] == [0, 1]
+        assert self.rows_closed
+
+    @unittest_run_loop
+    async def test_bad_params(self):
+        for params in (
+            {"limit": "x"},
+            {"limit": "0"},
+            {"sort": "state"},
+            {"order": "up"},
+            {"cursor": "bad"},
+        ):
+            async with self.client.get("/connections", params=params) as response:
+                assert response.status == 400
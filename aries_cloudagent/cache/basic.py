@@ -1,29 +1,102 @@
 """Basic in-memory cache implementation."""
 
+import heapq
+import sys
 import time
+
+from collections import OrderedDict
 from typing import Any, Sequence, Text, Union
 
 from .base import BaseCache
 
 
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the memory used by a cached value, in bytes."""
+    size = sys.getsizeof(value)
+    if _depth < 8:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                size += estimate_size(key, _depth + 1)
+                size += estimate_size(item, _depth + 1)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in value:
+                size += estimate_size(item, _depth + 1)
+    return size
+
+
 class BasicCache(BaseCache):
     """Basic in-memory cache class."""
 
-    def __init__(self):
-        """Initialize a `BasicCache` instance."""
+    def __init__(self, max_entries: int = None, max_size: int = None):
+        """
+        Initialize a `BasicCache` instance.
+
+        Args:
+            max_entries: The maximum number of entries to retain
+            max_size: The approximate maximum size of the cached keys and values,
+                in bytes
+
+        When either limit is reached, the least recently used entries are evicted.
+        """
         super().__init__()
         # looks like { "key": { "expires": <epoch timestamp>, "value": <val> } }
-        self._cache = {}
+        # ordered from least to most recently used
+        self._cache = OrderedDict()
+        # heap of (expires, key) pairs, which may include superseded entries
+        self._expiry = []
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.resident_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the cache statistics."""
+        return {
+            "entries": len(self._cache),
+            "resident_size": self.resident_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Text):
+        """Remove an entry, updating the resident size."""
+        item = self._cache.pop(key)
+        self.resident_size -= item["size"]
 
     def _remove_expired_cache_items(self):
-        """Remove all expired items from cache."""
-        for key, val in self._cache.copy().items():  # iterate copy, del from original
-            cache_item_expiry = val["expires"]
-            if cache_item_expiry is None:
-                continue
-            now = time.perf_counter()
-            if now >= cache_item_expiry:
-                del self._cache[key]
+        """Remove expired items, visiting only those past their expiry time."""
+        now = time.perf_counter()
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            expires, key = heapq.heappop(expiry)
+            item = self._cache.get(key)
+            if item and item["expires"] == expires:
+                self._remove(key)
+                self.expirations += 1
+        if len(expiry) > 2 * len(self._cache) + 64:
+            # drop entries for keys which were cleared or overwritten
+            self._expiry = [
+                (expires, key)
+                for (expires, key) in expiry
+                if key in self._cache and self._cache[key]["expires"] == expires
+            ]
+            heapq.heapify(self._expiry)
+
+    def _evict(self):
+        """Evict least recently used entries until within the configured limits."""
+        while self._cache and (
+            (self.max_entries and len(self._cache) > self.max_entries)
+            or (self.max_size and self.resident_size > self.max_size)
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
 
     async def get(self, key: Text):
         """
@@ -37,7 +110,18 @@ class BasicCache(BaseCache):
 
         """
         self._remove_expired_cache_items()
-        return self._cache.get(key)["value"] if self._cache.get(key) else None
+        item = self._cache.get(key)
+        if not item:
+            self.misses += 1
+            return None
+        if item["expires"] is not None and item["expires"] <= time.perf_counter():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return item["value"]
 
     async def set(self, keys: Union[Text, Sequence[Text]], value: Any, ttl: int = None):
         """
@@ -53,8 +137,16 @@ class BasicCache(BaseCache):
         """
         self._remove_expired_cache_items()
         expires_ts = time.perf_counter() + ttl if ttl else None
+        value_size = estimate_size(value) if self.max_size else 0
         for key in [keys] if isinstance(keys, Text) else keys:
-            self._cache[key] = {"expires": expires_ts, "value": value}
+            if key in self._cache:
+                self._remove(key)
+            size = value_size + sys.getsizeof(key) if self.max_size else 0
+            self._cache[key] = {"expires": expires_ts, "value": value, "size": size}
+            self.resident_size += size
+            if expires_ts is not None:
+                heapq.heappush(self._expiry, (expires_ts, key))
+        self._evict()
 
     async def clear(self, key: Text):
         """
@@ -65,9 +157,11 @@ class BasicCache(BaseCache):
 
         """
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
 
     async def flush(self):
         """Remove all items from the cache."""
 
-        self._cache = {}
+        self._cache = OrderedDict()
+        self._expiry = []
+        self.resident_size = 0
@@ -0,0 +1,28 @@
+"""Default cache provider classes."""
+
+import logging
+
+from ..config.base import BaseProvider, BaseInjector, BaseSettings
+from .basic import BasicCache
+from .remote import RemoteCache
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CacheProvider(BaseProvider):
+    """Provider for the configured cache implementation."""
+
+    async def provide(self, settings: BaseSettings, injector: BaseInjector):
+        """Create and return the cache instance."""
+
+        max_entries = settings.get_value("cache.max_entries")
+        max_size = settings.get_value("cache.max_size")
+        cache_url = settings.get_value("cache.url")
+        if cache_url:
+            LOGGER.info("Using shared cache server: %s", cache_url)
+            return RemoteCache(
+                cache_url,
+                near_ttl=float(settings.get_value("cache.near_ttl", default=5)),
+                near_max_entries=max_entries or 10000,
+            )
+        return BasicCache(max_entries=max_entries, max_size=max_size)
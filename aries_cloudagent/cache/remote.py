@@ -0,0 +1,500 @@
+"""Cache implementation backed by a shared key/value server."""
+
+import asyncio
+import logging
+import uuid
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Sequence, Text, Union
+from urllib.parse import urlparse
+
+import msgpack
+
+from .base import BaseCache, CacheError, CacheKeyLock
+from .basic import BasicCache
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RespConnection:
+    """
+    A pipelined client connection speaking the Redis serialization protocol.
+
+    Commands are written as soon as they are issued and replies are matched
+    to callers in order, so concurrent callers share a single connection
+    without waiting for each other's round trips.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        on_message: Callable[[bytes, bytes], Awaitable] = None,
+    ):
+        """
+        Initialize a `RespConnection` instance.
+
+        Args:
+            url: The server address, in the form redis://[:password@]host[:port][/db]
+            timeout: The timeout in seconds for establishing the connection
+            on_message: The handler for messages published to channels
+                this connection is subscribed to
+
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "tcp"):
+            raise CacheError("Unsupported cache URL: {}".format(url))
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self.on_message = on_message
+        self._lock = asyncio.Lock()
+        self._pending = deque()
+        self._reader: asyncio.StreamReader = None
+        self._writer: asyncio.StreamWriter = None
+        self._read_task: asyncio.Task = None
+
+    @property
+    def connected(self) -> bool:
+        """Accessor for the connection state."""
+        return bool(self._writer and not self._writer.transport.is_closing())
+
+    async def connect(self):
+        """Open the connection, if not already connected."""
+        async with self._lock:
+            if self.connected:
+                return
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                raise CacheError("Error connecting to cache server") from e
+            self._read_task = asyncio.ensure_future(self._read_replies())
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            if setup:
+                await self.pipeline(setup, connect=False)
+
+    async def close(self):
+        """Close the connection."""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        self._fail_pending(CacheError("Connection closed"))
+
+    @staticmethod
+    def encode_command(args: Sequence) -> bytes:
+        """Encode a command as an array of bulk strings."""
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif isinstance(arg, int):
+                arg = b"%d" % arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def execute(self, *args) -> Any:
+        """Send a single command and return its reply."""
+        return (await self.pipeline([args]))[0]
+
+    async def pipeline(self, commands: Sequence[Sequence], connect: bool = True):
+        """Send several commands in one write and return their replies."""
+        if connect and not self.connected:
+            await self.connect()
+        if not self._writer:
+            # the connection was lost or closed while connecting
+            raise CacheError("Not connected to cache server")
+        loop = asyncio.get_event_loop()
+        futures = []
+        for _ in commands:
+            fut = loop.create_future()
+            self._pending.append(fut)
+            futures.append(fut)
+        self._writer.write(b"".join(self.encode_command(cmd) for cmd in commands))
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def _fail_pending(self, exc: Exception):
+        """Fail all commands awaiting a reply."""
+        while self._pending:
+            fut = self._pending.popleft()
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def _read_reply(self):
+        """Parse a single reply from the stream."""
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            return CacheError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise ConnectionError("Unexpected reply from server")
+
+    async def _read_replies(self):
+        """Resolve pending commands with their replies, in order."""
+        try:
+            while True:
+                reply = await self._read_reply()
+                if (
+                    self.on_message
+                    and isinstance(reply, list)
+                    and len(reply) == 3
+                    and reply[0] == b"message"
+                ):
+                    await self.on_message(reply[1], reply[2])
+                    continue
+                if not self._pending:
+                    raise ConnectionError("Unexpected reply from server")
+                fut = self._pending.popleft()
+                if fut.done():
+                    continue
+                if isinstance(reply, CacheError):
+                    fut.set_exception(reply)
+                else:
+                    fut.set_result(reply)
+        except asyncio.CancelledError:
+            pass
+        except (
+            ConnectionError,
+            OSError,
+            ValueError,
+            asyncio.IncompleteReadError,
+        ) as e:
+            LOGGER.warning("Cache server connection lost: %s", e)
+            if self._writer:
+                self._writer.close()
+                self._writer = None
+            self._fail_pending(CacheError("Cache server connection lost"))
+
+
+class RemoteCacheKeyLock(CacheKeyLock):
+    """A cache key lock which also excludes other processes sharing the cache."""
+
+    def __init__(self, cache: "RemoteCache", key: Text):
+        """Initialize the key lock."""
+        super().__init__(cache, key)
+        self.remote_token: str = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await super().__aenter__()
+        if not self.done:
+            found = await self.cache.lock_remote(self)
+            if found is not None and not self.done:
+                self._future.set_result(found)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit, releasing the remote lock if held."""
+        await super().__aexit__(exc_type, exc_val, exc_tb)
+        if self.remote_token:
+            await self.cache.unlock_remote(self)
+
+
+class RemoteCache(BaseCache):
+    """
+    Cache shared between agent instances through a Redis-compatible server.
+
+    Values are encoded with msgpack. Recently used values are also held in a
+    local near cache for up to `near_ttl` seconds. Each update is published to
+    the other instances sharing the server, which drop the key from their near
+    caches, and the near cache is bypassed while that subscription is down.
+    """
+
+    # delete the lock only if it has not expired and been taken by another holder
+    UNLOCK_SCRIPT = (
+        'if redis.call("GET", KEYS[1]) == ARGV[1] then '
+        'return redis.call("DEL", KEYS[1]) else return 0 end'
+    )
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        prefix: str = "acapy:",
+        near_ttl: float = 5.0,
+        near_max_entries: int = 10000,
+        lock_ttl: float = 30.0,
+    ):
+        """
+        Initialize a `RemoteCache` instance.
+
+        Args:
+            url: The cache server address
+            prefix: The prefix applied to the keys stored on the server
+            near_ttl: The number of seconds to retain values in the near cache,
+                or zero to disable the near cache
+            near_max_entries: The maximum number of entries in the near cache
+            lock_ttl: The maximum number of seconds a key lock is held
+
+        """
+        super().__init__()
+        self.connection = RespConnection(url)
+        self.prefix = prefix
+        self.near_ttl = near_ttl
+        self.near = BasicCache(max_entries=near_max_entries) if near_ttl else None
+        self.lock_ttl = lock_ttl
+        self.instance_id = uuid.uuid4().hex
+        self.channel = prefix + "invalidate"
+        self.subscriber = (
+            RespConnection(url, on_message=self._invalidated) if self.near else None
+        )
+        self._subscribed = False
+        self._subscribe_lock = asyncio.Lock()
+
+    def _remote_key(self, key: Text) -> str:
+        return self.prefix + key
+
+    def _near_ttl(self, ttl: float = None) -> float:
+        return min(ttl, self.near_ttl) if ttl else self.near_ttl
+
+    async def _near_ready(self) -> bool:
+        """Check that the near cache is receiving invalidations from other instances."""
+        if not self.near:
+            return False
+        if self._subscribed and self.subscriber.connected:
+            return True
+        async with self._subscribe_lock:
+            if self._subscribed and self.subscriber.connected:
+                return True
+            if self._subscribed:
+                # invalidations may have been missed while disconnected
+                self._subscribed = False
+                await self.near.flush()
+            try:
+                await self.subscriber.execute("SUBSCRIBE", self.channel)
+            except CacheError as e:
+                LOGGER.warning("Error subscribing to cache invalidations: %s", e)
+                return False
+            self._subscribed = True
+        return True
+
+    def _invalidate_command(self, keys: Sequence[Text] = None) -> tuple:
+        """Build the command notifying other instances of updated keys."""
+        return (
+            "PUBLISH",
+            self.channel,
+            self.encode_value([self.instance_id, keys and list(keys)]),
+        )
+
+    async def _invalidated(self, channel: bytes, message: bytes):
+        """Drop keys updated by another instance from the near cache."""
+        try:
+            sender, keys = self.decode_value(message)
+        except (ValueError, TypeError, msgpack.ExtraData):
+            LOGGER.warning("Invalid cache invalidation message")
+            return
+        if sender == self.instance_id:
+            return
+        if keys is None:
+            await self.near.flush()
+        else:
+            for key in keys:
+                await self.near.clear(key)
+
+    @staticmethod
+    def encode_value(value: Any) -> bytes:
+        """Encode a value for storage on the server."""
+        return msgpack.packb(value, use_bin_type=True)
+
+    @staticmethod
+    def decode_value(value: bytes) -> Any:
+        """Decode a value stored on the server."""
+        return msgpack.unpackb(value, raw=False) if value is not None else None
+
+    async def get(self, key: Text):
+        """
+        Get an item from the cache.
+
+        Args:
+            key: the key to retrieve an item for
+
+        Returns:
+            The record found or `None`
+
+        """
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: Sequence[Text]) -> Sequence[Any]:
+        """
+        Get several items from the cache, fetching any remote values in one batch.
+
+        Args:
+            keys: the keys to retrieve items for
+
+        Returns:
+            A list with the value found, or `None`, for each key
+
+        """
+        results = [None] * len(keys)
+        missing = []
+        near = await self._near_ready()
+        for idx, key in enumerate(keys):
+            if near:
+                results[idx] = await self.near.get(key)
+            if results[idx] is None:
+                missing.append(idx)
+        if missing:
+            try:
+                replies = await self.connection.pipeline(
+                    [("GET", self._remote_key(keys[idx])) for idx in missing]
+                )
+            except CacheError as e:
+                LOGGER.warning("Error fetching from cache server: %s", e)
+                return results
+            for idx, reply in zip(missing, replies):
+                value = self.decode_value(reply)
+                results[idx] = value
+                if near and value is not None:
+                    await self.near.set(keys[idx], value, self.near_ttl)
+        return results
+
+    async def set(self, keys: Union[Text, Sequence[Text]], value: Any, ttl: int = None):
+        """
+        Add an item to the cache with an optional ttl.
+
+        Args:
+            keys: the key or keys for which to set an item
+            value: the value to store in the cache
+            ttl: number of seconds that the record should persist
+
+        """
+        keys = [keys] if isinstance(keys, Text) else list(keys)
+        encoded = self.encode_value(value)
+        commands = []
+        for key in keys:
+            if ttl:
+                commands.append(
+                    ("SET", self._remote_key(key), encoded, "PX", int(ttl * 1000))
+                )
+            else:
+                commands.append(("SET", self._remote_key(key), encoded))
+        if self.near:
+            commands.append(self._invalidate_command(keys))
+            if await self._near_ready():
+                await self.near.set(keys, value, self._near_ttl(ttl))
+        try:
+            await self.connection.pipeline(commands)
+        except CacheError as e:
+            LOGGER.warning("Error updating cache server: %s", e)
+
+    async def clear(self, key: Text):
+        """
+        Remove an item from the cache, if present.
+
+        Args:
+            key: the key to remove
+
+        """
+        commands = [("DEL", self._remote_key(key))]
+        if self.near:
+            await self.near.clear(key)
+            commands.append(self._invalidate_command([key]))
+        try:
+            await self.connection.pipeline(commands)
+        except CacheError as e:
+            LOGGER.warning("Error updating cache server: %s", e)
+
+    async def flush(self):
+        """Remove all items with this cache's prefix from the cache."""
+        if self.near:
+            await self.near.flush()
+        cursor = b"0"
+        while True:
+            cursor, keys = await self.connection.execute(
+                "SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 1000
+            )
+            if keys:
+                await self.connection.execute("DEL", *keys)
+            if cursor == b"0":
+                break
+        if self.near:
+            await self.connection.execute(*self._invalidate_command())
+
+    def acquire(self, key: Text) -> RemoteCacheKeyLock:
+        """Acquire a lock on a given cache key, shared with other processes."""
+        result = RemoteCacheKeyLock(self, key)
+        first = self._key_locks.setdefault(key, result)
+        if first is not result:
+            result.parent = first
+        return result
+
+    async def lock_remote(self, lock: RemoteCacheKeyLock) -> Any:
+        """
+        Take the server-side lock for a key, or wait for its holder's result.
+
+        Returns:
+            The value produced by another process while waiting, if any
+
+        """
+        lock_key = self._remote_key("lock::" + lock.key)
+        token = uuid.uuid4().hex
+        delay = 0.02
+        waited = 0.0
+        try:
+            while waited < self.lock_ttl:
+                acquired = await self.connection.execute(
+                    "SET", lock_key, token, "NX", "PX", int(self.lock_ttl * 1000)
+                )
+                if acquired:
+                    lock.remote_token = token
+                    return None
+                await asyncio.sleep(delay)
+                waited += delay
+                delay = min(delay * 2, 0.5)
+                (found,) = await self.get_many([lock.key])
+                if found is not None:
+                    return found
+        except CacheError as e:
+            LOGGER.warning("Error locking cache key: %s", e)
+        return None
+
+    async def unlock_remote(self, lock: RemoteCacheKeyLock):
+        """Release the server-side lock for a key, if still held by this lock."""
+        token, lock.remote_token = lock.remote_token, None
+        try:
+            await self.connection.execute(
+                "EVAL",
+                self.UNLOCK_SCRIPT,
+                1,
+                self._remote_key("lock::" + lock.key),
+                token,
+            )
+        except CacheError as e:
+            LOGGER.warning("Error unlocking cache key: %s", e)
+
+    async def close(self):
+        """Close the connections to the cache server."""
+        await self.connection.close()
+        if self.subscriber:
+            self._subscribed = False
+            await self.subscriber.close()
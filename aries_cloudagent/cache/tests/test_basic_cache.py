@@ -165,3 +165,64 @@ class TestBasicCache:
     @pytest.mark.asyncio
     async def test_repr(self, cache):
         assert isinstance(repr(cache), str)
+
+
+class TestBasicCacheBounded:
+    @pytest.mark.asyncio
+    async def test_max_entries(self):
+        cache = BasicCache(max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # "b" is now least recently used
+        await cache.set("c", 3)
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.stats["evictions"] == 1
+        assert cache.stats["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_max_size(self):
+        cache = BasicCache(max_size=2048)
+        await cache.set("a", "x" * 512)
+        assert 512 < cache.resident_size < 2048
+        await cache.set("b", "x" * 1536)
+        assert await cache.get("a") is None
+        assert await cache.get("b")
+        await cache.set("c", "x" * 4096)
+        assert cache.stats["entries"] == 0
+        assert cache.resident_size == 0
+
+    @pytest.mark.asyncio
+    async def test_overwrite_size(self):
+        cache = BasicCache(max_size=1 << 20)
+        await cache.set("a", "x" * 512)
+        size = cache.resident_size
+        await cache.set("a", "x" * 512)
+        assert cache.resident_size == size
+        await cache.clear("a")
+        assert cache.resident_size == 0
+
+    @pytest.mark.asyncio
+    async def test_expiry_index(self):
+        cache = BasicCache()
+        await cache.set("a", 1, 0.01)
+        await cache.set("a", 2, 60)
+        await cache.set("b", 1, 0.01)
+        await cache.set("c", 1)
+        await sleep(0.02)
+        assert await cache.get("a") == 2
+        assert "b" not in cache._cache
+        assert await cache.get("c") == 1
+        stats = cache.stats
+        assert stats["expirations"] == 1
+        assert stats["hits"] == 2
+        assert await cache.get("b") is None
+        assert cache.stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expiry_compaction(self):
+        cache = BasicCache()
+        for _ in range(100):
+            await cache.set("a", 1, 60)
+        assert len(cache._expiry) <= 2 * len(cache._cache) + 65
@@ -0,0 +1,293 @@
+import asyncio
+import fnmatch
+import time
+
+import msgpack
+import pytest
+
+from ..base import CacheError
+from ..remote import RemoteCache, RespConnection
+
+
+class StandInServer:
+    """Minimal key/value server speaking the subset of RESP used by RemoteCache."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.subscribers = {}
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.port}"
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] and entry[1] <= time.perf_counter():
+            del self.data[key]
+            entry = None
+        return entry and entry[0]
+
+    @staticmethod
+    def bulk(value):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def run(self, cmd, args, writer):
+        if cmd == b"PING":
+            return b"+PONG\r\n"
+        if cmd == b"GET":
+            value = self._get(args[0])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if cmd == b"SET":
+            key, value, opts = args[0], args[1], [a.upper() for a in args[2:]]
+            expires = None
+            if b"PX" in opts:
+                expires = (
+                    time.perf_counter() + int(args[2 + opts.index(b"PX") + 1]) / 1000
+                )
+            if b"NX" in opts and self._get(key) is not None:
+                return b"$-1\r\n"
+            self.data[key] = (value, expires)
+            return b"+OK\r\n"
+        if cmd == b"DEL":
+            count = sum(1 for key in args if self.data.pop(key, None))
+            return b":%d\r\n" % count
+        if cmd == b"SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode()
+            keys = [k for k in self.data if fnmatch.fnmatch(k.decode(), pattern)]
+            out = b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys)
+            for key in keys:
+                out += b"$%d\r\n%s\r\n" % (len(key), key)
+            return out
+        if cmd == b"EVAL" and b'redis.call("DEL"' in args[0]:
+            # the compare-and-delete script used to release key locks
+            key, token = args[2], args[3]
+            if self._get(key) == token:
+                del self.data[key]
+                return b":1\r\n"
+            return b":0\r\n"
+        if cmd == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[0], set()).add(writer)
+            return b"*3\r\n" + self.bulk(b"subscribe") + self.bulk(args[0]) + b":1\r\n"
+        if cmd == b"PUBLISH":
+            receivers = self.subscribers.get(args[0], set())
+            for receiver in receivers:
+                receiver.write(
+                    b"*3\r\n"
+                    + self.bulk(b"message")
+                    + self.bulk(args[0])
+                    + self.bulk(args[1])
+                )
+            return b":%d\r\n" % len(receivers)
+        return b"-ERR unknown command\r\n"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                count = int(line[1:-2])
+                args = []
+                for _ in range(count):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                self.commands.append(args)
+                writer.write(self.run(args[0].upper(), args[1:], writer))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for receivers in self.subscribers.values():
+                receivers.discard(writer)
+            writer.close()
+
+
+@pytest.fixture()
+async def server():
+    server = StandInServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture()
+async def cache(server):
+    cache = RemoteCache(server.url, near_ttl=0)
+    yield cache
+    await cache.close()
+
+
+class TestRespConnection:
+    def test_encode_command(self):
+        assert RespConnection.encode_command(("SET", "k", b"\x00", 5)) == (
+            b"*4\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\n\x00\r\n$1\r\n5\r\n"
+        )
+
+    def test_bad_url(self):
+        with pytest.raises(CacheError):
+            RespConnection("http://localhost")
+
+    @pytest.mark.asyncio
+    async def test_connect_error(self):
+        conn = RespConnection("redis://127.0.0.1:1", timeout=1)
+        with pytest.raises(CacheError):
+            await conn.execute("PING")
+
+    @pytest.mark.asyncio
+    async def test_pipeline(self, server):
+        conn = RespConnection(server.url)
+        replies = await conn.pipeline([("SET", "a", "1"), ("GET", "a"), ("GET", "b")])
+        assert replies == ["OK", b"1", None]
+        with pytest.raises(CacheError):
+            await conn.execute("BOGUS")
+        assert (
+            await asyncio.gather(*(conn.execute("PING") for _ in range(5)))
+            == ["PONG"] * 5
+        )
+        await conn.close()
+
+    @pytest.mark.asyncio
+    async def test_unexpected_reply(self, server):
+        conn = RespConnection(server.url)
+        await conn.connect()
+        conn._writer.write(b"*1\r\n$4\r\nPING\r\n")
+        await asyncio.sleep(0.05)
+        assert not conn.connected
+        assert await conn.execute("PING") == "PONG"
+        await conn.close()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_disconnected(self, server):
+        conn = RespConnection(server.url)
+        with pytest.raises(CacheError):
+            await conn.pipeline([("PING",)], connect=False)
+        assert not conn._pending
+        assert await conn.execute("PING") == "PONG"
+        await conn.close()
+
+
+class TestRemoteCache:
+    @pytest.mark.asyncio
+    async def test_get_set(self, cache, server):
+        assert await cache.get("missing") is None
+        await cache.set("key", {"a": [1, "b"], "c": b"\x01"})
+        assert await cache.get("key") == {"a": [1, "b"], "c": b"\x01"}
+        assert b"acapy:key" in server.data
+        await cache.set(["k1", "k2"], "value")
+        assert await cache.get_many(["k1", "missing", "k2"]) == [
+            "value",
+            None,
+            "value",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_expires(self, cache):
+        await cache.set("key", "value", 0.05)
+        assert await cache.get("key") == "value"
+        await asyncio.sleep(0.06)
+        assert await cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_clear_flush(self, cache, server):
+        server.data[b"other:key"] = (b"\xa1x", None)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.clear("a")
+        assert await cache.get("a") is None
+        await cache.flush()
+        assert await cache.get("b") is None
+        assert list(server.data) == [b"other:key"]
+
+    @pytest.mark.asyncio
+    async def test_near_cache(self, server):
+        cache = RemoteCache(server.url, near_ttl=10)
+        await cache.set("key", "value")
+        server.commands.clear()
+        assert await cache.get("key") == "value"
+        assert not server.commands
+        await cache.clear("key")
+        assert await cache.get("key") is None
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_near_cache_invalidation(self, server):
+        first = RemoteCache(server.url, near_ttl=10)
+        second = RemoteCache(server.url, near_ttl=10)
+        await first.set("key", "one")
+        assert await second.get("key") == "one"
+
+        await first.set("key", "two")
+        await asyncio.sleep(0.05)
+        assert await second.get("key") == "two"
+        await first.clear("key")
+        await asyncio.sleep(0.05)
+        assert await second.get("key") is None
+
+        await second.set("other", "value")
+        await first.flush()
+        await asyncio.sleep(0.05)
+        assert await second.near.get("other") is None
+
+        # the near cache is dropped when invalidations may have been missed
+        await second.set("key", "three")
+        await second.subscriber.close()
+        server.data[b"acapy:key"] = (msgpack.packb("four"), None)
+        assert await second.get("key") == "four"
+
+        await first.close()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_server_unavailable(self):
+        cache = RemoteCache("redis://127.0.0.1:1", near_ttl=0)
+        cache.connection.timeout = 1
+        await cache.set("key", "value")
+        assert await cache.get("key") is None
+        await cache.clear("key")
+
+    @pytest.mark.asyncio
+    async def test_acquire_cross_process(self, server):
+        first = RemoteCache(server.url, near_ttl=0)
+        second = RemoteCache(server.url, near_ttl=0)
+        started = asyncio.Event()
+
+        async def produce():
+            async with first.acquire("key") as entry:
+                assert not entry.done
+                started.set()
+                await asyncio.sleep(0.1)
+                await entry.set_result("produced")
+
+        task = asyncio.ensure_future(produce())
+        await started.wait()
+        async with second.acquire("key") as entry:
+            assert entry.done
+            assert entry.result == "produced"
+        await task
+        assert not any(key.startswith(b"acapy:lock::") for key in server.data)
+
+        # a lock which expired and was taken by another holder is not released
+        lock = second.acquire("expired")
+        async with lock:
+            server.data[b"acapy:lock::expired"] = (b"other-token", None)
+        assert server.data[b"acapy:lock::expired"][0] == b"other-token"
+
+        async with second.acquire("other") as entry:
+            assert not entry.done
+            await entry.set_result("value")
+        assert await first.get("other") == "value"
+
+        await first.close()
+        await second.close()
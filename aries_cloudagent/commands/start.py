@@ -6,6 +6,7 @@ import logging
 import os
 import signal
 from argparse import ArgumentParser
+from multiprocessing.queues import Queue
 from typing import Coroutine, Sequence
 
 try:
@@ -14,22 +15,28 @@ except ImportError:
     uvloop = None
 
 from ..core.conductor import Conductor
+from ..core.workers import WorkerPool
 from ..config import argparse as arg
 from ..config.default_context import DefaultContextBuilder
+from ..config.error import ArgsParseError
 from ..config.util import common_config
 
 LOGGER = logging.getLogger(__name__)
 
 
-async def start_app(conductor: Conductor):
+async def start_app(conductor: Conductor, workers: WorkerPool = None):
     """Start up."""
     await conductor.setup()
     await conductor.start()
+    if workers:
+        workers.start(conductor.forward_webhook)
 
 
-async def shutdown_app(conductor: Conductor):
+async def shutdown_app(conductor: Conductor, workers: WorkerPool = None):
     """Shut down."""
     print("\nShutting down")
+    if workers:
+        workers.stop()
     await conductor.stop()
 
 
@@ -54,6 +61,34 @@ def execute(argv: Sequence[str] = None):
         webhook_urls.append(webhook_url)
         settings["admin.webhook_urls"] = webhook_urls
 
+    # Additional processes listening on the same inbound ports
+    workers = None
+    worker_count = settings.get("transport.inbound_workers") or 1
+    if worker_count > 1:
+        if settings.get("wallet.type", "basic") == "basic":
+            raise ArgsParseError(
+                "--inbound-workers requires a persistent wallet type, "
+                + "as the wallet is shared between processes"
+            )
+        if settings.get("transport.enable_undelivered_queue"):
+            # a message queued by one process cannot be picked up by a
+            # recipient connected to another
+            raise ArgsParseError(
+                "--enable-undelivered-queue cannot be used with --inbound-workers"
+            )
+        if settings.get("transport.ordered_dispatch"):
+            # messages are spread between the processes by the operating
+            # system, so ordering can only hold within a single process
+            raise ArgsParseError(
+                "--ordered-dispatch cannot be used with --inbound-workers"
+            )
+        if not settings.get("cache.url"):
+            LOGGER.warning(
+                "Inbound workers are running without a shared cache (--cache-url)"
+            )
+        settings["transport.reuse_port"] = True
+        workers = WorkerPool(execute_worker, settings, worker_count - 1)
+
     # Create the Conductor instance
     context_builder = DefaultContextBuilder(settings)
     conductor = Conductor(context_builder)
@@ -62,6 +97,15 @@ def execute(argv: Sequence[str] = None):
     if uvloop:
         uvloop.install()
         print("uvloop installed")
+    run_loop(start_app(conductor, workers), shutdown_app(conductor, workers))
+
+
+def execute_worker(settings: dict, webhooks: Queue = None):
+    """Entrypoint for an inbound worker process started by the leader."""
+    common_config(settings)
+    conductor = Conductor(DefaultContextBuilder(settings), webhooks)
+    if uvloop:
+        uvloop.install()
     run_loop(start_app(conductor), shutdown_app(conductor))
 
 
@@ -31,6 +31,89 @@ class TestStart(AsyncTestCase):
             assert isinstance(shutdown_app.call_args[0][0], command.Conductor)
             run_loop.assert_called_once()
 
+    def test_exec_start_workers(self):
+        with self.assertRaises(command.ArgsParseError):
+            command.execute(
+                ["-it", "http", "0.0.0.0", "80", "-ot", "http", "--inbound-workers", "2"]
+            )
+
+        with self.assertRaises(command.ArgsParseError):
+            command.execute(
+                [
+                    "-it",
+                    "http",
+                    "0.0.0.0",
+                    "80",
+                    "-ot",
+                    "http",
+                    "--wallet-type",
+                    "indy",
+                    "--inbound-workers",
+                    "2",
+                    "--ordered-dispatch",
+                    "connection",
+                ]
+            )
+
+        with self.assertRaises(command.ArgsParseError):
+            command.execute(
+                [
+                    "-it",
+                    "http",
+                    "0.0.0.0",
+                    "80",
+                    "-ot",
+                    "http",
+                    "--wallet-type",
+                    "indy",
+                    "--inbound-workers",
+                    "2",
+                    "--enable-undelivered-queue",
+                ]
+            )
+
+        with async_mock.patch.object(
+            command, "start_app", autospec=True
+        ) as start_app, async_mock.patch.object(
+            command, "run_loop"
+        ) as run_loop, async_mock.patch.object(
+            command, "shutdown_app", autospec=True
+        ) as shutdown_app:
+            command.execute(
+                [
+                    "-it",
+                    "http",
+                    "0.0.0.0",
+                    "80",
+                    "-ot",
+                    "http",
+                    "--wallet-type",
+                    "indy",
+                    "--inbound-workers",
+                    "3",
+                ]
+            )
+            workers = start_app.call_args[0][1]
+            assert isinstance(workers, command.WorkerPool)
+            assert workers.count == 2
+            assert workers.target is command.execute_worker
+            assert workers.settings["transport.reuse_port"]
+            assert shutdown_app.call_args[0][1] is workers
+            run_loop.assert_called_once()
+
+    async def test_start_shutdown_app_workers(self):
+        conductor = async_mock.MagicMock(
+            setup=async_mock.CoroutineMock(),
+            start=async_mock.CoroutineMock(),
+            stop=async_mock.CoroutineMock(),
+        )
+        workers = async_mock.MagicMock()
+        await command.start_app(conductor, workers)
+        workers.start.assert_called_once_with(conductor.forward_webhook)
+        await command.shutdown_app(conductor, workers)
+        workers.stop.assert_called_once_with()
+        conductor.stop.assert_awaited_once_with()
+
     async def test_run_loop(self):
         startup = async_mock.CoroutineMock()
         startup_call = startup()
@@ -4,7 +4,15 @@ import abc
 import os
 
 from argparse import ArgumentParser, Namespace
-from typing import Type
+from typing import Sequence, Type
+
+from ..utils.json_codec import (
+    available_backends,
+    BACKEND_AUTO,
+    BACKEND_JSON,
+    BACKEND_ORJSON,
+    BACKEND_UJSON,
+)
 
 from .error import ArgsParseError
 from .util import ByteSize
@@ -131,6 +139,38 @@ class AdminGroup(ArgumentGroup):
             to those events using the admin API. If not specified, webhooks are not\
             published by the agent.",
         )
+        parser.add_argument(
+            "--webhook-batch-size",
+            type=int,
+            metavar="<count>",
+            help="Deliver webhooks in batches of up to this many events, posted to\
+            each target topic URL as a JSON array. Batches are delivered from a\
+            queue separate from agent messages. Default: webhooks are posted\
+            individually.",
+        )
+        parser.add_argument(
+            "--webhook-batch-window",
+            type=float,
+            metavar="<seconds>",
+            help="The longest time a batched webhook waits for its batch to fill.\
+            Default: 0.5.",
+        )
+        parser.add_argument(
+            "--webhook-coalesce",
+            action="store_true",
+            help="Deliver webhooks from a queue separate from agent messages,\
+            replacing any undelivered update to a connection, credential exchange\
+            or presentation exchange record with the latest update to the same\
+            record. Webhooks are still posted individually unless\
+            --webhook-batch-size is given.",
+        )
+        parser.add_argument(
+            "--webhook-queue-limit",
+            type=int,
+            metavar="<count>",
+            help="The maximum number of batched webhooks waiting for delivery,\
+            after which new webhooks are dropped. Default: 1000.",
+        )
 
     def get_settings(self, args: Namespace):
         """Extract admin settings."""
@@ -162,8 +202,120 @@ class AdminGroup(ArgumentGroup):
             if hook_url:
                 hook_urls.append(hook_url)
             settings["admin.webhook_urls"] = hook_urls
+            if args.webhook_batch_size is not None:
+                if args.webhook_batch_size < 1:
+                    raise ArgsParseError("Webhook batch size must be positive")
+                settings["admin.webhook_batch_size"] = args.webhook_batch_size
+            if args.webhook_batch_window is not None:
+                if args.webhook_batch_window < 0:
+                    raise ArgsParseError("Webhook batch window must not be negative")
+                settings["admin.webhook_batch_window"] = args.webhook_batch_window
+            if args.webhook_coalesce:
+                settings["admin.webhook_coalesce"] = True
+            if args.webhook_queue_limit is not None:
+                if args.webhook_queue_limit < 1:
+                    raise ArgsParseError("Webhook queue limit must be positive")
+                settings["admin.webhook_queue_limit"] = args.webhook_queue_limit
+        return settings
+
+
+@group(CAT_START)
+class CacheGroup(ArgumentGroup):
+    """Cache settings."""
+
+    GROUP_NAME = "Cache"
+
+    def add_arguments(self, parser: ArgumentParser):
+        """Add cache-specific command line arguments to the parser."""
+        parser.add_argument(
+            "--cache-max-entries",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of entries held in the in-memory cache.\
+            The least recently used entries are evicted beyond this limit.\
+            Default: unlimited.",
+        )
+        parser.add_argument(
+            "--cache-max-size",
+            type=ByteSize(min_size=1024),
+            metavar="<cache-size>",
+            help="Set the approximate maximum size in bytes of the in-memory cache.\
+            The least recently used entries are evicted beyond this limit.\
+            Default: unlimited.",
+        )
+        parser.add_argument(
+            "--cache-url",
+            type=str,
+            metavar="<cache-url>",
+            help="Share the cache between agent instances using the Redis-compatible\
+            key/value server at this URL, for example 'redis://localhost:6379/0'.\
+            By default each instance uses a private in-memory cache.",
+        )
+        parser.add_argument(
+            "--cache-near-ttl",
+            type=float,
+            metavar="<seconds>",
+            help="Set the number of seconds values from the shared cache server are\
+            also held in memory, or 0 to always query the server. Default: 5.",
+        )
+        parser.add_argument(
+            "--record-cache-ttl",
+            type=str,
+            action="append",
+            metavar="<record-type>=<seconds>",
+            help="Set the number of seconds records of the given type are cached,\
+            for example 'connection=120'. May be specified multiple times.",
+        )
+        parser.add_argument(
+            "--record-cache-size",
+            type=str,
+            action="append",
+            metavar="<record-type>=<count>",
+            help="Set the maximum number of cache entries for records of the given\
+            type, including their cached lookups, for example\
+            'credential_exchange_v10=10000'. The least recently used entries are\
+            evicted beyond this limit. May be specified multiple times.",
+        )
+
+    def get_settings(self, args: Namespace) -> dict:
+        """Extract cache settings."""
+        settings = {}
+        if args.cache_max_entries:
+            settings["cache.max_entries"] = args.cache_max_entries
+        if args.cache_max_size:
+            settings["cache.max_size"] = args.cache_max_size
+        if args.cache_url:
+            settings["cache.url"] = args.cache_url
+        if args.cache_near_ttl is not None:
+            settings["cache.near_ttl"] = args.cache_near_ttl
+        if args.record_cache_ttl:
+            settings["cache.record_ttl"] = self.parse_record_values(
+                "--record-cache-ttl", args.record_cache_ttl, float
+            )
+        if args.record_cache_size:
+            settings["cache.record_max_entries"] = self.parse_record_values(
+                "--record-cache-size", args.record_cache_size, int
+            )
         return settings
 
+    @staticmethod
+    def parse_record_values(option: str, values: Sequence[str], convert) -> dict:
+        """Parse a list of '<record-type>=<value>' strings into a dictionary."""
+        result = {}
+        for value in values:
+            record_type, _sep, setting = value.partition("=")
+            try:
+                parsed = convert(setting)
+            except ValueError:
+                parsed = None
+            if not record_type or parsed is None or parsed <= 0:
+                raise ArgsParseError(
+                    f"Parameter {option} expects '<record-type>=<value>' with a"
+                    " positive value"
+                )
+            result[record_type] = parsed
+        return result
+
 
 @group(CAT_START)
 class DebugGroup(ArgumentGroup):
@@ -375,7 +527,31 @@ class GeneralGroup(ArgumentGroup):
             metavar="<storage-type>",
             help="Specifies the type of storage provider to use for the internal\
             storage engine. This storage interface is used to store internal state.\
-            Supported internal storage types are 'basic' (memory) and 'indy'.",
+            Supported internal storage types are 'basic' (memory), 'indy' and\
+            'sqlite'.",
+        )
+        parser.add_argument(
+            "--storage-path",
+            type=str,
+            metavar="<path>",
+            help="The database file used by the 'sqlite' storage type. Default:\
+            ~/.aries_cloudagent/<wallet-name>.sqlite",
+        )
+        parser.add_argument(
+            "--storage-pool-size",
+            type=int,
+            metavar="<count>",
+            help="The number of database connections used by the 'sqlite'\
+            storage type. Default: 4.",
+        )
+        parser.add_argument(
+            "--json-backend",
+            type=str,
+            choices=(BACKEND_AUTO, BACKEND_JSON, BACKEND_ORJSON, BACKEND_UJSON),
+            metavar="<json-backend>",
+            help="Specifies the library used to encode and decode JSON messages\
+            and records: 'json' (the standard library), 'orjson' or 'ujson'.\
+            Default: 'auto', the fastest of these which is installed.",
         )
 
     def get_settings(self, args: Namespace) -> dict:
@@ -385,6 +561,18 @@ class GeneralGroup(ArgumentGroup):
             settings["external_plugins"] = args.external_plugins
         if args.storage_type:
             settings["storage.type"] = args.storage_type
+        if args.storage_path:
+            settings["storage.path"] = args.storage_path
+        if args.storage_pool_size is not None:
+            if args.storage_pool_size < 1:
+                raise ArgsParseError("Storage pool size must be positive")
+            settings["storage.pool_size"] = args.storage_pool_size
+        if args.json_backend:
+            if args.json_backend not in (BACKEND_AUTO, *available_backends()):
+                raise ArgsParseError(
+                    f"JSON backend is not installed: {args.json_backend}"
+                )
+            settings["json.backend"] = args.json_backend
         return settings
 
 
@@ -429,6 +617,15 @@ class LedgerGroup(ArgumentGroup):
             the URL might be 'http://localhost:9000/genesis'.\
             Genesis transactions URLs are available for the Sovrin test/main networks.",
         )
+        parser.add_argument(
+            "--ledger-cache-dir",
+            type=str,
+            dest="ledger_cache_dir",
+            metavar="<ledger-cache-dir>",
+            help="Specifies a local directory in which to retain schemas and\
+            credential definitions read from the ledger, so that they are not\
+            fetched again after a restart.",
+        )
 
     def get_settings(self, args: Namespace) -> dict:
         """Extract ledger settings."""
@@ -441,6 +638,8 @@ class LedgerGroup(ArgumentGroup):
             settings["ledger.genesis_transactions"] = args.genesis_transactions
         if args.ledger_pool_name:
             settings["ledger.pool_name"] = args.ledger_pool_name
+        if args.ledger_cache_dir:
+            settings["ledger.cache_dir"] = args.ledger_cache_dir
         return settings
 
 
@@ -627,6 +826,89 @@ class TransportGroup(ArgumentGroup):
             for delivery to agents without an endpoint. This option will require\
             additional memory to store messages in the queue.",
         )
+        parser.add_argument(
+            "--undelivered-queue-log",
+            type=str,
+            metavar="<path>",
+            help="Retain messages held in the undelivered queue in an append-only\
+            log at this path, so that they are kept when the agent restarts.",
+        )
+        parser.add_argument(
+            "--undelivered-queue-max-per-key",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of messages held in the undelivered queue\
+            for a single recipient key. When the limit is reached the oldest\
+            message for that key is dropped. Default: no limit.",
+        )
+        parser.add_argument(
+            "--undelivered-queue-max",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of messages held in the undelivered queue\
+            for all recipient keys. When the limit is reached the oldest message\
+            is dropped. Default: no limit.",
+        )
+        parser.add_argument(
+            "--outbound-queue-log",
+            type=str,
+            metavar="<path>",
+            help="Retain outbound messages awaiting delivery in an append-only log\
+            at this path, so that they are delivered after the agent restarts.\
+            Webhooks, which are not encrypted, are not retained. By default\
+            undelivered messages are held in memory only.",
+        )
+        parser.add_argument(
+            "--inbound-workers",
+            type=int,
+            metavar="<count>",
+            help="Set the number of processes handling inbound messages. The\
+            additional worker processes listen on the same inbound transport\
+            ports and share the wallet, and the cache server if --cache-url is\
+            given. The admin server runs in the first process only, and\
+            webhooks raised in the workers are forwarded to it to be sent.\
+            Requires a persistent wallet type, and cannot be combined with\
+            --enable-undelivered-queue or --ordered-dispatch. Default: 1.",
+        )
+        parser.add_argument(
+            "--ordered-dispatch",
+            type=str,
+            choices=("connection", "thread"),
+            metavar="<order>",
+            help="Handle inbound messages one at a time for each sending\
+            connection ('connection') or message thread ('thread'), in the order\
+            they were received. Messages from different connections or threads\
+            are still handled in parallel. Ordering holds within a single\
+            process, so this option cannot be combined with --inbound-workers.\
+            By default messages are handled in parallel without ordering.",
+        )
+        parser.add_argument(
+            "--max-inflight-per-connection",
+            type=int,
+            metavar="<count>",
+            help="With --ordered-dispatch, set the maximum number of inbound\
+            messages waiting to be handled for a connection or thread. Further\
+            messages are refused, asking the sender to retry later.\
+            Default: 100.",
+        )
+        parser.add_argument(
+            "--broadcast-shared-pack",
+            action="store_true",
+            help="Pack a message broadcast to many connections once for groups\
+            of connections sharing a sender key, rather than once per connection.\
+            WARNING: the packed message lists the recipient keys of every\
+            connection in its group, which discloses them to the other members.\
+            Only enable this when the recipients may learn of each other.\
+            Default: false.",
+        )
+        parser.add_argument(
+            "--outbound-endpoint-concurrency",
+            type=int,
+            metavar="<count>",
+            help="Set the maximum number of concurrent deliveries to a single\
+            outbound endpoint (scheme, host and port), which is also the size of\
+            the keep-alive connection pool for each host. Default: 20.",
+        )
 
     def get_settings(self, args: Namespace):
         """Extract transport settings."""
@@ -634,6 +916,32 @@ class TransportGroup(ArgumentGroup):
         settings["transport.inbound_configs"] = args.inbound_transports
         settings["transport.outbound_configs"] = args.outbound_transports
         settings["transport.enable_undelivered_queue"] = args.enable_undelivered_queue
+        if args.undelivered_queue_log:
+            settings["transport.undelivered_queue_log"] = args.undelivered_queue_log
+        if args.undelivered_queue_max_per_key:
+            settings[
+                "transport.undelivered_queue_max_per_key"
+            ] = args.undelivered_queue_max_per_key
+        if args.undelivered_queue_max:
+            settings["transport.undelivered_queue_max"] = args.undelivered_queue_max
+        if args.outbound_queue_log:
+            settings["transport.outbound_queue_log"] = args.outbound_queue_log
+        if args.inbound_workers:
+            settings["transport.inbound_workers"] = args.inbound_workers
+        if args.ordered_dispatch:
+            settings["transport.ordered_dispatch"] = args.ordered_dispatch
+        if args.max_inflight_per_connection is not None:
+            if args.max_inflight_per_connection < 1:
+                raise ArgsParseError("--max-inflight-per-connection must be positive")
+            settings[
+                "transport.max_inflight_per_connection"
+            ] = args.max_inflight_per_connection
+        if args.broadcast_shared_pack:
+            settings["transport.broadcast_shared_pack"] = True
+        if args.outbound_endpoint_concurrency:
+            settings[
+                "transport.outbound_endpoint_concurrency"
+            ] = args.outbound_endpoint_concurrency
 
         if args.endpoint:
             settings["default_endpoint"] = args.endpoint[0]
@@ -708,6 +1016,14 @@ class WalletGroup(ArgumentGroup):
             \"mysecretpassword\",\"admin_account\":\"postgres\",\"admin_password\":\
             \"mysecretpassword\"}'",
         )
+        parser.add_argument(
+            "--wallet-crypto-processes",
+            type=int,
+            metavar="<count>",
+            help="Run message pack and unpack operations for the 'basic' wallet\
+            in a pool of this many processes, so that they may use more than one\
+            CPU core. Default: 0, run them in a thread.",
+        )
         parser.add_argument(
             "--replace-public-did",
             action="store_true",
@@ -733,6 +1049,10 @@ class WalletGroup(ArgumentGroup):
             settings["wallet.storage_config"] = args.wallet_storage_config
         if args.wallet_storage_creds:
             settings["wallet.storage_creds"] = args.wallet_storage_creds
+        if args.wallet_crypto_processes:
+            if args.wallet_crypto_processes < 0:
+                raise ArgsParseError("--wallet-crypto-processes must not be negative")
+            settings["wallet.crypto_processes"] = args.wallet_crypto_processes
         if args.replace_public_did:
             settings["wallet.replace_public_did"] = True
         return settings
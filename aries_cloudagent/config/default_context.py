@@ -5,7 +5,7 @@ from .injection_context import InjectionContext
 from .provider import CachedProvider, ClassProvider, StatsProvider
 
 from ..cache.base import BaseCache
-from ..cache.basic import BasicCache
+from ..cache.provider import CacheProvider
 from ..core.plugin_registry import PluginRegistry
 from ..core.protocol_registry import ProtocolRegistry
 from ..ledger.base import BaseLedger
@@ -17,6 +17,7 @@ from ..protocols.actionmenu.base_service import BaseMenuService
 from ..protocols.actionmenu.driver_service import DriverMenuService
 from ..protocols.introduction.base_service import BaseIntroductionService
 from ..protocols.introduction.demo_service import DemoIntroductionService
+from ..protocols.routing.manager import RouteTable
 from ..storage.base import BaseStorage
 from ..storage.provider import StorageProvider
 from ..transport.wire_format import BaseWireFormat
@@ -38,12 +39,21 @@ class DefaultContextBuilder(ContextBuilder):
             collector = Collector(log_path=timing_log)
             context.injector.bind_instance(Collector, collector)
 
-        # Shared in-memory cache
-        context.injector.bind_instance(BaseCache, BasicCache())
+        # Shared cache, in-memory unless a cache server is configured
+        context.injector.bind_provider(BaseCache, CachedProvider(CacheProvider()))
 
         # Global protocol registry
         context.injector.bind_instance(ProtocolRegistry, ProtocolRegistry())
 
+        # Mediator routes, held in memory unless worker processes share the
+        # storage: their routes are resolved from storage, as another process
+        # may have updated them
+        shared = context.settings.get("transport.inbound_workers") or (
+            context.settings.get("transport.worker_index")
+        )
+        if not shared:
+            context.injector.bind_instance(RouteTable, RouteTable())
+
         await self.bind_providers(context)
         await self.load_plugins(context)
 
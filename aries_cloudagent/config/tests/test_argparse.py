@@ -21,6 +21,99 @@ class TestArgParse(AsyncTestCase):
 
         parser.parse_args([])
 
+    async def test_cache_settings(self):
+        """Test cache argument parsing."""
+
+        parser = ArgumentParser()
+        group = argparse.CacheGroup()
+        group.add_arguments(parser)
+
+        result = parser.parse_args(
+            [
+                "--cache-max-entries",
+                "1000",
+                "--cache-max-size",
+                "64m",
+                "--cache-url",
+                "redis://localhost:6379/0",
+                "--cache-near-ttl",
+                "0",
+            ]
+        )
+        settings = group.get_settings(result)
+        assert settings.get("cache.max_entries") == 1000
+        assert settings.get("cache.max_size") == 64 << 20
+        assert settings.get("cache.url") == "redis://localhost:6379/0"
+        assert settings.get("cache.near_ttl") == 0
+
+        assert group.get_settings(parser.parse_args([])) == {}
+
+        result = parser.parse_args(
+            [
+                "--record-cache-ttl",
+                "connection=120",
+                "--record-cache-size",
+                "connection=5000",
+                "--record-cache-size",
+                "credential_exchange_v10=100",
+            ]
+        )
+        settings = group.get_settings(result)
+        assert settings.get("cache.record_ttl") == {"connection": 120}
+        assert settings.get("cache.record_max_entries") == {
+            "connection": 5000,
+            "credential_exchange_v10": 100,
+        }
+
+        with self.assertRaises(argparse.ArgsParseError):
+            group.get_settings(parser.parse_args(["--record-cache-size", "x=0"]))
+
+    async def test_webhook_settings(self):
+        """Test batched webhook argument parsing."""
+
+        parser = ArgumentParser()
+        group = argparse.AdminGroup()
+        group.add_arguments(parser)
+
+        result = parser.parse_args(
+            [
+                "--admin",
+                "0.0.0.0",
+                "8020",
+                "--admin-insecure-mode",
+                "--webhook-batch-size",
+                "20",
+                "--webhook-batch-window",
+                "0.25",
+                "--webhook-coalesce",
+                "--webhook-queue-limit",
+                "500",
+            ]
+        )
+        settings = group.get_settings(result)
+        assert settings.get("admin.webhook_batch_size") == 20
+        assert settings.get("admin.webhook_batch_window") == 0.25
+        assert settings.get("admin.webhook_coalesce") is True
+        assert settings.get("admin.webhook_queue_limit") == 500
+
+        result = parser.parse_args(
+            ["--admin", "0.0.0.0", "8020", "--admin-insecure-mode"]
+        )
+        assert "admin.webhook_batch_size" not in group.get_settings(result)
+
+        result = parser.parse_args(
+            [
+                "--admin",
+                "0.0.0.0",
+                "8020",
+                "--admin-insecure-mode",
+                "--webhook-batch-size",
+                "0",
+            ]
+        )
+        with self.assertRaises(argparse.ArgsParseError):
+            group.get_settings(result)
+
     async def test_transport_settings(self):
         """Test required argument parsing."""
 
@@ -60,6 +153,17 @@ class TestArgParse(AsyncTestCase):
         assert settings.get("default_endpoint") == "http://default.endpoint/"
         assert settings.get("additional_endpoints") == ["ws://alternate.endpoint/"]
 
+        base_args = ["-it", "http", "0.0.0.0", "80", "-ot", "http"]
+        result = parser.parse_args(base_args + ["--max-inflight-per-connection", "5"])
+        settings = group.get_settings(result)
+        assert settings.get("transport.max_inflight_per_connection") == 5
+        for count in ("0", "-1"):
+            result = parser.parse_args(
+                base_args + ["--max-inflight-per-connection", count]
+            )
+            with self.assertRaises(argparse.ArgsParseError):
+                group.get_settings(result)
+
     def test_bytesize(self):
         bs = ByteSize()
         with self.assertRaises(ArgumentTypeError):
@@ -1,6 +1,7 @@
 from asynctest import TestCase as AsyncTestCase
 
 from ...core.protocol_registry import ProtocolRegistry
+from ...protocols.routing.manager import RouteTable
 from ...storage.base import BaseStorage
 from ...transport.wire_format import BaseWireFormat
 from ...wallet.base import BaseWallet
@@ -24,3 +25,11 @@ class TestDefaultContext(AsyncTestCase):
             BaseStorage,
         ):
             assert isinstance(await result.inject(cls), cls)
+
+    async def test_route_table_workers(self):
+        result = await DefaultContextBuilder().build()
+        assert await result.inject(RouteTable, required=False)
+
+        builder = DefaultContextBuilder(settings={"transport.worker_index": 1})
+        result = await builder.build()
+        assert await result.inject(RouteTable, required=False) is None
@@ -24,6 +24,15 @@ class ConnectionRecord(BaseRecord):  # lgtm[py/missing-equals]
     WEBHOOK_TOPIC = "connections"
     LOG_STATE_FLAG = "debug.connections"
     CACHE_ENABLED = True
+    # records are created on inbound messages, possibly in another process
+    CACHE_NEGATIVE_INDEXES = False
+    CACHE_TAG_INDEXES = (
+        ("my_did",),
+        ("their_did",),
+        ("my_did", "their_did"),
+        ("invitation_key",),
+        ("request_id",),
+    )
     TAG_NAMES = {
         "my_did",
         "their_did",
@@ -205,6 +214,7 @@ class ConnectionRecord(BaseRecord):  # lgtm[py/missing-equals]
             context: The injection context to use
         """
         assert self.connection_id
+        await self.commit_batch(context)
         storage: BaseStorage = await context.inject(BaseStorage)
         result = await storage.search_records(
             self.RECORD_TYPE_INVITATION, {"connection_id": self.connection_id}
@@ -236,6 +246,7 @@ class ConnectionRecord(BaseRecord):  # lgtm[py/missing-equals]
             context: The injection context to use
         """
         assert self.connection_id
+        await self.commit_batch(context)
         storage: BaseStorage = await context.inject(BaseStorage)
         result = await storage.search_records(
             self.RECORD_TYPE_REQUEST, {"connection_id": self.connection_id}
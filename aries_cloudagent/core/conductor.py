@@ -8,11 +8,16 @@ wallet.
 
 """
 
+import asyncio
 import hashlib
 import logging
 
+from multiprocessing.queues import Queue
+from typing import Sequence
+
 from ..admin.base_server import BaseAdminServer
 from ..admin.server import AdminServer
+from ..cache.base import BaseCache
 from ..config.default_context import ContextBuilder
 from ..config.injection_context import InjectionContext
 from ..config.ledger import ledger_config
@@ -20,14 +25,19 @@ from ..config.logging import LoggingConfigurator
 from ..config.wallet import wallet_config
 from ..messaging.responder import BaseResponder
 from ..protocols.connections.manager import ConnectionManager, ConnectionManagerError
+from ..storage.base import BaseStorage
 from ..transport.inbound.manager import InboundTransportManager
 from ..transport.inbound.message import InboundMessage
+from ..transport.inbound.session import AcceptResult
 from ..transport.outbound.base import OutboundDeliveryError
 from ..transport.outbound.manager import OutboundTransportManager
 from ..transport.outbound.message import OutboundMessage
+from ..transport.outbound.webhook import WebhookDispatcher
 from ..transport.wire_format import BaseWireFormat
+from ..utils.json_codec import set_json_backend
 from ..utils.task_queue import CompletedTask, TaskQueue
 from ..utils.stats import Collector
+from ..wallet.base import BaseWallet
 
 from .dispatcher import Dispatcher
 
@@ -42,14 +52,16 @@ class Conductor:
     of our require interfaces and routing inbound and outbound message data.
     """
 
-    def __init__(self, context_builder: ContextBuilder) -> None:
+    def __init__(
+        self, context_builder: ContextBuilder, webhook_queue: Queue = None
+    ) -> None:
         """
         Initialize an instance of Conductor.
 
         Args:
-            inbound_transports: Configuration for inbound transports
-            outbound_transports: Configuration for outbound transports
-            settings: Dictionary of various settings
+            context_builder: The builder of the global request context
+            webhook_queue: In an inbound worker process, the queue used to
+                forward webhooks to the leader process
 
         """
         self.admin_server = None
@@ -58,11 +70,14 @@ class Conductor:
         self.dispatcher: Dispatcher = None
         self.inbound_transport_manager: InboundTransportManager = None
         self.outbound_transport_manager: OutboundTransportManager = None
+        self.webhook_dispatcher: WebhookDispatcher = None
+        self.webhook_queue = webhook_queue
 
     async def setup(self):
         """Initialize the global request context."""
 
         context = await self.context_builder.build()
+        set_json_backend(context.settings.get("json.backend"))
 
         self.dispatcher = Dispatcher(context)
         await self.dispatcher.setup()
@@ -83,6 +98,28 @@ class Conductor:
         )
         await self.outbound_transport_manager.setup()
 
+        # Batched webhook delivery, if enabled
+        if context.settings.get("admin.webhook_batch_size") or context.settings.get(
+            "admin.webhook_coalesce"
+        ):
+            dispatcher_args = {
+                "batch_size": context.settings.get("admin.webhook_batch_size") or 1,
+                "coalesce": bool(context.settings.get("admin.webhook_coalesce")),
+                # without a batch size, webhooks keep their individual format
+                "post_arrays": bool(context.settings.get("admin.webhook_batch_size")),
+            }
+            if context.settings.get("admin.webhook_batch_window") is not None:
+                dispatcher_args["batch_window"] = context.settings[
+                    "admin.webhook_batch_window"
+                ]
+            if context.settings.get("admin.webhook_queue_limit"):
+                dispatcher_args["queue_limit"] = context.settings[
+                    "admin.webhook_queue_limit"
+                ]
+            self.webhook_dispatcher = WebhookDispatcher(
+                self.deliver_webhook, **dispatcher_args
+            )
+
         # Admin API
         if context.settings.get("admin.enabled"):
             try:
@@ -96,6 +133,7 @@ class Conductor:
                     self.webhook_router,
                     self.dispatcher.task_queue,
                     self.get_stats,
+                    self.outbound_broadcast_router,
                 )
                 webhook_urls = context.settings.get("admin.webhook_urls")
                 if webhook_urls:
@@ -221,13 +259,28 @@ class Conductor:
             shutdown.run(self.admin_server.stop())
         if self.inbound_transport_manager:
             shutdown.run(self.inbound_transport_manager.stop())
+        if self.webhook_dispatcher:
+            shutdown.run(self.webhook_dispatcher.stop())
         if self.outbound_transport_manager:
             shutdown.run(self.outbound_transport_manager.stop())
         await shutdown.complete(timeout)
+        if self.context:
+            cache: BaseCache = await self.context.inject(BaseCache, required=False)
+            if cache:
+                await cache.close()
+            storage: BaseStorage = await self.context.inject(
+                BaseStorage, required=False
+            )
+            if storage:
+                await storage.close()
+            wallet: BaseWallet = await self.context.inject(BaseWallet, required=False)
+            if wallet:
+                # also closes the credential searches retained for the wallet
+                await wallet.close()
 
     def inbound_message_router(
         self, message: InboundMessage, can_respond: bool = False
-    ):
+    ) -> AcceptResult:
         """
         Route inbound messages.
 
@@ -235,6 +288,11 @@ class Conductor:
             message: The inbound message instance
             can_respond: If the session supports return routing
 
+        Returns:
+            The result of accepting the message, which asks the inbound
+            transport to retry later when the sender has too many messages
+            waiting to be handled
+
         """
 
         if message.receipt.direct_response_requested and not can_respond:
@@ -246,12 +304,24 @@ class Conductor:
         # Note: at this point we could send the message to a shared queue
         # if this pod is too busy to process it
 
+        if self.dispatcher.shard_full(message):
+            LOGGER.warning("Too many inbound messages waiting, refusing message")
+            return AcceptResult(False, retry=True)
+
+        if self.admin_server:
+            send_webhook = self.admin_server.send_webhook
+        elif self.context.settings.get("transport.worker_index"):
+            send_webhook = self.worker_webhook
+        else:
+            send_webhook = None
+
         self.dispatcher.queue_message(
             message,
             self.outbound_message_router,
-            self.admin_server and self.admin_server.send_webhook,
+            send_webhook,
             lambda completed: self.dispatch_complete(message, completed),
         )
+        return AcceptResult(True)
 
     def dispatch_complete(self, message: InboundMessage, completed: CompletedTask):
         """Handle completion of message dispatch."""
@@ -271,12 +341,16 @@ class Conductor:
             "task_done": self.dispatcher.task_queue.total_done,
             "task_failed": self.dispatcher.task_queue.total_failed,
             "task_pending": self.dispatcher.task_queue.current_pending,
+            "task_classes": self.dispatcher.task_queue.class_stats,
         }
         for m in self.outbound_transport_manager.outbound_buffer:
             if m.state == m.STATE_ENCODE:
                 stats["out_encode"] += 1
             if m.state == m.STATE_DELIVER:
                 stats["out_deliver"] += 1
+        stats["out_endpoints"] = self.outbound_transport_manager.lane_stats()
+        if self.webhook_dispatcher:
+            stats["webhooks"] = self.webhook_dispatcher.stats()
         return stats
 
     async def outbound_message_router(
@@ -338,12 +412,91 @@ class Conductor:
             LOGGER.warning("Cannot queue message for delivery, no supported transport")
             self.handle_not_delivered(context, outbound)
 
+    async def outbound_broadcast_router(
+        self,
+        context: InjectionContext,
+        outbound: OutboundMessage,
+        connection_ids: Sequence[str],
+    ) -> None:
+        """
+        Route an outbound message to each of a set of connections.
+
+        The message payload is serialized once and encoded for each connection,
+        or for groups of connections if shared packs are enabled.
+
+        Args:
+            context: The request context
+            outbound: The outbound message to be sent, without a target
+            connection_ids: The identifiers of the connections to send it to
+        """
+        connection_ids = list(dict.fromkeys(connection_ids))
+        mgr = ConnectionManager(context)
+        results = await asyncio.gather(
+            *(
+                self.dispatcher.run_task(
+                    mgr.get_connection_targets(connection_id=connection_id)
+                )
+                for connection_id in connection_ids
+            ),
+            return_exceptions=True,
+        )
+        targets = {}
+        for connection_id, result in zip(connection_ids, results):
+            if isinstance(result, Exception):
+                LOGGER.error(
+                    "Error preparing broadcast message for connection %s: %s",
+                    connection_id,
+                    result,
+                )
+            else:
+                targets[connection_id] = result
+
+        unsupported = self.outbound_transport_manager.enqueue_broadcast(
+            context, outbound.payload, targets
+        )
+        if unsupported:
+            LOGGER.warning(
+                "Cannot queue broadcast message for delivery to %d connection(s), "
+                "no supported transport",
+                len(unsupported),
+            )
+        for connection_id in unsupported:
+            self.handle_not_delivered(
+                context,
+                OutboundMessage(
+                    connection_id=connection_id,
+                    payload=outbound.payload,
+                    reply_thread_id=outbound.reply_thread_id,
+                    target_list=targets[connection_id],
+                ),
+            )
+
     def handle_not_delivered(
         self, context: InjectionContext, outbound: OutboundMessage
     ):
         """Handle a message that failed delivery via outbound transports."""
         self.inbound_transport_manager.return_undelivered(outbound)
 
+    async def worker_webhook(self, topic: str, payload: dict):
+        """
+        Send a webhook from an inbound worker process.
+
+        Workers do not run the admin server, so webhooks are forwarded to the
+        leader process, which sends them on with its own in the order they
+        arrive. Without a queue to the leader, webhooks are sent directly to
+        the webhook URLs given at startup.
+        """
+        if self.webhook_queue:
+            self.webhook_queue.put((topic, payload))
+            return
+        for url in self.context.settings.get("admin.webhook_urls") or ():
+            self.webhook_router(topic, payload, url)
+
+    async def forward_webhook(self, topic: str, payload: dict):
+        """Send a webhook forwarded from an inbound worker process."""
+        if self.admin_server:
+            await self.admin_server.send_webhook(topic, payload)
+
     def webhook_router(
         self, topic: str, payload: dict, endpoint: str, max_attempts: int = None
     ):
@@ -356,6 +509,9 @@ class Conductor:
             endpoint: The endpoint of the webhook target
             max_attempts: The maximum number of attempts
         """
+        if self.webhook_dispatcher:
+            self.webhook_dispatcher.enqueue(topic, payload, endpoint, max_attempts)
+            return
         try:
             self.outbound_transport_manager.enqueue_webhook(
                 topic, payload, endpoint, max_attempts
@@ -364,3 +520,19 @@ class Conductor:
             LOGGER.warning(
                 "Cannot queue message webhook for delivery, no supported transport"
             )
+
+    async def deliver_webhook(self, url: str, payload: str):
+        """
+        Post a batch of webhooks using the running outbound transport.
+
+        Args:
+            url: The URL of the webhook target topic
+            payload: The JSON-encoded batch
+
+        Raises:
+            OutboundDeliveryError: if the associated transport is not running
+
+        """
+        manager = self.outbound_transport_manager
+        transport_id = manager.get_running_transport_for_endpoint(url)
+        await manager.get_transport_instance(transport_id).handle_message(payload, url)
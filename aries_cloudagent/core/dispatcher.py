@@ -8,6 +8,7 @@ lifecycle hook callbacks storing state for message threads, etc.
 import asyncio
 import logging
 import os
+from collections import deque
 from typing import Callable, Coroutine, Union
 
 from aiohttp.web import HTTPException
@@ -22,10 +23,23 @@ from ..messaging.responder import BaseResponder
 from ..messaging.util import datetime_now
 from ..protocols.connections.manager import ConnectionManager
 from ..protocols.problem_report.message import ProblemReport
+from ..protocols.routing.manager import RouteTable
+from ..protocols.routing.message_types import FORWARD
+from ..storage.base import BaseStorage, StorageBatch
 from ..transport.inbound.message import InboundMessage
 from ..transport.outbound.message import OutboundMessage
+from ..utils.json_codec import json_dumps
 from ..utils.stats import Collector
-from ..utils.task_queue import CompletedTask, PendingTask, TaskQueue
+from ..utils.task_queue import (
+    CompletedTask,
+    PendingTask,
+    TaskClass,
+    TaskQueue,
+    TASK_CLASS_ADMIN,
+    TASK_CLASS_CRYPTO,
+    TASK_CLASS_INBOUND,
+    TASK_CLASS_OUTBOUND,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -38,31 +52,67 @@ class Dispatcher:
     to other agents.
     """
 
+    ORDER_BY_CONNECTION = "connection"
+    ORDER_BY_THREAD = "thread"
+    MAX_INFLIGHT_PER_SHARD = 100
+
     def __init__(self, context: InjectionContext):
         """Initialize an instance of Dispatcher."""
         self.context = context
         self.collector: Collector = None
         self.task_queue: TaskQueue = None
+        self.order_by: str = None
+        self.route_table: RouteTable = None
+        self.max_inflight_per_shard = 0
+        # messages waiting for an earlier message with the same shard key,
+        # keyed by shard; a shard is present while one of its messages is active
+        self.shards = {}
 
     async def setup(self):
         """Perform async instance setup."""
         self.collector = await self.context.inject(Collector, required=False)
+        self.route_table = await self.context.inject(RouteTable, required=False)
         max_active = int(os.getenv("DISPATCHER_MAX_ACTIVE", 50))
+        admin_max_active = int(os.getenv("DISPATCHER_ADMIN_MAX_ACTIVE", 10))
+        # each class has its own budget, so that a burst of admin requests
+        # cannot hold up message handling; crypto work is started first as
+        # other tasks are waiting on it
         self.task_queue = TaskQueue(
-            max_active=max_active, timed=bool(self.collector), trace_fn=self.log_task
+            timed=bool(self.collector),
+            trace_fn=self.log_task,
+            task_classes=(
+                TaskClass(TASK_CLASS_CRYPTO, max_active, priority=0),
+                TaskClass(TASK_CLASS_INBOUND, max_active, priority=1),
+                TaskClass(TASK_CLASS_OUTBOUND, max_active, priority=2),
+                TaskClass(TASK_CLASS_ADMIN, admin_max_active, priority=3),
+            ),
         )
+        self.order_by = self.context.settings.get("transport.ordered_dispatch")
+        if self.order_by:
+            self.max_inflight_per_shard = int(
+                self.context.settings.get("transport.max_inflight_per_connection")
+                or self.MAX_INFLIGHT_PER_SHARD
+            )
 
     def put_task(
-        self, coro: Coroutine, complete: Callable = None, ident: str = None
+        self,
+        coro: Coroutine,
+        complete: Callable = None,
+        ident: str = None,
+        task_class: str = TASK_CLASS_INBOUND,
     ) -> PendingTask:
         """Run a task in the task queue, potentially blocking other handlers."""
-        return self.task_queue.put(coro, complete, ident)
+        return self.task_queue.put(coro, complete, ident, task_class)
 
     def run_task(
-        self, coro: Coroutine, complete: Callable = None, ident: str = None
+        self,
+        coro: Coroutine,
+        complete: Callable = None,
+        ident: str = None,
+        task_class: str = TASK_CLASS_OUTBOUND,
     ) -> asyncio.Task:
         """Run a task in the task queue, potentially blocking other handlers."""
-        return self.task_queue.run(coro, complete, ident)
+        return self.task_queue.run(coro, complete, ident, task_class=task_class)
 
     def log_task(self, task: CompletedTask):
         """Log a completed task using the stats collector."""
@@ -71,14 +121,19 @@ class Dispatcher:
             LOGGER.exception(
                 "Handler error: %s", task.ident or "", exc_info=task.exc_info
             )
-        if self.collector:
+        if self.collector and task.timing:
             timing = task.timing
             if "queued" in timing:
-                self.collector.log(
-                    f"Dispatcher:queued", timing["unqueued"] - timing["queued"]
-                )
-            if task.ident:
-                self.collector.log(task.ident, timing["ended"] - timing["started"])
+                queued = timing["unqueued"] - timing["queued"]
+                self.collector.log(f"Dispatcher:queued", queued)
+                self.collector.log(f"Dispatcher:queued:{task.task_class}", queued)
+            else:
+                self.collector.log(f"Dispatcher:queued:{task.task_class}", 0.0)
+            if "ended" in timing:
+                duration = timing["ended"] - timing["started"]
+                self.collector.log(f"Dispatcher:run:{task.task_class}", duration)
+                if task.ident:
+                    self.collector.log(task.ident, duration)
 
     def queue_message(
         self,
@@ -100,9 +155,63 @@ class Dispatcher:
             A pending task instance resolving to the handler task
 
         """
-        return self.put_task(
-            self.handle_message(inbound_message, send_outbound, send_webhook), complete
+        coro = self.handle_message(inbound_message, send_outbound, send_webhook)
+        key = self.shard_key(inbound_message)
+        if not key:
+            return self.put_task(coro, complete)
+
+        pending = PendingTask(
+            coro,
+            lambda completed: self.shard_complete(key, completed, complete),
+            task_class=TASK_CLASS_INBOUND,
         )
+        if key in self.shards:
+            self.shards[key].append(pending)
+        else:
+            self.shards[key] = deque()
+            self.task_queue.schedule(pending)
+        return pending
+
+    def shard_key(self, inbound_message: InboundMessage) -> str:
+        """
+        Determine the key of the shard a message is handled in, if any.
+
+        Messages with the same shard key are handled one at a time, in the
+        order they were received. Connections are identified by the sender's
+        verkey, as the connection record has not been resolved yet. Shards are
+        held in memory, so the order is only kept among the messages received
+        by this process.
+        """
+        receipt = inbound_message.receipt
+        if self.order_by == self.ORDER_BY_CONNECTION:
+            key = receipt.sender_verkey or receipt.thread_id
+        elif self.order_by == self.ORDER_BY_THREAD:
+            key = receipt.thread_id
+        else:
+            key = None
+        return key
+
+    def shard_inflight(self, key: str) -> int:
+        """Get the number of active and waiting messages for a shard key."""
+        shard = self.shards.get(key)
+        return 0 if shard is None else len(shard) + 1
+
+    def shard_full(self, inbound_message: InboundMessage) -> bool:
+        """Check whether a message should be refused until its shard catches up."""
+        key = self.max_inflight_per_shard and self.shard_key(inbound_message)
+        return bool(key) and self.shard_inflight(key) >= self.max_inflight_per_shard
+
+    def shard_complete(self, key: str, completed: CompletedTask, complete: Callable):
+        """Handle completion of a sharded message and start the next one."""
+        try:
+            if complete:
+                complete(completed)
+        finally:
+            shard = self.shards.get(key)
+            if shard:
+                self.task_queue.schedule(shard.popleft())
+            else:
+                self.shards.pop(key, None)
 
     async def handle_message(
         self,
@@ -123,6 +232,11 @@ class Dispatcher:
 
         """
 
+        if self.route_table and await self.forward_message(
+            inbound_message, send_outbound
+        ):
+            return
+
         connection_mgr = ConnectionManager(self.context)
         connection = await connection_mgr.find_inbound_connection(
             inbound_message.receipt
@@ -162,11 +276,71 @@ class Dispatcher:
 
         context.injector.bind_instance(BaseResponder, responder)
 
+        # Records saved by the handler are written to storage together, before
+        # any reply is sent and once the handler returns. The pending writes of
+        # a failed handler are discarded.
+        storage: BaseStorage = await context.inject(BaseStorage, required=False)
+        batch = storage and storage.batch()
+        if batch:
+            context.injector.bind_instance(StorageBatch, batch)
+
         handler_cls = context.message.Handler
         handler = handler_cls().handle
         if self.collector:
             handler = self.collector.wrap_coro(handler, [handler.__qualname__])
-        await handler(context, responder)
+        try:
+            await handler(context, responder)
+        except BaseException:
+            if batch:
+                batch.discard()
+            raise
+        if batch:
+            await batch.commit()
+
+    async def forward_message(
+        self, inbound_message: InboundMessage, send_outbound: Coroutine
+    ) -> bool:
+        """
+        Relay a forward message for a known route without handling it in full.
+
+        The message is not deserialized and the inbound connection is not
+        resolved: the route for the recipient key is found in the route table,
+        and the inner payload is queued for delivery as received.
+
+        Args:
+            inbound_message: The inbound message instance
+            send_outbound: Async function to send outbound messages
+
+        Returns:
+            False if the message is to be handled by its message handler
+
+        """
+        payload = inbound_message.payload
+        if (
+            not isinstance(payload, dict)
+            or payload.get("@type") != FORWARD
+            or not inbound_message.receipt.recipient_verkey
+        ):
+            return False
+        target = payload.get("to")
+        packed = payload.get("msg")
+        if not isinstance(target, str) or not isinstance(packed, (str, dict)):
+            return False
+        route = await self.route_table.get_route(self.context, target)
+        if not route:
+            # unknown and duplicated routes are reported by the handler
+            return False
+
+        if isinstance(packed, dict):
+            packed = json_dumps(packed)
+        LOGGER.debug("Forwarding message to connection: %s", route.connection_id)
+        outbound = OutboundMessage(
+            connection_id=route.connection_id,
+            enc_payload=packed.encode("utf-8"),
+            payload=None,
+        )
+        await send_outbound(self.context, outbound, inbound_message)
+        return True
 
     async def make_message(self, parsed_msg: dict) -> AgentMessage:
         """
@@ -206,6 +380,10 @@ class Dispatcher:
 
     async def complete(self, timeout: float = 0.1):
         """Wait for pending tasks to complete."""
+        for shard in self.shards.values():
+            for pending in shard:
+                pending.cancel()
+            shard.clear()
         await self.task_queue.complete(timeout=timeout)
 
 
@@ -263,9 +441,15 @@ class DispatcherResponder(BaseResponder):
         """
         Send outbound message.
 
+        The writes pending in the storage batch of the handler are committed
+        first, so that a reply is never sent ahead of the records it relies on.
+
         Args:
             message: The `OutboundMessage` to be sent
         """
+        batch: StorageBatch = await self._context.inject(StorageBatch, required=False)
+        if batch and batch.pending:
+            await batch.commit()
         await self._send(self._context, message, self._inbound_message)
 
     async def send_webhook(self, topic: str, payload: dict):
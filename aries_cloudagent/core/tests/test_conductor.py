@@ -5,6 +5,7 @@ from asynctest import mock as async_mock
 
 from .. import conductor as test_module
 from ...admin.base_server import BaseAdminServer
+from ...cache.base import BaseCache
 from ...config.base_context import ContextBuilder
 from ...config.injection_context import InjectionContext
 from ...connections.models.connection_record import ConnectionRecord
@@ -113,10 +114,19 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
 
             mock_logger.print_banner.assert_called_once()
 
+            cache = async_mock.MagicMock(close=async_mock.CoroutineMock())
+            conductor.context.injector.bind_instance(BaseCache, cache)
+            storage = async_mock.MagicMock(close=async_mock.CoroutineMock())
+            conductor.context.injector.bind_instance(BaseStorage, storage)
+            wallet = async_mock.MagicMock(close=async_mock.CoroutineMock())
+            conductor.context.injector.bind_instance(BaseWallet, wallet)
             await conductor.stop()
 
             mock_inbound_mgr.return_value.stop.assert_awaited_once_with()
             mock_outbound_mgr.return_value.stop.assert_awaited_once_with()
+            cache.close.assert_awaited_once_with()
+            storage.close.assert_awaited_once_with()
+            wallet.close.assert_awaited_once_with()
 
     async def test_inbound_message_handler(self):
         builder: ContextBuilder = StubContextBuilder(self.test_settings)
@@ -132,7 +142,7 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
             receipt = MessageReceipt()
             message = InboundMessage(message_body, receipt)
 
-            conductor.inbound_message_router(message)
+            assert conductor.inbound_message_router(message)
 
             mock_dispatch.assert_called_once()
             assert mock_dispatch.call_args[0][0] is message
@@ -140,6 +150,68 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
             assert mock_dispatch.call_args[0][2] is None  # admin webhook router
             assert callable(mock_dispatch.call_args[0][3])
 
+    async def test_inbound_message_handler_busy(self):
+        builder: ContextBuilder = StubContextBuilder(self.test_settings)
+        conductor = test_module.Conductor(builder)
+
+        await conductor.setup()
+
+        with async_mock.patch.object(
+            conductor.dispatcher, "queue_message", autospec=True
+        ) as mock_dispatch, async_mock.patch.object(
+            conductor.dispatcher, "shard_full", return_value=True
+        ):
+            message = InboundMessage("{}", MessageReceipt())
+            result = conductor.inbound_message_router(message)
+            assert not result and result.retry
+            mock_dispatch.assert_not_called()
+
+    async def test_inbound_message_handler_worker(self):
+        builder: ContextBuilder = StubContextBuilder(
+            {
+                **self.test_settings,
+                "admin.webhook_urls": ["http://localhost:8022"],
+                "transport.worker_index": 1,
+            }
+        )
+        conductor = test_module.Conductor(builder)
+
+        await conductor.setup()
+
+        with async_mock.patch.object(
+            conductor.dispatcher, "queue_message", autospec=True
+        ) as mock_dispatch, async_mock.patch.object(
+            conductor, "webhook_router", autospec=True
+        ) as mock_router:
+            message = InboundMessage("{}", MessageReceipt())
+            assert conductor.inbound_message_router(message)
+            send_webhook = mock_dispatch.call_args[0][2]
+            await send_webhook("topic", {"state": "active"})
+            mock_router.assert_called_once_with(
+                "topic", {"state": "active"}, "http://localhost:8022"
+            )
+
+        conductor.webhook_queue = async_mock.MagicMock()
+        with async_mock.patch.object(
+            conductor, "webhook_router", autospec=True
+        ) as mock_router:
+            await conductor.worker_webhook("topic", {"state": "active"})
+            conductor.webhook_queue.put.assert_called_once_with(
+                ("topic", {"state": "active"})
+            )
+            mock_router.assert_not_called()
+
+    async def test_forward_webhook(self):
+        conductor = test_module.Conductor(StubContextBuilder(self.test_settings))
+        await conductor.forward_webhook("topic", {"state": "active"})
+        conductor.admin_server = async_mock.MagicMock(
+            send_webhook=async_mock.CoroutineMock()
+        )
+        await conductor.forward_webhook("topic", {"state": "active"})
+        conductor.admin_server.send_webhook.assert_awaited_once_with(
+            "topic", {"state": "active"}
+        )
+
     async def test_outbound_message_handler_return_route(self):
         builder: ContextBuilder = StubContextBuilder(self.test_settings)
         conductor = test_module.Conductor(builder)
@@ -218,6 +290,49 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
                 conductor.context, message
             )
 
+    async def test_outbound_broadcast_router(self):
+        builder: ContextBuilder = StubContextBuilder(self.test_settings)
+        conductor = test_module.Conductor(builder)
+
+        with async_mock.patch.object(
+            test_module, "OutboundTransportManager", autospec=True
+        ) as mock_outbound_mgr, async_mock.patch.object(
+            test_module, "ConnectionManager", autospec=True
+        ) as conn_mgr:
+
+            await conductor.setup()
+
+            targets = {
+                "conn-1": [ConnectionTarget(endpoint="http://one")],
+                "conn-2": [ConnectionTarget(endpoint="ftp://two")],
+            }
+
+            async def get_connection_targets(connection_id):
+                if connection_id not in targets:
+                    raise test_module.ConnectionManagerError()
+                return targets[connection_id]
+
+            conn_mgr.return_value.get_connection_targets.side_effect = (
+                get_connection_targets
+            )
+            mock_outbound_mgr.return_value.enqueue_broadcast.return_value = ["conn-2"]
+            message = OutboundMessage(payload="{}")
+
+            with async_mock.patch.object(
+                conductor, "handle_not_delivered"
+            ) as mock_not_delivered:
+                await conductor.outbound_broadcast_router(
+                    conductor.context, message, ["conn-1", "conn-2", "conn-1", "bad"]
+                )
+
+            mock_outbound_mgr.return_value.enqueue_broadcast.assert_called_once_with(
+                conductor.context, "{}", targets
+            )
+            mock_not_delivered.assert_called_once()
+            undelivered = mock_not_delivered.call_args[0][1]
+            assert undelivered.connection_id == "conn-2"
+            assert undelivered.target_list == targets["conn-2"]
+
     async def test_admin(self):
         builder: ContextBuilder = StubContextBuilder(self.test_settings)
         builder.update_settings({"admin.enabled": "1"})
@@ -315,3 +430,38 @@ class TestConductor(AsyncTestCase, Config, TestDIDs):
                 test_topic, test_payload, test_endpoint, test_attempts
             )
 
+    async def test_webhook_router_batched(self):
+        builder: ContextBuilder = StubContextBuilder(self.test_settings)
+        builder.update_settings(
+            {"admin.webhook_batch_size": 5, "admin.webhook_batch_window": 0.1}
+        )
+        conductor = test_module.Conductor(builder)
+
+        await conductor.setup()
+        dispatcher = conductor.webhook_dispatcher
+        assert dispatcher.batch_size == 5 and dispatcher.batch_window == 0.1
+        assert dispatcher.post_arrays and not dispatcher.coalesce
+
+        with async_mock.patch.object(
+            conductor.outbound_transport_manager, "enqueue_webhook"
+        ) as mock_enqueue, async_mock.patch.object(
+            dispatcher, "enqueue"
+        ) as mock_dispatch:
+            conductor.webhook_router("topic", {"test": "payload"}, "http://example")
+            mock_dispatch.assert_called_once_with(
+                "topic", {"test": "payload"}, "http://example", None
+            )
+            mock_enqueue.assert_not_called()
+
+        stats = await conductor.get_stats()
+        assert stats["webhooks"] == {"pending": 0, "targets": {}}
+
+    async def test_webhook_coalesce_only(self):
+        builder: ContextBuilder = StubContextBuilder(self.test_settings)
+        builder.update_settings({"admin.webhook_coalesce": True})
+        conductor = test_module.Conductor(builder)
+
+        await conductor.setup()
+        dispatcher = conductor.webhook_dispatcher
+        assert dispatcher.coalesce
+        assert dispatcher.batch_size == 1 and not dispatcher.post_arrays
@@ -9,6 +9,10 @@ from ...core.protocol_registry import ProtocolRegistry
 from ...messaging.agent_message import AgentMessage, AgentMessageSchema
 from ...messaging.error import MessageParseError
 from ...protocols.problem_report.message import ProblemReport
+from ...protocols.routing.manager import RouteTable, RoutingManager
+from ...protocols.routing.message_types import FORWARD
+from ...storage.base import BaseStorage
+from ...storage.basic import BasicStorage
 from ...transport.inbound.message import InboundMessage
 from ...transport.inbound.receipt import MessageReceipt
 from ...transport.outbound.message import OutboundMessage
@@ -84,6 +88,141 @@ class TestDispatcher(AsyncTestCase):
                 handler_mock.call_args[0][2], test_module.DispatcherResponder
             )
 
+    async def test_dispatch_ordered_by_connection(self):
+        context = make_context()
+        context.enforce_typing = False
+        context.update_settings(
+            {
+                "transport.ordered_dispatch": "connection",
+                "transport.max_inflight_per_connection": 2,
+            }
+        )
+        registry = await context.inject(ProtocolRegistry)
+        registry.register_message_types(
+            {StubAgentMessage.Meta.message_type: StubAgentMessage}
+        )
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        rcv = Receiver()
+        handled = []
+
+        async def handle(handler, context, responder):
+            verkey = context.message_receipt.sender_verkey
+            handled.append(("start", verkey, context.message._id))
+            await asyncio.sleep(0.01)
+            handled.append(("end", verkey, context.message._id))
+
+        def make_message(verkey, msg_id):
+            message = {"@type": StubAgentMessage.Meta.message_type, "@id": msg_id}
+            return InboundMessage(message, MessageReceipt(sender_verkey=verkey))
+
+        with async_mock.patch.object(
+            StubAgentMessageHandler, "handle", autospec=True
+        ) as handler_mock, async_mock.patch.object(
+            test_module.ConnectionManager,
+            "find_inbound_connection",
+            async_mock.CoroutineMock(return_value=None),
+        ):
+            handler_mock.side_effect = handle
+            dispatcher.queue_message(make_message("a", "1"), rcv.send)
+            dispatcher.queue_message(make_message("a", "2"), rcv.send)
+            dispatcher.queue_message(make_message("b", "3"), rcv.send)
+            assert dispatcher.shard_full(make_message("a", "4"))
+            assert not dispatcher.shard_full(make_message("b", "4"))
+            assert dispatcher.shard_inflight("a") == 2
+            await dispatcher.task_queue
+
+        # messages from one connection are handled in order, one at a time
+        assert [h for h in handled if h[1] == "a"] == [
+            ("start", "a", "1"),
+            ("end", "a", "1"),
+            ("start", "a", "2"),
+            ("end", "a", "2"),
+        ]
+        # while another connection is handled in parallel
+        assert handled[:2] == [("start", "a", "1"), ("start", "b", "3")]
+        assert not dispatcher.shards
+
+    async def test_dispatch_batch(self):
+        context = make_context()
+        context.enforce_typing = False
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        registry = await context.inject(ProtocolRegistry)
+        registry.register_message_types(
+            {StubAgentMessage.Meta.message_type: StubAgentMessage}
+        )
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        stored_at_send = []
+
+        async def send(context, message, inbound=None):
+            stored_at_send.append(
+                await storage.record_exists(ConnectionRecord.RECORD_TYPE)
+            )
+
+        async def handle(handler, context, responder):
+            await ConnectionRecord(my_did="did").save(context)
+            await responder.send_reply(ProblemReport(explain_ltxt="reply"))
+            if context.message._id == "fail":
+                await ConnectionRecord(my_did="other").save(context)
+                raise ValueError()
+
+        with async_mock.patch.object(
+            StubAgentMessageHandler, "handle", autospec=True
+        ) as handler_mock, async_mock.patch.object(
+            test_module.ConnectionManager,
+            "find_inbound_connection",
+            async_mock.CoroutineMock(return_value=None),
+        ):
+            handler_mock.side_effect = handle
+            message = {"@type": StubAgentMessage.Meta.message_type, "@id": "ok"}
+            await dispatcher.handle_message(make_inbound(message), send)
+            # the record was committed before the reply was sent
+            assert stored_at_send == [True]
+
+            message["@id"] = "fail"
+            with self.assertRaises(ValueError):
+                await dispatcher.handle_message(make_inbound(message), send)
+            # writes made after the reply by a failed handler are discarded
+            assert await storage.count_records(ConnectionRecord.RECORD_TYPE) == 2
+
+    async def test_dispatch_forward(self):
+        context = make_context()
+        context.enforce_typing = False
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        context.injector.bind_instance(RouteTable, RouteTable())
+        await RoutingManager(context).create_route_record("conn-id", "route-key")
+        dispatcher = test_module.Dispatcher(context)
+        await dispatcher.setup()
+        rcv = Receiver()
+
+        def make_forward(to, msg):
+            message = {"@type": FORWARD, "to": to, "msg": msg}
+            return InboundMessage(message, MessageReceipt(recipient_verkey="my-key"))
+
+        with async_mock.patch.object(
+            dispatcher, "make_message", async_mock.CoroutineMock()
+        ) as mock_make_message, async_mock.patch.object(
+            test_module.ConnectionManager,
+            "find_inbound_connection",
+            async_mock.CoroutineMock(return_value=None),
+        ):
+            await dispatcher.handle_message(make_forward("route-key", "{}"), rcv.send)
+            await dispatcher.handle_message(
+                make_forward("route-key", {"ciphertext": "x"}), rcv.send
+            )
+            mock_make_message.assert_not_called()
+            assert [
+                (outbound.connection_id, outbound.enc_payload)
+                for (_, outbound, _) in rcv.messages
+            ] == [("conn-id", b"{}"), ("conn-id", b'{"ciphertext": "x"}')]
+
+            # unknown routes are left to the forward handler
+            mock_make_message.side_effect = MessageParseError()
+            await dispatcher.handle_message(make_forward("other-key", "{}"), rcv.send)
+            mock_make_message.assert_awaited_once()
+
     async def test_bad_message_dispatch(self):
         dispatcher = test_module.Dispatcher(make_context())
         await dispatcher.setup()
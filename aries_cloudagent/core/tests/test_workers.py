@@ -0,0 +1,71 @@
+import asyncio
+import os
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..workers import WorkerPool
+
+
+def exit_worker(settings, webhooks):
+    os._exit(0 if settings["transport.worker_index"] else 1)
+
+
+def webhook_worker(settings, webhooks):
+    webhooks.put(("topic", {"index": settings["transport.worker_index"]}))
+
+
+class TestWorkerPool(AsyncTestCase):
+    def test_worker_settings(self):
+        settings = {
+            "admin.enabled": True,
+            "admin.webhook_urls": ["http://localhost:8022"],
+            "debug.print_invitation": True,
+            "ledger.cache_dir": "/var/acapy/ledger",
+            "transport.inbound_workers": 3,
+            "transport.outbound_queue_log": "/var/acapy/outbound.log",
+            "wallet.type": "indy",
+        }
+        result = WorkerPool.worker_settings(settings, 2)
+        assert result == {
+            "admin.enabled": False,
+            "admin.webhook_urls": ["http://localhost:8022"],
+            "ledger.cache_dir": "/var/acapy/ledger.2",
+            "transport.inbound_workers": 0,
+            "transport.outbound_queue_log": "/var/acapy/outbound.log.2",
+            "transport.reuse_port": True,
+            "transport.worker_index": 2,
+            "wallet.type": "indy",
+        }
+        assert settings["admin.enabled"]
+
+    def test_start_stop(self):
+        pool = WorkerPool(exit_worker, {}, 2)
+        pool.start()
+        assert [p.name for p in pool.processes] == [
+            "aca-py-worker-1",
+            "aca-py-worker-2",
+        ]
+        processes = pool.processes
+        for process in processes:
+            process.join(30)
+        pool.stop()
+        assert [p.exitcode for p in processes] == [0, 0]
+        assert not pool.processes
+
+    async def test_forward_webhooks(self):
+        received = []
+
+        async def send_webhook(topic, payload):
+            received.append((topic, payload["index"]))
+
+        pool = WorkerPool(webhook_worker, {}, 2)
+        pool.start(send_webhook)
+        for process in pool.processes:
+            process.join(30)
+        for _ in range(300):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.1)
+        pool.stop()
+        assert sorted(received) == [("topic", 1), ("topic", 2)]
+        assert not pool.webhooks
@@ -0,0 +1,132 @@
+"""Worker processes sharing the inbound transports of the agent."""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+
+from multiprocessing.queues import Queue
+from typing import Awaitable, Callable, Sequence
+
+LOGGER = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    Start and stop worker processes which handle inbound messages.
+
+    Each worker runs its own conductor, with its own dispatcher and outbound
+    transport manager, listening on the same inbound ports as the leader
+    process. The workers share the agent's wallet and storage, and the cache
+    server if one is configured. Only the leader runs the admin server, and
+    webhooks raised in the workers are forwarded to it over a queue.
+
+    State held in memory is not shared: the undelivered message queue cannot
+    be used, and mediator routes are resolved from storage for each message.
+    """
+
+    # settings which only apply to the leader process
+    LEADER_SETTINGS = ("debug.print_invitation", "debug.test_suite_endpoint")
+    # settings naming files or directories which must not be shared
+    # between processes
+    PROCESS_FILE_SETTINGS = (
+        "ledger.cache_dir",
+        "transport.outbound_queue_log",
+    )
+
+    def __init__(self, target: Callable, settings: dict, count: int):
+        """
+        Initialize a `WorkerPool` instance.
+
+        Args:
+            target: The function run in each worker process, which is passed
+                the worker settings and the queue of webhooks for the leader
+            settings: The settings of the leader process
+            count: The number of worker processes to start
+
+        """
+        self.target = target
+        self.settings = settings
+        self.count = count
+        self.processes: Sequence[multiprocessing.Process] = []
+        self.webhooks: Queue = None
+        self._forwarder: threading.Thread = None
+
+    @classmethod
+    def worker_settings(cls, settings: dict, index: int) -> dict:
+        """Derive the settings for a worker process from the leader settings."""
+        result = {
+            key: value
+            for key, value in settings.items()
+            if key not in cls.LEADER_SETTINGS
+        }
+        result["admin.enabled"] = False
+        result["transport.inbound_workers"] = 0
+        result["transport.reuse_port"] = True
+        result["transport.worker_index"] = index
+        for key in cls.PROCESS_FILE_SETTINGS:
+            if result.get(key):
+                result[key] = f"{result[key]}.{index}"
+        return result
+
+    def start(self, send_webhook: Callable[[str, dict], Awaitable] = None):
+        """
+        Start the worker processes.
+
+        Args:
+            send_webhook: Send each webhook forwarded by the workers, on the
+                event loop of the caller
+
+        """
+        # spawn rather than fork, as the parent is running an event loop
+        mp_context = multiprocessing.get_context("spawn")
+        if send_webhook:
+            self.webhooks = mp_context.Queue()
+            self._forwarder = threading.Thread(
+                target=self._forward_webhooks,
+                args=(send_webhook, asyncio.get_event_loop()),
+                name="aca-py-worker-webhooks",
+                daemon=True,
+            )
+            self._forwarder.start()
+        for index in range(1, self.count + 1):
+            process = mp_context.Process(
+                target=self.target,
+                args=(self.worker_settings(self.settings, index), self.webhooks),
+                name=f"aca-py-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            LOGGER.info("Started inbound worker %d (pid %d)", index, process.pid)
+            self.processes.append(process)
+
+    def _forward_webhooks(
+        self,
+        send_webhook: Callable[[str, dict], Awaitable],
+        loop: asyncio.AbstractEventLoop,
+    ):
+        """Pass webhooks from the workers to the event loop, in arrival order."""
+        while True:
+            item = self.webhooks.get()
+            if item is None:
+                break
+            topic, payload = item
+            asyncio.run_coroutine_threadsafe(send_webhook(topic, payload), loop)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker processes, waiting up to `timeout` seconds for each."""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                LOGGER.warning("Killing unresponsive worker %s", process.name)
+                process.kill()
+        self.processes = []
+        if self._forwarder:
+            self.webhooks.put(None)
+            self._forwarder.join(timeout)
+            self._forwarder = None
+            self.webhooks.close()
+            self.webhooks = None
@@ -1,11 +1,18 @@
 """Base holder class."""
 
-from abc import ABC
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, Iterable, Mapping, Sequence
+
+from ..utils.task_queue import gather_bounded
 
 
 class BaseHolder(ABC):
     """Base class for holder."""
 
+    FETCH_CONCURRENCY = 8
+    SEARCH_CHUNK_SIZE = 100
+
     def __repr__(self) -> str:
         """
         Return a human readable representation of this class.
@@ -15,3 +22,139 @@ class BaseHolder(ABC):
 
         """
         return "<{}>".format(self.__class__.__name__)
+
+    @abstractmethod
+    async def get_credential(self, credential_id: str):
+        """
+        Get a credential stored in the wallet.
+
+        Args:
+            credential_id: Credential id to retrieve
+
+        """
+
+    @abstractmethod
+    async def get_credentials(self, start: int, count: int, wql: dict):
+        """
+        Get credentials stored in the wallet.
+
+        Args:
+            start: Starting index
+            count: Number of records to return
+            wql: wql query dict
+
+        """
+
+    @abstractmethod
+    async def get_credentials_for_presentation_request_by_referent(
+        self,
+        presentation_request: dict,
+        referents: Sequence[str],
+        start: int,
+        count: int,
+        extra_query: dict = {},
+    ):
+        """
+        Get credentials stored in the wallet for a presentation request.
+
+        Args:
+            presentation_request: Valid presentation request from issuer
+            referents: Presentation request referents to use to search for creds
+            start: Starting index
+            count: Maximum number of records to return
+            extra_query: wql query dict
+
+        """
+
+    async def get_credentials_by_ids(
+        self, credential_ids: Iterable[str]
+    ) -> Mapping[str, dict]:
+        """
+        Get several credentials stored in the wallet concurrently.
+
+        Args:
+            credential_ids: The credential ids to retrieve, which may include
+                duplicates
+
+        Returns:
+            A dict of each distinct credential id to the credential found
+
+        """
+        credential_ids = list(OrderedDict.fromkeys(credential_ids))
+        credentials = await gather_bounded(
+            self.get_credential, credential_ids, self.FETCH_CONCURRENCY
+        )
+        return dict(zip(credential_ids, credentials))
+
+    async def iter_credentials(
+        self, wql: dict, start: int = 0, chunk_size: int = None
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the credentials matching a query, fetching them in chunks.
+
+        Args:
+            wql: wql query dict
+            start: Starting index
+            chunk_size: The number of credentials fetched at once
+
+        """
+        chunk_size = chunk_size or self.SEARCH_CHUNK_SIZE
+        while True:
+            credentials = await self.get_credentials(start, chunk_size, wql)
+            for credential in credentials:
+                yield credential
+            if len(credentials) < chunk_size:
+                break
+            start += chunk_size
+
+    async def iter_credentials_for_presentation_request_by_referent(
+        self,
+        presentation_request: dict,
+        referents: Sequence[str],
+        start: int = 0,
+        extra_query: dict = None,
+        chunk_size: int = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the credentials for each presentation request referent.
+
+        The credentials for each referent are fetched in chunks. A credential
+        matching several referents is only produced for the first of them, so
+        its `presentation_referents` may not list all the referents it matches.
+
+        Args:
+            presentation_request: Valid presentation request from issuer
+            referents: Presentation request referents to use to search for creds,
+                defaulting to all those of the request
+            start: Starting index for each referent
+            extra_query: wql query dict
+            chunk_size: The number of credentials fetched at once
+
+        """
+        chunk_size = chunk_size or self.SEARCH_CHUNK_SIZE
+        if not referents:
+            referents = (
+                *presentation_request["requested_attributes"],
+                *presentation_request["requested_predicates"],
+            )
+        produced = set()
+        for referent in referents:
+            offset = start
+            while True:
+                credentials = await (
+                    self.get_credentials_for_presentation_request_by_referent(
+                        presentation_request,
+                        (referent,),
+                        offset,
+                        chunk_size,
+                        extra_query or {},
+                    )
+                )
+                for credential in credentials:
+                    cred_id = credential["cred_info"]["referent"]
+                    if cred_id not in produced:
+                        produced.add(cred_id)
+                        yield credential
+                if len(credentials) < chunk_size:
+                    break
+                offset += chunk_size
@@ -4,7 +4,7 @@ import json
 import logging
 
 from collections import OrderedDict
-from typing import Sequence, Union
+from typing import Sequence, Tuple, Union
 
 import indy.anoncreds
 from indy.error import ErrorCode, IndyError
@@ -16,12 +16,92 @@ from ..storage.record import StorageRecord
 from ..wallet.error import WalletNotFoundError
 
 from .base import BaseHolder
+from .search import CredentialSearch, CredentialSearchRegistry
+
+
+class IndyCredentialSearch(CredentialSearch):
+    """An open search of the credentials matching a query."""
+
+    def __init__(self, search_handle: int):
+        """Initialize the `IndyCredentialSearch` instance."""
+        super().__init__()
+        self.search_handle = search_handle
+
+    @classmethod
+    async def open(cls, wallet, wql: dict) -> "IndyCredentialSearch":
+        """Start a search of the credentials in a wallet."""
+        search_handle, _record_count = await indy.anoncreds.prover_search_credentials(
+            wallet.handle, json.dumps(wql)
+        )
+        return cls(search_handle)
+
+    async def fetch(self, count: int) -> Sequence[dict]:
+        """Fetch the next credentials."""
+        credentials = json.loads(
+            await indy.anoncreds.prover_fetch_credentials(self.search_handle, count)
+        )
+        self.position += count
+        self.exhausted = len(credentials) < count
+        return credentials
+
+    async def close(self):
+        """Close the search."""
+        await indy.anoncreds.prover_close_credentials_search(self.search_handle)
+
+
+class IndyPresentationSearch(CredentialSearch):
+    """An open search of the credentials for presentation request referents."""
+
+    def __init__(self, search_handle: int, referents: Sequence[str]):
+        """Initialize the `IndyPresentationSearch` instance."""
+        super().__init__()
+        self.search_handle = search_handle
+        self.referents = tuple(referents)
+
+    @classmethod
+    async def open(
+        cls,
+        wallet,
+        presentation_request: dict,
+        referents: Sequence[str],
+        extra_query: dict,
+    ) -> "IndyPresentationSearch":
+        """Start a search of the credentials for a presentation request."""
+        search_handle = await indy.anoncreds.prover_search_credentials_for_proof_req(
+            wallet.handle,
+            json.dumps(presentation_request),
+            json.dumps(extra_query),
+        )
+        return cls(search_handle, referents)
+
+    async def fetch(self, count: int) -> Sequence[Tuple[str, Sequence[dict]]]:
+        """Fetch the next credentials for each referent."""
+        results = []
+        exhausted = True
+        for reft in self.referents:
+            credentials = json.loads(
+                await indy.anoncreds.prover_fetch_credentials_for_proof_req(
+                    self.search_handle, reft, count
+                )
+            )
+            exhausted = exhausted and len(credentials) < count
+            results.append((reft, credentials))
+        self.position += count
+        self.exhausted = exhausted
+        return results
+
+    async def close(self):
+        """Close the search."""
+        await indy.anoncreds.prover_close_credentials_search_for_proof_req(
+            self.search_handle
+        )
 
 
 class IndyHolder(BaseHolder):
     """Indy holder class."""
 
     RECORD_TYPE_MIME_TYPES = "attribute-mime-types"
+    SEARCH_CHUNK_SIZE = 256
 
     def __init__(self, wallet):
         """
@@ -33,6 +113,8 @@ class IndyHolder(BaseHolder):
         """
         self.logger = logging.getLogger(__name__)
         self.wallet = wallet
+        # searches are tied to the wallet handle, so the wallet closes them
+        self.searches: CredentialSearchRegistry = wallet.credential_searches
 
     async def create_credential_request(
         self, credential_offer, credential_definition, did
@@ -122,29 +204,26 @@ class IndyHolder(BaseHolder):
         """
         Get credentials stored in the wallet.
 
+        The search is retained for a short time afterwards, so that a request
+        for the following page continues it.
+
         Args:
             start: Starting index
             count: Number of records to return
             wql: wql query dict
 
         """
-        search_handle, record_count = await indy.anoncreds.prover_search_credentials(
-            self.wallet.handle,
-            json.dumps(wql)
-        )
-
-        # We need to move the database cursor position manually...
-        if start > 0:
-            # TODO: move cursor in chunks to avoid exploding memory
-            await indy.anoncreds.prover_fetch_credentials(search_handle, start)
-
-        credentials_json = await indy.anoncreds.prover_fetch_credentials(
-            search_handle,
-            count
-        )
-        await indy.anoncreds.prover_close_credentials_search(search_handle)
-
-        credentials = json.loads(credentials_json)
+        key = ("credentials", json.dumps(wql, sort_keys=True))
+        search = await self.searches.checkout(key, start)
+        if not search:
+            search = await IndyCredentialSearch.open(self.wallet, wql)
+        try:
+            await search.skip(start - search.position, self.SEARCH_CHUNK_SIZE)
+            credentials = await search.fetch(count)
+        except Exception:
+            await search.close()
+            raise
+        await self.searches.checkin(key, search)
         return credentials
 
     async def get_credentials_for_presentation_request_by_referent(
@@ -158,6 +237,9 @@ class IndyHolder(BaseHolder):
         """
         Get credentials stored in the wallet.
 
+        The search is retained for a short time afterwards, so that a request
+        for the following page continues it.
+
         Args:
             presentation_request: Valid presentation request from issuer
             referents: Presentation request referents to use to search for creds
@@ -167,33 +249,27 @@ class IndyHolder(BaseHolder):
 
         """
 
-        search_handle = await indy.anoncreds.prover_search_credentials_for_proof_req(
-            self.wallet.handle,
-            json.dumps(presentation_request),
-            json.dumps(extra_query),
-        )
-
         if not referents:
             referents = (
                 *presentation_request["requested_attributes"],
                 *presentation_request["requested_predicates"],
             )
+        key = (
+            "proof_req",
+            json.dumps(presentation_request, sort_keys=True),
+            json.dumps(extra_query, sort_keys=True),
+            tuple(referents),
+        )
+        search = await self.searches.checkout(key, start)
+        if not search:
+            search = await IndyPresentationSearch.open(
+                self.wallet, presentation_request, referents, extra_query
+            )
         creds_dict = OrderedDict()
 
         try:
-            for reft in referents:
-                # We need to move the database cursor position manually...
-                if start > 0:
-                    # TODO: move cursors in chunks to avoid exploding memory
-                    await indy.anoncreds.prover_fetch_credentials_for_proof_req(
-                        search_handle, reft, start
-                    )
-                (
-                    credentials_json
-                ) = await indy.anoncreds.prover_fetch_credentials_for_proof_req(
-                    search_handle, reft, count
-                )
-                credentials = json.loads(credentials_json)
+            await search.skip(start - search.position, self.SEARCH_CHUNK_SIZE)
+            for reft, credentials in await search.fetch(count):
                 for cred in credentials:
                     cred_id = cred["cred_info"]["referent"]
                     if cred_id not in creds_dict:
@@ -201,12 +277,10 @@ class IndyHolder(BaseHolder):
                         creds_dict[cred_id] = cred
                     else:
                         creds_dict[cred_id]["presentation_referents"].add(reft)
-
-        finally:
-            # Always close
-            await indy.anoncreds.prover_close_credentials_search_for_proof_req(
-                search_handle
-            )
+        except Exception:
+            await search.close()
+            raise
+        await self.searches.checkin(key, search)
 
         for cred in creds_dict.values():
             cred["presentation_referents"] = list(cred["presentation_referents"])
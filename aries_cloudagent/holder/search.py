@@ -0,0 +1,161 @@
+"""Credential searches retained between page requests."""
+
+import asyncio
+import logging
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Hashable, Sequence
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CredentialSearch(ABC):
+    """An open wallet search for credentials, positioned at a start index."""
+
+    def __init__(self):
+        """Initialize the `CredentialSearch` instance."""
+        self.exhausted = False
+        self.position = 0
+
+    @abstractmethod
+    async def fetch(self, count: int) -> Sequence:
+        """
+        Fetch the next results of the search, advancing its position.
+
+        Implementations set `exhausted` once the search returns fewer results
+        than requested.
+
+        Args:
+            count: The number of results to fetch
+
+        """
+
+    @abstractmethod
+    async def close(self):
+        """Close the search."""
+
+    async def skip(self, count: int, chunk_size: int):
+        """
+        Advance the position of the search without keeping the results.
+
+        Args:
+            count: The number of results to skip
+            chunk_size: The largest number of results fetched at once
+
+        """
+        while count > 0 and not self.exhausted:
+            size = min(count, chunk_size)
+            await self.fetch(size)
+            count -= size
+        self.position += count
+
+
+class CredentialSearchRegistry:
+    """
+    Open searches retained for the next page request, closed when they expire.
+
+    A search is checked in with the position following the page it returned,
+    so that a request for the next page can continue the search instead of
+    opening a new one and skipping the earlier results. Idle searches are
+    closed by a timer once they expire, as well as on the next checkout or
+    checkin.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_open: int = 32):
+        """
+        Initialize the `CredentialSearchRegistry` instance.
+
+        Args:
+            ttl: The time in seconds an idle search is retained
+            max_open: The maximum number of idle searches retained
+
+        """
+        self.ttl = ttl
+        self.max_open = max_open
+        self._searches = OrderedDict()
+        self._timer = None
+
+    def __len__(self) -> int:
+        """Get the number of idle searches retained."""
+        return len(self._searches)
+
+    async def checkout(self, key: Hashable, position: int) -> CredentialSearch:
+        """
+        Take a retained search with the given query key and position.
+
+        Returns:
+            The search, or `None` if there is no such search
+
+        """
+        await self.expire()
+        entry = self._searches.pop((key, position), None)
+        return entry and entry[1]
+
+    async def checkin(self, key: Hashable, search: CredentialSearch):
+        """Retain a search for the page following its position."""
+        if search.exhausted:
+            # later pages of an exhausted search are empty
+            await self._close(search)
+            return
+        entry = self._searches.pop((key, search.position), None)
+        if entry:
+            await self._close(entry[1])
+        expires = time.perf_counter() + self.ttl
+        self._searches[(key, search.position)] = (expires, search)
+        await self.expire()
+        self._schedule()
+
+    async def expire(self):
+        """Close the searches which have expired or exceed the limit."""
+        now = time.perf_counter()
+        while self._searches:
+            entry_key, (expires, search) = next(iter(self._searches.items()))
+            if expires > now and len(self._searches) <= self.max_open:
+                break
+            del self._searches[entry_key]
+            await self._close(search)
+
+    async def close_all(self, match: Callable[[Hashable], bool] = None):
+        """
+        Close all retained searches.
+
+        Args:
+            match: If given, only close the searches whose query key it accepts
+
+        """
+        entry_keys = [
+            entry_key
+            for entry_key in self._searches
+            if not match or match(entry_key[0])
+        ]
+        searches = [self._searches.pop(entry_key)[1] for entry_key in entry_keys]
+        if not self._searches and self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for search in searches:
+            await self._close(search)
+
+    def _schedule(self):
+        """Start the timer for the next search to expire."""
+        if self._timer or not self._searches:
+            return
+        # searches are retained in the order they expire
+        expires, _search = next(iter(self._searches.values()))
+        delay = max(expires - time.perf_counter(), 0.0)
+        self._timer = asyncio.get_event_loop().call_later(delay, self._timer_expired)
+
+    def _timer_expired(self):
+        self._timer = None
+        asyncio.ensure_future(self._expire_scheduled())
+
+    async def _expire_scheduled(self):
+        await self.expire()
+        self._schedule()
+
+    async def _close(self, search: CredentialSearch):
+        try:
+            await search.close()
+        except Exception:
+            LOGGER.exception("Error closing credential search")
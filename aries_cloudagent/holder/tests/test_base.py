@@ -0,0 +1,86 @@
+from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
+
+from ..base import BaseHolder
+
+
+class MockHolder(BaseHolder):
+    async def get_credential(self, credential_id: str):
+        pass
+
+    async def get_credentials(self, start: int, count: int, wql: dict):
+        pass
+
+    async def get_credentials_for_presentation_request_by_referent(
+        self, presentation_request, referents, start, count, extra_query={}
+    ):
+        pass
+
+
+class TestBaseHolder(AsyncTestCase):
+    async def test_get_credentials_by_ids(self):
+        holder = MockHolder()
+        holder.get_credential = async_mock.CoroutineMock(
+            side_effect=lambda cred_id: {"referent": cred_id}
+        )
+        result = await holder.get_credentials_by_ids(["a", "b", "a"])
+        assert result == {"a": {"referent": "a"}, "b": {"referent": "b"}}
+        assert holder.get_credential.call_count == 2
+
+    async def test_iter_credentials(self):
+        holder = MockHolder()
+        creds = [{"referent": str(idx)} for idx in range(7)]
+        holder.get_credentials = async_mock.CoroutineMock(
+            side_effect=lambda start, count, wql: creds[start : start + count]
+        )
+        result = [cred async for cred in holder.iter_credentials({}, 1, chunk_size=3)]
+        assert result == creds[1:]
+        assert holder.get_credentials.call_args_list == [
+            ((1, 3, {}),),
+            ((4, 3, {}),),
+            ((7, 3, {}),),
+        ]
+
+    async def test_iter_credentials_for_presentation_request_by_referent(self):
+        holder = MockHolder()
+        creds = {
+            "attr": [
+                {"cred_info": {"referent": idx}, "presentation_referents": ["attr"]}
+                for idx in range(4)
+            ],
+            "pred": [
+                {"cred_info": {"referent": idx}, "presentation_referents": ["pred"]}
+                for idx in (0, 4)
+            ],
+        }
+        holder.get_credentials_for_presentation_request_by_referent = async_mock.CoroutineMock(
+            side_effect=lambda req, refts, start, count, extra: creds[refts[0]][
+                start : start + count
+            ]
+        )
+        request = {
+            "requested_attributes": {"attr": {}},
+            "requested_predicates": {"pred": {}},
+        }
+        result = [
+            cred
+            async for cred in holder.iter_credentials_for_presentation_request_by_referent(
+                request, (), chunk_size=2
+            )
+        ]
+        # the credential matching both referents is produced once
+        assert result == creds["attr"] + creds["pred"][1:]
+        calls = (
+            holder.get_credentials_for_presentation_request_by_referent.call_args_list
+        )
+        assert [call[0][1:4] for call in calls] == [
+            (("attr",), 0, 2),
+            (("attr",), 2, 2),
+            (("attr",), 4, 2),
+            (("pred",), 0, 2),
+            (("pred",), 2, 2),
+        ]
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            BaseHolder()
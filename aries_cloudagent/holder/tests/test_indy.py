@@ -8,6 +8,7 @@ from asynctest import mock as async_mock
 from indy.error import IndyError, ErrorCode
 
 from aries_cloudagent.holder.indy import IndyHolder
+from aries_cloudagent.holder.search import CredentialSearchRegistry
 from aries_cloudagent.storage.error import StorageError
 from aries_cloudagent.storage.record import StorageRecord
 from aries_cloudagent.wallet.indy import IndyWallet
@@ -20,8 +21,12 @@ from ...protocols.issue_credential.v1_0.messages.inner.credential_preview import
 @pytest.mark.indy
 class TestIndyHolder(AsyncTestCase):
     def test_init(self):
-        holder = IndyHolder("wallet")
-        assert holder.wallet == "wallet"
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
+        holder = IndyHolder(mock_wallet)
+        assert holder.wallet is mock_wallet
+        assert holder.searches is mock_wallet.credential_searches
 
     @async_mock.patch("indy.anoncreds.prover_create_credential_req")
     async def test_create_credential_request(self, mock_create_credential_req):
@@ -132,7 +137,9 @@ class TestIndyHolder(AsyncTestCase):
         mock_search_credentials.return_value = ("search_handle", "record_count")
         mock_fetch_credentials.return_value = "[1,2,3]"
 
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
 
         credentials = await holder.get_credentials(0, 0, {})
@@ -144,10 +151,14 @@ class TestIndyHolder(AsyncTestCase):
         mock_fetch_credentials.return_value = "[1,2,3]"
 
         mock_fetch_credentials.assert_called_once_with("search_handle", 0)
-        mock_close_cred_search.assert_called_once_with("search_handle")
+        # the search is retained for the next page
+        mock_close_cred_search.assert_not_called()
 
         assert credentials == json.loads("[1,2,3]")
 
+        await holder.searches.close_all()
+        mock_close_cred_search.assert_called_once_with("search_handle")
+
     @async_mock.patch("indy.anoncreds.prover_search_credentials")
     @async_mock.patch("indy.anoncreds.prover_fetch_credentials")
     @async_mock.patch("indy.anoncreds.prover_close_credentials_search")
@@ -157,7 +168,9 @@ class TestIndyHolder(AsyncTestCase):
         mock_search_credentials.return_value = ("search_handle", "record_count")
         mock_fetch_credentials.return_value = "[1,2,3]"
 
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
 
         credentials = await holder.get_credentials(2, 3, {})
@@ -167,6 +180,40 @@ class TestIndyHolder(AsyncTestCase):
             (("search_handle", 3),),
         ]
 
+        # the next page continues the retained search
+        credentials = await holder.get_credentials(5, 3, {})
+        mock_search_credentials.assert_called_once()
+        assert mock_fetch_credentials.call_args_list[2:] == [(("search_handle", 3),)]
+        await holder.searches.close_all()
+        mock_close_cred_search.assert_called_once_with("search_handle")
+
+    @async_mock.patch("indy.anoncreds.prover_search_credentials")
+    @async_mock.patch("indy.anoncreds.prover_fetch_credentials")
+    @async_mock.patch("indy.anoncreds.prover_close_credentials_search")
+    async def test_get_credentials_seek_chunked(
+        self, mock_close_cred_search, mock_fetch_credentials, mock_search_credentials
+    ):
+        mock_search_credentials.return_value = ("search_handle", "record_count")
+        mock_fetch_credentials.side_effect = lambda handle, count: json.dumps(
+            [0] * count
+        )
+
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
+        holder = IndyHolder(mock_wallet)
+
+        credentials = await holder.get_credentials(600, 3, {})
+
+        assert mock_fetch_credentials.call_args_list == [
+            (("search_handle", 256),),
+            (("search_handle", 256),),
+            (("search_handle", 88),),
+            (("search_handle", 3),),
+        ]
+        assert len(credentials) == 3
+        await holder.searches.close_all()
+
     @async_mock.patch("indy.anoncreds.prover_search_credentials_for_proof_req")
     @async_mock.patch("indy.anoncreds.prover_fetch_credentials_for_proof_req")
     @async_mock.patch("indy.anoncreds.prover_close_credentials_search_for_proof_req")
@@ -181,7 +228,9 @@ class TestIndyHolder(AsyncTestCase):
             '[{"cred_info": {"referent": "asdb"}}]'
         )
 
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
 
         credentials = await holder.get_credentials_for_presentation_request_by_referent(
@@ -209,7 +258,9 @@ class TestIndyHolder(AsyncTestCase):
     async def test_get_credential(self, mock_get_cred):
         mock_get_cred.return_value = "{}"
 
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
 
         credential = await holder.get_credential("credential_id")
@@ -227,7 +278,9 @@ class TestIndyHolder(AsyncTestCase):
         mock_nonsec_get_wallet_record,
         mock_prover_del_cred,
     ):
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
         mock_nonsec_get_wallet_record.return_value = json.dumps(
             {
@@ -248,7 +301,9 @@ class TestIndyHolder(AsyncTestCase):
     async def test_create_presentation(self, mock_create_proof):
         mock_create_proof.return_value = "{}"
 
-        mock_wallet = async_mock.MagicMock()
+        mock_wallet = async_mock.MagicMock(
+            credential_searches=CredentialSearchRegistry()
+        )
         holder = IndyHolder(mock_wallet)
 
         presentation = await holder.create_presentation(
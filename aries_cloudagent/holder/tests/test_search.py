@@ -0,0 +1,107 @@
+import asyncio
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..search import CredentialSearch, CredentialSearchRegistry
+
+
+class ListSearch(CredentialSearch):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.fetched = []
+        self.closed = False
+
+    async def fetch(self, count):
+        result = self.rows[self.position : self.position + count]
+        self.fetched.append(count)
+        self.position += count
+        self.exhausted = len(result) < count
+        return result
+
+    async def close(self):
+        self.closed = True
+
+
+class TestCredentialSearch(AsyncTestCase):
+    async def test_skip(self):
+        search = ListSearch(list(range(10)))
+        await search.skip(7, 3)
+        assert search.fetched == [3, 3, 1]
+        assert await search.fetch(2) == [7, 8]
+
+        search = ListSearch(list(range(10)))
+        await search.skip(1000, 4)
+        assert search.fetched == [4, 4, 4]
+        assert search.position == 1000
+        assert search.exhausted
+
+
+class TestCredentialSearchRegistry(AsyncTestCase):
+    async def test_checkin_checkout(self):
+        registry = CredentialSearchRegistry()
+        search = ListSearch(list(range(10)))
+        await search.fetch(4)
+        await registry.checkin("key", search)
+        assert len(registry) == 1
+        assert await registry.checkout("key", 0) is None
+        assert await registry.checkout("other", 4) is None
+        assert await registry.checkout("key", 4) is search
+        assert len(registry) == 0
+
+        await search.fetch(10)
+        await registry.checkin("key", search)
+        assert search.closed
+        assert len(registry) == 0
+
+    async def test_replace(self):
+        registry = CredentialSearchRegistry()
+        first = ListSearch(list(range(10)))
+        second = ListSearch(list(range(10)))
+        await first.fetch(2)
+        await second.fetch(2)
+        await registry.checkin("key", first)
+        await registry.checkin("key", second)
+        assert first.closed and not second.closed
+        assert await registry.checkout("key", 2) is second
+
+    async def test_expire(self):
+        registry = CredentialSearchRegistry(ttl=0.0)
+        search = ListSearch(list(range(10)))
+        await search.fetch(2)
+        await registry.checkin("key", search)
+        assert search.closed
+        assert len(registry) == 0
+
+        registry = CredentialSearchRegistry(max_open=2)
+        searches = [ListSearch(list(range(10))) for _ in range(3)]
+        for idx, search in enumerate(searches):
+            await search.fetch(2)
+            await registry.checkin(idx, search)
+        assert [search.closed for search in searches] == [True, False, False]
+
+        await registry.close_all()
+        assert all(search.closed for search in searches)
+        assert len(registry) == 0
+
+    async def test_expire_timer(self):
+        registry = CredentialSearchRegistry(ttl=0.01)
+        search = ListSearch(list(range(10)))
+        await search.fetch(2)
+        await registry.checkin("key", search)
+        assert not search.closed
+        await asyncio.sleep(0.05)
+        assert search.closed
+        assert len(registry) == 0
+
+    async def test_close_all_match(self):
+        registry = CredentialSearchRegistry()
+        searches = [ListSearch(list(range(10))) for _ in range(3)]
+        for idx, search in enumerate(searches):
+            await search.fetch(2)
+            await registry.checkin(("wallet", idx % 2), search)
+        await registry.close_all(lambda key: key[1] == 0)
+        assert [search.closed for search in searches] == [True, False, True]
+        assert len(registry) == 1
+        await registry.close_all()
+        assert registry._timer is None
@@ -1,13 +1,18 @@
 """Ledger base class."""
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import re
+from typing import Iterable, Mapping
+
+from ..utils.task_queue import gather_bounded
 
 
 class BaseLedger(ABC):
     """Base class for ledger."""
 
     LEDGER_TYPE = None
+    FETCH_CONCURRENCY = 8
 
     async def __aenter__(self) -> "BaseLedger":
         """
@@ -70,6 +75,64 @@ class BaseLedger(ABC):
         if did:
             return re.sub(r"^did:\w+:", "", did)
 
+    @abstractmethod
+    async def get_schema(self, schema_id: str):
+        """
+        Get a schema from the cache if available, otherwise fetch from the ledger.
+
+        Args:
+            schema_id: The schema id (or stringified sequence number) to retrieve
+
+        """
+
+    async def get_schemas(self, schema_ids: Iterable[str]) -> Mapping[str, dict]:
+        """
+        Get several schemas, fetching those not cached concurrently.
+
+        Args:
+            schema_ids: The schema ids to retrieve, which may include duplicates
+
+        Returns:
+            A dict of each distinct schema id to the schema found
+
+        """
+        schema_ids = list(OrderedDict.fromkeys(schema_ids))
+        schemas = await gather_bounded(
+            self.get_schema, schema_ids, self.FETCH_CONCURRENCY
+        )
+        return dict(zip(schema_ids, schemas))
+
+    @abstractmethod
+    async def get_credential_definition(self, credential_definition_id: str):
+        """
+        Get a credential definition from the cache if available, otherwise the ledger.
+
+        Args:
+            credential_definition_id: The credential definition id to retrieve
+
+        """
+
+    async def get_credential_definitions(
+        self, credential_definition_ids: Iterable[str]
+    ) -> Mapping[str, dict]:
+        """
+        Get several credential definitions, fetching those not cached concurrently.
+
+        Args:
+            credential_definition_ids: The credential definition ids to retrieve,
+                which may include duplicates
+
+        Returns:
+            A dict of each distinct credential definition id to the
+            credential definition found
+
+        """
+        cred_def_ids = list(OrderedDict.fromkeys(credential_definition_ids))
+        cred_defs = await gather_bounded(
+            self.get_credential_definition, cred_def_ids, self.FETCH_CONCURRENCY
+        )
+        return dict(zip(cred_def_ids, cred_defs))
+
     async def get_txn_author_agreement(self, reload: bool = False):
         """Get the current transaction author agreement, fetching it if necessary."""
 
@@ -0,0 +1,211 @@
+"""Read cache for ledger lookups."""
+
+import json
+import logging
+
+from os import makedirs, path, replace
+from typing import Any, Sequence, Text, Tuple, Union
+
+from ..cache.base import BaseCache
+
+LOGGER = logging.getLogger(__name__)
+
+CATEGORY_SCHEMA = "schema"
+CATEGORY_CRED_DEF = "credential_definition"
+CATEGORY_VERKEY = "verkey"
+CATEGORY_ENDPOINT = "endpoint"
+
+
+class LedgerReadCache:
+    """
+    Cache the results of ledger read operations.
+
+    Schemas and credential definitions cannot change once written, so they are
+    held in memory for the life of the agent and optionally appended to a local
+    file, which is loaded again at startup. Mutable values such as verkeys and
+    endpoints are kept in the shared `BaseCache` with a short TTL. Lookups which
+    found nothing on the ledger are also cached briefly.
+    """
+
+    IMMUTABLE_CATEGORIES = (CATEGORY_SCHEMA, CATEGORY_CRED_DEF)
+
+    def __init__(
+        self,
+        cache: BaseCache = None,
+        *,
+        persist_path: str = None,
+        mutable_ttl: int = 60,
+        negative_ttl: int = 30,
+    ):
+        """
+        Initialize a `LedgerReadCache` instance.
+
+        Args:
+            cache: The cache instance used for mutable values
+            persist_path: The file used to retain immutable ledger objects
+                between restarts
+            mutable_ttl: The TTL for verkey and endpoint cache entries
+            negative_ttl: The TTL for lookups which found nothing on the ledger
+
+        """
+        self.cache = cache
+        self.persist_path = persist_path
+        self.mutable_ttl = mutable_ttl
+        self.negative_ttl = negative_ttl
+        self.immutable = {}
+        self.hits = {}
+        self.misses = {}
+        if persist_path:
+            self.load()
+
+    @staticmethod
+    def cache_key(category: str, key: Text) -> str:
+        """Build the cache key for a ledger object."""
+        return f"ledger::{category}::{key}"
+
+    def load(self):
+        """Load the immutable ledger objects retained by a previous run."""
+        if not self.persist_path or not path.exists(self.persist_path):
+            return
+        lines = 0
+        try:
+            with open(self.persist_path) as persisted:
+                for line in persisted:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        if entry["value"] is None:
+                            self.immutable.pop(entry["key"], None)
+                        else:
+                            self.immutable[entry["key"]] = entry["value"]
+                    except (ValueError, KeyError, TypeError):
+                        LOGGER.warning("Skipping corrupt ledger cache entry")
+        except OSError as e:
+            LOGGER.warning("Error loading ledger cache: %s", e)
+            return
+        if lines > len(self.immutable):
+            self.compact()
+        LOGGER.debug(
+            "Loaded %d ledger objects from %s", len(self.immutable), self.persist_path
+        )
+
+    def compact(self):
+        """Rewrite the persisted cache file without superseded entries."""
+        if not self.persist_path:
+            return
+        temp_path = self.persist_path + ".tmp"
+        try:
+            with open(temp_path, "w") as persisted:
+                for key, value in self.immutable.items():
+                    persisted.write(json.dumps({"key": key, "value": value}) + "\n")
+            replace(temp_path, self.persist_path)
+        except OSError as e:
+            LOGGER.warning("Error compacting ledger cache: %s", e)
+
+    def _persist(self, entries: Sequence[Tuple[str, Any]]):
+        """Append immutable ledger objects to the persisted cache file."""
+        if not self.persist_path:
+            return
+        try:
+            parent = path.dirname(self.persist_path)
+            if parent:
+                makedirs(parent, exist_ok=True)
+            with open(self.persist_path, "a") as persisted:
+                for key, value in entries:
+                    persisted.write(json.dumps({"key": key, "value": value}) + "\n")
+        except OSError as e:
+            LOGGER.warning("Error persisting ledger cache: %s", e)
+
+    def _count(self, category: str, hit: bool):
+        counts = self.hits if hit else self.misses
+        counts[category] = counts.get(category, 0) + 1
+
+    async def get(self, category: str, key: Text) -> Tuple[bool, Any]:
+        """
+        Look up a cached ledger object.
+
+        Args:
+            category: The kind of ledger object
+            key: The identifier of the ledger object
+
+        Returns:
+            A tuple of whether a cached result was found and the cached value,
+            which is `None` for objects known to be missing from the ledger
+
+        """
+        cache_key = self.cache_key(category, key)
+        if cache_key in self.immutable:
+            self._count(category, True)
+            return True, self.immutable[cache_key]
+        if self.cache:
+            entry = await self.cache.get(cache_key)
+            if entry is not None:
+                self._count(category, True)
+                return True, entry.get("value")
+        self._count(category, False)
+        return False, None
+
+    async def set(self, category: str, keys: Union[Text, Sequence[Text]], value: Any):
+        """
+        Cache the result of a ledger lookup.
+
+        Args:
+            category: The kind of ledger object
+            keys: The identifier or identifiers of the ledger object
+            value: The ledger object, or `None` if it was not found
+
+        """
+        keys = [keys] if isinstance(keys, Text) else keys
+        cache_keys = [self.cache_key(category, key) for key in keys]
+        if value is not None and category in self.IMMUTABLE_CATEGORIES:
+            added = []
+            for cache_key in cache_keys:
+                if self.immutable.get(cache_key) != value:
+                    self.immutable[cache_key] = value
+                    added.append((cache_key, value))
+            if added:
+                self._persist(added)
+            # supersede any cached negative result
+            if self.cache:
+                for cache_key in cache_keys:
+                    await self.cache.clear(cache_key)
+        elif self.cache:
+            await self.cache.set(
+                cache_keys,
+                {"value": value},
+                self.negative_ttl if value is None else self.mutable_ttl,
+            )
+
+    async def clear(self, category: str, key: Text):
+        """
+        Remove a cached ledger object after it has been changed on the ledger.
+
+        Args:
+            category: The kind of ledger object
+            key: The identifier of the ledger object
+
+        """
+        cache_key = self.cache_key(category, key)
+        if self.immutable.pop(cache_key, None) is not None:
+            self._persist([(cache_key, None)])
+        if self.cache:
+            await self.cache.clear(cache_key)
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the hit ratios of ledger lookups, by category."""
+        result = {}
+        for category in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(category, 0)
+            misses = self.misses.get(category, 0)
+            result[category] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4),
+            }
+        return result
+
+    def reset_stats(self):
+        """Reset the lookup counters."""
+        self.hits = {}
+        self.misses = {}
@@ -25,6 +25,13 @@ from ..storage.indy import IndyStorage
 from ..wallet.base import BaseWallet
 
 from .base import BaseLedger
+from .cache import (
+    CATEGORY_CRED_DEF,
+    CATEGORY_ENDPOINT,
+    CATEGORY_SCHEMA,
+    CATEGORY_VERKEY,
+    LedgerReadCache,
+)
 from .error import (
     BadLedgerRequestError,
     ClosedPoolError,
@@ -89,6 +96,7 @@ class IndyLedger(BaseLedger):
         keepalive: int = 0,
         cache: BaseCache = None,
         cache_duration: int = 600,
+        cache_path: str = None,
     ):
         """
         Initialize an IndyLedger instance.
@@ -99,6 +107,8 @@ class IndyLedger(BaseLedger):
             keepalive: How many seconds to keep the ledger open
             cache: The cache instance to use
             cache_duration: The TTL for ledger cache entries
+            cache_path: The file used to retain schemas and credential
+                definitions between restarts
         """
         self.logger = logging.getLogger(__name__)
 
@@ -109,6 +119,7 @@ class IndyLedger(BaseLedger):
         self.close_task: asyncio.Future = None
         self.cache = cache
         self.cache_duration = cache_duration
+        self.read_cache = LedgerReadCache(cache, persist_path=cache_path)
         self.wallet = wallet
         self.pool_handle = None
         self.pool_name = pool_name
@@ -330,6 +341,7 @@ class IndyLedger(BaseLedger):
 
             try:
                 await self._submit(request_json, public_did=public_info.did)
+                await self.read_cache.clear(CATEGORY_SCHEMA, schema_id)
             except LedgerTransactionError as e:
                 # Identify possible duplicate schema errors on indy-node < 1.9 and > 1.9
                 if (
@@ -393,10 +405,9 @@ class IndyLedger(BaseLedger):
             schema_id: The schema id (or stringified sequence number) to retrieve
 
         """
-        if self.cache:
-            result = await self.cache.get(f"schema::{schema_id}")
-            if result:
-                return result
+        found, result = await self.read_cache.get(CATEGORY_SCHEMA, schema_id)
+        if found:
+            return result
 
         if schema_id.isdigit():
             return await self.fetch_schema_by_seq_no(int(schema_id))
@@ -427,6 +438,7 @@ class IndyLedger(BaseLedger):
         response = json.loads(response_json)
         if not response["result"]["seqNo"]:
             # schema not found
+            await self.read_cache.set(CATEGORY_SCHEMA, schema_id, None)
             return None
 
         with IndyErrorHandler("Exception when parsing schema response"):
@@ -435,12 +447,11 @@ class IndyLedger(BaseLedger):
             )
 
         parsed_response = json.loads(parsed_schema_json)
-        if parsed_response and self.cache:
-            await self.cache.set(
-                [f"schema::{schema_id}", f"schema::{response['result']['seqNo']}"],
-                parsed_response,
-                self.cache_duration,
-            )
+        await self.read_cache.set(
+            CATEGORY_SCHEMA,
+            [schema_id, str(response["result"]["seqNo"])],
+            parsed_response or None,
+        )
 
         return parsed_response
 
@@ -554,6 +565,7 @@ class IndyLedger(BaseLedger):
                     public_info.did, credential_definition_json
                 )
             await self._submit(request_json, True, public_did=public_info.did)
+            await self.read_cache.clear(CATEGORY_CRED_DEF, credential_definition_id)
         else:
             self.logger.warning(
                 "Ledger definition of cred def %s already exists",
@@ -586,12 +598,11 @@ class IndyLedger(BaseLedger):
             credential_definition_id: The schema id of the schema to fetch cred def for
 
         """
-        if self.cache:
-            result = await self.cache.get(
-                f"credential_definition::{credential_definition_id}"
-            )
-            if result:
-                return result
+        found, result = await self.read_cache.get(
+            CATEGORY_CRED_DEF, credential_definition_id
+        )
+        if found:
+            return result
 
         return await self.fetch_credential_definition(credential_definition_id)
 
@@ -625,12 +636,9 @@ class IndyLedger(BaseLedger):
                 if error.error_code == ErrorCode.LedgerNotFound:
                     parsed_response = None
 
-        if parsed_response and self.cache:
-            await self.cache.set(
-                f"credential_definition::{credential_definition_id}",
-                parsed_response,
-                self.cache_duration,
-            )
+        await self.read_cache.set(
+            CATEGORY_CRED_DEF, credential_definition_id, parsed_response or None
+        )
 
         return parsed_response
 
@@ -658,6 +666,10 @@ class IndyLedger(BaseLedger):
         Args:
             did: The DID to look up on the ledger or in the cache
         """
+        found, verkey = await self.read_cache.get(CATEGORY_VERKEY, did)
+        if found:
+            return verkey
+
         nym = self.did_to_nym(did)
         public_info = await self.wallet.get_public_did()
         public_did = public_info.did if public_info else None
@@ -665,7 +677,9 @@ class IndyLedger(BaseLedger):
             request_json = await indy.ledger.build_get_nym_request(public_did, nym)
         response_json = await self._submit(request_json, public_did=public_did)
         data_json = (json.loads(response_json))["result"]["data"]
-        return json.loads(data_json)["verkey"]
+        verkey = json.loads(data_json)["verkey"] if data_json else None
+        await self.read_cache.set(CATEGORY_VERKEY, did, verkey)
+        return verkey
 
     async def get_endpoint_for_did(self, did: str) -> str:
         """Fetch the endpoint for a ledger DID.
@@ -673,6 +687,10 @@ class IndyLedger(BaseLedger):
         Args:
             did: The DID to look up on the ledger or in the cache
         """
+        found, address = await self.read_cache.get(CATEGORY_ENDPOINT, did)
+        if found:
+            return address
+
         nym = self.did_to_nym(did)
         public_info = await self.wallet.get_public_did()
         public_did = public_info.did if public_info else None
@@ -688,6 +706,7 @@ class IndyLedger(BaseLedger):
         else:
             address = None
 
+        await self.read_cache.set(CATEGORY_ENDPOINT, did, address)
         return address
 
     async def update_endpoint_for_did(self, did: str, endpoint: str) -> bool:
@@ -698,6 +717,7 @@ class IndyLedger(BaseLedger):
             endpoint: The endpoint address
             transport_vk: The endpoint transport verkey
         """
+        await self.read_cache.clear(CATEGORY_ENDPOINT, did)
         exist_endpoint = await self.get_endpoint_for_did(did)
         if exist_endpoint != endpoint:
             nym = self.did_to_nym(did)
@@ -707,6 +727,7 @@ class IndyLedger(BaseLedger):
                     nym, nym, None, attr_json, None
                 )
             await self._submit(request_json, True, True)
+            await self.read_cache.set(CATEGORY_ENDPOINT, did, endpoint)
             return True
         return False
 
@@ -726,6 +747,7 @@ class IndyLedger(BaseLedger):
         public_did = public_info.did if public_info else None
         r = await indy.ledger.build_nym_request(public_did, did, verkey, alias, role)
         await self._submit(r, True, True, public_did=public_did)
+        await self.read_cache.clear(CATEGORY_VERKEY, did)
 
     def nym_to_did(self, nym: str) -> str:
         """Format a nym with the ledger's DID prefix."""
@@ -2,6 +2,9 @@
 
 import logging
 
+from hashlib import sha256
+from os import path
+
 from ..cache.base import BaseCache
 from ..config.base import BaseProvider, BaseInjector, BaseSettings
 from ..utils.classloader import ClassLoader
@@ -15,6 +18,19 @@ class LedgerProvider(BaseProvider):
 
     LEDGER_CLASSES = {"indy": "aries_cloudagent.ledger.indy.IndyLedger"}
 
+    @staticmethod
+    def cache_path(
+        settings: BaseSettings, pool_name: str, genesis_transactions: str = None
+    ) -> str:
+        """Determine the file used to persist ledger objects, if configured."""
+        cache_dir = settings.get("ledger.cache_dir")
+        if not cache_dir:
+            return None
+        # distinguish ledgers sharing a pool name by their genesis transactions
+        if genesis_transactions:
+            pool_name += "-" + sha256(genesis_transactions.encode()).hexdigest()[:16]
+        return path.join(cache_dir, f"{pool_name}.jsonl")
+
     async def provide(self, settings: BaseSettings, injector: BaseInjector):
         """Create and open the ledger instance."""
 
@@ -26,9 +42,15 @@ class LedgerProvider(BaseProvider):
         if wallet.WALLET_TYPE == "indy":
             IndyLedger = ClassLoader.load_class(self.LEDGER_CLASSES["indy"])
             cache = await injector.inject(BaseCache, required=False)
-            ledger = IndyLedger(pool_name, wallet, keepalive=keepalive, cache=cache)
-
             genesis_transactions = settings.get("ledger.genesis_transactions")
+            ledger = IndyLedger(
+                pool_name,
+                wallet,
+                keepalive=keepalive,
+                cache=cache,
+                cache_path=self.cache_path(settings, pool_name, genesis_transactions),
+            )
+
             if genesis_transactions:
                 await ledger.create_pool_config(genesis_transactions, True)
             elif not await ledger.check_pool_config():
@@ -0,0 +1,57 @@
+from asynctest import TestCase as AsyncTestCase
+from asynctest import mock as async_mock
+
+from ..base import BaseLedger
+
+
+class MockLedger(BaseLedger):
+    async def get_key_for_did(self, did: str) -> str:
+        pass
+
+    async def get_endpoint_for_did(self, did: str) -> str:
+        pass
+
+    async def update_endpoint_for_did(self, did: str, endpoint: str) -> bool:
+        pass
+
+    async def register_nym(
+        self, did: str, verkey: str, alias: str = None, role: str = None
+    ):
+        pass
+
+    def nym_to_did(self, nym: str) -> str:
+        return nym
+
+    async def get_schema(self, schema_id: str):
+        pass
+
+    async def get_credential_definition(self, credential_definition_id: str):
+        pass
+
+
+class TestBaseLedger(AsyncTestCase):
+    async def test_get_schemas(self):
+        ledger = MockLedger()
+        ledger.get_schema = async_mock.CoroutineMock(
+            side_effect=lambda schema_id: {"id": schema_id}
+        )
+        result = await ledger.get_schemas(["s1", "s2", "s1"])
+        assert result == {"s1": {"id": "s1"}, "s2": {"id": "s2"}}
+        assert ledger.get_schema.call_count == 2
+
+    async def test_get_credential_definitions(self):
+        ledger = MockLedger()
+        ledger.FETCH_CONCURRENCY = 1
+        ledger.get_credential_definition = async_mock.CoroutineMock(
+            side_effect=lambda cred_def_id: {"id": cred_def_id}
+        )
+        result = await ledger.get_credential_definitions(["c1", "c1", "c2"])
+        assert list(result) == ["c1", "c2"]
+        assert ledger.get_credential_definition.call_count == 2
+
+    def test_abstract(self):
+        class PartialLedger(MockLedger):
+            get_schema = BaseLedger.get_schema
+
+        with self.assertRaises(TypeError):
+            PartialLedger()
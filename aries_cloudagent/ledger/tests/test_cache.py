@@ -0,0 +1,81 @@
+import json
+import tempfile
+
+from os import path
+
+from asynctest import TestCase as AsyncTestCase
+
+from ...cache.basic import BasicCache
+
+from ..cache import LedgerReadCache
+
+
+class TestLedgerReadCache(AsyncTestCase):
+    async def test_immutable(self):
+        read_cache = LedgerReadCache(BasicCache())
+        assert await read_cache.get("schema", "schema_id") == (False, None)
+        await read_cache.set("schema", ["schema_id", "15"], {"id": "schema_id"})
+        assert await read_cache.get("schema", "schema_id") == (
+            True,
+            {"id": "schema_id"},
+        )
+        assert await read_cache.get("schema", "15") == (True, {"id": "schema_id"})
+        assert not read_cache.cache._cache
+        assert read_cache.stats == {
+            "schema": {"hits": 2, "misses": 1, "hit_ratio": 0.6667}
+        }
+
+    async def test_mutable_and_negative(self):
+        read_cache = LedgerReadCache(BasicCache(), mutable_ttl=60, negative_ttl=0.01)
+        await read_cache.set("endpoint", "did", "http://localhost")
+        await read_cache.set("verkey", "did", None)
+        assert await read_cache.get("endpoint", "did") == (True, "http://localhost")
+        assert await read_cache.get("verkey", "did") == (True, None)
+        await read_cache.clear("endpoint", "did")
+        assert await read_cache.get("endpoint", "did") == (False, None)
+
+        # a negative result for an immutable object is superseded once written
+        await read_cache.set("credential_definition", "cred_def_id", None)
+        assert await read_cache.get("credential_definition", "cred_def_id") == (
+            True,
+            None,
+        )
+        await read_cache.set("credential_definition", "cred_def_id", {"id": 1})
+        assert await read_cache.get("credential_definition", "cred_def_id") == (
+            True,
+            {"id": 1},
+        )
+
+    async def test_no_cache(self):
+        read_cache = LedgerReadCache()
+        await read_cache.set("verkey", "did", "verkey")
+        assert await read_cache.get("verkey", "did") == (False, None)
+        await read_cache.set("schema", "schema_id", {"id": "schema_id"})
+        assert await read_cache.get("schema", "schema_id") == (
+            True,
+            {"id": "schema_id"},
+        )
+
+    async def test_persist(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            persist_path = path.join(temp_dir, "ledger", "pool.jsonl")
+            read_cache = LedgerReadCache(persist_path=persist_path)
+            await read_cache.set("schema", ["schema_id", "15"], {"id": "schema_id"})
+            await read_cache.set("credential_definition", "cred_def_id", {"id": 1})
+            await read_cache.set("credential_definition", "cred_def_id", {"id": 1})
+            await read_cache.clear("schema", "15")
+
+            with open(persist_path) as persisted:
+                assert len(persisted.readlines()) == 4
+            with open(persist_path, "a") as persisted:
+                persisted.write("{corrupt\n")
+
+            restored = LedgerReadCache(persist_path=persist_path)
+            assert restored.immutable == {
+                "ledger::schema::schema_id": {"id": "schema_id"},
+                "ledger::credential_definition::cred_def_id": {"id": 1},
+            }
+            assert await restored.get("schema", "15") == (False, None)
+            with open(persist_path) as persisted:
+                entries = [json.loads(line) for line in persisted]
+            assert len(entries) == 2
@@ -1316,6 +1316,41 @@ class TestIndyLedger(AsyncTestCase):
             )
             assert response == endpoint
 
+    @async_mock.patch("aries_cloudagent.ledger.indy.IndyLedger._context_open")
+    @async_mock.patch("aries_cloudagent.ledger.indy.IndyLedger._context_close")
+    @async_mock.patch("indy.ledger.build_get_nym_request")
+    @async_mock.patch("indy.ledger.build_get_attrib_request")
+    @async_mock.patch("aries_cloudagent.ledger.indy.IndyLedger._submit")
+    async def test_get_key_and_endpoint_cached(
+        self,
+        mock_submit,
+        mock_build_get_attrib_req,
+        mock_build_get_nym_req,
+        mock_close,
+        mock_open
+    ):
+        mock_wallet = async_mock.MagicMock()
+        mock_wallet.WALLET_TYPE = "indy"
+        mock_wallet.get_public_did = async_mock.CoroutineMock(
+            return_value=DIDInfo(self.test_did, self.test_verkey, None)
+        )
+
+        mock_submit.side_effect = [
+            json.dumps({"result": {"data": json.dumps({"verkey": self.test_verkey})}}),
+            json.dumps({"result": {"data": None}}),
+        ]
+        ledger = IndyLedger("name", mock_wallet, cache=BasicCache())
+
+        async with ledger:
+            for _ in range(2):
+                assert await ledger.get_key_for_did(self.test_did) == self.test_verkey
+                assert await ledger.get_endpoint_for_did(self.test_did) is None
+            assert mock_submit.call_count == 2
+            assert ledger.read_cache.stats == {
+                "endpoint": {"hits": 1, "misses": 1, "hit_ratio": 0.5},
+                "verkey": {"hits": 1, "misses": 1, "hit_ratio": 0.5},
+            }
+
     @async_mock.patch("aries_cloudagent.ledger.indy.IndyLedger._context_open")
     @async_mock.patch("aries_cloudagent.ledger.indy.IndyLedger._context_close")
     @async_mock.patch("indy.ledger.build_get_attrib_request")
@@ -334,6 +334,7 @@ class AgentMessageSchema(BaseModelSchema):
         self._decorators = DecoratorSet()
         self._decorators_dict = None
         self._signatures = {}
+        self._signed_fields = resolve_meta_property(self, "signed_fields") or ()
 
     @pre_load
     def extract_decorators(self, data, **kwargs):
@@ -354,9 +355,11 @@ class AgentMessageSchema(BaseModelSchema):
             ValidationError: If there is a missing field signature
 
         """
+        # schema instances are reused, so each load starts a new decorator set
+        self._decorators = DecoratorSet()
         processed = self._decorators.extract_decorators(data, self.__class__)
 
-        expect_fields = resolve_meta_property(self, "signed_fields") or ()
+        expect_fields = self._signed_fields
         found_signatures = {}
         for field_name, field in self._decorators.fields.items():
             if "sig" in field:
@@ -412,8 +415,7 @@ class AgentMessageSchema(BaseModelSchema):
         self._signatures = signatures
 
         # check existence of signatures
-        expect_fields = resolve_meta_property(self, "signed_fields") or ()
-        for field_name in expect_fields:
+        for field_name in self._signed_fields:
             if field_name not in self._signatures:
                 raise BaseModelError(
                     "Missing signature for field: {}".format(field_name)
@@ -13,6 +13,21 @@ from ..models.base import BaseModel
 
 DECORATOR_PREFIX = "~"
 
+# message properties handled by each schema class, which are not decorators
+SCHEMA_DATA_KEYS = {}
+
+
+def schema_data_keys(schema: Type[Schema]) -> frozenset:
+    """Get the data keys of the declared fields of a schema class."""
+    keys = SCHEMA_DATA_KEYS.get(schema)
+    if keys is None:
+        keys = SCHEMA_DATA_KEYS[schema] = frozenset(
+            field_def.data_key
+            for field_def in schema._declared_fields.values()
+            if isinstance(field_def, Field) and field_def.data_key
+        )
+    return keys
+
 
 class DecoratorError(BaseError):
     """Base error for decorator issues."""
@@ -108,11 +123,10 @@ class BaseDecoratorSet(OrderedDict):
     ) -> OrderedDict:
         """Extract decorators and return the remaining properties."""
         remain = OrderedDict()
-        skip_attrs = set(skip_attrs) if skip_attrs else set()
         if schema:
-            for field_name, field_def in schema._declared_fields.items():
-                if isinstance(field_def, Field) and field_def.data_key:
-                    skip_attrs.add(field_def.data_key)
+            skip_attrs = schema_data_keys(schema).union(skip_attrs or ())
+        else:
+            skip_attrs = set(skip_attrs) if skip_attrs else set()
         if message:
             pfx_len = len(self._prefix)
             for key, value in message.items():
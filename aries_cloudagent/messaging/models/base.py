@@ -1,16 +1,19 @@
 """Base classes for Models and Schemas."""
 import logging
 from abc import ABC
-import json
 from typing import Union
 
 from marshmallow import Schema, post_dump, pre_load, post_load, ValidationError
 
 from ...core.error import BaseError
 from ...utils.classloader import ClassLoader
+from ...utils.json_codec import json_dumps, json_loads
 
 LOGGER = logging.getLogger(__name__)
 
+# idle schema instances, by schema class
+SCHEMA_POOL = {}
+
 
 def resolve_class(the_cls, relative_cls: type = None):
     """
@@ -99,6 +102,26 @@ class BaseModel(ABC):
         """
         return resolve_class(cls.Meta.schema_class, cls)
 
+    @classmethod
+    def _get_schema(cls) -> "BaseModelSchema":
+        """
+        Take a schema instance from the pool, creating one if none are idle.
+
+        Schema instances are expensive to create and may hold state while
+        loading or dumping, so each is used by one operation at a time and
+        returned to the pool with `_release_schema`.
+        """
+        schema_class = cls._get_schema_class()
+        try:
+            return SCHEMA_POOL[schema_class].pop()
+        except (KeyError, IndexError):
+            return schema_class()
+
+    @staticmethod
+    def _release_schema(schema: "BaseModelSchema"):
+        """Return a schema instance to the pool."""
+        SCHEMA_POOL.setdefault(schema.__class__, []).append(schema)
+
     @property
     def Schema(self) -> type:
         """
@@ -122,12 +145,14 @@ class BaseModel(ABC):
             A model instance for this data
 
         """
-        schema = cls._get_schema_class()()
+        schema = cls._get_schema()
         try:
             return schema.loads(obj) if isinstance(obj, str) else schema.load(obj)
         except ValidationError as e:
             LOGGER.exception(f"{cls.__name__} message validation error:")
             raise BaseModelError(f"{cls.__name__} schema validation failed") from e
+        finally:
+            cls._release_schema(schema)
 
     def serialize(self, as_string=False) -> dict:
         """
@@ -140,7 +165,7 @@ class BaseModel(ABC):
             A dict representation of this model, or a JSON string if as_string is True
 
         """
-        schema = self.Schema()
+        schema = self._get_schema()
         try:
             return schema.dumps(self) if as_string else schema.dump(self)
         except ValidationError as e:
@@ -148,6 +173,8 @@ class BaseModel(ABC):
             raise BaseModelError(
                 f"{self.__class__.__name__} schema validation failed"
             ) from e
+        finally:
+            self._release_schema(schema)
 
     @classmethod
     def from_json(cls, json_repr: Union[str, bytes]):
@@ -162,7 +189,7 @@ class BaseModel(ABC):
 
         """
         try:
-            parsed = json.loads(json_repr)
+            parsed = json_loads(json_repr)
         except ValueError as e:
             LOGGER.exception(f"{cls.__name__} message parse error:")
             raise BaseModelError(f"{cls.__name__} JSON parsing failed") from e
@@ -176,7 +203,7 @@ class BaseModel(ABC):
             A JSON representation of this message
 
         """
-        return json.dumps(self.serialize())
+        return json_dumps(self.serialize())
 
     def __repr__(self) -> str:
         """
@@ -220,6 +247,12 @@ class BaseModelSchema(Schema):
                     self.__class__.__name__
                 )
             )
+        self._dump_only_keys = {
+            field_obj.data_key or field_name
+            for field_name, field_obj in self.fields.items()
+            if field_obj.dump_only
+        }
+        self._skip_values = resolve_meta_property(self, "skip_values", [])
 
     @classmethod
     def _get_model_class(cls):
@@ -256,12 +289,7 @@ class BaseModelSchema(Schema):
 
         """
         # not sure why this is necessary, seems like a bug
-        to_remove = {
-            field_obj.data_key or field_name
-            for field_name, field_obj in self.fields.items()
-            if field_obj.dump_only
-        }
-        for field_name in to_remove:
+        for field_name in self._dump_only_keys:
             if field_name in data:
                 del data[field_name]
         return data
@@ -286,5 +314,5 @@ class BaseModelSchema(Schema):
             Returns this modified data
 
         """
-        skip_vals = resolve_meta_property(self, "skip_values", [])
+        skip_vals = self._skip_values
         return {key: value for key, value in data.items() if value not in skip_vals}
@@ -1,18 +1,32 @@
 """Classes for BaseStorage-based record management."""
 
+import asyncio
+import base64
+import heapq
 import json
 import sys
+import time
 import uuid
+import weakref
 
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Mapping, Sequence, Union
+from typing import Any, AsyncIterator, Mapping, Sequence, Tuple, Union
 
 from marshmallow import fields
 
 from ...cache.base import BaseCache
 from ...config.injection_context import InjectionContext
-from ...storage.base import BaseStorage, StorageDuplicateError, StorageNotFoundError
+from ...storage.base import (
+    BaseStorage,
+    DEFAULT_PAGE_SIZE,
+    StorageBatch,
+    StorageDuplicateError,
+    StorageNotFoundError,
+)
 from ...storage.record import StorageRecord
+from ...utils.json_codec import json_dumps, json_loads
+from ...utils.stats import Collector
 
 from .base import BaseModel, BaseModelSchema
 from ..responder import BaseResponder
@@ -20,6 +34,13 @@ from ..util import datetime_to_str, time_now
 from ..valid import INDY_ISO8601_DATETIME
 
 
+# the keys cached for each record type with an entry limit, by cache instance
+_CACHED_KEYS = weakref.WeakKeyDictionary()
+
+# the record types whose tags have been migrated, by storage instance
+_MIGRATED_TAGS = weakref.WeakKeyDictionary()
+
+
 def match_post_filter(record: dict, post_filter: dict) -> bool:
     """Determine if a record value matches the post-filter."""
     for k, v in post_filter.items():
@@ -39,8 +60,18 @@ class BaseRecord(BaseModel):
     WEBHOOK_TOPIC = None
     LOG_STATE_FLAG = None
     CACHE_TTL = 60
+    CACHE_MAX_ENTRIES = None
     CACHE_ENABLED = False
+    CACHE_TAG_INDEXES = ()
+    CACHE_NEGATIVE_INDEXES = True
     TAG_NAMES = {"state"}
+    # tags added after records of this type were first stored, which are
+    # added to older records once before the first query
+    MIGRATE_TAGS = set()
+    TAG_MIGRATION_RECORD_TYPE = "record_tag_migration"
+    SORT_KEYS = ("created_at", "updated_at")
+    PAGE_SNAPSHOT_SIZE = 1000
+    PAGE_SNAPSHOT_TTL = 60
 
     def __init__(
         self,
@@ -87,7 +118,7 @@ class BaseRecord(BaseModel):
     def storage_record(self) -> StorageRecord:
         """Accessor for a `StorageRecord` representing this record."""
         return StorageRecord(
-            self.RECORD_TYPE, json.dumps(self.value), self.tags, self._id
+            self.RECORD_TYPE, json_dumps(self.value), self.tags, self._id
         )
 
     @property
@@ -132,6 +163,25 @@ class BaseRecord(BaseModel):
         if record_id:
             return f"{record_type}::{record_id}"
 
+    @classmethod
+    def cache_ttl(cls, context: InjectionContext) -> float:
+        """Get the cache TTL for this record type, which may be set per type."""
+        ttls = context.settings.get("cache.record_ttl") or {}
+        return ttls.get(cls.RECORD_TYPE, cls.CACHE_TTL)
+
+    @classmethod
+    def cache_max_entries(cls, context: InjectionContext) -> int:
+        """Get the maximum number of cache entries for this record type, if any."""
+        limits = context.settings.get("cache.record_max_entries") or {}
+        return limits.get(cls.RECORD_TYPE, cls.CACHE_MAX_ENTRIES)
+
+    @classmethod
+    def _cached_keys(cls, cache: BaseCache) -> OrderedDict:
+        """Get the keys cached for this record type, least recently used first."""
+        return _CACHED_KEYS.setdefault(cache, {}).setdefault(
+            cls.RECORD_TYPE, OrderedDict()
+        )
+
     @classmethod
     async def get_cached_key(cls, context: InjectionContext, cache_key: str):
         """Shortcut method to fetch a cached key value.
@@ -144,7 +194,12 @@ class BaseRecord(BaseModel):
             return
         cache: BaseCache = await context.inject(BaseCache, required=False)
         if cache:
-            return await cache.get(cache_key)
+            value = await cache.get(cache_key)
+            if value is not None and cls.cache_max_entries(context):
+                keys = cls._cached_keys(cache)
+                if cache_key in keys:
+                    keys.move_to_end(cache_key)
+            return value
 
     @classmethod
     async def set_cached_key(
@@ -162,7 +217,16 @@ class BaseRecord(BaseModel):
             return
         cache: BaseCache = await context.inject(BaseCache, required=False)
         if cache:
-            await cache.set(cache_key, value, ttl or cls.CACHE_TTL)
+            await cache.set(cache_key, value, ttl or cls.cache_ttl(context))
+            max_entries = cls.cache_max_entries(context)
+            if max_entries:
+                # evict the least recently used entries of this record type
+                keys = cls._cached_keys(cache)
+                keys[cache_key] = None
+                keys.move_to_end(cache_key)
+                while len(keys) > max_entries:
+                    evicted, _ = keys.popitem(last=False)
+                    await cache.clear(evicted)
 
     @classmethod
     async def clear_cached_key(cls, context: InjectionContext, cache_key: str):
@@ -177,10 +241,77 @@ class BaseRecord(BaseModel):
         cache: BaseCache = await context.inject(BaseCache, required=False)
         if cache:
             await cache.clear(cache_key)
+            if cls.cache_max_entries(context):
+                cls._cached_keys(cache).pop(cache_key, None)
+
+    @classmethod
+    def tag_index_cache_key(cls, tag_filter: dict) -> str:
+        """Assemble a cache key for the IDs of the records matching a tag filter.
+
+        Only equality filters on one of the tag name combinations listed in
+        CACHE_TAG_INDEXES are cached.
+
+        Args:
+            tag_filter: The tag filter, using unprefixed tag names
+        """
+        if not cls.CACHE_ENABLED or not tag_filter:
+            return None
+        names = set(tag_filter)
+        if not any(names == set(index) for index in cls.CACHE_TAG_INDEXES):
+            return None
+        if not all(isinstance(value, str) for value in tag_filter.values()):
+            return None
+        return cls.cache_key(
+            json.dumps(sorted(tag_filter.items())), f"{cls.RECORD_TYPE}::tags"
+        )
+
+    @property
+    def tag_index_cache_keys(self) -> Sequence[str]:
+        """Accessor for the keys of the cached tag filter lookups for this record."""
+        if not self.CACHE_ENABLED:
+            return []
+        tags = self.strip_tag_prefix(self.tags)
+        return [
+            self.tag_index_cache_key({name: tags[name] for name in index})
+            for index in self.CACHE_TAG_INDEXES
+            if all(tags.get(name) for name in index)
+        ]
+
+    @classmethod
+    async def log_cache_result(
+        cls, context: InjectionContext, hit: bool, start_time: float
+    ):
+        """Record a cache hit or miss with the stats collector, if any.
+
+        Args:
+            context: The injection context to use
+            hit: Whether the lookup was answered by the cache
+            start_time: The performance counter value at the start of the lookup
+        """
+        collector: Collector = await context.inject(Collector, required=False)
+        if collector:
+            collector.log(
+                "{}.cache_{}".format(cls.__name__, "hit" if hit else "miss"),
+                time.perf_counter() - start_time,
+                start_time,
+            )
 
     async def clear_cached(self, context: InjectionContext):
-        """Clear the cached value of this record, if any."""
+        """Clear the cached value of this record and related lookups, if any."""
         await self.clear_cached_key(context, self.cache_key(self._id))
+        for index_key in self.tag_index_cache_keys:
+            await self.clear_cached_key(context, index_key)
+
+    @classmethod
+    async def commit_batch(cls, context: InjectionContext):
+        """Commit the pending writes of the ambient storage batch, if any.
+
+        Args:
+            context: The injection context to use
+        """
+        batch: StorageBatch = await context.inject(StorageBatch, required=False)
+        if batch and batch.pending:
+            await batch.commit()
 
     @classmethod
     async def retrieve_by_id(
@@ -196,15 +327,18 @@ class BaseRecord(BaseModel):
         cache_key = cls.cache_key(record_id)
         vals = None
 
+        await cls.commit_batch(context)
         if cls.CACHE_ENABLED and cached:
+            start_time = time.perf_counter()
             vals = await cls.get_cached_key(context, cache_key)
+            await cls.log_cache_result(context, bool(vals), start_time)
 
         if not vals:
             storage: BaseStorage = await context.inject(BaseStorage)
             result = await storage.get_record(
                 cls.RECORD_TYPE, record_id, {"retrieveTags": False}
             )
-            vals = json.loads(result.value)
+            vals = json_loads(result.value)
             if cls.CACHE_ENABLED:
                 await cls.set_cached_key(context, cache_key, vals)
 
@@ -221,24 +355,94 @@ class BaseRecord(BaseModel):
             tag_filter: The filter dictionary to apply
             post_filter: Additional value filters to apply after retrieval
         """
-        storage: BaseStorage = await context.inject(BaseStorage)
-        query = storage.search_records(
-            cls.RECORD_TYPE,
-            cls.prefix_tag_filter(tag_filter),
-            None,
-            {"retrieveTags": False},
-        )
+        await cls.commit_batch(context)
+        await cls.migrate_tags(context)
+        index_key = cls.tag_index_cache_key(tag_filter)
+        rows = None
+        if index_key:
+            start_time = time.perf_counter()
+            rows = await cls._retrieve_indexed(context, index_key, tag_filter)
+            await cls.log_cache_result(context, rows is not None, start_time)
+
+        if rows is None:
+            storage: BaseStorage = await context.inject(BaseStorage)
+            if post_filter:
+                query = storage.search_records(
+                    cls.RECORD_TYPE,
+                    cls.prefix_tag_filter(tag_filter),
+                    None,
+                    {"retrieveTags": False},
+                )
+                found = [record async for record in query]
+            else:
+                # two rows are enough to tell a unique match from a duplicate
+                found = await storage.find_records(
+                    cls.RECORD_TYPE,
+                    cls.prefix_tag_filter(tag_filter),
+                    2,
+                    {"retrieveTags": False},
+                )
+            rows = [(record.id, json_loads(record.value)) for record in found]
+            # a truncated result cannot be cached as the index of the filter,
+            # and an empty result only when no other process may add a match
+            if (
+                index_key
+                and (post_filter or len(rows) < 2)
+                and (rows or cls.CACHE_NEGATIVE_INDEXES)
+            ):
+                for record_id, vals in rows:
+                    await cls.set_cached_key(context, cls.cache_key(record_id), vals)
+                await cls.set_cached_key(
+                    context, index_key, [record_id for record_id, _vals in rows]
+                )
+
         found = None
-        async for record in query:
-            vals = json.loads(record.value)
+        for record_id, vals in rows:
             if not post_filter or match_post_filter(vals, post_filter):
                 if found:
                     raise StorageDuplicateError("Multiple records located")
-                found = cls.from_storage(record.id, vals)
+                found = cls.from_storage(record_id, vals)
         if not found:
             raise StorageNotFoundError("Record not found")
         return found
 
+    @classmethod
+    async def _retrieve_indexed(
+        cls, context: InjectionContext, index_key: str, tag_filter: dict
+    ) -> Sequence[tuple]:
+        """Resolve a tag filter through the cached record IDs, if still valid.
+
+        Records which have since been deleted or no longer match the filter
+        invalidate the cached lookup.
+
+        Returns:
+            A list of (record ID, record value) pairs, or None
+
+        """
+        record_ids = await cls.get_cached_key(context, index_key)
+        if record_ids is None:
+            return None
+        rows = []
+        for record_id in record_ids:
+            cache_key = cls.cache_key(record_id)
+            vals = await cls.get_cached_key(context, cache_key)
+            if not vals:
+                storage: BaseStorage = await context.inject(BaseStorage)
+                try:
+                    result = await storage.get_record(
+                        cls.RECORD_TYPE, record_id, {"retrieveTags": False}
+                    )
+                except StorageNotFoundError:
+                    result = None
+                if result:
+                    vals = json_loads(result.value)
+                    await cls.set_cached_key(context, cache_key, vals)
+            if not vals or not match_post_filter(vals, tag_filter):
+                await cls.clear_cached_key(context, index_key)
+                return None
+            rows.append((record_id, vals))
+        return rows
+
     @classmethod
     async def query(
         cls,
@@ -253,6 +457,93 @@ class BaseRecord(BaseModel):
             tag_filter: An optional dictionary of tag filter clauses
             post_filter: Additional value filters to apply
         """
+        result = []
+        async for record_id, vals in cls._iter_values(context, tag_filter, post_filter):
+            result.append(cls.from_storage(record_id, vals))
+        return result
+
+    @classmethod
+    async def migrate_tags(cls, context: InjectionContext):
+        """
+        Add the tags in `MIGRATE_TAGS` to records stored before they were tagged.
+
+        The stored records are scanned once, after which a marker record for the
+        record type is stored with the names of the migrated tags.
+
+        Args:
+            context: The injection context to use
+
+        """
+        if not cls.MIGRATE_TAGS:
+            return
+        storage: BaseStorage = await context.inject(BaseStorage)
+        migrated = _MIGRATED_TAGS.setdefault(storage, set())
+        if cls.RECORD_TYPE in migrated:
+            return
+        marker_value = json_dumps(sorted(cls.MIGRATE_TAGS))
+        try:
+            marker = await storage.get_record(
+                cls.TAG_MIGRATION_RECORD_TYPE, cls.RECORD_TYPE
+            )
+        except StorageNotFoundError:
+            marker = None
+        if not marker or marker.value != marker_value:
+            updates = []
+            async for record in storage.search_records(cls.RECORD_TYPE):
+                tags = cls.from_storage(record.id, json_loads(record.value)).tags
+                if tags != (record.tags or {}):
+                    updates.append((record, tags))
+            for record, tags in updates:
+                await storage.update_record_tags(record, tags)
+            marker_record = StorageRecord(
+                cls.TAG_MIGRATION_RECORD_TYPE, marker_value, {}, cls.RECORD_TYPE
+            )
+            if marker:
+                await storage.update_record_value(marker_record, marker_value)
+            else:
+                try:
+                    await storage.add_record(marker_record)
+                except StorageDuplicateError:
+                    # migrated concurrently
+                    pass
+        migrated.add(cls.RECORD_TYPE)
+
+    @classmethod
+    def split_filters(
+        cls, tag_filter: dict = None, post_filter: dict = None
+    ) -> Tuple[dict, dict]:
+        """
+        Move post-filter clauses on tagged properties into the tag filter.
+
+        Args:
+            tag_filter: An optional dictionary of tag filter clauses
+            post_filter: Additional value filters to apply
+
+        Returns:
+            A tuple of the tag filter and the remaining post-filter
+
+        """
+        tag_filter = dict(tag_filter or {})
+        remain = {}
+        tag_map = cls.get_tag_map()
+        for name, value in (post_filter or {}).items():
+            if name in tag_map and name not in tag_filter and isinstance(value, str):
+                tag_filter[name] = value
+            else:
+                remain[name] = value
+        return tag_filter, remain
+
+    @classmethod
+    async def _iter_values(
+        cls,
+        context: InjectionContext,
+        tag_filter: dict = None,
+        post_filter: dict = None,
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """Iterate the IDs and values of the stored records matching the filters."""
+        await cls.commit_batch(context)
+        await cls.migrate_tags(context)
+        tag_filter, post_filter = cls.split_filters(tag_filter, post_filter)
         storage: BaseStorage = await context.inject(BaseStorage)
         query = storage.search_records(
             cls.RECORD_TYPE,
@@ -260,12 +551,199 @@ class BaseRecord(BaseModel):
             None,
             {"retrieveTags": False},
         )
-        result = []
+        scanned = 0
         async for record in query:
-            vals = json.loads(record.value)
+            vals = json_loads(record.value)
             if not post_filter or match_post_filter(vals, post_filter):
-                result.append(cls.from_storage(record.id, vals))
-        return result
+                yield record.id, vals
+            scanned += 1
+            if not scanned % DEFAULT_PAGE_SIZE:
+                # let other tasks run during long searches
+                await asyncio.sleep(0)
+
+    @classmethod
+    async def iter_query(
+        cls,
+        context: InjectionContext,
+        tag_filter: dict = None,
+        post_filter: dict = None,
+    ) -> AsyncIterator["BaseRecord"]:
+        """Iterate stored records without loading all of them at once.
+
+        Args:
+            context: The injection context to use
+            tag_filter: An optional dictionary of tag filter clauses
+            post_filter: Additional value filters to apply
+        """
+        async for record_id, vals in cls._iter_values(context, tag_filter, post_filter):
+            yield cls.from_storage(record_id, vals)
+
+    @classmethod
+    def encode_cursor(cls, sort: str, descending: bool, position: tuple) -> str:
+        """Encode the position of the last record of a page as a cursor."""
+        cursor = json.dumps([sort, descending, *position]).encode("utf-8")
+        return base64.urlsafe_b64encode(cursor).decode("ascii")
+
+    @classmethod
+    def decode_cursor(cls, cursor: str, sort: str, descending: bool) -> tuple:
+        """
+        Decode a cursor to the position after which the next page starts.
+
+        Raises:
+            ValueError: If the cursor is invalid or was created for another sort
+
+        """
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            cur_sort, cur_descending, sort_value, record_id = decoded
+        except (TypeError, ValueError, UnicodeError):
+            raise ValueError("Invalid cursor")
+        if not (
+            isinstance(sort_value, str)
+            and isinstance(record_id, str)
+            and isinstance(cur_descending, bool)
+        ):
+            raise ValueError("Invalid cursor")
+        if cur_sort != sort or cur_descending != descending:
+            raise ValueError("Cursor does not match the requested sort order")
+        return (sort_value, record_id)
+
+    @classmethod
+    async def query_page(
+        cls,
+        context: InjectionContext,
+        tag_filter: dict = None,
+        post_filter: dict = None,
+        *,
+        limit: int,
+        cursor: str = None,
+        sort: str = "created_at",
+        descending: bool = False,
+    ) -> Tuple[Sequence["BaseRecord"], str]:
+        """Query one page of stored records, in order of a timestamp.
+
+        Storage searches are unordered, so every matching record is scanned,
+        but only the values of one page are retained at a time. When a cache
+        is available, the order of up to `PAGE_SNAPSHOT_SIZE` following
+        records is cached with the cursor, and the next pages are read from
+        this snapshot rather than by another scan. Records added after the
+        snapshot was taken are not included in those pages.
+
+        Args:
+            context: The injection context to use
+            tag_filter: An optional dictionary of tag filter clauses
+            post_filter: Additional value filters to apply
+            limit: The maximum number of records to return
+            cursor: The cursor returned with the previous page
+            sort: The timestamp to sort by, one of `SORT_KEYS`
+            descending: Return the most recent records first
+
+        Returns:
+            A tuple of the records and the cursor for the next page, which is
+            `None` for the last page
+
+        Raises:
+            ValueError: If the sort key or cursor is invalid
+
+        """
+        if sort not in cls.SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        if limit < 1:
+            raise ValueError("Page limit must be positive")
+        after = cls.decode_cursor(cursor, sort, descending) if cursor else None
+        cache: BaseCache = await context.inject(BaseCache, required=False)
+        filters = (tag_filter, post_filter)
+
+        page = None
+        if cursor and cache:
+            snapshot = await cache.get(cls._page_snapshot_key(filters, cursor))
+            if snapshot and (len(snapshot["rows"]) > limit or snapshot["complete"]):
+                page, rest = await cls._read_page_snapshot(
+                    context, filters, snapshot["rows"], limit
+                )
+                complete = snapshot["complete"]
+                if not page:
+                    # the remaining records were deleted or changed
+                    page = None
+
+        if page is None:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            keep = limit + 1 + (cls.PAGE_SNAPSHOT_SIZE if cache else 0)
+            rows = []
+            async for record_id, vals in cls._iter_values(
+                context, tag_filter, post_filter
+            ):
+                position = (vals.get(sort) or "", record_id)
+                if after and (position >= after if descending else position <= after):
+                    continue
+                rows.append((position, vals))
+                if len(rows) >= keep * 2:
+                    rows = select(keep, rows, key=lambda row: row[0])
+            rows = select(keep, rows, key=lambda row: row[0])
+            page = rows[:limit]
+            rest = [position for (position, _vals) in rows[limit:]]
+            complete = len(rows) < keep
+
+        next_cursor = None
+        if page and (rest or not complete):
+            next_cursor = cls.encode_cursor(sort, descending, page[-1][0])
+            if cache and rest:
+                await cache.set(
+                    cls._page_snapshot_key(filters, next_cursor),
+                    {
+                        "rows": [list(position) for position in rest],
+                        "complete": complete,
+                    },
+                    cls.PAGE_SNAPSHOT_TTL,
+                )
+        records = [cls.from_storage(position[1], vals) for (position, vals) in page]
+        return records, next_cursor
+
+    @classmethod
+    def _page_snapshot_key(cls, filters: tuple, cursor: str) -> str:
+        """Get the cache key of the page snapshot following a cursor."""
+        return cls.cache_key(
+            json.dumps([filters, cursor], sort_keys=True), f"{cls.RECORD_TYPE}::page"
+        )
+
+    @classmethod
+    async def _read_page_snapshot(
+        cls, context: InjectionContext, filters: tuple, rows: Sequence, limit: int
+    ) -> Tuple[Sequence[tuple], Sequence[tuple]]:
+        """
+        Load the records of a page from the positions in a snapshot.
+
+        Records which have since been deleted, or no longer match the simple
+        equality clauses of the filters, are skipped.
+
+        Returns:
+            A tuple of the positions and values of the records of the page, and
+            the positions remaining in the snapshot
+
+        """
+        tag_filter, post_filter = filters
+        match = dict(post_filter or {})
+        match.update(
+            (name, value)
+            for (name, value) in (tag_filter or {}).items()
+            if isinstance(value, str)
+        )
+        storage: BaseStorage = await context.inject(BaseStorage)
+        page = []
+        index = 0
+        while index < len(rows) and len(page) < limit:
+            position = tuple(rows[index])
+            index += 1
+            try:
+                record = await storage.get_record(
+                    cls.RECORD_TYPE, position[1], {"retrieveTags": False}
+                )
+            except StorageNotFoundError:
+                continue
+            vals = json_loads(record.value)
+            if match_post_filter(vals, match):
+                page.append((position, vals))
+        return page, [tuple(row) for row in rows[index:]]
 
     async def save(
         self,
@@ -278,6 +756,9 @@ class BaseRecord(BaseModel):
     ) -> str:
         """Persist the record to storage.
 
+        If a `StorageBatch` is bound in the context, the write is added to the
+        batch and the post-save actions are run once the batch is committed.
+
         Args:
             context: The injection context to use
             reason: A reason to add to the log
@@ -286,18 +767,28 @@ class BaseRecord(BaseModel):
         """
         new_record = None
         log_reason = reason or ("Updated record" if self._id else "Created record")
+        batch: StorageBatch = await context.inject(StorageBatch, required=False)
+        prev_id = self._id
+        prev_created_at = self.created_at
         try:
             self.updated_at = time_now()
-            storage: BaseStorage = await context.inject(BaseStorage)
+            storage: BaseStorage = None
+            if not batch:
+                storage = await context.inject(BaseStorage)
             if not self._id:
                 self._id = str(uuid.uuid4())
                 self.created_at = self.updated_at
-                await storage.add_record(self.storage_record)
+                if batch:
+                    batch.add_record(self.storage_record)
+                else:
+                    await storage.add_record(self.storage_record)
                 new_record = True
             else:
                 record = self.storage_record
-                await storage.update_record_value(record, record.value)
-                await storage.update_record_tags(record, record.tags)
+                if batch:
+                    batch.update_record(record, record.value, record.tags)
+                else:
+                    await storage.update_record(record, record.value, record.tags)
                 new_record = False
         finally:
             params = {self.RECORD_TYPE: self.serialize()}
@@ -307,9 +798,31 @@ class BaseRecord(BaseModel):
                 log_reason = f"FAILED: {log_reason}"
             self.log_state(context, log_reason, params, override=log_override)
 
-        await self.post_save(context, new_record, self._last_state, webhook)
+        last_state = self._last_state
         self._last_state = self.state
+        if not batch:
+            await self.post_save(context, new_record, last_state, webhook)
+            return self._id
+
+        # the webhook is prepared now, as the record may be saved again before
+        # the batch is committed
+        webhook_topic = self.webhook_topic
+        if webhook is None:
+            webhook = bool(webhook_topic) and (new_record or (last_state != self.state))
+        webhook_payload = self.webhook_payload if webhook else None
 
+        async def committed():
+            await self.post_save(context, new_record, last_state, False)
+            if webhook:
+                await self.send_webhook(context, webhook_payload, topic=webhook_topic)
+
+        def discarded():
+            self._id = prev_id
+            self.created_at = prev_created_at
+            self._last_state = last_state
+
+        batch.on_commit(committed)
+        batch.on_discard(discarded)
         return self._id
 
     async def post_save(
@@ -344,8 +857,14 @@ class BaseRecord(BaseModel):
             context: The injection context to use
         """
         if self._id:
-            storage: BaseStorage = await context.inject(BaseStorage)
-            await storage.delete_record(self.storage_record)
+            batch: StorageBatch = await context.inject(StorageBatch, required=False)
+            if batch:
+                batch.delete_record(self.storage_record)
+                batch.on_commit(lambda: self.clear_cached(context))
+            else:
+                storage: BaseStorage = await context.inject(BaseStorage)
+                await storage.delete_record(self.storage_record)
+                await self.clear_cached(context)
         # FIXME - update state and send webhook?
 
     @property
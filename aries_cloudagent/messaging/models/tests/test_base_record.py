@@ -3,8 +3,12 @@ import json
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....cache.base import BaseCache
+from ....cache.basic import BasicCache
 from ....config.injection_context import InjectionContext
-from ....storage.base import BaseStorage, StorageRecord
+from ....storage.base import BaseStorage, StorageBatch, StorageRecord
+from ....storage.basic import BasicStorage
+from ....storage.error import StorageDuplicateError, StorageNotFoundError
+from ....utils.stats import Collector
 
 from ...responder import BaseResponder, MockResponder
 from ...util import time_now
@@ -25,6 +29,25 @@ class BaseRecordImplSchema(BaseRecordSchema):
         model_class = BaseRecordImpl
 
 
+class TaggedRecordImpl(BaseRecord):
+    class Meta:
+        schema_class = "TaggedRecordImplSchema"
+
+    RECORD_TYPE = "tagged_record"
+    CACHE_ENABLED = True
+    CACHE_TAG_INDEXES = (("code",),)
+    TAG_NAMES = {"code", "state"}
+
+    def __init__(self, *, id: str = None, code: str = None, **kwargs):
+        super().__init__(id, **kwargs)
+        self.code = code
+
+
+class TaggedRecordImplSchema(BaseRecordSchema):
+    class Meta:
+        model_class = TaggedRecordImpl
+
+
 class UnencTestImpl(BaseRecord):
     TAG_NAMES = {"~a", "~b", "c"}
 
@@ -58,8 +81,7 @@ class TestBaseRecord(AsyncTestCase):
     async def test_post_save_exist(self):
         context = InjectionContext(enforce_typing=False)
         mock_storage = async_mock.MagicMock()
-        mock_storage.update_record_value = async_mock.CoroutineMock()
-        mock_storage.update_record_tags = async_mock.CoroutineMock()
+        mock_storage.update_record = async_mock.CoroutineMock()
         context.injector.bind_instance(BaseStorage, mock_storage)
         record = BaseRecordImpl()
         last_state = "last_state"
@@ -70,8 +92,78 @@ class TestBaseRecord(AsyncTestCase):
         ) as post_save:
             await record.save(context, reason="reason", webhook=False)
             post_save.assert_called_once_with(context, False, last_state, False)
-        mock_storage.update_record_value.assert_called_once()
-        mock_storage.update_record_tags.assert_called_once()
+        mock_storage.update_record.assert_called_once()
+
+    async def test_save_batched(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        batch = storage.batch()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(StorageBatch, batch)
+        record = BaseRecordImpl(state="initial")
+        with async_mock.patch.object(
+            record, "post_save", async_mock.CoroutineMock()
+        ) as post_save:
+            record_id = await record.save(context, reason="reason")
+            record.state = "updated"
+            await record.save(context, reason="reason")
+            post_save.assert_not_called()
+            assert len(batch.operations) == 1
+
+            await batch.commit()
+            assert post_save.await_count == 2
+            post_save.assert_awaited_with(context, False, "initial", False)
+
+        record.state = "final"
+        await record.save(context)
+        result = await BaseRecordImpl.retrieve_by_id(context, record_id, False)
+        assert not batch.pending
+        assert result.state == "final"
+
+    async def test_save_batched_webhooks(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        batch = storage.batch()
+        responder = MockResponder()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(StorageBatch, batch)
+        context.injector.bind_instance(BaseResponder, responder)
+        record = BaseRecordImpl(state="offer_received")
+        with async_mock.patch.object(BaseRecordImpl, "WEBHOOK_TOPIC", "topic"):
+            await record.save(context)
+            record.state = "request_sent"
+            await record.save(context)
+            await record.save(context)
+            assert not responder.webhooks
+            await batch.commit()
+        assert [
+            (topic, payload["state"]) for (topic, payload) in responder.webhooks
+        ] == [("topic", "offer_received"), ("topic", "request_sent")]
+
+    async def test_save_batched_discard(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        batch = storage.batch()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(StorageBatch, batch)
+        record = BaseRecordImpl(state="initial")
+        await record.save(context)
+        assert record._id
+        batch.discard()
+        assert record._id is None and record.created_at is None
+
+        await record.save(context)
+        with async_mock.patch.object(
+            storage, "apply_batch", async_mock.CoroutineMock(side_effect=KeyError())
+        ):
+            with self.assertRaises(KeyError):
+                await batch.commit()
+        assert record._id is None
+
+        context.injector.clear_binding(StorageBatch)
+        record_id = await record.save(context)
+        result = await BaseRecordImpl.retrieve_by_id(context, record_id, False)
+        assert result.state == "initial"
 
     async def test_cache(self):
         context = InjectionContext(enforce_typing=False)
@@ -194,3 +286,226 @@ class TestBaseRecord(AsyncTestCase):
         assert UnencTestImpl.prefix_tag_filter(tags) == {
             "$or": [{"~a": "x"}, {"c": "z"}]
         }
+
+    async def test_tag_index_cache_keys(self):
+        assert TaggedRecordImpl.tag_index_cache_key({"code": "a"})
+        assert TaggedRecordImpl.tag_index_cache_key({"state": "a"}) is None
+        assert TaggedRecordImpl.tag_index_cache_key({"code": {"$neq": "a"}}) is None
+        assert BaseRecordImpl.tag_index_cache_key({"state": "a"}) is None
+        record = TaggedRecordImpl(code="a")
+        assert record.tag_index_cache_keys == [
+            TaggedRecordImpl.tag_index_cache_key({"code": "a"})
+        ]
+        assert TaggedRecordImpl().tag_index_cache_keys == []
+
+    async def test_retrieve_by_tag_filter_cached(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        collector = Collector()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(BaseCache, BasicCache())
+        context.injector.bind_instance(Collector, collector)
+
+        with self.assertRaises(StorageNotFoundError):
+            await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+
+        first = TaggedRecordImpl(code="a", state="one")
+        await first.save(context)
+        found = await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+        assert found._id == first._id
+
+        with async_mock.patch.object(
+            storage, "search_records", autospec=True
+        ) as search_records:
+            found = await TaggedRecordImpl.retrieve_by_tag_filter(
+                context, {"code": "a"}, {"state": "one"}
+            )
+            assert found._id == first._id
+            search_records.assert_not_called()
+
+        counts = collector.results["count"]
+        assert counts["TaggedRecordImpl.cache_hit"] == 1
+        assert counts["TaggedRecordImpl.cache_miss"] == 2
+
+        second = TaggedRecordImpl(code="a")
+        await second.save(context)
+        with self.assertRaises(StorageDuplicateError):
+            await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+
+        second.code = "b"
+        await second.save(context)
+        found = await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+        assert found._id == first._id
+
+        await first.delete_record(context)
+        with self.assertRaises(StorageNotFoundError):
+            await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+
+    async def test_retrieve_by_tag_filter_limited(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        context.injector.bind_instance(BaseCache, BasicCache())
+        for _ in range(3):
+            await TaggedRecordImpl(code="a").save(context)
+
+        with async_mock.patch.object(
+            storage, "find_records", wraps=storage.find_records
+        ) as find_records:
+            with self.assertRaises(StorageDuplicateError):
+                await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+            assert find_records.call_args[0][2] == 2
+            with self.assertRaises(StorageDuplicateError):
+                await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+            assert find_records.call_count == 2
+
+    async def test_cache_settings(self):
+        context = InjectionContext(enforce_typing=False)
+        cache = BasicCache()
+        context.injector.bind_instance(BaseCache, cache)
+        assert TaggedRecordImpl.cache_ttl(context) == TaggedRecordImpl.CACHE_TTL
+        assert TaggedRecordImpl.cache_max_entries(context) is None
+        context.update_settings(
+            {
+                "cache.record_ttl": {TaggedRecordImpl.RECORD_TYPE: 5},
+                "cache.record_max_entries": {TaggedRecordImpl.RECORD_TYPE: 2},
+            }
+        )
+        assert TaggedRecordImpl.cache_ttl(context) == 5
+
+        for key in ("a", "b"):
+            await TaggedRecordImpl.set_cached_key(context, key, {"key": key})
+        assert await TaggedRecordImpl.get_cached_key(context, "a")
+        await TaggedRecordImpl.set_cached_key(context, "c", {"key": "c"})
+        # the least recently used entry is evicted
+        assert await TaggedRecordImpl.get_cached_key(context, "b") is None
+        assert await TaggedRecordImpl.get_cached_key(context, "a")
+        assert await TaggedRecordImpl.get_cached_key(context, "c")
+
+    async def test_retrieve_by_tag_filter_no_negative(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        context.injector.bind_instance(BaseCache, BasicCache())
+        with async_mock.patch.object(TaggedRecordImpl, "CACHE_NEGATIVE_INDEXES", False):
+            with self.assertRaises(StorageNotFoundError):
+                await TaggedRecordImpl.retrieve_by_tag_filter(context, {"code": "a"})
+            index_key = TaggedRecordImpl.tag_index_cache_key({"code": "a"})
+            assert await TaggedRecordImpl.get_cached_key(context, index_key) is None
+
+    def test_split_filters(self):
+        tag_filter, post_filter = TaggedRecordImpl.split_filters(
+            {"code": "a"}, {"state": "one", "other": "x", "code": "b"}
+        )
+        assert tag_filter == {"code": "a", "state": "one"}
+        assert post_filter == {"other": "x", "code": "b"}
+
+    async def test_migrate_tags(self):
+        context = InjectionContext(enforce_typing=False)
+        storage = BasicStorage()
+        context.injector.bind_instance(BaseStorage, storage)
+        old = TaggedRecordImpl(code="a", state="one")
+        old._id = "old"
+        # stored before the state tag was added
+        await storage.add_record(
+            StorageRecord(
+                TaggedRecordImpl.RECORD_TYPE,
+                json.dumps(old.value),
+                {"code": "a"},
+                "old",
+            )
+        )
+        with async_mock.patch.object(TaggedRecordImpl, "MIGRATE_TAGS", {"state"}):
+            found = await TaggedRecordImpl.query(context, None, {"state": "one"})
+            assert [record._id for record in found] == ["old"]
+            stored = await storage.get_record(TaggedRecordImpl.RECORD_TYPE, "old")
+            assert stored.tags == {"code": "a", "state": "one"}
+            marker = await storage.get_record(
+                TaggedRecordImpl.TAG_MIGRATION_RECORD_TYPE, TaggedRecordImpl.RECORD_TYPE
+            )
+            assert json.loads(marker.value) == ["state"]
+
+            with async_mock.patch.object(
+                storage, "search_records", wraps=storage.search_records
+            ) as mock_search:
+                await TaggedRecordImpl.query(context, None, {"state": "one"})
+                assert mock_search.call_count == 1
+
+    async def test_query_page(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        for idx in range(25):
+            record = TaggedRecordImpl(code="a" if idx % 5 else "b", state="one")
+            await record.save(context)
+            record.created_at = f"2020-01-01 00:00:{idx:02}Z"
+            await record.save(context)
+
+        ids = []
+        cursor = None
+        while True:
+            page, cursor = await TaggedRecordImpl.query_page(
+                context, {"code": "a"}, limit=7, cursor=cursor
+            )
+            ids.extend(record.created_at for record in page)
+            if not cursor:
+                break
+            assert len(page) == 7
+        assert ids == [f"2020-01-01 00:00:{idx:02}Z" for idx in range(25) if idx % 5]
+
+        page, cursor = await TaggedRecordImpl.query_page(
+            context, None, {"state": "one"}, limit=3, descending=True
+        )
+        assert [record.created_at[-3:] for record in page] == ["24Z", "23Z", "22Z"]
+        page, _ = await TaggedRecordImpl.query_page(
+            context, limit=2, cursor=cursor, descending=True
+        )
+        assert [record.created_at[-3:] for record in page] == ["21Z", "20Z"]
+
+        with self.assertRaises(ValueError):
+            await TaggedRecordImpl.query_page(context, limit=2, cursor=cursor)
+        with self.assertRaises(ValueError):
+            await TaggedRecordImpl.query_page(context, limit=2, cursor="bad")
+        with self.assertRaises(ValueError):
+            await TaggedRecordImpl.query_page(context, limit=2, sort="code")
+        bad_cursor = TaggedRecordImpl.encode_cursor("created_at", False, (5, "id"))
+        with self.assertRaises(ValueError):
+            await TaggedRecordImpl.query_page(context, limit=2, cursor=bad_cursor)
+
+        found = [record.code async for record in TaggedRecordImpl.iter_query(context)]
+        assert len(found) == 25
+
+    async def test_query_page_snapshot(self):
+        context = InjectionContext(enforce_typing=False)
+        context.injector.bind_instance(BaseStorage, BasicStorage())
+        context.injector.bind_instance(BaseCache, BasicCache())
+        records = []
+        for idx in range(10):
+            record = TaggedRecordImpl(code="a", state="one")
+            await record.save(context)
+            record.created_at = f"2020-01-01 00:00:{idx:02}Z"
+            await record.save(context)
+            records.append(record)
+
+        with async_mock.patch.object(
+            TaggedRecordImpl, "PAGE_SNAPSHOT_SIZE", 4
+        ), async_mock.patch.object(
+            TaggedRecordImpl, "_iter_values", wraps=TaggedRecordImpl._iter_values
+        ) as mock_iter:
+            page, cursor = await TaggedRecordImpl.query_page(
+                context, {"code": "a"}, {"state": "one"}, limit=2
+            )
+            assert [record._id for record in page] == [r._id for r in records[:2]]
+            await records[3].delete_record(context)
+            records[4].state = "two"
+            await records[4].save(context)
+
+            ids = []
+            while cursor:
+                page, cursor = await TaggedRecordImpl.query_page(
+                    context, {"code": "a"}, {"state": "one"}, limit=2, cursor=cursor
+                )
+                ids.extend(record._id for record in page)
+            # the first snapshot holds records 2 to 6, after which another
+            # scan finds the remaining records
+            assert mock_iter.call_count == 2
+
+            assert ids == [r._id for r in records[2:] if r not in records[3:5]]
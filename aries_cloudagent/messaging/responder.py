@@ -100,6 +100,43 @@ class BaseResponder(ABC):
         )
         await self.send_outbound(outbound)
 
+    async def broadcast(self, message: AgentMessage, connection_ids: Sequence[str]):
+        """
+        Send a message to each of a set of connections.
+
+        The message is serialized once and the same payload is sent to every
+        connection.
+
+        Args:
+            message: The `AgentMessage` to be sent
+            connection_ids: The identifiers of the connections to send it to
+
+        """
+        outbound = await self.create_outbound(message)
+        await self.send_broadcast(outbound, connection_ids)
+
+    async def send_broadcast(
+        self, message: OutboundMessage, connection_ids: Sequence[str]
+    ):
+        """
+        Send an outbound message to each of a set of connections.
+
+        Responders without a broadcast route send a copy to each connection.
+
+        Args:
+            message: The `OutboundMessage` to be sent, without a target
+            connection_ids: The identifiers of the connections to send it to
+
+        """
+        for connection_id in dict.fromkeys(connection_ids):
+            await self.send_outbound(
+                OutboundMessage(
+                    connection_id=connection_id,
+                    payload=message.payload,
+                    reply_thread_id=message.reply_thread_id,
+                )
+            )
+
     @abstractmethod
     async def send_outbound(self, message: OutboundMessage):
         """
@@ -136,6 +173,10 @@ class MockResponder(BaseResponder):
         """Send a reply to an incoming message."""
         self.messages.append((message, kwargs))
 
+    async def broadcast(self, message: AgentMessage, connection_ids: Sequence[str]):
+        """Send a message to each of a set of connections."""
+        self.messages.append((message, {"connection_ids": list(connection_ids)}))
+
     async def send_outbound(self, message: OutboundMessage):
         """Send an outbound message."""
         self.messages.append((message, None))
@@ -3,6 +3,7 @@ from marshmallow import fields
 
 from ..agent_message import AgentMessage, AgentMessageSchema
 from ..decorators.signature_decorator import SignatureDecorator
+from ..models.base import SCHEMA_POOL
 from ...wallet.basic import BasicWallet
 
 
@@ -41,6 +42,23 @@ class BasicAgentMessage(AgentMessage):
         message_type = "basic-message"
 
 
+class PooledAgentMessage(AgentMessage):
+    """Agent message with a concrete schema"""
+
+    class Meta:
+        """Meta data"""
+
+        schema_class = "PooledAgentMessageSchema"
+        message_type = "pooled-message"
+
+
+class PooledAgentMessageSchema(AgentMessageSchema):
+    """Utility schema"""
+
+    class Meta:
+        model_class = PooledAgentMessage
+
+
 class TestAgentMessage(AsyncTestCase):
     """Tests agent message."""
 
@@ -86,3 +104,15 @@ class TestAgentMessage(AsyncTestCase):
         reply.assign_thread_from(msg)
         assert reply._thread_id == msg._thread_id
         assert reply._thread_id != reply._id
+
+    async def test_schema_reuse(self):
+        msg = PooledAgentMessage()
+        msg.assign_thread_id("thread-id")
+        loaded = PooledAgentMessage.deserialize(msg.serialize())
+        assert loaded._thread_id == "thread-id"
+
+        # a pooled schema instance must not carry decorators between loads
+        plain = PooledAgentMessage.deserialize(PooledAgentMessage().serialize())
+        assert plain._thread is None
+        assert loaded._thread_id == "thread-id"
+        assert len(SCHEMA_POOL[PooledAgentMessageSchema]) == 1
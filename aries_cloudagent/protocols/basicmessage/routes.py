@@ -1,7 +1,7 @@
 """Basic message admin routes."""
 
 from aiohttp import web
-from aiohttp_apispec import docs, request_schema
+from aiohttp_apispec import docs, request_schema, response_schema
 
 from marshmallow import fields, Schema
 
@@ -17,6 +17,25 @@ class SendMessageSchema(Schema):
     content = fields.Str(description="Message content", example="Hello")
 
 
+class BroadcastMessageSchema(SendMessageSchema):
+    """Request schema for broadcasting a message."""
+
+    connection_ids = fields.List(
+        fields.Str(description="Connection identifier"),
+        required=True,
+        description="Identifiers of the connections to send the message to",
+    )
+
+
+class BroadcastMessageResultSchema(Schema):
+    """Result schema for broadcasting a message."""
+
+    connection_ids = fields.List(
+        fields.Str(description="Connection identifier"),
+        description="Identifiers of the ready connections the message was sent to",
+    )
+
+
 @docs(tags=["basicmessage"], summary="Send a basic message to a connection")
 @request_schema(SendMessageSchema())
 async def connections_send_message(request: web.BaseRequest):
@@ -44,9 +63,45 @@ async def connections_send_message(request: web.BaseRequest):
     return web.json_response({})
 
 
+@docs(tags=["basicmessage"], summary="Send a basic message to many connections")
+@request_schema(BroadcastMessageSchema())
+@response_schema(BroadcastMessageResultSchema(), 200)
+async def connections_broadcast_message(request: web.BaseRequest):
+    """
+    Request handler for sending a basic message to a set of connections.
+
+    The message is sent to the connections which exist and are ready.
+
+    Args:
+        request: aiohttp request object
+
+    """
+    context = request.app["request_context"]
+    broadcast_handler = request.app["outbound_broadcast_router"]
+    params = await request.json()
+
+    connection_ids = []
+    for connection_id in dict.fromkeys(params.get("connection_ids") or ()):
+        try:
+            connection = await ConnectionRecord.retrieve_by_id(context, connection_id)
+        except StorageNotFoundError:
+            continue
+        if connection.is_ready:
+            connection_ids.append(connection_id)
+
+    if connection_ids:
+        msg = BasicMessage(content=params["content"])
+        await broadcast_handler(msg, connection_ids)
+
+    return web.json_response({"connection_ids": connection_ids})
+
+
 async def register(app: web.Application):
     """Register routes."""
 
     app.add_routes(
-        [web.post("/connections/{id}/send-message", connections_send_message)]
+        [
+            web.post("/connections/{id}/send-message", connections_send_message),
+            web.post("/connections/broadcast-message", connections_broadcast_message),
+        ]
     )
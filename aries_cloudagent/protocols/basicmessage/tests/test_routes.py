@@ -74,3 +74,69 @@ class TestBasicMessageRoutes(AsyncTestCase):
 
             await test_module.connections_send_message(mock_request)
             mock_basic_message.assert_not_called()
+
+    async def test_connections_broadcast_message(self):
+        mock_request = async_mock.MagicMock()
+        mock_request.json = async_mock.CoroutineMock(
+            return_value={
+                "content": "Hello",
+                "connection_ids": ["ready", "missing", "not-ready", "ready"],
+            }
+        )
+
+        mock_request.app = {
+            "outbound_broadcast_router": async_mock.CoroutineMock(),
+            "request_context": "context",
+        }
+
+        async def retrieve_by_id(context, connection_id):
+            if connection_id == "missing":
+                raise StorageNotFoundError()
+            return async_mock.MagicMock(is_ready=connection_id == "ready")
+
+        with async_mock.patch.object(
+            test_module, "ConnectionRecord", autospec=True
+        ) as mock_connection_record, async_mock.patch.object(
+            test_module, "BasicMessage", autospec=True
+        ) as mock_basic_message, async_mock.patch.object(
+            test_module.web, "json_response"
+        ) as mock_response:
+
+            mock_connection_record.retrieve_by_id = async_mock.CoroutineMock(
+                side_effect=retrieve_by_id
+            )
+
+            await test_module.connections_broadcast_message(mock_request)
+            mock_basic_message.assert_called_once_with(content="Hello")
+            mock_request.app["outbound_broadcast_router"].assert_awaited_once_with(
+                mock_basic_message.return_value, ["ready"]
+            )
+            mock_response.assert_called_once_with({"connection_ids": ["ready"]})
+
+    async def test_connections_broadcast_message_none_ready(self):
+        mock_request = async_mock.MagicMock()
+        mock_request.json = async_mock.CoroutineMock(
+            return_value={"content": "Hello", "connection_ids": ["missing"]}
+        )
+
+        mock_request.app = {
+            "outbound_broadcast_router": async_mock.CoroutineMock(),
+            "request_context": "context",
+        }
+
+        with async_mock.patch.object(
+            test_module, "ConnectionRecord", autospec=True
+        ) as mock_connection_record, async_mock.patch.object(
+            test_module, "BasicMessage", autospec=True
+        ) as mock_basic_message, async_mock.patch.object(
+            test_module.web, "json_response"
+        ) as mock_response:
+
+            mock_connection_record.retrieve_by_id = async_mock.CoroutineMock(
+                side_effect=StorageNotFoundError
+            )
+
+            await test_module.connections_broadcast_message(mock_request)
+            mock_basic_message.assert_not_called()
+            mock_request.app["outbound_broadcast_router"].assert_not_awaited()
+            mock_response.assert_called_once_with({"connection_ids": []})
@@ -857,9 +857,7 @@ class ConnectionManager:
             did: The DID to search for
         """
         storage: BaseStorage = await self.context.inject(BaseStorage)
-        record = await storage.search_records(
-            self.RECORD_TYPE_DID_DOC, {"did": did}
-        ).fetch_single()
+        record = await storage.find_record(self.RECORD_TYPE_DID_DOC, {"did": did})
         return DIDDoc.from_json(record.value), record
 
     async def store_did_document(self, did_doc: DIDDoc):
@@ -902,9 +900,7 @@ class ConnectionManager:
             key: The verkey to look up
         """
         storage: BaseStorage = await self.context.inject(BaseStorage)
-        record = await storage.search_records(
-            self.RECORD_TYPE_DID_KEY, {"key": key}
-        ).fetch_single()
+        record = await storage.find_record(self.RECORD_TYPE_DID_KEY, {"key": key})
         return record.tags["did"]
 
     async def remove_keys_for_did(self, did: str):
@@ -1095,6 +1091,27 @@ class ConnectionManager:
         await connection.save(self.context)
         return connection.routing_state
 
+    async def sync_inbound(self, router: ConnectionRecord, outbound_handler):
+        """
+        Ask a mediator to synchronize the routes of the connections it routes.
+
+        The mediator replies with the routes which differ from those of the
+        connections using it as their inbound connection, and route updates
+        are then sent for the differences.
+
+        Args:
+            router: The mediator connection record
+            outbound_handler: The function sending the request
+
+        """
+        if not router.is_ready:
+            raise ConnectionManagerError(
+                f"Routing connection is not ready: {router.connection_id}"
+            )
+        route_mgr = RoutingManager(self.context)
+        keys = await route_mgr.get_inbound_keys(router.connection_id)
+        await route_mgr.send_route_sync(router.connection_id, keys, outbound_handler)
+
     async def update_inbound(
         self, inbound_connection_id: str, recip_verkey: str, routing_state: str
     ):
@@ -1104,7 +1121,7 @@ class ConnectionManager:
         connection and marks the routing as complete.
         """
         conns = await ConnectionRecord.query(
-            self.context, {"inbound_connection_id": inbound_connection_id}
+            self.context, post_filter={"inbound_connection_id": inbound_connection_id}
         )
         wallet: BaseWallet = await self.context.inject(BaseWallet)
 
@@ -5,6 +5,7 @@ from aiohttp_apispec import docs, request_schema, response_schema
 
 from marshmallow import fields, Schema
 
+from ...admin.paging import PAGING_PARAMETERS, record_list_response
 from ...connections.models.connection_record import (
     ConnectionRecord,
     ConnectionRecordSchema,
@@ -12,7 +13,7 @@ from ...connections.models.connection_record import (
 from ...messaging.valid import IndyDID, UUIDFour
 from ...storage.error import StorageNotFoundError
 
-from .manager import ConnectionManager
+from .manager import ConnectionManager, ConnectionManagerError
 from .messages.connection_invitation import (
     ConnectionInvitation,
     ConnectionInvitationSchema,
@@ -26,6 +27,9 @@ class ConnectionListSchema(Schema):
         fields.Nested(ConnectionRecordSchema()),
         description="List of connection records",
     )
+    next_cursor = fields.Str(
+        description="Cursor for the next page of a paginated query", required=False
+    )
 
 
 class InvitationResultSchema(Schema):
@@ -134,6 +138,7 @@ def connection_sort_key(conn):
             "schema": {"type": "string"},
             "required": False,
         },
+        *PAGING_PARAMETERS,
     ],
 )
 @response_schema(ConnectionListSchema(), 200)
@@ -148,7 +153,6 @@ async def connections_list(request: web.BaseRequest):
         The connection list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     for param_name in (
         "invitation_id",
@@ -167,10 +171,13 @@ async def connections_list(request: web.BaseRequest):
     ):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    records = await ConnectionRecord.query(context, tag_filter, post_filter)
-    results = [record.serialize() for record in records]
-    results.sort(key=connection_sort_key)
-    return web.json_response({"results": results})
+    return await record_list_response(
+        request,
+        ConnectionRecord,
+        tag_filter,
+        post_filter,
+        sort_results=connection_sort_key,
+    )
 
 
 @docs(tags=["connection"], summary="Fetch a single connection record")
@@ -416,6 +423,32 @@ async def connections_establish_inbound(request: web.BaseRequest):
     return web.json_response({})
 
 
+@docs(
+    tags=["connection"],
+    summary="Synchronize the routes kept by a mediator connection",
+)
+async def connections_sync_routes(request: web.BaseRequest):
+    """
+    Request handler for synchronizing the routes kept by a mediator.
+
+    Args:
+        request: aiohttp request object
+    """
+    context = request.app["request_context"]
+    connection_id = request.match_info["id"]
+    outbound_handler = request.app["outbound_message_router"]
+    try:
+        connection = await ConnectionRecord.retrieve_by_id(context, connection_id)
+    except StorageNotFoundError:
+        raise web.HTTPNotFound()
+    connection_mgr = ConnectionManager(context)
+    try:
+        await connection_mgr.sync_inbound(connection, outbound_handler)
+    except ConnectionManagerError as err:
+        raise web.HTTPBadRequest(reason=str(err))
+    return web.json_response({})
+
+
 @docs(tags=["connection"], summary="Remove an existing connection record")
 async def connections_remove(request: web.BaseRequest):
     """
@@ -484,6 +517,7 @@ async def register(app: web.Application):
                 "/connections/{id}/establish-inbound/{ref_id}",
                 connections_establish_inbound,
             ),
+            web.post("/connections/{id}/sync-routes", connections_sync_routes),
             web.post("/connections/{id}/remove", connections_remove),
         ]
     )
@@ -814,6 +814,28 @@ class TestConnectionManager(AsyncTestCase, TestConfig):
 
             assert await self.manager.resolve_inbound_connection(receipt)
 
+    async def test_sync_inbound(self):
+        router = ConnectionRecord(state=ConnectionRecord.STATE_ACTIVE)
+        await router.save(self.context)
+        info = await self.wallet.create_local_did()
+        routed = ConnectionRecord(
+            my_did=info.did, inbound_connection_id=router.connection_id
+        )
+        await routed.save(self.context)
+
+        outbound_handler = async_mock.CoroutineMock()
+        with async_mock.patch.object(
+            RoutingManager, "send_route_sync", autospec=True
+        ) as mock_send_sync:
+            await self.manager.sync_inbound(router, outbound_handler)
+            mock_send_sync.assert_awaited_once_with(
+                async_mock.ANY, router.connection_id, [info.verkey], outbound_handler
+            )
+
+        router.state = ConnectionRecord.STATE_INACTIVE
+        with self.assertRaises(ConnectionManagerError):
+            await self.manager.sync_inbound(router, outbound_handler)
+
     async def test_create_did_document(self):
         did_info = DIDInfo(
             self.test_did, self.test_verkey, None,
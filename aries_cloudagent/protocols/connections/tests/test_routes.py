@@ -8,6 +8,7 @@ from ....connections.models.connection_record import ConnectionRecord
 from ....storage.error import StorageNotFoundError
 from ....holder.base import BaseHolder
 from ....messaging.request_context import RequestContext
+from ....utils.json_codec import json_dumps
 from .. import routes as test_module
 
 
@@ -70,7 +71,8 @@ class TestConnectionRoutes(AsyncTestCase):
                             }
                             for c in conns
                         ]
-                    }  # sorted
+                    },  # sorted
+                    dumps=json_dumps,
                 )
 
     async def test_connections_retrieve(self):
@@ -344,6 +346,57 @@ class TestConnectionRoutes(AsyncTestCase):
             with self.assertRaises(test_module.web.HTTPNotFound):
                 await test_module.connections_establish_inbound(mock_req)
 
+    async def test_connections_sync_routes(self):
+        context = RequestContext(base_context=InjectionContext(enforce_typing=False))
+        mock_req = async_mock.MagicMock()
+        mock_req.app = {
+            "request_context": context,
+            "outbound_message_router": async_mock.CoroutineMock(),
+        }
+        mock_req.match_info = {"id": "dummy"}
+
+        mock_conn_rec = async_mock.MagicMock()
+
+        with async_mock.patch.object(
+            test_module.ConnectionRecord, "retrieve_by_id", async_mock.CoroutineMock()
+        ) as mock_conn_rec_retrieve_by_id, async_mock.patch.object(
+            test_module, "ConnectionManager", autospec=True
+        ) as mock_conn_mgr, async_mock.patch.object(
+            test_module.web, "json_response"
+        ) as mock_response:
+
+            mock_conn_rec_retrieve_by_id.return_value = mock_conn_rec
+            mock_conn_mgr.return_value.sync_inbound = async_mock.CoroutineMock()
+
+            await test_module.connections_sync_routes(mock_req)
+            mock_conn_mgr.return_value.sync_inbound.assert_awaited_once_with(
+                mock_conn_rec, mock_req.app["outbound_message_router"]
+            )
+            mock_response.assert_called_once_with({})
+
+            mock_conn_mgr.return_value.sync_inbound.side_effect = (
+                test_module.ConnectionManagerError()
+            )
+            with self.assertRaises(test_module.web.HTTPBadRequest):
+                await test_module.connections_sync_routes(mock_req)
+
+    async def test_connections_sync_routes_not_found(self):
+        context = RequestContext(base_context=InjectionContext(enforce_typing=False))
+        mock_req = async_mock.MagicMock()
+        mock_req.app = {
+            "request_context": context,
+            "outbound_message_router": async_mock.CoroutineMock(),
+        }
+        mock_req.match_info = {"id": "dummy"}
+
+        with async_mock.patch.object(
+            test_module.ConnectionRecord, "retrieve_by_id", async_mock.CoroutineMock()
+        ) as mock_conn_rec_retrieve_by_id:
+            mock_conn_rec_retrieve_by_id.side_effect = StorageNotFoundError()
+
+            with self.assertRaises(test_module.web.HTTPNotFound):
+                await test_module.connections_sync_routes(mock_req)
+
     async def test_connections_remove(self):
         context = RequestContext(base_context=InjectionContext(enforce_typing=False))
         mock_req = async_mock.MagicMock()
@@ -7,6 +7,13 @@ from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from marshmallow import fields, Schema
 
+from ...admin.paging import (
+    FORMAT_PARAMETER,
+    PAGING_PARAMETERS,
+    is_ndjson_request,
+    ndjson_response,
+    record_list_response,
+)
 from ...connections.models.connection_record import ConnectionRecord
 from ...holder.base import BaseHolder
 from ...messaging.valid import INDY_CRED_DEF_ID, INDY_REV_REG_ID, INDY_SCHEMA_ID
@@ -68,6 +75,9 @@ class CredentialExchangeListSchema(Schema):
     """Result schema for a credential exchange query."""
 
     results = fields.List(fields.Nested(CredentialExchangeSchema()))
+    next_cursor = fields.Str(
+        description="Cursor for the next page of a paginated query", required=False
+    )
 
 
 class CredentialStoreRequestSchema(Schema):
@@ -211,6 +221,7 @@ async def credentials_remove(request: web.BaseRequest):
             "required": False,
         },
         {"name": "wql", "in": "query", "schema": {"type": "string"}, "required": False},
+        FORMAT_PARAMETER,
     ],
     summary="Fetch credentials from wallet",
 )
@@ -237,9 +248,16 @@ async def credentials_list(request: web.BaseRequest):
 
     # defaults
     start = int(start) if isinstance(start, str) else 0
-    count = int(count) if isinstance(count, str) else 10
 
     holder: BaseHolder = await context.inject(BaseHolder)
+    if is_ndjson_request(request):
+        # stream every matching credential unless a count is given
+        count = int(count) if isinstance(count, str) else None
+        return await ndjson_response(
+            request, holder.iter_credentials(wql, start), limit=count
+        )
+
+    count = int(count) if isinstance(count, str) else 10
     credentials = await holder.get_credentials(start, count, wql)
 
     return web.json_response({"results": credentials})
@@ -248,6 +266,7 @@ async def credentials_list(request: web.BaseRequest):
 @docs(
     tags=["credential_exchange *DEPRECATED*"],
     summary="Fetch all credential exchange records",
+    parameters=PAGING_PARAMETERS,
 )
 @response_schema(CredentialExchangeListSchema(), 200)
 async def credential_exchange_list(request: web.BaseRequest):
@@ -261,7 +280,6 @@ async def credential_exchange_list(request: web.BaseRequest):
         The credential exchange list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -275,8 +293,9 @@ async def credential_exchange_list(request: web.BaseRequest):
     ):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    records = await CredentialExchange.query(context, tag_filter, post_filter)
-    return web.json_response({"results": [record.serialize() for record in records]})
+    return await record_list_response(
+        request, CredentialExchange, tag_filter, post_filter
+    )
 
 
 @docs(
@@ -19,7 +19,13 @@ class V10CredentialExchange(BaseRecord):
     RECORD_TYPE = "credential_exchange_v10"
     RECORD_ID_NAME = "credential_exchange_id"
     WEBHOOK_TOPIC = "issue_credential"
-    TAG_NAMES = {"thread_id"}
+    TAG_NAMES = {"thread_id", "connection_id", "role", "state"}
+    # only thread_id was tagged by earlier versions
+    MIGRATE_TAGS = {"connection_id", "role", "state"}
+    CACHE_ENABLED = True
+    # records are created on inbound messages, possibly in another process
+    CACHE_NEGATIVE_INDEXES = False
+    CACHE_TAG_INDEXES = (("thread_id",),)
 
     INITIATOR_SELF = "self"
     INITIATOR_EXTERNAL = "external"
@@ -118,16 +124,9 @@ class V10CredentialExchange(BaseRecord):
         cls, context: InjectionContext, connection_id: str, thread_id: str
     ) -> "V10CredentialExchange":
         """Retrieve a credential exchange record by connection and thread ID."""
-        cache_key = f"credential_exchange_ctidx::{connection_id}::{thread_id}"
-        record_id = await cls.get_cached_key(context, cache_key)
-        if record_id:
-            record = await cls.retrieve_by_id(context, record_id)
-        else:
-            record = await cls.retrieve_by_tag_filter(
-                context, {"thread_id": thread_id}, {"connection_id": connection_id}
-            )
-            await cls.set_cached_key(context, cache_key, record.credential_exchange_id)
-        return record
+        return await cls.retrieve_by_tag_filter(
+            context, {"thread_id": thread_id}, {"connection_id": connection_id}
+        )
 
 
 class V10CredentialExchangeSchema(BaseRecordSchema):
@@ -4,6 +4,7 @@ from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from marshmallow import fields, Schema
 
+from ....admin.paging import PAGING_PARAMETERS, record_list_response
 from ....connections.models.connection_record import ConnectionRecord
 from ....holder.base import BaseHolder
 from ....messaging.credential_definitions.util import CRED_DEF_TAGS
@@ -41,6 +42,9 @@ class V10CredentialExchangeListResultSchema(Schema):
         fields.Nested(V10CredentialExchangeSchema),
         description="Aries#0036 v1.0 credential exchange records",
     )
+    next_cursor = fields.Str(
+        description="Cursor for the next page of a paginated query", required=False
+    )
 
 
 class V10CredentialProposalRequestSchema(Schema):
@@ -143,7 +147,11 @@ async def attribute_mime_types_get(request: web.BaseRequest):
     return web.json_response(await holder.get_mime_type(credential_id))
 
 
-@docs(tags=["issue-credential"], summary="Fetch all credential exchange records")
+@docs(
+    tags=["issue-credential"],
+    summary="Fetch all credential exchange records",
+    parameters=PAGING_PARAMETERS,
+)
 @response_schema(V10CredentialExchangeListResultSchema(), 200)
 async def credential_exchange_list(request: web.BaseRequest):
     """
@@ -156,7 +164,6 @@ async def credential_exchange_list(request: web.BaseRequest):
         The connection list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -164,8 +171,9 @@ async def credential_exchange_list(request: web.BaseRequest):
     for param_name in ("connection_id", "role", "state"):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    records = await V10CredentialExchange.query(context, tag_filter, post_filter)
-    return web.json_response({"results": [record.serialize() for record in records]})
+    return await record_list_response(
+        request, V10CredentialExchange, tag_filter, post_filter
+    )
 
 
 @docs(tags=["issue-credential"], summary="Fetch a single credential exchange record")
@@ -5,6 +5,7 @@ from aiohttp import web as aio_web
 
 from .....config.injection_context import InjectionContext
 from .....storage.error import StorageNotFoundError
+from .....utils.json_codec import json_dumps
 from .....holder.base import BaseHolder
 from .....messaging.request_context import RequestContext
 from .. import routes as test_module
@@ -52,7 +53,8 @@ class TestCredentialRoutes(AsyncTestCase):
             ) as mock_response:
                 await test_module.credential_exchange_list(mock)
                 mock_response.assert_called_once_with(
-                    {"results": [mock_cred_ex.serialize.return_value]}
+                    {"results": [mock_cred_ex.serialize.return_value]},
+                    dumps=json_dumps,
                 )
 
     async def test_credential_exchange_retrieve(self):
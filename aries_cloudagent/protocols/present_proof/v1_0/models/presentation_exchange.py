@@ -18,7 +18,13 @@ class V10PresentationExchange(BaseRecord):
     RECORD_TYPE = "presentation_exchange_v10"
     RECORD_ID_NAME = "presentation_exchange_id"
     WEBHOOK_TOPIC = "present_proof"
-    TAG_NAMES = {"thread_id"}
+    TAG_NAMES = {"thread_id", "connection_id", "role", "state"}
+    # only thread_id was tagged by earlier versions
+    MIGRATE_TAGS = {"connection_id", "role", "state"}
+    CACHE_ENABLED = True
+    # records are created on inbound messages, possibly in another process
+    CACHE_NEGATIVE_INDEXES = False
+    CACHE_TAG_INDEXES = (("thread_id",),)
 
     INITIATOR_SELF = "self"
     INITIATOR_EXTERNAL = "external"
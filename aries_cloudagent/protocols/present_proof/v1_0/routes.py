@@ -7,6 +7,13 @@ from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from marshmallow import Schema, fields
 
+from ....admin.paging import (
+    FORMAT_PARAMETER,
+    PAGING_PARAMETERS,
+    is_ndjson_request,
+    ndjson_response,
+    record_list_response,
+)
 from ....connections.models.connection_record import ConnectionRecord
 from ....holder.base import BaseHolder
 from ....messaging.decorators.attach_decorator import AttachDecorator
@@ -43,6 +50,9 @@ class V10PresentationExchangeListSchema(Schema):
         fields.Nested(V10PresentationExchangeSchema()),
         description="Aries#0037 v1.0 presentation exchange records",
     )
+    next_cursor = fields.Str(
+        description="Cursor for the next page of a paginated query", required=False
+    )
 
 
 class V10PresentationProposalRequestSchema(Schema):
@@ -242,7 +252,11 @@ class V10PresentationRequestSchema(Schema):
     )
 
 
-@docs(tags=["present-proof"], summary="Fetch all present-proof exchange records")
+@docs(
+    tags=["present-proof"],
+    summary="Fetch all present-proof exchange records",
+    parameters=PAGING_PARAMETERS,
+)
 @response_schema(V10PresentationExchangeListSchema(), 200)
 async def presentation_exchange_list(request: web.BaseRequest):
     """
@@ -255,7 +269,6 @@ async def presentation_exchange_list(request: web.BaseRequest):
         The presentation exchange list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -263,8 +276,9 @@ async def presentation_exchange_list(request: web.BaseRequest):
     for param_name in ("connection_id", "role", "state"):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    records = await V10PresentationExchange.query(context, tag_filter, post_filter)
-    return web.json_response({"results": [record.serialize() for record in records]})
+    return await record_list_response(
+        request, V10PresentationExchange, tag_filter, post_filter
+    )
 
 
 @docs(tags=["present-proof"], summary="Fetch a single presentation exchange record")
@@ -313,6 +327,7 @@ async def presentation_exchange_retrieve(request: web.BaseRequest):
             "schema": {"type": "string"},
             "required": False,
         },
+        FORMAT_PARAMETER,
     ],
 )
 async def presentation_exchange_credentials_list(request: web.BaseRequest):
@@ -348,9 +363,23 @@ async def presentation_exchange_credentials_list(request: web.BaseRequest):
 
     # defaults
     start = int(start) if isinstance(start, str) else 0
-    count = int(count) if isinstance(count, str) else 10
 
     holder: BaseHolder = await context.inject(BaseHolder)
+    if is_ndjson_request(request):
+        # stream the credentials for each referent unless a count is given
+        count = int(count) if isinstance(count, str) else None
+        return await ndjson_response(
+            request,
+            holder.iter_credentials_for_presentation_request_by_referent(
+                presentation_exchange_record.presentation_request,
+                presentation_referents,
+                start,
+                extra_query,
+            ),
+            limit=count,
+        )
+
+    count = int(count) if isinstance(count, str) else 10
     credentials = await holder.get_credentials_for_presentation_request_by_referent(
         presentation_exchange_record.presentation_request,
         presentation_referents,
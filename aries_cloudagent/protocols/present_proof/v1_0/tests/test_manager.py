@@ -65,6 +65,12 @@ class TestPresentationManager(AsyncTestCase):
         self.ledger.get_credential_definition = async_mock.CoroutineMock(
             return_value=async_mock.MagicMock()
         )
+        self.ledger.get_schemas = async_mock.CoroutineMock(
+            return_value={S_ID: async_mock.MagicMock()}
+        )
+        self.ledger.get_credential_definitions = async_mock.CoroutineMock(
+            return_value={CD_ID: async_mock.MagicMock()}
+        )
         self.context.injector.bind_instance(BaseLedger, self.ledger)
 
         Holder = async_mock.MagicMock(IndyHolder, autospec=True)
@@ -79,6 +85,9 @@ class TestPresentationManager(AsyncTestCase):
         self.holder.get_credential = async_mock.CoroutineMock(
             return_value={"schema_id": S_ID, "cred_def_id": CD_ID}
         )
+        self.holder.get_credentials_by_ids = async_mock.CoroutineMock(
+            return_value={"dummy_reft": {"schema_id": S_ID, "cred_def_id": CD_ID}}
+        )
         self.holder.create_presentation = async_mock.CoroutineMock(
             return_value=async_mock.MagicMock()
         )
@@ -218,6 +227,8 @@ class TestPresentationManager(AsyncTestCase):
             )
             save_ex.assert_called_once()
             assert exchange_out.state == V10PresentationExchange.STATE_PRESENTATION_SENT
+            self.ledger.get_schemas.assert_called_once_with([S_ID])
+            self.ledger.get_credential_definitions.assert_called_once_with([CD_ID])
 
     async def test_no_matching_creds_for_proof_req(self):
         exchange_in = V10PresentationExchange()
@@ -293,6 +304,7 @@ class TestPresentationManager(AsyncTestCase):
         ) as save_ex:
             exchange_out = await self.manager.verify_presentation(exchange_in)
             save_ex.assert_called_once()
+            self.ledger.get_schemas.assert_called_once_with([S_ID])
 
             assert exchange_out.state == (V10PresentationExchange.STATE_VERIFIED)
 
@@ -3,6 +3,7 @@ from asynctest import TestCase as AsyncTestCase
 from asynctest import mock as async_mock
 
 from .....storage.error import StorageNotFoundError
+from .....utils.json_codec import json_dumps
 from .. import routes as test_module
 
 
@@ -35,7 +36,8 @@ class TestProofRoutes(AsyncTestCase):
             ) as mock_response:
                 await test_module.presentation_exchange_list(mock)
                 mock_response.assert_called_once_with(
-                    {"results": [mock_presentation_exchange.serialize.return_value]}
+                    {"results": [mock_presentation_exchange.serialize.return_value]},
+                    dumps=json_dumps,
                 )
 
     async def test_presentation_exchange_credentials_list_not_found(self):
@@ -86,6 +88,37 @@ class TestProofRoutes(AsyncTestCase):
                 await test_module.presentation_exchange_credentials_list(mock)
                 mock_response.assert_called_once_with(returned_credentials)
 
+    async def test_presentation_exchange_credentials_list_ndjson(self):
+        mock = async_mock.MagicMock()
+        mock.match_info = {"pres_ex_id": "123-456-789", "referent": "myReferent1"}
+        mock.query = {"extra_query": "{}", "format": "ndjson", "start": "2"}
+        mock.app = {"request_context": self.mock_context}
+
+        with async_mock.patch.object(
+            test_module, "V10PresentationExchange", autospec=True
+        ) as mock_presentation_exchange:
+
+            mock_record = async_mock.MagicMock(presentation_request={"pr": "req"})
+            mock_presentation_exchange.retrieve_by_id = async_mock.CoroutineMock(
+                return_value=mock_record
+            )
+
+            # mock BaseHolder injection
+            inject = self.test_instance.context.inject = async_mock.CoroutineMock()
+            mock_holder = inject.return_value
+            mock_holder.iter_credentials_for_presentation_request_by_referent = async_mock.MagicMock(
+                return_value="iterator"
+            )
+
+            with async_mock.patch.object(
+                test_module, "ndjson_response", async_mock.CoroutineMock()
+            ) as mock_response:
+                await test_module.presentation_exchange_credentials_list(mock)
+                mock_holder.iter_credentials_for_presentation_request_by_referent.assert_called_once_with(
+                    {"pr": "req"}, ["myReferent1"], 2, {},
+                )
+                mock_response.assert_called_once_with(mock, "iterator", limit=None)
+
     async def test_presentation_exchange_credentials_list_multiple_referents(self):
         mock = async_mock.MagicMock()
         mock.match_info = {
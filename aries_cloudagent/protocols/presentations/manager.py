@@ -1,7 +1,9 @@
 """Classes to manage presentations."""
 
+import asyncio
 import json
 import logging
+from typing import Sequence, Tuple
 from uuid import uuid4
 
 from ...config.injection_context import InjectionContext
@@ -113,6 +115,29 @@ class PresentationManager:
 
         return presentation_exchange
 
+    async def fetch_ledger_objects(
+        self, schema_ids: Sequence[str], credential_definition_ids: Sequence[str]
+    ) -> Tuple[dict, dict]:
+        """
+        Fetch the schemas and credential definitions used in a presentation.
+
+        Args:
+            schema_ids: The schema ids in use, which may include duplicates
+            credential_definition_ids: The credential definition ids in use,
+                which may include duplicates
+
+        Returns:
+            A tuple (schemas, credential definitions), each keyed by id
+
+        """
+        ledger: BaseLedger = await self.context.inject(BaseLedger)
+        async with ledger:
+            schemas, credential_definitions = await asyncio.gather(
+                ledger.get_schemas(schema_ids),
+                ledger.get_credential_definitions(credential_definition_ids),
+            )
+        return schemas, credential_definitions
+
     async def create_presentation(
         self,
         presentation_exchange_record: PresentationExchange,
@@ -162,36 +187,18 @@ class PresentationManager:
             credential_ids.append(credential_id)
 
         # Get all schema and credential definition ids in use
-        # TODO: Cache this!!!
-        schema_ids = []
-        credential_definition_ids = []
         holder: BaseHolder = await self.context.inject(BaseHolder)
-        for credential_id in credential_ids:
-            credential = await holder.get_credential(credential_id)
-            schema_id = credential["schema_id"]
-            credential_definition_id = credential["cred_def_id"]
-            schema_ids.append(schema_id)
-            credential_definition_ids.append(credential_definition_id)
-
-        schemas = {}
-        credential_definitions = {}
-
-        ledger: BaseLedger = await self.context.inject(BaseLedger)
-        async with ledger:
-
-            # Build schemas for anoncreds
-            for schema_id in schema_ids:
-                schema = await ledger.get_schema(schema_id)
-                schemas[schema_id] = schema
-
-            # Build credential_definitions for anoncreds
-            for credential_definition_id in credential_definition_ids:
-                (credential_definition) = await ledger.get_credential_definition(
-                    credential_definition_id
-                )
-                credential_definitions[credential_definition_id] = credential_definition
+        credentials = await holder.get_credentials_by_ids(credential_ids)
+        schema_ids = [cred["schema_id"] for cred in credentials.values()]
+        credential_definition_ids = [
+            cred["cred_def_id"] for cred in credentials.values()
+        ]
+
+        # Build schemas and credential_definitions for anoncreds
+        schemas, credential_definitions = await self.fetch_ledger_objects(
+            schema_ids, credential_definition_ids
+        )
 
-        holder: BaseHolder = await self.context.inject(BaseHolder)
         presentation = await holder.create_presentation(
             presentation_exchange_record.presentation_request,
             requested_credentials,
@@ -253,23 +260,10 @@ class PresentationManager:
             schema_ids.append(identifier["schema_id"])
             credential_definition_ids.append(identifier["cred_def_id"])
 
-        schemas = {}
-        credential_definitions = {}
-
-        ledger: BaseLedger = await self.context.inject(BaseLedger)
-        async with ledger:
-
-            # Build schemas for anoncreds
-            for schema_id in schema_ids:
-                schema = await ledger.get_schema(schema_id)
-                schemas[schema_id] = schema
-
-            # Build credential_definitions for anoncreds
-            for credential_definition_id in credential_definition_ids:
-                (credential_definition) = await ledger.get_credential_definition(
-                    credential_definition_id
-                )
-                credential_definitions[credential_definition_id] = credential_definition
+        # Build schemas and credential_definitions for anoncreds
+        schemas, credential_definitions = await self.fetch_ledger_objects(
+            schema_ids, credential_definition_ids
+        )
 
         verifier: BaseVerifier = await self.context.inject(BaseVerifier)
         verified = await verifier.verify_presentation(
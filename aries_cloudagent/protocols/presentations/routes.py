@@ -6,6 +6,13 @@ from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from marshmallow import fields, Schema
 
+from ...admin.paging import (
+    FORMAT_PARAMETER,
+    PAGING_PARAMETERS,
+    is_ndjson_request,
+    ndjson_response,
+    record_list_response,
+)
 from ...holder.base import BaseHolder
 from ...storage.error import StorageNotFoundError
 
@@ -20,6 +27,9 @@ class PresentationExchangeListSchema(Schema):
     """Result schema for a presentation exchange query."""
 
     results = fields.List(fields.Nested(PresentationExchangeSchema()))
+    next_cursor = fields.Str(
+        description="Cursor for the next page of a paginated query", required=False
+    )
 
 
 class PresentationRequestRequestSchema(Schema):
@@ -57,6 +67,7 @@ class SendPresentationRequestSchema(Schema):
 @docs(
     tags=["presentation_exchange *DEPRECATED*"],
     summary="Fetch all presentation exchange records",
+    parameters=PAGING_PARAMETERS,
 )
 @response_schema(PresentationExchangeListSchema(), 200)
 async def presentation_exchange_list(request: web.BaseRequest):
@@ -70,7 +81,6 @@ async def presentation_exchange_list(request: web.BaseRequest):
         The presentation exchange list response
 
     """
-    context = request.app["request_context"]
     tag_filter = {}
     if "thread_id" in request.query and request.query["thread_id"] != "":
         tag_filter["thread_id"] = request.query["thread_id"]
@@ -82,8 +92,9 @@ async def presentation_exchange_list(request: web.BaseRequest):
     ):
         if param_name in request.query and request.query[param_name] != "":
             post_filter[param_name] = request.query[param_name]
-    records = await PresentationExchange.query(context, tag_filter, post_filter)
-    return web.json_response({"results": [record.serialize() for record in records]})
+    return await record_list_response(
+        request, PresentationExchange, tag_filter, post_filter
+    )
 
 
 @docs(
@@ -134,6 +145,7 @@ async def presentation_exchange_retrieve(request: web.BaseRequest):
             "schema": {"type": "string"},
             "required": False,
         },
+        FORMAT_PARAMETER,
     ],
     summary="Fetch credentials for a presentation request from wallet",
 )
@@ -170,9 +182,23 @@ async def presentation_exchange_credentials_list(request: web.BaseRequest):
 
     # defaults
     start = int(start) if isinstance(start, str) else 0
-    count = int(count) if isinstance(count, str) else 10
 
     holder: BaseHolder = await context.inject(BaseHolder)
+    if is_ndjson_request(request):
+        # stream the credentials for each referent unless a count is given
+        count = int(count) if isinstance(count, str) else None
+        return await ndjson_response(
+            request,
+            holder.iter_credentials_for_presentation_request_by_referent(
+                presentation_exchange_record.presentation_request,
+                presentation_referents,
+                start,
+                extra_query,
+            ),
+            limit=count,
+        )
+
+    count = int(count) if isinstance(count, str) else 10
     credentials = await holder.get_credentials_for_presentation_request_by_referent(
         presentation_exchange_record.presentation_request,
         presentation_referents,
@@ -10,6 +10,7 @@ from ....messaging.base_handler import (
 from ..manager import RoutingManager
 from ..messages.route_query_request import RouteQueryRequest
 from ..messages.route_query_response import RouteQueryResponse
+from ..models.paginated import Paginated
 
 
 class RouteQueryRequestHandler(BaseHandler):
@@ -25,11 +26,21 @@ class RouteQueryRequestHandler(BaseHandler):
         if not context.connection_ready:
             raise HandlerException("Cannot query routes: no active connection")
 
-        # TODO implement pagination
+        paginate = context.message.paginate
+        offset = (paginate and paginate.offset) or 0
+        limit = paginate and paginate.limit
 
         mgr = RoutingManager(context)
         result = await mgr.get_routes(
-            context.connection_record.connection_id, context.message.filter
+            context.connection_record.connection_id,
+            context.message.filter,
+            offset,
+            limit,
         )
-        response = RouteQueryResponse(routes=result)
+        paginated = (
+            Paginated(start=offset, end=offset + len(result), limit=limit)
+            if paginate
+            else None
+        )
+        response = RouteQueryResponse(routes=result, paginated=paginated)
         await responder.send_reply(response)
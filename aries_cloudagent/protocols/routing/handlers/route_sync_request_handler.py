@@ -0,0 +1,33 @@
+"""Handler for incoming route-sync-request messages."""
+
+from ....messaging.base_handler import (
+    BaseHandler,
+    BaseResponder,
+    HandlerException,
+    RequestContext,
+)
+
+from ..manager import RoutingManager
+from ..messages.route_sync_request import RouteSyncRequest
+from ..messages.route_sync_response import RouteSyncResponse
+
+
+class RouteSyncRequestHandler(BaseHandler):
+    """Handler for incoming route-sync-request messages."""
+
+    async def handle(self, context: RequestContext, responder: BaseResponder):
+        """Message handler implementation."""
+        self._logger.debug(
+            "%s called with context %s", self.__class__.__name__, context
+        )
+        assert isinstance(context.message, RouteSyncRequest)
+
+        if not context.connection_ready:
+            raise HandlerException("Cannot sync routes: no active connection")
+
+        mgr = RoutingManager(context)
+        digest, buckets = await mgr.sync_routes(
+            context.connection_record.connection_id, context.message.buckets
+        )
+        response = RouteSyncResponse(digest=digest, buckets=buckets)
+        await responder.send_reply(response)
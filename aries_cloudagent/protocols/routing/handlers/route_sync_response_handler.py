@@ -0,0 +1,36 @@
+"""Handler for incoming route-sync-response messages."""
+
+from ....messaging.base_handler import (
+    BaseHandler,
+    BaseResponder,
+    HandlerException,
+    RequestContext,
+)
+
+from ..keylist import bucket_keys, keylist_updates
+from ..manager import RoutingManager
+from ..messages.route_sync_response import RouteSyncResponse
+from ..messages.route_update_request import RouteUpdateRequest
+
+
+class RouteSyncResponseHandler(BaseHandler):
+    """Handler for incoming route-sync-response messages."""
+
+    async def handle(self, context: RequestContext, responder: BaseResponder):
+        """Message handler implementation."""
+        self._logger.debug(
+            "%s called with context %s", self.__class__.__name__, context
+        )
+        assert isinstance(context.message, RouteSyncResponse)
+
+        if not context.connection_ready:
+            raise HandlerException(
+                "Cannot handle route sync response: no active connection"
+            )
+
+        mgr = RoutingManager(context)
+        keys = await mgr.get_inbound_keys(context.connection_record.connection_id)
+        updates = keylist_updates(bucket_keys(keys), context.message.buckets)
+        if updates:
+            self._logger.info("Sending %d route update(s) to mediator", len(updates))
+            await responder.send_reply(RouteUpdateRequest(updates=updates))
@@ -14,10 +14,17 @@ from ...handlers.route_query_request_handler import RouteQueryRequestHandler
 from ...handlers.route_update_request_handler import RouteUpdateRequestHandler
 from ...handlers.route_query_response_handler import RouteQueryResponseHandler
 from ...handlers.route_update_response_handler import RouteUpdateResponseHandler
+from ...handlers.route_sync_request_handler import RouteSyncRequestHandler
+from ...handlers.route_sync_response_handler import RouteSyncResponseHandler
+from ...keylist import bucket_digests, bucket_keys, keylist_digest
+from ...manager import RoutingManager
+from ...messages.route_sync_request import RouteSyncRequest
+from ...messages.route_sync_response import RouteSyncResponse
 from ...messages.route_query_request import RouteQueryRequest
 from ...messages.route_query_response import RouteQueryResponse
 from ...messages.route_update_request import RouteUpdateRequest
 from ...messages.route_update_response import RouteUpdateResponse
+from ...models.paginate import Paginate
 from ...models.route_update import RouteUpdate
 from ...models.route_updated import RouteUpdated
 
@@ -109,6 +116,54 @@ class TestQueryUpdateHandlers(AsyncTestCase):
         assert result.routes[0].recipient_key == TEST_VERKEY
         assert not target
 
+    async def test_query_paginated(self):
+        mgr = RoutingManager(self.context)
+        for idx in range(5):
+            await mgr.create_route_record("conn-id", "key-{}".format(idx))
+        self.context.message = RouteQueryRequest(paginate=Paginate(offset=1, limit=2))
+        responder = MockResponder()
+        await RouteQueryRequestHandler().handle(self.context, responder)
+        result, _ = responder.messages[0]
+        assert [route.recipient_key for route in result.routes] == ["key-1", "key-2"]
+        assert (result.paginated.start, result.paginated.end) == (1, 3)
+        assert result.paginated.limit == 2
+
+    async def test_handle_sync(self):
+        keys = [TEST_VERKEY, TEST_ROUTE_VERKEY]
+        await RoutingManager(self.context).create_route_record("conn-id", keys[0])
+        digests = bucket_digests(bucket_keys(keys))
+        self.context.message = RouteSyncRequest(
+            digest=keylist_digest(digests), buckets=digests
+        )
+        responder = MockResponder()
+        await RouteSyncRequestHandler().handle(self.context, responder)
+        result, _ = responder.messages[0]
+        assert isinstance(result, RouteSyncResponse)
+        assert result.buckets
+
+        self.context.message = result
+        responder = MockResponder()
+        with async_mock.patch.object(
+            RoutingManager,
+            "get_inbound_keys",
+            async_mock.CoroutineMock(return_value=keys),
+        ):
+            await RouteSyncResponseHandler().handle(self.context, responder)
+        request, _ = responder.messages[0]
+        assert isinstance(request, RouteUpdateRequest)
+        assert [(u.recipient_key, u.action) for u in request.updates] == [
+            (TEST_ROUTE_VERKEY, RouteUpdate.ACTION_CREATE)
+        ]
+
+        self.context.connection_ready = False
+        for message, handler in (
+            (RouteSyncRequest(), RouteSyncRequestHandler()),
+            (RouteSyncResponse(), RouteSyncResponseHandler()),
+        ):
+            self.context.message = message
+            with self.assertRaises(HandlerException):
+                await handler.handle(self.context, MockResponder())
+
     async def test_handle_response(self):
         messages = [
             RouteUpdateResponse(
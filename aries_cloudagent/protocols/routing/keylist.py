@@ -0,0 +1,82 @@
+"""Digests of routing keylists, used to synchronize them with a mediator."""
+
+import hashlib
+
+from typing import Iterable, Mapping, Sequence, Set
+
+from .models.route_update import RouteUpdate
+
+# the number of hex digits of a key hash selecting its bucket
+BUCKET_PREFIX = 2
+# the number of hex digits kept of each bucket digest
+BUCKET_DIGEST_LENGTH = 16
+
+
+def key_bucket(key: str) -> str:
+    """Get the bucket of a recipient key."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:BUCKET_PREFIX]
+
+
+def bucket_keys(keys: Iterable[str]) -> Mapping[str, Set[str]]:
+    """Group recipient keys by bucket."""
+    buckets = {}
+    for key in keys:
+        buckets.setdefault(key_bucket(key), set()).add(key)
+    return buckets
+
+
+def bucket_digests(buckets: Mapping[str, Set[str]]) -> Mapping[str, str]:
+    """Compute the digest of the keys in each non-empty bucket."""
+    return {
+        bucket: hashlib.sha256("\n".join(sorted(keys)).encode("utf-8")).hexdigest()[
+            :BUCKET_DIGEST_LENGTH
+        ]
+        for (bucket, keys) in buckets.items()
+        if keys
+    }
+
+
+def keylist_digest(digests: Mapping[str, str]) -> str:
+    """Compute the digest of a keylist from the digests of its buckets."""
+    lines = (f"{bucket}:{digest}" for (bucket, digest) in sorted(digests.items()))
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def changed_buckets(
+    digests: Mapping[str, str], other_digests: Mapping[str, str]
+) -> Set[str]:
+    """Find the buckets whose keys differ between two keylists."""
+    return {
+        bucket
+        for bucket in set(digests) | set(other_digests)
+        if digests.get(bucket) != other_digests.get(bucket)
+    }
+
+
+def keylist_updates(
+    buckets: Mapping[str, Set[str]], mediator_buckets: Mapping[str, Sequence[str]]
+) -> Sequence[RouteUpdate]:
+    """
+    Determine the route updates bringing a mediator's keylist up to date.
+
+    Args:
+        buckets: The keys of the client by bucket
+        mediator_buckets: The mediator's keys in each bucket which differs
+
+    Returns:
+        The route updates creating the missing keys and deleting the others
+
+    """
+    updates = []
+    for bucket, mediator_keys in sorted(mediator_buckets.items()):
+        keys = buckets.get(bucket, set())
+        mediator_keys = set(mediator_keys)
+        updates.extend(
+            RouteUpdate(recipient_key=key, action=RouteUpdate.ACTION_CREATE)
+            for key in sorted(keys - mediator_keys)
+        )
+        updates.extend(
+            RouteUpdate(recipient_key=key, action=RouteUpdate.ACTION_DELETE)
+            for key in sorted(mediator_keys - keys)
+        )
+    return updates
@@ -1,19 +1,36 @@
 """Routing manager classes for tracking and inspecting routing records."""
 
+import asyncio
 import json
-from typing import Sequence
+import logging
+import time
+
+from typing import AsyncIterator, Mapping, Sequence, Tuple
 
 from ...config.injection_context import InjectionContext
+from ...connections.models.connection_record import ConnectionRecord
 from ...core.error import BaseError
+from ...messaging.models.base_record import BaseRecord
 from ...messaging.util import time_now
 from ...storage.base import BaseStorage, StorageRecord
 from ...storage.error import StorageError, StorageDuplicateError, StorageNotFoundError
-
+from ...wallet.base import BaseWallet
+
+from .keylist import (
+    bucket_digests,
+    bucket_keys,
+    changed_buckets,
+    key_bucket,
+    keylist_digest,
+)
+from .messages.route_sync_request import RouteSyncRequest
 from .messages.route_update_request import RouteUpdateRequest
 from .models.route_record import RouteRecord
 from .models.route_update import RouteUpdate
 from .models.route_updated import RouteUpdated
 
+LOGGER = logging.getLogger(__name__)
+
 
 class RoutingManagerError(BaseError):
     """Generic routing error."""
@@ -27,6 +44,7 @@ class RoutingManager:
     """Class for handling routing records."""
 
     RECORD_TYPE = "forward_route"
+    ROUTE_PAGE_SIZE = 1000
 
     def __init__(self, context: InjectionContext):
         """
@@ -61,6 +79,12 @@ class RoutingManager:
             The `RouteRecord` associated with this verkey
 
         """
+        route_table: RouteTable = await self._context.inject(RouteTable, required=False)
+        if route_table:
+            route = await route_table.get_route(self._context, recip_verkey)
+            if route:
+                return route
+        await BaseRecord.commit_batch(self._context)
         storage: BaseStorage = await self._context.inject(BaseStorage)
         try:
             record = await storage.search_records(
@@ -73,28 +97,18 @@ class RoutingManager:
         except StorageNotFoundError:
             raise RouteNotFoundError("No route defined for verkey: %s", recip_verkey)
         value = json.loads(record.value)
-        return RouteRecord(
+        route = RouteRecord(
             record_id=record.id,
             connection_id=record.tags["connection_id"],
             recipient_key=record.tags["recipient_key"],
             created_at=value.get("created_at"),
             updated_at=value.get("updated_at"),
         )
+        if route_table:
+            route_table.add_route(route)
+        return route
 
-    async def get_routes(
-        self, client_connection_id: str = None, tag_filter: dict = None
-    ) -> Sequence[RouteRecord]:
-        """
-        Fetch all routes associated with the current connection.
-
-        Args:
-            client_connection_id: The ID of the connection record
-            tag_filter: An optional dictionary of tag filters
-
-        Returns:
-            A sequence of route records found by the query
-
-        """
+    def _route_filters(self, client_connection_id: str, tag_filter: dict) -> dict:
         filters = {}
         if client_connection_id:
             filters["connection_id"] = client_connection_id
@@ -111,15 +125,81 @@ class RoutingManager:
                     raise RoutingManagerError(
                         "Unsupported tag filter: '{}' = {}".format(key, val)
                     )
+        return filters
 
-        results = []
+    async def iter_routes(
+        self, client_connection_id: str = None, tag_filter: dict = None
+    ) -> AsyncIterator[RouteRecord]:
+        """
+        Iterate over the routes associated with a connection, page by page.
+
+        Args:
+            client_connection_id: The ID of the connection record
+            tag_filter: An optional dictionary of tag filters
+
+        """
+        filters = self._route_filters(client_connection_id, tag_filter)
+        await BaseRecord.commit_batch(self._context)
         storage: BaseStorage = await self._context.inject(BaseStorage)
-        async for record in storage.search_records(RoutingManager.RECORD_TYPE, filters):
+        async for record in storage.search_records(
+            RoutingManager.RECORD_TYPE, filters, self.ROUTE_PAGE_SIZE
+        ):
             value = json.loads(record.value)
             value.update(record.tags)
-            results.append(RouteRecord(**value))
+            yield RouteRecord(record_id=record.id, **value)
+
+    async def get_routes(
+        self,
+        client_connection_id: str = None,
+        tag_filter: dict = None,
+        offset: int = None,
+        limit: int = None,
+    ) -> Sequence[RouteRecord]:
+        """
+        Fetch the routes associated with the current connection.
+
+        Args:
+            client_connection_id: The ID of the connection record
+            tag_filter: An optional dictionary of tag filters
+            offset: The number of routes to skip
+            limit: The maximum number of routes to return
+
+        Returns:
+            A sequence of route records found by the query
+
+        """
+        offset = offset or 0
+        results = []
+        if limit is not None and limit <= 0:
+            return results
+        async for route in self.iter_routes(client_connection_id, tag_filter):
+            if offset:
+                offset -= 1
+                continue
+            results.append(route)
+            if limit is not None and len(results) >= limit:
+                break
         return results
 
+    def _make_route(
+        self, client_connection_id: str, recipient_key: str
+    ) -> Tuple[StorageRecord, RouteRecord]:
+        """Create the storage record for a new route."""
+        value = {"created_at": time_now(), "updated_at": time_now()}
+        record = StorageRecord(
+            RoutingManager.RECORD_TYPE,
+            json.dumps(value),
+            {"connection_id": client_connection_id, "recipient_key": recipient_key},
+        )
+        route = RouteRecord(
+            record_id=record.id,
+            connection_id=client_connection_id,
+            recipient_key=recipient_key,
+            created_at=value["created_at"],
+            updated_at=value["updated_at"],
+        )
+        return record, route
+
     async def create_route_record(
         self, client_connection_id: str = None, recipient_key: str = None
     ) -> RouteRecord:
@@ -138,21 +218,12 @@ class RoutingManager:
             raise RoutingManagerError("Missing client_connection_id")
         if not recipient_key:
             raise RoutingManagerError("Missing recipient_key")
-        value = {"created_at": time_now(), "updated_at": time_now()}
-        record = StorageRecord(
-            RoutingManager.RECORD_TYPE,
-            json.dumps(value),
-            {"connection_id": client_connection_id, "recipient_key": recipient_key},
-        )
+        record, result = self._make_route(client_connection_id, recipient_key)
         storage: BaseStorage = await self._context.inject(BaseStorage)
         await storage.add_record(record)
-        result = RouteRecord(
-            record_id=record.id,
-            connection_id=client_connection_id,
-            recipient_key=recipient_key,
-            created_at=value["created_at"],
-            updated_at=value["updated_at"],
-        )
+        route_table: RouteTable = await self._context.inject(RouteTable, required=False)
+        if route_table:
+            route_table.add_route(result)
         return result
 
     async def delete_route_record(self, route: RouteRecord):
@@ -160,8 +231,13 @@ class RoutingManager:
         if route and route.record_id:
             storage: BaseStorage = await self._context.inject(BaseStorage)
             await storage.delete_record(
-                StorageRecord(None, None, None, route.record_id)
+                StorageRecord(RoutingManager.RECORD_TYPE, None, None, route.record_id)
             )
+            route_table: RouteTable = await self._context.inject(
+                RouteTable, required=False
+            )
+            if route_table:
+                route_table.remove_route(route)
 
     async def update_routes(
         self, client_connection_id: str, updates: Sequence[RouteUpdate]
@@ -169,16 +245,25 @@ class RoutingManager:
         """
         Update routes associated with the current connection.
 
+        The routes are created and deleted in a single storage batch. If the
+        batch cannot be committed, each change is reported as a server error.
+
         Args:
             client_connection_id: The ID of the connection record
             updates: The sequence of route updates (create/delete) to perform.
 
         """
-        exist_routes = await self.get_routes(client_connection_id)
+        keys = {update.recipient_key for update in updates if update.recipient_key}
         exist = {}
-        for route in exist_routes:
-            exist[route.recipient_key] = route
+        if keys:
+            async for route in self.iter_routes(
+                client_connection_id, {"recipient_key": list(keys)}
+            ):
+                exist[route.recipient_key] = route
 
+        storage: BaseStorage = await self._context.inject(BaseStorage)
+        batch = storage.batch()
+        changes = []
         updated = []
         for update in updates:
             result = RouteUpdated(
@@ -191,27 +276,102 @@ class RoutingManager:
                 if recip_key in exist:
                     result.result = RouteUpdated.RESULT_NO_CHANGE
                 else:
-                    try:
-                        await self.create_route_record(client_connection_id, recip_key)
-                    except RoutingManagerError:
-                        result.result = RouteUpdated.RESULT_SERVER_ERROR
-                    else:
-                        result.result = RouteUpdated.RESULT_SUCCESS
+                    record, route = self._make_route(client_connection_id, recip_key)
+                    batch.add_record(record)
+                    exist[recip_key] = route
+                    changes.append((update.action, route))
+                    result.result = RouteUpdated.RESULT_SUCCESS
             elif update.action == RouteUpdate.ACTION_DELETE:
-                if recip_key in exist:
-                    try:
-                        await self.delete_route_record(exist[recip_key])
-                    except StorageError:
-                        result.result = RouteUpdated.RESULT_SERVER_ERROR
-                    else:
-                        result.result = RouteUpdated.RESULT_SUCCESS
+                route = exist.pop(recip_key, None)
+                if route:
+                    batch.delete_record(
+                        StorageRecord(
+                            RoutingManager.RECORD_TYPE, None, None, route.record_id
+                        )
+                    )
+                    changes.append((update.action, route))
+                    result.result = RouteUpdated.RESULT_SUCCESS
                 else:
                     result.result = RouteUpdated.RESULT_NO_CHANGE
             else:
                 result.result = RouteUpdated.RESULT_CLIENT_ERROR
             updated.append(result)
+
+        try:
+            await batch.commit()
+        except StorageError:
+            LOGGER.exception("Error updating routes")
+            for result in updated:
+                if result.result == RouteUpdated.RESULT_SUCCESS:
+                    result.result = RouteUpdated.RESULT_SERVER_ERROR
+            return updated
+
+        route_table: RouteTable = await self._context.inject(RouteTable, required=False)
+        if route_table:
+            for action, route in changes:
+                if action == RouteUpdate.ACTION_CREATE:
+                    route_table.add_route(route)
+                else:
+                    route_table.remove_route(route)
         return updated
 
+    async def sync_routes(
+        self, client_connection_id: str, digests: Mapping[str, str]
+    ) -> Tuple[str, Mapping[str, Sequence[str]]]:
+        """
+        Compare a client's keylist with the routes kept for its connection.
+
+        Args:
+            client_connection_id: The ID of the connection record
+            digests: The digest of each bucket of the client's keylist
+
+        Returns:
+            The digest of the routed keylist, and the routed keys in each
+            bucket which differs from the client's keylist
+
+        """
+        buckets = {}
+        async for route in self.iter_routes(client_connection_id):
+            buckets.setdefault(key_bucket(route.recipient_key), set()).add(
+                route.recipient_key
+            )
+        route_digests = bucket_digests(buckets)
+        changed = changed_buckets(route_digests, digests or {})
+        return (
+            keylist_digest(route_digests),
+            {bucket: sorted(buckets.get(bucket, ())) for bucket in changed},
+        )
+
+    async def get_inbound_keys(self, router_connection_id: str) -> Sequence[str]:
+        """Get the verkeys of the connections routed through a mediator."""
+        wallet: BaseWallet = await self._context.inject(BaseWallet)
+        keys = []
+        for connection in await ConnectionRecord.query(
+            self._context, post_filter={"inbound_connection_id": router_connection_id}
+        ):
+            if connection.my_did:
+                keys.append((await wallet.get_local_did(connection.my_did)).verkey)
+        return keys
+
+    async def send_route_sync(
+        self, router_connection_id: str, keys: Sequence[str], outbound_handler
+    ):
+        """
+        Send the digests of a keylist to a mediator to synchronize its routes.
+
+        The mediator replies with its keys in the buckets which differ, from
+        which the route updates are determined.
+
+        Args:
+            router_connection_id: The ID of the mediator connection
+            keys: The recipient keys to be routed by the mediator
+            outbound_handler: The function sending the request
+
+        """
+        digests = bucket_digests(bucket_keys(keys))
+        msg = RouteSyncRequest(digest=keylist_digest(digests), buckets=digests)
+        await outbound_handler(msg, connection_id=router_connection_id)
+
     async def send_create_route(
         self, router_connection_id: str, recip_key: str, outbound_handler
     ):
@@ -226,3 +386,104 @@ class RoutingManager:
             ]
         )
         await outbound_handler(msg, connection_id=router_connection_id)
+
+
+class RouteTable:
+    """
+    Map recipient keys to their routes, loaded from storage on first use.
+
+    The table is kept current by the `RoutingManager` as routes are created
+    and deleted. When other processes share the agent's storage, the routes
+    they update are only picked up when the table is reloaded, so a `ttl`
+    should be given. Recipient keys having more than one route are left out,
+    so that they are resolved (and reported) from storage.
+    """
+
+    def __init__(self, ttl: float = None):
+        """
+        Initialize the `RouteTable` instance.
+
+        Args:
+            ttl: The time in seconds after which the table is reloaded, or
+                `None` to keep it until it is cleared
+
+        """
+        self.ttl = ttl
+        self._routes: Mapping[str, RouteRecord] = {}
+        self._loaded_at: float = None
+        self._loading: asyncio.Future = None
+
+    @property
+    def loaded(self) -> bool:
+        """Accessor for whether the table is loaded and current."""
+        return self._loaded_at is not None and (
+            self.ttl is None or time.perf_counter() - self._loaded_at < self.ttl
+        )
+
+    async def load(self, context: InjectionContext):
+        """Load the table from the routes in storage, if not already current."""
+        if self.loaded:
+            return
+        if not self._loading:
+            self._loading = asyncio.ensure_future(self._load(context))
+        try:
+            await self._loading
+        finally:
+            self._loading = None
+
+    async def _load(self, context: InjectionContext):
+        storage: BaseStorage = await context.inject(BaseStorage)
+        routes = {}
+        duplicates = set()
+        async for record in storage.search_records(RoutingManager.RECORD_TYPE):
+            recipient_key = record.tags.get("recipient_key")
+            if recipient_key in routes:
+                duplicates.add(recipient_key)
+                continue
+            value = json.loads(record.value)
+            routes[recipient_key] = RouteRecord(
+                record_id=record.id,
+                connection_id=record.tags.get("connection_id"),
+                recipient_key=recipient_key,
+                created_at=value.get("created_at"),
+                updated_at=value.get("updated_at"),
+            )
+        for recipient_key in duplicates:
+            del routes[recipient_key]
+        self._routes = routes
+        self._loaded_at = time.perf_counter()
+
+    async def get_route(
+        self, context: InjectionContext, recipient_key: str
+    ) -> RouteRecord:
+        """
+        Look up the route for a recipient key, loading the table if necessary.
+
+        Returns:
+            The `RouteRecord`, or `None` if the key has no single route
+
+        """
+        await self.load(context)
+        return self._routes.get(recipient_key)
+
+    def add_route(self, route: RouteRecord):
+        """Add a route created or found in storage."""
+        if self._loaded_at is None:
+            return
+        existing = self._routes.get(route.recipient_key)
+        if existing and existing.record_id != route.record_id:
+            # leave the duplicated key to be resolved from storage
+            del self._routes[route.recipient_key]
+        else:
+            self._routes[route.recipient_key] = route
+
+    def remove_route(self, route: RouteRecord):
+        """Remove a deleted route."""
+        existing = self._routes.get(route.recipient_key)
+        if existing and existing.record_id == route.record_id:
+            del self._routes[route.recipient_key]
+
+    def clear(self):
+        """Clear the table, which is reloaded on next use."""
+        self._routes = {}
+        self._loaded_at = None
@@ -6,6 +6,8 @@ FORWARD = f"{PROTOCOL_URI}/forward"
 
 ROUTE_QUERY_REQUEST = f"{PROTOCOL_URI}/route-query-request"
 ROUTE_QUERY_RESPONSE = f"{PROTOCOL_URI}/route-query-response"
+ROUTE_SYNC_REQUEST = f"{PROTOCOL_URI}/route-sync-request"
+ROUTE_SYNC_RESPONSE = f"{PROTOCOL_URI}/route-sync-response"
 ROUTE_UPDATE_REQUEST = f"{PROTOCOL_URI}/route-update-request"
 ROUTE_UPDATE_RESPONSE = f"{PROTOCOL_URI}/route-update-response"
 
@@ -19,6 +21,12 @@ MESSAGE_TYPES = {
     ROUTE_QUERY_RESPONSE: (
         f"{PROTOCOL_PACKAGE}.messages.route_query_response.RouteQueryResponse"
     ),
+    ROUTE_SYNC_REQUEST: (
+        f"{PROTOCOL_PACKAGE}.messages.route_sync_request.RouteSyncRequest"
+    ),
+    ROUTE_SYNC_RESPONSE: (
+        f"{PROTOCOL_PACKAGE}.messages.route_sync_response.RouteSyncResponse"
+    ),
     ROUTE_UPDATE_REQUEST: (
         f"{PROTOCOL_PACKAGE}.messages.route_update_request.RouteUpdateRequest"
     ),
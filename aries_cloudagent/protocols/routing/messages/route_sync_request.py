@@ -0,0 +1,55 @@
+"""Request to compare a keylist with the routes kept by a routing agent."""
+
+from typing import Mapping
+
+from marshmallow import fields
+
+from ....messaging.agent_message import AgentMessage, AgentMessageSchema
+
+from ..message_types import PROTOCOL_PACKAGE, ROUTE_SYNC_REQUEST
+
+HANDLER_CLASS = (
+    f"{PROTOCOL_PACKAGE}.handlers.route_sync_request_handler.RouteSyncRequestHandler"
+)
+
+
+class RouteSyncRequest(AgentMessage):
+    """Request the routed keys differing from a keylist."""
+
+    class Meta:
+        """RouteSyncRequest metadata."""
+
+        handler_class = HANDLER_CLASS
+        message_type = ROUTE_SYNC_REQUEST
+        schema_class = "RouteSyncRequestSchema"
+
+    def __init__(
+        self, *, digest: str = None, buckets: Mapping[str, str] = None, **kwargs
+    ):
+        """
+        Initialize a RouteSyncRequest message instance.
+
+        Args:
+            digest: The digest of the keylist
+            buckets: The digest of each bucket of the keylist
+        """
+
+        super(RouteSyncRequest, self).__init__(**kwargs)
+        self.digest = digest
+        self.buckets = buckets or {}
+
+
+class RouteSyncRequestSchema(AgentMessageSchema):
+    """RouteSyncRequest message schema used in serialization/deserialization."""
+
+    class Meta:
+        """RouteSyncRequestSchema metadata."""
+
+        model_class = RouteSyncRequest
+
+    digest = fields.Str(required=True, description="Keylist digest")
+    buckets = fields.Dict(
+        keys=fields.Str(description="Bucket"),
+        values=fields.Str(description="Digest of the keys in the bucket"),
+        required=True,
+    )
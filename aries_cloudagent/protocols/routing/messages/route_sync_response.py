@@ -0,0 +1,60 @@
+"""Return the routed keys differing from a keylist."""
+
+from typing import Mapping, Sequence
+
+from marshmallow import fields
+
+from ....messaging.agent_message import AgentMessage, AgentMessageSchema
+
+from ..message_types import PROTOCOL_PACKAGE, ROUTE_SYNC_RESPONSE
+
+HANDLER_CLASS = (
+    f"{PROTOCOL_PACKAGE}.handlers"
+    ".route_sync_response_handler.RouteSyncResponseHandler"
+)
+
+
+class RouteSyncResponse(AgentMessage):
+    """Return the routed keys in each bucket differing from a keylist."""
+
+    class Meta:
+        """RouteSyncResponse metadata."""
+
+        handler_class = HANDLER_CLASS
+        message_type = ROUTE_SYNC_RESPONSE
+        schema_class = "RouteSyncResponseSchema"
+
+    def __init__(
+        self,
+        *,
+        digest: str = None,
+        buckets: Mapping[str, Sequence[str]] = None,
+        **kwargs,
+    ):
+        """
+        Initialize a RouteSyncResponse message instance.
+
+        Args:
+            digest: The digest of the routed keylist
+            buckets: The routed keys in each bucket which differs
+        """
+
+        super(RouteSyncResponse, self).__init__(**kwargs)
+        self.digest = digest
+        self.buckets = buckets or {}
+
+
+class RouteSyncResponseSchema(AgentMessageSchema):
+    """RouteSyncResponse message schema used in serialization/deserialization."""
+
+    class Meta:
+        """RouteSyncResponseSchema metadata."""
+
+        model_class = RouteSyncResponse
+
+    digest = fields.Str(required=True, description="Routed keylist digest")
+    buckets = fields.Dict(
+        keys=fields.Str(description="Bucket"),
+        values=fields.List(fields.Str(description="Recipient key")),
+        required=True,
+    )
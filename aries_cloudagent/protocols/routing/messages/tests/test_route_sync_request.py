@@ -0,0 +1,27 @@
+from ..route_sync_request import RouteSyncRequest
+from ...message_types import ROUTE_SYNC_REQUEST
+
+from unittest import TestCase
+
+
+class TestRouteSyncRequest(TestCase):
+    test_digest = "0" * 64
+    test_buckets = {"a1": "0123456789abcdef"}
+
+    def setUp(self):
+        self.message = RouteSyncRequest(
+            digest=self.test_digest, buckets=self.test_buckets
+        )
+
+    def test_init(self):
+        assert self.message.digest == self.test_digest
+        assert self.message.buckets == self.test_buckets
+
+    def test_type(self):
+        assert self.message._type == ROUTE_SYNC_REQUEST
+
+    def test_make_model(self):
+        data = self.message.serialize()
+        model_instance = RouteSyncRequest.deserialize(data)
+        assert isinstance(model_instance, RouteSyncRequest)
+        assert model_instance.buckets == self.test_buckets
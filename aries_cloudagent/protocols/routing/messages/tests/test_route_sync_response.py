@@ -0,0 +1,27 @@
+from ..route_sync_response import RouteSyncResponse
+from ...message_types import ROUTE_SYNC_RESPONSE
+
+from unittest import TestCase
+
+
+class TestRouteSyncResponse(TestCase):
+    test_digest = "0" * 64
+    test_buckets = {"a1": ["3Dn1SJNPaCXcvvJvSbsFWP2xaCjMom3can8CQNhWrTRx"], "b2": []}
+
+    def setUp(self):
+        self.message = RouteSyncResponse(
+            digest=self.test_digest, buckets=self.test_buckets
+        )
+
+    def test_init(self):
+        assert self.message.digest == self.test_digest
+        assert self.message.buckets == self.test_buckets
+
+    def test_type(self):
+        assert self.message._type == ROUTE_SYNC_RESPONSE
+
+    def test_make_model(self):
+        data = self.message.serialize()
+        model_instance = RouteSyncResponse.deserialize(data)
+        assert isinstance(model_instance, RouteSyncResponse)
+        assert model_instance.buckets == self.test_buckets
@@ -2,13 +2,28 @@ from asynctest import TestCase as AsyncTestCase
 from asynctest import mock as async_mock
 
 from ....config.injection_context import InjectionContext
+from ....connections.models.connection_record import ConnectionRecord
 from ....messaging.request_context import RequestContext
 from ....storage.base import BaseStorage
 from ....storage.basic import BasicStorage
 from ....storage.error import StorageDuplicateError, StorageError, StorageNotFoundError
 from ....transport.inbound.receipt import MessageReceipt
+from ....wallet.base import BaseWallet
+from ....wallet.basic import BasicWallet
 
-from ..manager import RoutingManager, RoutingManagerError, RouteNotFoundError
+from ..keylist import (
+    bucket_digests,
+    bucket_keys,
+    key_bucket,
+    keylist_digest,
+    keylist_updates,
+)
+from ..manager import (
+    RoutingManager,
+    RoutingManagerError,
+    RouteNotFoundError,
+    RouteTable,
+)
 from ..models.route_record import RouteRecord
 from ..models.route_update import RouteUpdate
 from ..models.route_updated import RouteUpdated
@@ -228,11 +243,33 @@ class TestRoutingManager(AsyncTestCase):
         assert results[0].action == "mystery"
         assert results[0].result == RouteUpdated.RESULT_CLIENT_ERROR
 
+    async def test_update_routes_query(self):
+        await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
+        await self.manager.create_route_record(TEST_CONN_ID, TEST_VERKEY)
+        with async_mock.patch.object(
+            self.manager, "iter_routes", wraps=self.manager.iter_routes
+        ) as mock_iter_routes:
+            results = await self.manager.update_routes(
+                client_connection_id=TEST_CONN_ID,
+                updates=[
+                    RouteUpdate(
+                        recipient_key=TEST_ROUTE_VERKEY,
+                        action=RouteUpdate.ACTION_DELETE,
+                    )
+                ],
+            )
+            mock_iter_routes.assert_called_once_with(
+                TEST_CONN_ID, {"recipient_key": [TEST_ROUTE_VERKEY]}
+            )
+        assert results[0].result == RouteUpdated.RESULT_SUCCESS
+        routes = await self.manager.get_routes(TEST_CONN_ID)
+        assert [route.recipient_key for route in routes] == [TEST_VERKEY]
+
     async def test_update_routes_create_server_error(self):
         with async_mock.patch.object(
-            self.manager, "create_route_record", async_mock.CoroutineMock()
-        ) as mock_mgr_create_route_record:
-            mock_mgr_create_route_record.side_effect = RoutingManagerError()
+            self.storage, "apply_batch", async_mock.CoroutineMock()
+        ) as mock_apply_batch:
+            mock_apply_batch.side_effect = StorageError()
             results = await self.manager.update_routes(
                 client_connection_id=TEST_CONN_ID,
                 updates=[
@@ -265,9 +302,9 @@ class TestRoutingManager(AsyncTestCase):
     async def test_update_routes_delete_server_error(self):
         record = await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
         with async_mock.patch.object(
-            self.manager, "delete_route_record", async_mock.CoroutineMock()
-        ) as mock_mgr_delete_route_record:
-            mock_mgr_delete_route_record.side_effect = StorageError()
+            self.storage, "apply_batch", async_mock.CoroutineMock()
+        ) as mock_apply_batch:
+            mock_apply_batch.side_effect = StorageError()
             results = await self.manager.update_routes(
                 client_connection_id=TEST_CONN_ID,
                 updates=[
@@ -282,6 +319,105 @@ class TestRoutingManager(AsyncTestCase):
             assert results[0].action == RouteUpdate.ACTION_DELETE
             assert results[0].result == RouteUpdated.RESULT_SERVER_ERROR
 
+    async def test_update_routes_batch(self):
+        await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
+        keys = ["key-{}".format(idx) for idx in range(5)]
+        with async_mock.patch.object(
+            self.storage, "apply_batch", wraps=self.storage.apply_batch
+        ) as mock_apply_batch:
+            results = await self.manager.update_routes(
+                client_connection_id=TEST_CONN_ID,
+                updates=[
+                    RouteUpdate(recipient_key=key, action=RouteUpdate.ACTION_CREATE)
+                    for key in keys + keys[:1]
+                ] + [
+                    RouteUpdate(
+                        recipient_key=TEST_ROUTE_VERKEY,
+                        action=RouteUpdate.ACTION_DELETE
+                    ),
+                    RouteUpdate(
+                        recipient_key=keys[0],
+                        action=RouteUpdate.ACTION_DELETE
+                    ),
+                ]
+            )
+            mock_apply_batch.assert_awaited_once()
+        assert [result.result for result in results] == [
+            RouteUpdated.RESULT_SUCCESS
+        ] * 5 + [
+            RouteUpdated.RESULT_NO_CHANGE,
+            RouteUpdated.RESULT_SUCCESS,
+            RouteUpdated.RESULT_SUCCESS,
+        ]
+        routes = await self.manager.get_routes(TEST_CONN_ID)
+        assert sorted(route.recipient_key for route in routes) == keys[1:]
+
+    async def test_get_routes_paginated(self):
+        for idx in range(5):
+            await self.manager.create_route_record(TEST_CONN_ID, "key-{}".format(idx))
+        routes = await self.manager.get_routes(TEST_CONN_ID, offset=1, limit=3)
+        assert [route.recipient_key for route in routes] == [
+            "key-1", "key-2", "key-3"
+        ]
+        assert all(route.record_id for route in routes)
+        assert await self.manager.get_routes(TEST_CONN_ID, limit=0) == []
+        assert len(await self.manager.get_routes(TEST_CONN_ID, offset=4)) == 1
+
+    async def test_sync_routes(self):
+        keys = ["key-{}".format(idx) for idx in range(50)]
+        for key in keys[:45]:
+            await self.manager.create_route_record(TEST_CONN_ID, key)
+        await self.manager.create_route_record(TEST_CONN_ID, "stale-key")
+
+        buckets = bucket_keys(keys)
+        digests = bucket_digests(buckets)
+        digest, mediator_buckets = await self.manager.sync_routes(
+            TEST_CONN_ID, digests
+        )
+        assert digest != keylist_digest(digests)
+        # only the buckets which differ are returned
+        assert 0 < len(mediator_buckets) <= 6
+        updates = keylist_updates(buckets, mediator_buckets)
+        assert sorted(
+            (update.action, update.recipient_key) for update in updates
+        ) == sorted(
+            [(RouteUpdate.ACTION_CREATE, key) for key in keys[45:]]
+            + [(RouteUpdate.ACTION_DELETE, "stale-key")]
+        )
+
+        await self.manager.update_routes(TEST_CONN_ID, updates)
+        digest, mediator_buckets = await self.manager.sync_routes(
+            TEST_CONN_ID, digests
+        )
+        assert digest == keylist_digest(digests)
+        assert mediator_buckets == {}
+
+    async def test_get_inbound_keys(self):
+        wallet = BasicWallet()
+        self.context.injector.bind_instance(BaseWallet, wallet)
+        did_info = await wallet.create_local_did()
+        for my_did in (did_info.did, None):
+            await ConnectionRecord(
+                my_did=my_did, inbound_connection_id=TEST_CONN_ID
+            ).save(self.context)
+        await ConnectionRecord(
+            my_did=did_info.did, inbound_connection_id="other-conn"
+        ).save(self.context)
+        keys = await self.manager.get_inbound_keys(TEST_CONN_ID)
+        assert keys == [did_info.verkey]
+
+    async def test_send_route_sync(self):
+        mock_outbound_handler = async_mock.CoroutineMock()
+        await self.manager.send_route_sync(
+            router_connection_id=TEST_CONN_ID,
+            keys=[TEST_ROUTE_VERKEY],
+            outbound_handler=mock_outbound_handler
+        )
+        message = mock_outbound_handler.call_args[0][0]
+        assert message.digest == keylist_digest(message.buckets)
+        assert list(message.buckets) == [key_bucket(TEST_ROUTE_VERKEY)]
+        assert mock_outbound_handler.call_args[1] == {"connection_id": TEST_CONN_ID}
+
     async def test_send_create_route(self):
         mock_outbound_handler = async_mock.CoroutineMock()
         await self.manager.send_create_route(
@@ -290,3 +426,44 @@ class TestRoutingManager(AsyncTestCase):
             outbound_handler=mock_outbound_handler
         )
         mock_outbound_handler.assert_called_once()
+
+    async def test_route_table(self):
+        route_table = RouteTable()
+        self.context.injector.bind_instance(RouteTable, route_table)
+        stored = await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
+        assert not route_table.loaded
+
+        with async_mock.patch.object(
+            self.storage, "search_records", wraps=self.storage.search_records
+        ) as mock_search:
+            record = await self.manager.get_recipient(TEST_ROUTE_VERKEY)
+            assert record.record_id == stored.record_id
+            assert record.connection_id == TEST_CONN_ID
+            assert route_table.loaded
+            # later lookups do not search storage
+            await self.manager.get_recipient(TEST_ROUTE_VERKEY)
+            assert mock_search.call_count == 1
+
+        # the table is updated as routes are created and deleted
+        await self.manager.update_routes(
+            TEST_CONN_ID,
+            [RouteUpdate(recipient_key=TEST_VERKEY, action=RouteUpdate.ACTION_CREATE)]
+        )
+        route = await route_table.get_route(self.context, TEST_VERKEY)
+        assert route.connection_id == TEST_CONN_ID
+        await self.manager.delete_route_record(stored)
+        assert not await route_table.get_route(self.context, TEST_ROUTE_VERKEY)
+        with self.assertRaises(RouteNotFoundError):
+            await self.manager.get_recipient(TEST_ROUTE_VERKEY)
+
+    async def test_route_table_duplicates(self):
+        await self.manager.create_route_record(TEST_CONN_ID, TEST_ROUTE_VERKEY)
+        await self.manager.create_route_record("other-conn", TEST_ROUTE_VERKEY)
+        route_table = RouteTable(ttl=0)
+        self.context.injector.bind_instance(RouteTable, route_table)
+        # duplicated keys are left to be reported from storage
+        assert not await route_table.get_route(self.context, TEST_ROUTE_VERKEY)
+        with self.assertRaises(RouteNotFoundError):
+            await self.manager.get_recipient(TEST_ROUTE_VERKEY)
+        # a table with no time to live is reloaded on each use
+        assert not route_table.loaded
@@ -1,14 +1,21 @@
 """Abstract base classes for non-secrets storage."""
 
 from abc import ABC, abstractmethod
-from typing import Mapping, Sequence
+from collections import deque, namedtuple, OrderedDict
+from typing import Awaitable, Callable, Mapping, Sequence
 
-from .error import StorageDuplicateError, StorageNotFoundError
+from .error import StorageDuplicateError, StorageError, StorageNotFoundError
 from .record import StorageRecord
 
 
 DEFAULT_PAGE_SIZE = 100
 
+StorageOperation = namedtuple("StorageOperation", "action record")
+
+OP_ADD = "add"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
 
 class BaseStorage(ABC):
     """Abstract Non-Secrets interface."""
@@ -62,6 +69,19 @@ class BaseStorage(ABC):
 
         """
 
+    async def update_record(self, record: StorageRecord, value: str, tags: Mapping):
+        """
+        Update an existing stored record's value and tags.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+            tags: New tags
+
+        """
+        await self.update_record_value(record, value)
+        await self.update_record_tags(record, tags)
+
     @abstractmethod
     async def delete_record_tags(
         self, record: StorageRecord, tags: (Sequence, Mapping)
@@ -85,6 +105,37 @@ class BaseStorage(ABC):
 
         """
 
+    def batch(self) -> "StorageBatch":
+        """
+        Create a new batch of write operations against this store.
+
+        Returns:
+            An instance of `StorageBatch`
+
+        """
+        return StorageBatch(self)
+
+    async def apply_batch(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a sequence of write operations.
+
+        Backends able to perform several writes in one call should override this
+        method. Operations are applied in order.
+
+        Args:
+            operations: The `StorageOperation` instances to apply
+
+        """
+        for op in operations:
+            if op.action == OP_ADD:
+                await self.add_record(op.record)
+            elif op.action == OP_UPDATE:
+                await self.update_record(op.record, op.record.value, op.record.tags)
+            elif op.action == OP_DELETE:
+                await self.delete_record(op.record)
+            else:
+                raise StorageError("Unsupported batch operation: {}".format(op.action))
+
     @abstractmethod
     def search_records(
         self,
@@ -107,11 +158,258 @@ class BaseStorage(ABC):
 
         """
 
+    async def find_records(
+        self,
+        type_filter: str,
+        tag_query: Mapping = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        options: Mapping = None,
+    ) -> Sequence[StorageRecord]:
+        """
+        Fetch the first records matching a query, without continuing the search.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+            limit: The maximum number of records to return
+            options: Dictionary of backend-specific options
+
+        Returns:
+            A list of up to `limit` records
+
+        """
+        if limit <= 0:
+            return []
+        async with self.search_records(type_filter, tag_query, limit, options) as query:
+            return await query.fetch(limit)
+
+    async def find_record(
+        self, type_filter: str, tag_query: Mapping = None, options: Mapping = None
+    ) -> StorageRecord:
+        """
+        Fetch the single record matching a query.
+
+        Only the first two matching records are fetched.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+            options: Dictionary of backend-specific options
+
+        Returns:
+            The matching record
+
+        Raises:
+            StorageNotFoundError: If no record matches the query
+            StorageDuplicateError: If more than one record matches the query
+
+        """
+        results = await self.find_records(type_filter, tag_query, 2, options)
+        if not results:
+            raise StorageNotFoundError("Record not found")
+        if len(results) > 1:
+            raise StorageDuplicateError("Duplicate records found")
+        return results[0]
+
+    async def record_exists(self, type_filter: str, tag_query: Mapping = None) -> bool:
+        """
+        Check whether any record matches a query.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        """
+        return bool(
+            await self.find_records(type_filter, tag_query, 1, {"retrieveTags": False})
+        )
+
+    async def count_records(self, type_filter: str, tag_query: Mapping = None) -> int:
+        """
+        Count the records matching a query.
+
+        Backends able to count records without fetching them should override
+        this method.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        """
+        total = 0
+        async with self.search_records(
+            type_filter, tag_query, None, {"retrieveTags": False}
+        ) as query:
+            while True:
+                rows = await query.fetch(query.page_size)
+                if not rows:
+                    break
+                total += len(rows)
+        return total
+
+    async def close(self):
+        """Release any resources held by the store."""
+
     def __repr__(self) -> str:
         """Human readable representation of a `BaseStorage` implementation."""
         return "<{}>".format(self.__class__.__name__)
 
 
+class StorageBatch:
+    """
+    Collect record writes to be committed to the store together.
+
+    Successive writes to the same record are merged, so that a record created
+    and updated within the batch results in a single add operation.
+    """
+
+    def __init__(self, store: BaseStorage):
+        """
+        Initialize a `StorageBatch` instance.
+
+        Args:
+            store: `BaseStorage` to commit to
+
+        """
+        self._store = store
+        self._operations = OrderedDict()
+        self._callbacks = []
+        self._discard_callbacks = []
+
+    @property
+    def store(self) -> BaseStorage:
+        """Accessor for the `BaseStorage` implementation being used."""
+        return self._store
+
+    @property
+    def operations(self) -> Sequence[StorageOperation]:
+        """Accessor for the pending operations."""
+        return list(self._operations.values())
+
+    @property
+    def pending(self) -> bool:
+        """Accessor for the presence of uncommitted operations or callbacks."""
+        return bool(self._operations or self._callbacks)
+
+    def _queue(self, action: str, record: StorageRecord):
+        """Merge a new operation with any pending operation on the same record."""
+        if not record:
+            raise StorageError("No record provided")
+        if not record.id:
+            raise StorageError("Record has no ID")
+        key = (record.type, record.id)
+        prev = self._operations.get(key)
+        if prev:
+            if prev.action == OP_DELETE:
+                if action != OP_ADD:
+                    raise StorageNotFoundError("Record not found: {}".format(record.id))
+                action = OP_UPDATE
+            elif action == OP_ADD:
+                raise StorageDuplicateError("Duplicate record")
+            elif prev.action == OP_ADD:
+                if action == OP_DELETE:
+                    del self._operations[key]
+                    return
+                action = OP_ADD
+        self._operations[key] = StorageOperation(action, record)
+
+    def add_record(self, record: StorageRecord):
+        """
+        Queue the addition of a new record.
+
+        Args:
+            record: `StorageRecord` to be stored
+
+        """
+        self._queue(OP_ADD, record)
+
+    def update_record(self, record: StorageRecord, value: str, tags: Mapping):
+        """
+        Queue an update to an existing record's value and tags.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+            tags: New tags
+
+        """
+        self._queue(OP_UPDATE, record._replace(value=value, tags=dict(tags or {})))
+
+    def delete_record(self, record: StorageRecord):
+        """
+        Queue the deletion of an existing record.
+
+        Args:
+            record: `StorageRecord` to delete
+
+        """
+        self._queue(OP_DELETE, record)
+
+    def on_commit(self, callback: Callable[[], Awaitable]):
+        """
+        Register a coroutine function to be awaited once the batch is committed.
+
+        Args:
+            callback: The coroutine function to call
+
+        """
+        self._callbacks.append(callback)
+
+    def on_discard(self, callback: Callable[[], None]):
+        """
+        Register a function to be called if the batch is discarded.
+
+        The callbacks are also called when the operations cannot be applied.
+
+        Args:
+            callback: The function to call
+
+        """
+        self._discard_callbacks.append(callback)
+
+    async def commit(self):
+        """Apply the pending operations to the store and run commit callbacks."""
+        operations = self.operations
+        callbacks = self._callbacks
+        discard_callbacks = self._discard_callbacks
+        self._operations = OrderedDict()
+        self._callbacks = []
+        self._discard_callbacks = []
+        if operations:
+            try:
+                await self._store.apply_batch(operations)
+            except Exception:
+                for callback in reversed(discard_callbacks):
+                    callback()
+                raise
+        for callback in callbacks:
+            await callback()
+
+    def discard(self):
+        """Drop the pending operations and callbacks."""
+        discard_callbacks = self._discard_callbacks
+        self._operations = OrderedDict()
+        self._callbacks = []
+        self._discard_callbacks = []
+        for callback in reversed(discard_callbacks):
+            callback()
+
+    async def __aenter__(self):
+        """Context manager enter."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Context manager exit, committing unless an exception was raised."""
+        if exc_type:
+            self.discard()
+        else:
+            await self.commit()
+
+    def __repr__(self) -> str:
+        """Human readable representation of a `StorageBatch`."""
+        return "<{}>".format(self.__class__.__name__)
+
+
 class BaseStorageRecordSearch(ABC):
     """Represent an active stored records search."""
 
@@ -244,8 +542,18 @@ class BaseStorageRecordSearch(ABC):
         return results
 
     async def fetch_single(self) -> StorageRecord:
-        """Fetch a single query result."""
-        results = await self.fetch_all()
+        """
+        Fetch a single query result.
+
+        Only the first two results are fetched, which is enough to detect a
+        duplicate.
+        """
+        if not self.opened:
+            await self.open()
+        try:
+            results = await self.fetch(2)
+        finally:
+            await self.close()
         if not results:
             raise StorageNotFoundError("Record not found")
         if len(results) > 1:
@@ -278,14 +586,11 @@ class BaseStorageRecordSearch(ABC):
         if not self.opened:
             await self.open()
         if not self._buffer:
-            self._buffer = await self.fetch(self.page_size)
+            self._buffer = deque(await self.fetch(self.page_size))
             if not self._buffer:
                 await self.close()
                 raise StopAsyncIteration
-        try:
-            return self._buffer.pop(0)
-        except IndexError:
-            raise StopAsyncIteration
+        return self._buffer.popleft()
 
     def __repr__(self) -> str:
         """Human readable representation of `BaseStorageRecordSearch`."""
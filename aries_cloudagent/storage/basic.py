@@ -1,9 +1,17 @@
 """Basic in-memory storage implementation (non-wallet)."""
 
 from collections import OrderedDict
+from itertools import count
 from typing import Mapping, Sequence
 
-from .base import BaseStorage, BaseStorageRecordSearch
+from .base import (
+    BaseStorage,
+    BaseStorageRecordSearch,
+    StorageOperation,
+    OP_ADD,
+    OP_DELETE,
+    OP_UPDATE,
+)
 from .error import (
     StorageError,
     StorageDuplicateError,
@@ -26,6 +34,37 @@ class BasicStorage(BaseStorage):
 
         """
         self._records = OrderedDict()
+        self._record_seq = {}
+        self._seq_counter = count()
+        self._type_index = {}
+        self._tag_index = {}
+
+    def _index_record(self, record: StorageRecord):
+        """Add a record to the type and tag indexes."""
+        self._type_index.setdefault(record.type, {})[record.id] = None
+        if record.tags:
+            for name, value in record.tags.items():
+                self._tag_index.setdefault((record.type, name, value), set()).add(
+                    record.id
+                )
+
+    def _unindex_tags(self, record: StorageRecord):
+        """Remove the tags of a record from the tag index."""
+        if record.tags:
+            for name, value in record.tags.items():
+                key = (record.type, name, value)
+                posting = self._tag_index.get(key)
+                if posting is not None:
+                    posting.discard(record.id)
+                    if not posting:
+                        del self._tag_index[key]
+
+    def _replace_tags(self, oldrec: StorageRecord, tags: dict):
+        """Replace the tags of a stored record, keeping the tag index current."""
+        self._unindex_tags(oldrec)
+        newrec = oldrec._replace(tags=tags)
+        self._records[oldrec.id] = newrec
+        self._index_record(newrec)
 
     async def add_record(self, record: StorageRecord):
         """
@@ -46,6 +85,8 @@ class BasicStorage(BaseStorage):
         if record.id in self._records:
             raise StorageDuplicateError("Duplicate record")
         self._records[record.id] = record
+        self._record_seq[record.id] = next(self._seq_counter)
+        self._index_record(record)
 
     async def get_record(
         self, record_type: str, record_id: str, options: Mapping = None
@@ -103,7 +144,25 @@ class BasicStorage(BaseStorage):
         oldrec = self._records.get(record.id)
         if not oldrec:
             raise StorageNotFoundError("Record not found: {}".format(record.id))
-        self._records[record.id] = oldrec._replace(tags=dict(tags or {}))
+        self._replace_tags(oldrec, dict(tags or {}))
+
+    async def update_record(self, record: StorageRecord, value: str, tags: Mapping):
+        """
+        Update an existing stored record's value and tags.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        oldrec = self._records.get(record.id)
+        if not oldrec:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        self._replace_tags(oldrec._replace(value=value), dict(tags or {}))
 
     async def delete_record_tags(
         self, record: StorageRecord, tags: (Sequence, Mapping)
@@ -127,7 +186,7 @@ class BasicStorage(BaseStorage):
             for tag in tags:
                 if tag in newtags:
                     del newtags[tag]
-        self._records[record.id] = oldrec._replace(tags=newtags)
+        self._replace_tags(oldrec, newtags)
 
     async def delete_record(self, record: StorageRecord):
         """
@@ -140,9 +199,141 @@ class BasicStorage(BaseStorage):
             StorageNotFoundError: If record not found
 
         """
-        if record.id not in self._records:
+        oldrec = self._records.get(record.id)
+        if not oldrec:
             raise StorageNotFoundError("Record not found: {}".format(record.id))
-        del self._records[record.id]
+        self._unindex_tags(oldrec)
+        type_ids = self._type_index.get(oldrec.type)
+        if type_ids is not None:
+            type_ids.pop(oldrec.id, None)
+            if not type_ids:
+                del self._type_index[oldrec.type]
+        del self._record_seq[oldrec.id]
+        del self._records[oldrec.id]
+
+    async def apply_batch(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a sequence of write operations.
+
+        All operations are checked before any is applied, so that a failing
+        batch leaves the store unchanged.
+
+        Args:
+            operations: The `StorageOperation` instances to apply
+
+        Raises:
+            StorageError: If an operation is not supported or has no record ID
+            StorageDuplicateError: If a record to be added already exists
+            StorageNotFoundError: If a record to be updated or deleted is not found
+
+        """
+        present = {}
+        for op in operations:
+            if op.action not in (OP_ADD, OP_UPDATE, OP_DELETE):
+                raise StorageError("Unsupported batch operation: {}".format(op.action))
+            if not op.record or not op.record.id:
+                raise StorageError("Record has no ID")
+            exists = present.get(op.record.id, op.record.id in self._records)
+            if op.action == OP_ADD:
+                if exists:
+                    raise StorageDuplicateError("Duplicate record")
+            elif not exists:
+                raise StorageNotFoundError("Record not found: {}".format(op.record.id))
+            present[op.record.id] = op.action != OP_DELETE
+        for op in operations:
+            if op.action == OP_ADD:
+                await self.add_record(op.record)
+            elif op.action == OP_UPDATE:
+                await self.update_record(op.record, op.record.value, op.record.tags)
+            else:
+                await self.delete_record(op.record)
+
+    def plan_search(self, type_filter: str, tag_query: Mapping = None) -> Sequence[str]:
+        """
+        Determine the candidate record IDs for a search using the indexes.
+
+        Equality, `$in`, `$or` and `$and` clauses are resolved against the tag
+        index; the candidates must still be checked against the full query,
+        as range and negation clauses are not narrowed by the planner.
+
+        Args:
+            type_filter: The record type
+            tag_query: Tags to query
+
+        Returns:
+            A list of record IDs in insertion order
+
+        """
+        type_ids = self._type_index.get(type_filter)
+        if not type_ids:
+            return []
+        candidates = self._plan_tag_query(type_filter, tag_query)
+        if candidates is None:
+            return list(type_ids)
+        return sorted(candidates, key=self._record_seq.__getitem__)
+
+    def _plan_tag_query(self, type_filter: str, tag_query: Mapping) -> set:
+        """Resolve a tag query to a set of candidate IDs, or None to scan."""
+        if not tag_query or not isinstance(tag_query, dict):
+            return None
+        postings = []
+        for k, v in tag_query.items():
+            if k == "$and" and isinstance(v, list):
+                for sub in v:
+                    sub_ids = self._plan_tag_query(type_filter, sub)
+                    if sub_ids is not None:
+                        postings.append(sub_ids)
+            elif k == "$or" and isinstance(v, list):
+                union = set()
+                for sub in v:
+                    sub_ids = self._plan_tag_query(type_filter, sub)
+                    if sub_ids is None:
+                        union = None
+                        break
+                    union.update(sub_ids)
+                if union is not None:
+                    postings.append(union)
+            elif k[:1] == "$":
+                # $not and unknown operators are handled by the match
+                continue
+            elif isinstance(v, str):
+                postings.append(self._tag_index.get((type_filter, k, v), set()))
+            elif isinstance(v, dict) and len(v) == 1 and "$in" in v:
+                values = v["$in"]
+                if isinstance(values, list):
+                    union = set()
+                    for value in values:
+                        union.update(self._tag_index.get((type_filter, k, value), ()))
+                    postings.append(union)
+            # range operators fall back to scanning the other candidates
+        if not postings:
+            return None
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(posting)
+        return result
+
+    async def count_records(self, type_filter: str, tag_query: Mapping = None) -> int:
+        """
+        Count the records matching a query, without fetching them.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        """
+        candidates = self.plan_search(type_filter, tag_query)
+        if not tag_query:
+            return len(candidates)
+        records = self._records
+        return sum(
+            1
+            for record_id in candidates
+            if basic_tag_query_match(records[record_id].tags, tag_query)
+        )
 
     def search_records(
         self,
@@ -210,7 +401,11 @@ def basic_tag_query_match(tags: dict, tag_query: dict) -> bool:
         tags = {}
     if tag_query:
         for k, v in tag_query.items():
-            if k == "$or":
+            if k == "$and":
+                if not isinstance(v, list):
+                    raise StorageSearchError("Expected list for $and filter value")
+                chk = all(basic_tag_query_match(tags, opt) for opt in v)
+            elif k == "$or":
                 if not isinstance(v, list):
                     raise StorageSearchError("Expected list for $or filter value")
                 chk = False
@@ -295,15 +490,18 @@ class BasicStorageRecordSearch(BaseStorageRecordSearch):
             raise StorageSearchError("Search query has not been opened")
         ret = []
         check_type = self.type_filter
+        records = self._store._records
         i = max_count
         while i > 0:
             try:
                 id = next(self._iter)
             except StopIteration:
                 break
-            record = self._cache[id]
-            if record.type == check_type and basic_tag_query_match(
-                record.tags, self.tag_query
+            record = records.get(id)
+            if (
+                record
+                and record.type == check_type
+                and basic_tag_query_match(record.tags, self.tag_query)
             ):
                 ret.append(record)
                 i -= 1
@@ -311,7 +509,7 @@ class BasicStorageRecordSearch(BaseStorageRecordSearch):
 
     async def open(self):
         """Start the search query."""
-        self._cache = self._store._records.copy()
+        self._cache = self._store.plan_search(self.type_filter, self.tag_query)
         self._iter = iter(self._cache)
 
     async def close(self):
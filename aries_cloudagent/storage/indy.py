@@ -1,12 +1,19 @@
 """Indy implementation of BaseStorage interface."""
 
-import json
+import asyncio
 from typing import Mapping, Sequence
 
 from indy import non_secrets
 from indy.error import IndyError, ErrorCode
 
-from .base import BaseStorage, BaseStorageRecordSearch
+from .base import (
+    BaseStorage,
+    BaseStorageRecordSearch,
+    StorageOperation,
+    OP_ADD,
+    OP_DELETE,
+    OP_UPDATE,
+)
 from .error import (
     StorageError,
     StorageDuplicateError,
@@ -14,6 +21,7 @@ from .error import (
     StorageSearchError,
 )
 from .record import StorageRecord
+from ..utils.json_codec import json_dumps, json_loads
 from ..wallet.indy import IndyWallet
 
 
@@ -55,7 +63,7 @@ class IndyStorage(BaseStorage):
 
         """
         _validate_record(record)
-        tags_json = json.dumps(record.tags) if record.tags else None
+        tags_json = json_dumps(record.tags) if record.tags else None
         try:
             await non_secrets.add_wallet_record(
                 self._wallet.handle, record.type, record.id, record.value, tags_json
@@ -92,7 +100,7 @@ class IndyStorage(BaseStorage):
             raise StorageError("Record ID not provided")
         if not options:
             options = {}
-        options_json = json.dumps(
+        options_json = json_dumps(
             {
                 "retrieveType": False,
                 "retrieveValue": True,
@@ -107,7 +115,7 @@ class IndyStorage(BaseStorage):
             if x_indy.error_code == ErrorCode.WalletItemNotFound:
                 raise StorageNotFoundError("Record not found: {}".format(record_id))
             raise StorageError(str(x_indy))
-        result = json.loads(result_json)
+        result = json_loads(result_json)
         return StorageRecord(
             type=record_type,
             id=result["id"],
@@ -152,7 +160,7 @@ class IndyStorage(BaseStorage):
 
         """
         _validate_record(record)
-        tags_json = json.dumps(tags) if tags else "{}"
+        tags_json = json_dumps(tags) if tags else "{}"
         try:
             await non_secrets.update_wallet_record_tags(
                 self._wallet.handle, record.type, record.id, tags_json
@@ -162,6 +170,29 @@ class IndyStorage(BaseStorage):
                 raise StorageNotFoundError("Record not found: {}".format(record.id))
             raise StorageError(str(x_indy))
 
+    async def update_record(self, record: StorageRecord, value: str, tags: Mapping):
+        """
+        Update an existing stored record's value and tags.
+
+        The non-secrets API updates the value and the tags in separate calls,
+        which are submitted to libindy together rather than waiting for one
+        update to complete before starting the other. The update is not atomic.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+            StorageError: If a libindy error occurs
+
+        """
+        await asyncio.gather(
+            self.update_record_value(record, value),
+            self.update_record_tags(record, tags),
+        )
+
     async def delete_record_tags(
         self, record: StorageRecord, tags: (Sequence, Mapping)
     ):
@@ -178,7 +209,7 @@ class IndyStorage(BaseStorage):
             # check existence of record first (otherwise no exception thrown)
             await self.get_record(record.type, record.id)
 
-            tag_names_json = json.dumps(list(tags))
+            tag_names_json = json_dumps(list(tags))
             await non_secrets.delete_wallet_record_tags(
                 self._wallet.handle, record.type, record.id, tag_names_json
             )
@@ -205,6 +236,71 @@ class IndyStorage(BaseStorage):
                 raise StorageNotFoundError("Record not found: {}".format(record.id))
             raise StorageError(str(x_indy))
 
+    async def apply_batch(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a sequence of write operations, one at a time and in order.
+
+        The non-secrets API has no transactions or multi-record calls, so this
+        backend gets no batching benefit: each operation makes the same libindy
+        calls as when applied on its own (two for an update). The batch is not
+        atomic either: when an operation fails, the operations before it remain
+        applied and the operations after it are not attempted.
+
+        Args:
+            operations: The `StorageOperation` instances to apply
+
+        Raises:
+            StorageError: If an operation is not supported
+
+        """
+        for op in operations:
+            if op.action not in (OP_ADD, OP_UPDATE, OP_DELETE):
+                raise StorageError("Unsupported batch operation: {}".format(op.action))
+            _validate_record(op.record)
+
+        for op in operations:
+            if op.action == OP_ADD:
+                await self.add_record(op.record)
+            elif op.action == OP_UPDATE:
+                await self.update_record(op.record, op.record.value, op.record.tags)
+            else:
+                await self.delete_record(op.record)
+
+    async def count_records(self, type_filter: str, tag_query: Mapping = None) -> int:
+        """
+        Count the records matching a query, using the total count of a search.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        """
+        options_json = json_dumps(
+            {
+                "retrieveRecords": False,
+                "retrieveTotalCount": True,
+                "retrieveType": False,
+                "retrieveValue": False,
+                "retrieveTags": False,
+            }
+        )
+        try:
+            search_handle = await non_secrets.open_wallet_search(
+                self._wallet.handle,
+                type_filter,
+                json_dumps(tag_query or {}),
+                options_json,
+            )
+            try:
+                result_json = await non_secrets.fetch_wallet_search_next_records(
+                    self._wallet.handle, search_handle, 1
+                )
+            finally:
+                await non_secrets.close_wallet_search(search_handle)
+        except IndyError as x_indy:
+            raise StorageSearchError(str(x_indy))
+        return json_loads(result_json).get("totalCount") or 0
+
     def search_records(
         self,
         type_filter: str,
@@ -295,7 +391,7 @@ class IndyStorageRecordSearch(BaseStorageRecordSearch):
         result_json = await non_secrets.fetch_wallet_search_next_records(
             self.store.wallet.handle, self._handle, max_count
         )
-        results = json.loads(result_json)
+        results = json_loads(result_json)
         ret = []
         if results["records"]:
             for row in results["records"]:
@@ -311,8 +407,8 @@ class IndyStorageRecordSearch(BaseStorageRecordSearch):
 
     async def open(self):
         """Start the search query."""
-        query_json = json.dumps(self.tag_query or {})
-        options_json = json.dumps(
+        query_json = json_dumps(self.tag_query or {})
+        options_json = json_dumps(
             {
                 "retrieveRecords": True,
                 "retrieveTotalCount": False,
@@ -1,6 +1,7 @@
 """Default storage provider classes."""
 
 import logging
+import os
 
 from ..config.base import BaseProvider, BaseInjector, BaseSettings
 from ..utils.classloader import ClassLoader
@@ -16,6 +17,7 @@ class StorageProvider(BaseProvider):
         "basic": "aries_cloudagent.storage.basic.BasicStorage",
         "indy": "aries_cloudagent.storage.indy.IndyStorage",
         "postgres_storage": "aries_cloudagent.storage.indy.IndyStorage",
+        "sqlite": "aries_cloudagent.storage.sqlite.SqliteStorage",
     }
 
     async def provide(self, settings: BaseSettings, injector: BaseInjector):
@@ -29,5 +31,18 @@ class StorageProvider(BaseProvider):
             "storage.type", default=storage_default_type
         ).lower()
         storage_class = self.STORAGE_TYPES.get(storage_type, storage_type)
+        if storage_type == "sqlite":
+            storage_path = settings.get_value("storage.path") or os.path.join(
+                os.path.expanduser("~"),
+                ".aries_cloudagent",
+                "{}.sqlite".format(settings.get_value("wallet.name") or "default"),
+            )
+            os.makedirs(os.path.dirname(os.path.abspath(storage_path)), exist_ok=True)
+            LOGGER.info("Using SQLite storage: %s", storage_path)
+            return ClassLoader.load_class(storage_class)(
+                wallet,
+                path=storage_path,
+                pool_size=settings.get_value("storage.pool_size") or 4,
+            )
         storage = ClassLoader.load_class(storage_class)(wallet)
         return storage
@@ -0,0 +1,728 @@
+"""SQLite implementation of BaseStorage interface."""
+
+import asyncio
+import sqlite3
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Sequence, Tuple
+
+from .base import (
+    BaseStorage,
+    BaseStorageRecordSearch,
+    StorageOperation,
+    OP_ADD,
+    OP_DELETE,
+    OP_UPDATE,
+)
+from .error import (
+    StorageError,
+    StorageDuplicateError,
+    StorageNotFoundError,
+    StorageSearchError,
+)
+from .record import StorageRecord
+
+SCHEMA = (
+    "PRAGMA journal_mode=WAL",
+    """CREATE TABLE IF NOT EXISTS records (
+        seq INTEGER PRIMARY KEY,
+        type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        value TEXT NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_records_type_id ON records (type, id)",
+    # the rowid is implicitly part of the index, which orders each type by seq
+    "CREATE INDEX IF NOT EXISTS ix_records_type ON records (type)",
+    """CREATE TABLE IF NOT EXISTS tags (
+        record_seq INTEGER NOT NULL REFERENCES records (seq) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (record_seq, name)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS ix_tags_name_value ON tags (name, value, record_seq)",
+)
+
+SQL_INSERT_RECORD = "INSERT INTO records (type, id, value) VALUES (?, ?, ?)"
+SQL_INSERT_TAG = "INSERT INTO tags (record_seq, name, value) VALUES (?, ?, ?)"
+SQL_SELECT_RECORD = "SELECT seq, value FROM records WHERE type = ? AND id = ?"
+SQL_SELECT_SEQ = "SELECT seq FROM records WHERE type = ? AND id = ?"
+SQL_SELECT_TAGS = "SELECT name, value FROM tags WHERE record_seq = ?"
+SQL_UPDATE_VALUE = "UPDATE records SET value = ? WHERE seq = ?"
+SQL_DELETE_TAGS = "DELETE FROM tags WHERE record_seq = ?"
+SQL_DELETE_TAG = "DELETE FROM tags WHERE record_seq = ? AND name = ?"
+SQL_DELETE_RECORD = "DELETE FROM records WHERE seq = ?"
+SQL_PROBE_TAG = (
+    "SELECT count(*) FROM (SELECT 1 FROM tags WHERE name = ? AND value = ? LIMIT ?)"
+)
+
+# the number of matches counted when choosing the tag clause to search by
+PROBE_LIMIT = 1000
+
+TAG_OPERATORS = {
+    "$neq": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+def _validate_record(record: StorageRecord):
+    if not record:
+        raise StorageError("No record provided")
+    if not record.id:
+        raise StorageError("Record has no ID")
+    if not record.type:
+        raise StorageError("Record has no type")
+
+
+def tag_query_sql(tag_query: Mapping) -> Tuple[str, list]:
+    """
+    Translate a tag query into an SQL condition on the records table.
+
+    The supported operators are those of `basic_tag_query_match`. A clause on
+    a tag matches only records having the tag, including `$neq` clauses.
+
+    Args:
+        tag_query: The tag query
+
+    Returns:
+        The condition and its parameters
+
+    Raises:
+        StorageSearchError: If the query is not supported
+
+    """
+    clauses = []
+    params = []
+    for k, v in (tag_query or {}).items():
+        if k in ("$and", "$or"):
+            if not isinstance(v, list):
+                raise StorageSearchError(f"Expected list for {k} filter value")
+            subs = [tag_query_sql(sub) for sub in v]
+            if not subs:
+                clause = "1" if k == "$and" else "0"
+            else:
+                joiner = " AND " if k == "$and" else " OR "
+                clause = "(" + joiner.join(sub for (sub, _) in subs) + ")"
+                for (_, sub_params) in subs:
+                    params.extend(sub_params)
+        elif k == "$not":
+            if not isinstance(v, dict):
+                raise StorageSearchError("Expected dict for $not filter value")
+            sub, sub_params = tag_query_sql(v)
+            clause = f"NOT {sub}"
+            params.extend(sub_params)
+        elif k[0] == "$":
+            raise StorageSearchError("Unexpected filter operator: {}".format(k))
+        elif isinstance(v, str):
+            clause = (
+                "r.seq IN (SELECT record_seq FROM tags WHERE name = ? AND value = ?)"
+            )
+            params.extend((k, v))
+        elif isinstance(v, dict):
+            if len(v) != 1:
+                raise StorageSearchError("Unsupported subquery: {}".format(v))
+            op, cmp_val = next(iter(v.items()))
+            if op == "$in":
+                if not isinstance(cmp_val, list):
+                    raise StorageSearchError("Expected list for $in value")
+                marks = ", ".join("?" * len(cmp_val))
+                clause = (
+                    "r.seq IN (SELECT record_seq FROM tags WHERE name = ?"
+                    f" AND value IN ({marks}))"
+                )
+                params.append(k)
+                params.extend(cmp_val)
+            elif op in TAG_OPERATORS:
+                if not isinstance(cmp_val, str):
+                    raise StorageSearchError("Expected string for filter value")
+                clause = (
+                    "r.seq IN (SELECT record_seq FROM tags WHERE name = ?"
+                    f" AND value {TAG_OPERATORS[op]} ?)"
+                )
+                params.extend((k, cmp_val))
+            else:
+                raise StorageSearchError("Unsupported match operator: {}".format(op))
+        else:
+            raise StorageSearchError(
+                "Expected string or dict for filter value, got {}".format(v)
+            )
+        clauses.append(clause)
+    if not clauses:
+        return "1", params
+    return "(" + " AND ".join(clauses) + ")", params
+
+
+class SqliteConnectionPool:
+    """
+    A pool of SQLite connections used from worker threads.
+
+    Any number of reads may run at once. Writes are serialized and each runs
+    in its own transaction, as SQLite permits a single writer.
+    """
+
+    def __init__(self, path: str, size: int = 4, cached_statements: int = 256):
+        """
+        Initialize the `SqliteConnectionPool` instance.
+
+        Args:
+            path: The database path, or `:memory:` for a private in-memory
+                database, which is limited to a single connection
+            size: The number of connections and worker threads
+            cached_statements: The number of prepared statements each
+                connection keeps for reuse
+
+        """
+        self.path = path
+        self.size = 1 if path == ":memory:" else max(size, 1)
+        self.cached_statements = cached_statements
+        self._connections = []
+        self._executor: ThreadPoolExecutor = None
+        self._idle: asyncio.Queue = None
+        self._opening: asyncio.Future = None
+        self._write_lock: asyncio.Lock = None
+
+    @property
+    def opened(self) -> bool:
+        """Accessor for open state."""
+        return bool(self._opening and self._opening.done())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    async def open(self):
+        """Open the connections and create the schema if necessary."""
+        if not self._opening:
+            self._opening = asyncio.ensure_future(self._open())
+        try:
+            await self._opening
+        except Exception:
+            self._opening = None
+            raise
+
+    async def _open(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="sqlite-storage"
+        )
+        self._idle = asyncio.Queue()
+        self._write_lock = asyncio.Lock()
+        loop = asyncio.get_event_loop()
+        for _ in range(self.size):
+            conn = await loop.run_in_executor(self._executor, self._connect)
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+
+        def create_schema(conn: sqlite3.Connection):
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+        conn = await self._idle.get()
+        try:
+            await loop.run_in_executor(self._executor, create_schema, conn)
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a function on an idle connection in a worker thread."""
+        if not self.opened:
+            await self.open()
+        conn = await self._idle.get()
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                self._executor, fn, conn
+            )
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a function on a connection within a write transaction."""
+
+        def transaction(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+        if not self.opened:
+            await self.open()
+        async with self._write_lock:
+            return await self.run(transaction)
+
+    async def close(self):
+        """Close the connections and stop the worker threads."""
+        if not self.opened:
+            return
+        executor = self._executor
+        connections = self._connections
+        self._executor = None
+        self._connections = []
+        self._opening = None
+        for conn in connections:
+            await asyncio.get_event_loop().run_in_executor(executor, conn.close)
+        executor.shutdown()
+
+
+class SqliteStorage(BaseStorage):
+    """SQLite storage class, keeping record tags in an indexed table."""
+
+    def __init__(self, _wallet=None, *, path: str = ":memory:", pool_size: int = 4):
+        """
+        Initialize a `SqliteStorage` instance.
+
+        Args:
+            _wallet: The wallet implementation, which is not used
+            path: The database path
+            pool_size: The number of database connections
+
+        """
+        self._pool = SqliteConnectionPool(path, pool_size)
+
+    @property
+    def pool(self) -> SqliteConnectionPool:
+        """Accessor for the connection pool."""
+        return self._pool
+
+    async def close(self):
+        """Close the database connections."""
+        await self._pool.close()
+
+    @staticmethod
+    def _find_seq(conn: sqlite3.Connection, record: StorageRecord) -> int:
+        row = conn.execute(SQL_SELECT_SEQ, (record.type, record.id)).fetchone()
+        if not row:
+            raise StorageNotFoundError("Record not found: {}".format(record.id))
+        return row[0]
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, record: StorageRecord):
+        try:
+            seq = conn.execute(
+                SQL_INSERT_RECORD, (record.type, record.id, record.value)
+            ).lastrowid
+        except sqlite3.IntegrityError:
+            raise StorageDuplicateError("Duplicate record ID: {}".format(record.id))
+        if record.tags:
+            conn.executemany(
+                SQL_INSERT_TAG,
+                ((seq, name, value) for (name, value) in record.tags.items()),
+            )
+
+    @classmethod
+    def _replace(
+        cls, conn: sqlite3.Connection, record: StorageRecord, value: str, tags
+    ):
+        seq = cls._find_seq(conn, record)
+        if value is not None:
+            conn.execute(SQL_UPDATE_VALUE, (value, seq))
+        if tags is not None:
+            conn.execute(SQL_DELETE_TAGS, (seq,))
+            conn.executemany(
+                SQL_INSERT_TAG, ((seq, name, val) for (name, val) in tags.items())
+            )
+
+    @classmethod
+    def _delete(cls, conn: sqlite3.Connection, record: StorageRecord):
+        conn.execute(SQL_DELETE_RECORD, (cls._find_seq(conn, record),))
+
+    async def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        try:
+            return await self._pool.write(fn)
+        except sqlite3.Error as err:
+            raise StorageError(str(err)) from err
+
+    async def add_record(self, record: StorageRecord):
+        """
+        Add a new record to the store.
+
+        Args:
+            record: `StorageRecord` to be stored
+
+        Raises:
+            StorageError: If no record is provided
+            StorageError: If the record has no ID
+            StorageDuplicateError: If the record already exists
+
+        """
+        _validate_record(record)
+        await self._write(lambda conn: self._insert(conn, record))
+
+    async def get_record(
+        self, record_type: str, record_id: str, options: Mapping = None
+    ) -> StorageRecord:
+        """
+        Fetch a record from the store by type and ID.
+
+        Args:
+            record_type: The record type
+            record_id: The record id
+            options: A dictionary of backend-specific options
+
+        Returns:
+            A `StorageRecord` instance
+
+        Raises:
+            StorageNotFoundError: If the record is not found
+
+        """
+        if not record_type:
+            raise StorageError("Record type not provided")
+        if not record_id:
+            raise StorageError("Record ID not provided")
+        retrieve_tags = (options or {}).get("retrieveTags", True)
+
+        def fetch(conn: sqlite3.Connection):
+            row = conn.execute(SQL_SELECT_RECORD, (record_type, record_id)).fetchone()
+            if not row:
+                return None
+            tags = (
+                dict(conn.execute(SQL_SELECT_TAGS, (row[0],)).fetchall())
+                if retrieve_tags
+                else {}
+            )
+            return StorageRecord(record_type, row[1], tags, record_id)
+
+        try:
+            result = await self._pool.run(fetch)
+        except sqlite3.Error as err:
+            raise StorageError(str(err)) from err
+        if not result:
+            raise StorageNotFoundError("Record not found: {}".format(record_id))
+        return result
+
+    async def update_record_value(self, record: StorageRecord, value: str):
+        """
+        Update an existing stored record's value.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        _validate_record(record)
+        await self._write(lambda conn: self._replace(conn, record, value, None))
+
+    async def update_record_tags(self, record: StorageRecord, tags: Mapping):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to update
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        _validate_record(record)
+        await self._write(
+            lambda conn: self._replace(conn, record, None, dict(tags or {}))
+        )
+
+    async def update_record(self, record: StorageRecord, value: str, tags: Mapping):
+        """
+        Update an existing stored record's value and tags in one transaction.
+
+        Args:
+            record: `StorageRecord` to update
+            value: The new value
+            tags: New tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        _validate_record(record)
+        await self._write(
+            lambda conn: self._replace(conn, record, value, dict(tags or {}))
+        )
+
+    async def delete_record_tags(
+        self, record: StorageRecord, tags: (Sequence, Mapping)
+    ):
+        """
+        Update an existing stored record's tags.
+
+        Args:
+            record: `StorageRecord` to delete
+            tags: Tags
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        _validate_record(record)
+
+        def delete_tags(conn: sqlite3.Connection):
+            seq = self._find_seq(conn, record)
+            if tags:
+                conn.executemany(SQL_DELETE_TAG, ((seq, name) for name in tags))
+
+        await self._write(delete_tags)
+
+    async def delete_record(self, record: StorageRecord):
+        """
+        Delete a record.
+
+        Args:
+            record: `StorageRecord` to delete
+
+        Raises:
+            StorageNotFoundError: If record not found
+
+        """
+        _validate_record(record)
+        await self._write(lambda conn: self._delete(conn, record))
+
+    async def apply_batch(self, operations: Sequence[StorageOperation]):
+        """
+        Apply a sequence of write operations in a single transaction.
+
+        A failing batch is rolled back, leaving the store unchanged.
+
+        Args:
+            operations: The `StorageOperation` instances to apply
+
+        Raises:
+            StorageError: If an operation is not supported or has no record ID
+            StorageDuplicateError: If a record to be added already exists
+            StorageNotFoundError: If a record to be updated or deleted is not found
+
+        """
+        for op in operations:
+            if op.action not in (OP_ADD, OP_UPDATE, OP_DELETE):
+                raise StorageError("Unsupported batch operation: {}".format(op.action))
+            _validate_record(op.record)
+
+        def apply(conn: sqlite3.Connection):
+            for op in operations:
+                if op.action == OP_ADD:
+                    self._insert(conn, op.record)
+                elif op.action == OP_UPDATE:
+                    self._replace(
+                        conn, op.record, op.record.value, dict(op.record.tags or {})
+                    )
+                else:
+                    self._delete(conn, op.record)
+
+        await self._write(apply)
+
+    async def count_records(self, type_filter: str, tag_query: Mapping = None) -> int:
+        """
+        Count the records matching a query, without fetching them.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+
+        """
+        condition, params = tag_query_sql(tag_query)
+        sql = f"SELECT count(*) FROM records r WHERE r.type = ? AND {condition}"
+        try:
+            return await self._pool.run(
+                lambda conn: conn.execute(sql, (type_filter, *params)).fetchone()[0]
+            )
+        except sqlite3.Error as err:
+            raise StorageSearchError(str(err)) from err
+
+    def search_records(
+        self,
+        type_filter: str,
+        tag_query: Mapping = None,
+        page_size: int = None,
+        options: Mapping = None,
+    ) -> "SqliteStorageRecordSearch":
+        """
+        Search stored records.
+
+        Args:
+            type_filter: Filter string
+            tag_query: Tags to query
+            page_size: Page size
+            options: Dictionary of backend-specific options
+
+        Returns:
+            An instance of `SqliteStorageRecordSearch`
+
+        """
+        return SqliteStorageRecordSearch(
+            self, type_filter, tag_query, page_size, options
+        )
+
+
+class SqliteStorageRecordSearch(BaseStorageRecordSearch):
+    """
+    Represent an active stored records search.
+
+    Each fetch continues from the sequence number of the last record returned,
+    so that no connection or cursor is held between fetches.
+    """
+
+    def __init__(
+        self,
+        store: SqliteStorage,
+        type_filter: str,
+        tag_query: Mapping,
+        page_size: int = None,
+        options: Mapping = None,
+    ):
+        """
+        Initialize a `SqliteStorageRecordSearch` instance.
+
+        Args:
+            store: `BaseStorage` to search
+            type_filter: Filter string
+            tag_query: Tags to search
+            page_size: Size of page to return
+            options: Dictionary of backend-specific options
+
+        """
+        super(SqliteStorageRecordSearch, self).__init__(
+            store, type_filter, tag_query, page_size, options
+        )
+        self._last_seq = None
+        self._sql = None
+        self._join_params = None
+        self._params = None
+
+    @property
+    def opened(self) -> bool:
+        """
+        Accessor for open state.
+
+        Returns:
+            True if opened, else False
+
+        """
+        return self._sql is not None
+
+    async def fetch(self, max_count: int) -> Sequence[StorageRecord]:
+        """
+        Fetch the next list of results from the store.
+
+        Args:
+            max_count: Max number of records to return
+
+        Returns:
+            A list of `StorageRecord`
+
+        Raises:
+            StorageSearchError: If the search query has not been opened
+
+        """
+        if not self.opened:
+            raise StorageSearchError("Search query has not been opened")
+        params = (
+            *self._join_params,
+            self.type_filter,
+            self._last_seq,
+            *self._params,
+            max_count,
+        )
+        retrieve_tags = self.option("retrieveTags", True)
+        sql = self._sql
+
+        def fetch(conn: sqlite3.Connection):
+            rows = conn.execute(sql, params).fetchall()
+            tags = {}
+            if rows and retrieve_tags:
+                marks = ", ".join("?" * len(rows))
+                for seq, name, value in conn.execute(
+                    "SELECT record_seq, name, value FROM tags"
+                    f" WHERE record_seq IN ({marks})",
+                    [row[0] for row in rows],
+                ):
+                    tags.setdefault(seq, {})[name] = value
+            return rows, tags
+
+        try:
+            rows, tags = await self.store.pool.run(fetch)
+        except sqlite3.Error as err:
+            raise StorageSearchError(str(err)) from err
+        if rows:
+            self._last_seq = rows[-1][0]
+        return [
+            StorageRecord(self.type_filter, value, tags.get(seq, {}), record_id)
+            for (seq, record_id, value) in rows
+        ]
+
+    async def open(self):
+        """
+        Start the search query.
+
+        Top-level equality clauses are joined on the tags index, which lists
+        the matching records in sequence order, so that each fetch reads only
+        as far as its last result. The clause matching the fewest records is
+        joined first. Other clauses are evaluated for each candidate record.
+        """
+        tag_query = dict(self.tag_query or {})
+        joins = [
+            (name, value)
+            for (name, value) in tag_query.items()
+            if name[:1] != "$" and isinstance(value, str)
+        ]
+        for (name, _) in joins:
+            del tag_query[name]
+        condition, params = tag_query_sql(tag_query)
+
+        if len(joins) > 1:
+
+            def probe(conn: sqlite3.Connection):
+                return [
+                    conn.execute(SQL_PROBE_TAG, (name, value, PROBE_LIMIT)).fetchone()[
+                        0
+                    ]
+                    for (name, value) in joins
+                ]
+
+            try:
+                counts = await self.store.pool.run(probe)
+            except sqlite3.Error as err:
+                raise StorageSearchError(str(err)) from err
+            joins = [
+                join for (_, join) in sorted(zip(counts, joins), key=lambda c: c[0])
+            ]
+
+        if joins:
+            # the unary + keeps the planner from driving the query by type
+            sql = "SELECT r.seq, r.id, r.value FROM tags t0"
+            sql += " JOIN records r ON r.seq = t0.record_seq"
+            for idx in range(1, len(joins)):
+                sql += (
+                    f" JOIN tags t{idx} ON t{idx}.record_seq = r.seq"
+                    f" AND t{idx}.name = ? AND t{idx}.value = ?"
+                )
+            sql += (
+                " WHERE t0.name = ? AND t0.value = ? AND +r.type = ?"
+                f" AND t0.record_seq > ? AND {condition} ORDER BY t0.record_seq LIMIT ?"
+            )
+            self._join_params = [v for join in joins[1:] for v in join] + list(joins[0])
+        else:
+            sql = (
+                "SELECT r.seq, r.id, r.value FROM records r"
+                f" WHERE r.type = ? AND r.seq > ? AND {condition}"
+                " ORDER BY r.seq LIMIT ?"
+            )
+            self._join_params = []
+        self._params = params
+        self._sql = sql
+        self._last_seq = 0
+
+    async def close(self):
+        """Dispose of the search query."""
+        self._sql = None
@@ -152,3 +152,219 @@ class TestBasicStorage:
         search = store.search_records("TYPE", {}, None)
         with pytest.raises(StorageSearchError):
             await search.fetch(100)
+
+    @pytest.mark.asyncio
+    async def test_count_find(self, store):
+        records = [
+            test_record({"a": str(idx % 2), "b": str(idx)}) for idx in range(5)
+        ]
+        for record in records:
+            await store.add_record(record)
+        await store.add_record(test_missing_record())
+
+        assert await store.count_records("TYPE") == 5
+        assert await store.count_records("TYPE", {"a": "0"}) == 3
+        assert await store.count_records("TYPE", {"b": {"$gt": "2"}}) == 2
+        assert await store.count_records("OTHER") == 0
+
+        assert await store.record_exists("TYPE", {"a": "1"})
+        assert not await store.record_exists("TYPE", {"a": "2"})
+
+        found = await store.find_records("TYPE", {"a": "0"}, 2)
+        assert len(found) == 2
+        assert all(record.tags["a"] == "0" for record in found)
+        assert await store.find_records("TYPE", {"a": "0"}, 0) == []
+
+        found = await store.find_record("TYPE", {"b": "3"})
+        assert found.id == records[3].id
+        with pytest.raises(StorageDuplicateError):
+            await store.find_record("TYPE", {"a": "1"})
+        with pytest.raises(StorageNotFoundError):
+            await store.find_record("TYPE", {"b": "9"})
+
+    @pytest.mark.asyncio
+    async def test_fetch_single(self, store):
+        for idx in range(3):
+            await store.add_record(test_record({"a": "1" if idx else "0"}))
+        search = store.search_records("TYPE", {"a": "0"})
+        assert (await search.fetch_single()).tags == {"a": "0"}
+        assert not search.opened
+        with pytest.raises(StorageDuplicateError):
+            await store.search_records("TYPE", {"a": "1"}).fetch_single()
+        with pytest.raises(StorageNotFoundError):
+            await store.search_records("TYPE", {"a": "2"}).fetch_single()
+
+    @pytest.mark.asyncio
+    async def test_tag_search(self, store):
+        records = [
+            test_record({"a": "1", "b": "x"}),
+            test_record({"a": "2", "b": "x"}),
+            test_record({"a": "3", "b": "y"}),
+            test_missing_record()._replace(tags={"a": "1"}),
+        ]
+        for record in records:
+            await store.add_record(record)
+
+        async def ids(query):
+            search = store.search_records("TYPE", query)
+            return [found.id for found in await search.fetch_all()]
+
+        assert await ids({"a": "1"}) == [records[0].id]
+        assert await ids({"b": "x"}) == [records[0].id, records[1].id]
+        assert await ids({"a": "1", "b": "y"}) == []
+        assert await ids({"a": {"$in": ["1", "3"]}}) == [
+            records[0].id,
+            records[2].id,
+        ]
+        assert await ids({"$or": [{"a": "2"}, {"b": "y"}]}) == [
+            records[1].id,
+            records[2].id,
+        ]
+        assert await ids({"$and": [{"b": "x"}, {"a": {"$gt": "1"}}]}) == [records[1].id]
+        assert await ids({"b": "x", "$not": {"a": "1"}}) == [records[1].id]
+        assert await ids({"a": {"$lte": "2"}}) == [records[0].id, records[1].id]
+        assert await ids({"c": "z"}) == []
+
+    @pytest.mark.asyncio
+    async def test_tag_search_index_updates(self, store):
+        record = test_record({"a": "A"})
+        await store.add_record(record)
+
+        async def found(query):
+            search = store.search_records("TYPE", query)
+            return len(await search.fetch_all())
+
+        await store.update_record_tags(record, {"a": "B"})
+        assert await found({"a": "A"}) == 0
+        assert await found({"a": "B"}) == 1
+
+        await store.delete_record_tags(record, ["a"])
+        assert await found({"a": "B"}) == 0
+        assert await found({}) == 1
+
+        await store.update_record_tags(record, {"a": "C"})
+        await store.delete_record(record)
+        assert await found({"a": "C"}) == 0
+        assert await found({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_update_record(self, store):
+        record = test_record({"a": "A"})
+        await store.add_record(record)
+        await store.update_record(record, "b", {"a": "B"})
+        result = await store.get_record(record.type, record.id)
+        assert result.value == "b"
+        assert result.tags == {"a": "B"}
+
+        missing = test_missing_record()
+        with pytest.raises(StorageNotFoundError):
+            await store.update_record(missing, missing.value, {})
+
+    @pytest.mark.asyncio
+    async def test_batch(self, store):
+        existing = test_record({"a": "A"})
+        removed = test_record()
+        await store.add_record(existing)
+        await store.add_record(removed)
+
+        async with store.batch() as batch:
+            added = test_record({"a": "X"})
+            batch.add_record(added)
+            batch.update_record(added, "updated", {"a": "Y"})
+            batch.update_record(existing, "changed", {"a": "B"})
+            batch.delete_record(removed)
+            transient = test_record()
+            batch.add_record(transient)
+            batch.delete_record(transient)
+            assert [op.action for op in batch.operations] == [
+                "add",
+                "update",
+                "delete",
+            ]
+            with pytest.raises(StorageDuplicateError):
+                batch.add_record(added)
+            with pytest.raises(StorageNotFoundError):
+                batch.update_record(removed, "value", {})
+
+        result = await store.get_record(added.type, added.id)
+        assert result.value == "updated"
+        assert result.tags == {"a": "Y"}
+        result = await store.get_record(existing.type, existing.id)
+        assert result.value == "changed"
+        assert result.tags == {"a": "B"}
+        with pytest.raises(StorageNotFoundError):
+            await store.get_record(removed.type, removed.id)
+        with pytest.raises(StorageNotFoundError):
+            await store.get_record(transient.type, transient.id)
+
+    @pytest.mark.asyncio
+    async def test_batch_callbacks(self, store):
+        record = test_record()
+        batch = store.batch()
+        committed = []
+
+        async def callback():
+            committed.append(await store.get_record(record.type, record.id))
+
+        batch.add_record(record)
+        batch.on_commit(callback)
+        assert batch.pending
+        await batch.commit()
+        assert not batch.pending
+        assert committed and committed[0].id == record.id
+
+        discarded = []
+        batch.delete_record(record)
+        batch.on_commit(callback)
+        batch.on_discard(lambda: discarded.append(1))
+        batch.discard()
+        assert not batch.pending
+        assert discarded == [1]
+        await store.get_record(record.type, record.id)
+
+        batch.add_record(record)
+        batch.on_commit(callback)
+        batch.on_discard(lambda: discarded.append(2))
+        with pytest.raises(StorageDuplicateError):
+            await batch.commit()
+        assert discarded == [1, 2]
+        assert len(committed) == 1
+
+
+class TestBasicStorageIndexes:
+    @pytest.mark.asyncio
+    async def test_index_cleanup(self, store):
+        record = test_record({"a": "A"})
+        await store.add_record(record)
+        await store.update_record_tags(record, {"a": "B"})
+        assert list(store._tag_index) == [(record.type, "a", "B")]
+        await store.delete_record(record)
+        assert not store._tag_index
+        assert not store._type_index
+        assert not store._record_seq
+
+    @pytest.mark.asyncio
+    async def test_plan_search(self, store):
+        records = [test_record({"a": str(idx % 2)}) for idx in range(4)]
+        for record in records:
+            await store.add_record(record)
+        assert store.plan_search("TYPE", {"a": "1"}) == [
+            records[1].id,
+            records[3].id,
+        ]
+        assert store.plan_search("TYPE", {"a": {"$gt": "0"}}) == [
+            record.id for record in records
+        ]
+        assert store.plan_search("TYPE", {"a": "2"}) == []
+        assert store.plan_search("OTHER", {}) == []
+
+    @pytest.mark.asyncio
+    async def test_batch_failure(self, store):
+        record = test_record()
+        batch = store.batch()
+        batch.add_record(record)
+        batch.delete_record(test_missing_record())
+        with pytest.raises(StorageNotFoundError):
+            await batch.commit()
+        with pytest.raises(StorageNotFoundError):
+            await store.get_record(record.type, record.id)
@@ -0,0 +1,100 @@
+import asyncio
+import os
+
+import pytest
+
+from aries_cloudagent.storage.error import StorageSearchError
+from aries_cloudagent.storage.record import StorageRecord
+from aries_cloudagent.storage.sqlite import SqliteStorage, tag_query_sql
+
+from . import test_basic_storage as basic
+
+
+@pytest.fixture()
+def store():
+    yield SqliteStorage()
+
+
+class TestSqliteStorage(basic.TestBasicStorage):
+    """Run the basic storage tests against an in-memory database."""
+
+
+class TestSqliteStorageFile:
+    @pytest.mark.asyncio
+    async def test_persist(self, tmp_path):
+        path = os.path.join(str(tmp_path), "storage.sqlite")
+        store = SqliteStorage(path=path, pool_size=3)
+        records = [
+            StorageRecord("TYPE", str(idx), {"a": str(idx % 3)}) for idx in range(50)
+        ]
+        await asyncio.gather(*(store.add_record(record) for record in records))
+        fetched = await asyncio.gather(
+            *(store.get_record("TYPE", record.id) for record in records)
+        )
+        assert fetched == records
+        await store.close()
+
+        store = SqliteStorage(path=path)
+        search = store.search_records("TYPE", {"a": "1"}, page_size=5)
+        found = await search.fetch_all()
+        assert [record.id for record in found] == [
+            record.id for record in records if record.tags["a"] == "1"
+        ]
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self):
+        store = SqliteStorage()
+        for idx in range(7):
+            await store.add_record(StorageRecord("TYPE", str(idx), {}, str(idx)))
+        search = store.search_records("TYPE")
+        await search.open()
+        pages = []
+        while True:
+            page = await search.fetch(3)
+            if not page:
+                break
+            pages.append([record.id for record in page])
+            # records added after the search position are found
+            if len(pages) == 1:
+                await store.add_record(StorageRecord("TYPE", "7", {}, "7"))
+        assert pages == [["0", "1", "2"], ["3", "4", "5"], ["6", "7"]]
+
+        search = store.search_records("TYPE", None, None, {"retrieveTags": False})
+        async with search:
+            assert (await search.fetch(1))[0].tags == {}
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_joined_tag_clauses(self):
+        store = SqliteStorage()
+        for idx in range(30):
+            tags = {"a": str(idx % 2), "b": str(idx % 5), "c": str(idx)}
+            await store.add_record(StorageRecord("TYPE", "{}", tags, str(idx)))
+        await store.add_record(StorageRecord("OTHER", "{}", {"a": "0"}, "x"))
+        query = {"a": "0", "b": "1", "c": {"$neq": "6"}}
+        search = store.search_records("TYPE", query, page_size=1)
+        found = await search.fetch_all()
+        assert [record.id for record in found] == ["16", "26"]
+        search = store.search_records("TYPE", {"a": "0", "$or": [{"b": "2"}]})
+        found = await search.fetch_all()
+        assert [record.id for record in found] == ["2", "12", "22"]
+        await store.close()
+
+    def test_tag_query_sql(self):
+        assert tag_query_sql({}) == ("1", [])
+        condition, params = tag_query_sql({"a": "1", "b": {"$in": ["x", "y"]}})
+        assert condition.count("SELECT record_seq") == 2
+        assert params == ["a", "1", "b", "x", "y"]
+        for query in (
+            {"$and": {}},
+            {"$not": []},
+            {"$unknown": "x"},
+            {"a": 1},
+            {"a": {"$in": "x"}},
+            {"a": {"$gt": 1}},
+            {"a": {"$like": "x"}},
+            {"a": {"$gt": "1", "$lt": "2"}},
+        ):
+            with pytest.raises(StorageSearchError):
+                tag_query_sql(query)
@@ -7,6 +7,12 @@ class TransportError(BaseError):
     """Base class for all transport errors."""
 
 
+class TransportBusyError(TransportError):
+    """The message was refused as the agent is busy, and may be sent again later."""
+
+    error_code = "transport_busy"
+
+
 class WireFormatError(TransportError):
     """Base class for wire-format errors."""
 
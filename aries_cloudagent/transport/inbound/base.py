@@ -33,6 +33,8 @@ class BaseInboundTransport(ABC):
         self._max_message_size = max_message_size
         self._scheme = scheme
         self.wire_format: BaseWireFormat = wire_format
+        # allow other processes to listen on the same port
+        self.reuse_port = False
 
     @property
     def max_message_size(self):
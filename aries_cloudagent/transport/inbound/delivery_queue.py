@@ -5,10 +5,22 @@ The delivery queue holds and manages messages that have not yet
 been delivered to their intended destination.
 
 """
+import base64
+import logging
+import os
 import time
+import uuid
+
+from collections import deque, OrderedDict
+from typing import Callable, Iterable, Sequence
+
+from ...connections.models.connection_target import ConnectionTarget
+from ...utils.json_codec import json_dumps, json_loads
 
 from ..outbound.message import OutboundMessage
 
+LOGGER = logging.getLogger(__name__)
+
 
 class QueuedMessage:
     """
@@ -17,14 +29,23 @@ class QueuedMessage:
     Allows tracking Metadata.
     """
 
-    def __init__(self, msg: OutboundMessage):
+    def __init__(
+        self,
+        msg: OutboundMessage,
+        *,
+        keys: Iterable[str] = None,
+        queue_id: str = None,
+        timestamp: float = None,
+    ):
         """
         Create Wrapper for queued message.
 
         Automatically sets timestamp on create.
         """
         self.msg = msg
-        self.timestamp = time.time()
+        self.keys = set(keys) if keys else set()
+        self.queue_id = queue_id or uuid.uuid4().hex
+        self.timestamp = time.time() if timestamp is None else timestamp
 
     def older_than(self, compare_timestamp: float) -> bool:
         """
@@ -38,6 +59,181 @@ class QueuedMessage:
         return self.timestamp < compare_timestamp
 
 
+class FileDeliveryStore:
+    """
+    Delivery queue store backed by an append-only log file.
+
+    Each queued message is appended as a line of JSON, followed by a line for
+    each recipient key it is removed from. When removed entries make up most of
+    the log, it is rewritten to hold only the messages still queued.
+
+    Only the encrypted payload of a message is written: messages which have
+    not been packed are held in memory only.
+    """
+
+    def __init__(self, path: str, *, compact_min: int = 1000):
+        """
+        Initialize a `FileDeliveryStore` instance.
+
+        Args:
+            path: The path of the log file
+            compact_min: The minimum number of log lines before compaction
+
+        """
+        self.path = path
+        self.compact_min = compact_min
+        self._lines = 0
+        self._file = None
+
+    @staticmethod
+    def retained(wrapped_msg: QueuedMessage) -> bool:
+        """Check whether a queued message is written to the log."""
+        return bool(wrapped_msg.msg.enc_payload)
+
+    @staticmethod
+    def encode_target(target: ConnectionTarget) -> dict:
+        """Convert a connection target to a JSON-compatible dict."""
+        return {
+            "did": target.did,
+            "endpoint": target.endpoint,
+            "label": target.label,
+            "recipient_keys": target.recipient_keys,
+            "routing_keys": target.routing_keys,
+            "sender_key": target.sender_key,
+        }
+
+    @classmethod
+    def encode_entry(cls, wrapped_msg: QueuedMessage) -> dict:
+        """Convert a queued message to a JSON-compatible log entry."""
+        msg = wrapped_msg.msg
+        entry = {
+            "op": "add",
+            "id": wrapped_msg.queue_id,
+            "keys": sorted(wrapped_msg.keys),
+            "timestamp": wrapped_msg.timestamp,
+            "connection_id": msg.connection_id,
+            "reply_thread_id": msg.reply_thread_id,
+            "reply_to_verkey": msg.reply_to_verkey,
+            "reply_from_verkey": msg.reply_from_verkey,
+        }
+        if isinstance(msg.enc_payload, bytes):
+            entry["enc_payload_b64"] = base64.b64encode(msg.enc_payload).decode("ascii")
+        else:
+            entry["enc_payload"] = msg.enc_payload
+        if msg.target:
+            entry["target"] = cls.encode_target(msg.target)
+        if msg.target_list:
+            entry["target_list"] = [
+                cls.encode_target(target) for target in msg.target_list
+            ]
+        return entry
+
+    @staticmethod
+    def decode_entry(entry: dict) -> QueuedMessage:
+        """Convert a log entry back to a queued message."""
+        if "enc_payload_b64" in entry:
+            enc_payload = base64.b64decode(entry["enc_payload_b64"])
+        else:
+            enc_payload = entry.get("enc_payload")
+        if not enc_payload:
+            # written by a previous version retaining unencrypted messages
+            raise ValueError("Delivery queue entry has no encrypted payload")
+        msg = OutboundMessage(
+            connection_id=entry.get("connection_id"),
+            enc_payload=enc_payload,
+            payload=None,
+            reply_thread_id=entry.get("reply_thread_id"),
+            reply_to_verkey=entry.get("reply_to_verkey"),
+            reply_from_verkey=entry.get("reply_from_verkey"),
+            target=ConnectionTarget(**entry["target"]) if entry.get("target") else None,
+            target_list=[
+                ConnectionTarget(**target) for target in entry.get("target_list") or ()
+            ],
+        )
+        return QueuedMessage(
+            msg, keys=entry["keys"], queue_id=entry["id"], timestamp=entry["timestamp"]
+        )
+
+    def _append(self, entry: dict):
+        if not self._file:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._file = open(self.path, "a")
+        self._file.write(json_dumps(entry) + "\n")
+        self._file.flush()
+        self._lines += 1
+
+    def add(self, wrapped_msg: QueuedMessage):
+        """Retain a queued message until it is removed for all its keys."""
+        if self.retained(wrapped_msg):
+            self._append(self.encode_entry(wrapped_msg))
+
+    def remove(self, queue_id: str, key: str = None, queued: dict = None):
+        """
+        Record the removal of a queued message.
+
+        Args:
+            queue_id: The identifier of the queued message
+            key: The recipient key the message was removed for, or `None` if
+                it was removed for all keys
+            queued: The messages remaining in the queue, used for compaction
+
+        """
+        entry = {"op": "del", "id": queue_id}
+        if key:
+            entry["key"] = key
+        self._append(entry)
+        if (
+            queued is not None
+            and self._lines >= self.compact_min
+            and self._lines > 2 * len(queued)
+        ):
+            self.compact(queued.values())
+
+    def load(self) -> Sequence[QueuedMessage]:
+        """Load the messages retained by a previous run, oldest first."""
+        queued = OrderedDict()
+        self._lines = 0
+        if os.path.exists(self.path):
+            with open(self.path) as log:
+                for line in log:
+                    self._lines += 1
+                    try:
+                        entry = json_loads(line)
+                        if entry["op"] == "add":
+                            queued[entry["id"]] = self.decode_entry(entry)
+                        elif entry["id"] in queued:
+                            wrapped_msg = queued[entry["id"]]
+                            if entry.get("key"):
+                                wrapped_msg.keys.discard(entry["key"])
+                            if not entry.get("key") or not wrapped_msg.keys:
+                                del queued[entry["id"]]
+                    except (ValueError, KeyError, TypeError):
+                        LOGGER.warning("Skipping corrupt delivery queue entry")
+            if self._lines > len(queued):
+                self.compact(queued.values())
+        return list(queued.values())
+
+    def compact(self, queued: Iterable[QueuedMessage]):
+        """Rewrite the log to hold only the messages still queued."""
+        self.close()
+        temp_path = self.path + ".tmp"
+        lines = 0
+        with open(temp_path, "w") as log:
+            for wrapped_msg in filter(self.retained, queued):
+                log.write(json_dumps(self.encode_entry(wrapped_msg)) + "\n")
+                lines += 1
+        os.replace(temp_path, self.path)
+        self._lines = lines
+
+    def close(self):
+        """Close the log file."""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
 class DeliveryQueue:
     """
     DeliveryQueue class.
@@ -45,15 +241,103 @@ class DeliveryQueue:
     Manages undelivered messages.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        store: FileDeliveryStore = None,
+        *,
+        ttl_seconds: int = 604800,
+        max_per_key: int = None,
+        max_total: int = None,
+    ) -> None:
         """
         Initialize an instance of DeliveryQueue.
 
-        This uses an in memory structure to queue messages.
+        Messages are held in a FIFO per recipient key, along with an index of all
+        queued messages in the order they were added, so that expiry only visits
+        the messages which have expired. When a quota is reached, the oldest
+        messages are dropped to make room.
+
+        Args:
+            store: Retain queued messages between restarts in this store
+            ttl_seconds: The number of seconds to hold a message, one week by default
+            max_per_key: The maximum number of messages held for a recipient key
+            max_total: The maximum number of messages held for all keys
+
         """
 
+        # each FIFO may hold stale entries for messages already removed for
+        # that key, which are skipped when read and dropped when compacted
         self.queue_by_key = {}
-        self.ttl_seconds = 604800  # one week
+        self.count_by_key = {}
+        # ordered by timestamp, from oldest to newest
+        self.messages = OrderedDict()
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_per_key = max_per_key
+        self.max_total = max_total
+        self.expired = 0
+        self.dropped = 0
+        if store:
+            for wrapped_msg in store.load():
+                self._enqueue(wrapped_msg)
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the delivery queue statistics."""
+        return {
+            "messages": len(self.messages),
+            "keys": len(self.count_by_key),
+            "expired": self.expired,
+            "dropped": self.dropped,
+        }
+
+    def _enqueue(self, wrapped_msg: QueuedMessage):
+        self.messages[wrapped_msg.queue_id] = wrapped_msg
+        for key in wrapped_msg.keys:
+            if key not in self.queue_by_key:
+                self.queue_by_key[key] = deque()
+            self.queue_by_key[key].append(wrapped_msg)
+            self.count_by_key[key] = self.count_by_key.get(key, 0) + 1
+
+    def _discard(self, wrapped_msg: QueuedMessage, key: str = None):
+        """Remove a message for one key, or for all its keys."""
+        keys = [key] if key else list(wrapped_msg.keys)
+        for key in keys:
+            if key not in wrapped_msg.keys:
+                continue
+            wrapped_msg.keys.discard(key)
+            count = self.count_by_key[key] - 1
+            if count:
+                self.count_by_key[key] = count
+                queue = self.queue_by_key[key]
+                if len(queue) > 2 * count + 16:
+                    self.queue_by_key[key] = deque(
+                        wm for wm in queue if key in wm.keys
+                    )
+            else:
+                del self.count_by_key[key]
+                del self.queue_by_key[key]
+        removed = not wrapped_msg.keys
+        if removed:
+            self.messages.pop(wrapped_msg.queue_id, None)
+        if self.store and self.store.retained(wrapped_msg):
+            self.store.remove(
+                wrapped_msg.queue_id,
+                None if removed else keys[0],
+                self.messages,
+            )
+
+    def _oldest(self, key: str) -> QueuedMessage:
+        """Find the oldest message queued for a key, dropping stale entries."""
+        queue = self.queue_by_key.get(key)
+        while queue and key not in queue[0].keys:
+            queue.popleft()
+        return queue[0] if queue else None
+
+    def _live_messages(self, key: str) -> Sequence[QueuedMessage]:
+        """List the messages still queued for a key."""
+        queue = self.queue_by_key.get(key)
+        return [wm for wm in queue if key in wm.keys] if queue else []
 
     def expire_messages(self, ttl=None):
         """
@@ -65,10 +349,12 @@ class DeliveryQueue:
 
         ttl_seconds = ttl or self.ttl_seconds
         horizon = time.time() - ttl_seconds
-        for key in self.queue_by_key.keys():
-            self.queue_by_key[key] = [
-                wm for wm in self.queue_by_key[key] if not wm.older_than(horizon)
-            ]
+        while self.messages:
+            wrapped_msg = next(iter(self.messages.values()))
+            if not wrapped_msg.older_than(horizon):
+                break
+            self._discard(wrapped_msg)
+            self.expired += 1
 
     def add_message(self, msg: OutboundMessage):
         """
@@ -79,16 +365,27 @@ class DeliveryQueue:
         Args:
             msg: The OutboundMessage to add
         """
+        self.expire_messages()
         keys = set()
-        if msg.target:
-            keys.update(msg.target.recipient_keys)
+        targets = ([msg.target] if msg.target else []) + msg.target_list
+        for target in targets:
+            keys.update(target.recipient_keys or ())
         if msg.reply_to_verkey:
             keys.add(msg.reply_to_verkey)
-        wrapped_msg = QueuedMessage(msg)
-        for recipient_key in keys:
-            if recipient_key not in self.queue_by_key:
-                self.queue_by_key[recipient_key] = []
-            self.queue_by_key[recipient_key].append(wrapped_msg)
+        if not keys:
+            return
+        for key in keys:
+            if self.max_per_key and self.count_by_key.get(key, 0) >= self.max_per_key:
+                self._discard(self._oldest(key), key)
+                self.dropped += 1
+        if self.max_total:
+            while len(self.messages) >= self.max_total:
+                self._discard(next(iter(self.messages.values())))
+                self.dropped += 1
+        wrapped_msg = QueuedMessage(msg, keys=keys)
+        self._enqueue(wrapped_msg)
+        if self.store:
+            self.store.add(wrapped_msg)
 
     def has_message_for_key(self, key: str):
         """
@@ -97,9 +394,7 @@ class DeliveryQueue:
         Args:
             key: The key to use for lookup
         """
-        if key in self.queue_by_key and len(self.queue_by_key[key]):
-            return True
-        return False
+        return self.message_count_for_key(key) > 0
 
     def message_count_for_key(self, key: str):
         """
@@ -108,10 +403,8 @@ class DeliveryQueue:
         Args:
             key: The key to use for lookup
         """
-        if key in self.queue_by_key:
-            return len(self.queue_by_key[key])
-        else:
-            return 0
+        self.expire_messages()
+        return self.count_by_key.get(key, 0)
 
     def get_one_message_for_key(self, key: str):
         """
@@ -120,19 +413,70 @@ class DeliveryQueue:
         Args:
             key: The key to use for lookup
         """
-        if key in self.queue_by_key:
-            return self.queue_by_key[key].pop(0).msg
+        messages = self.get_messages_for_key(key, 1)
+        if messages:
+            return messages[0]
 
-    def inspect_all_messages_for_key(self, key: str):
+    def get_messages_for_key(
+        self, key: str, count: int, select: Callable[[OutboundMessage], bool] = None,
+    ) -> Sequence[OutboundMessage]:
         """
-        Return all messages for key.
+        Remove and return up to `count` of the oldest messages for a key.
 
         Args:
             key: The key to use for lookup
+            count: The maximum number of messages to return
+            select: Optional. Only remove messages for which this returns True
         """
-        if key in self.queue_by_key:
+        self.expire_messages()
+        selected = []
+        if self._oldest(key):
             for wrapped_msg in self.queue_by_key[key]:
-                yield wrapped_msg.msg
+                if len(selected) >= count:
+                    break
+                if key in wrapped_msg.keys and (not select or select(wrapped_msg.msg)):
+                    selected.append(wrapped_msg)
+        for wrapped_msg in selected:
+            self._discard(wrapped_msg, key)
+        self._oldest(key)
+        return [wrapped_msg.msg for wrapped_msg in selected]
+
+    def requeue_messages_for_key(self, key: str, msgs: Sequence[OutboundMessage]):
+        """
+        Return messages to the front of the queue for a key.
+
+        The messages are delivered next, in the order given, and are held for a
+        fresh time limit.
+
+        Args:
+            key: The key to use for lookup
+            msgs: The messages previously removed for the key
+        """
+        if not msgs:
+            return
+        queue = self.queue_by_key.setdefault(key, deque())
+        wrapped_msgs = [QueuedMessage(msg, keys={key}) for msg in msgs]
+        for wrapped_msg in reversed(wrapped_msgs):
+            queue.appendleft(wrapped_msg)
+        for wrapped_msg in wrapped_msgs:
+            self.messages[wrapped_msg.queue_id] = wrapped_msg
+            if self.store:
+                self.store.add(wrapped_msg)
+        self.count_by_key[key] = self.count_by_key.get(key, 0) + len(wrapped_msgs)
+
+    def inspect_all_messages_for_key(self, key: str, limit: int = None):
+        """
+        Return all messages for key.
+
+        Args:
+            key: The key to use for lookup
+            limit: Optional. The maximum number of messages to return
+        """
+        self.expire_messages()
+        for idx, wrapped_msg in enumerate(self._live_messages(key)):
+            if limit is not None and idx >= limit:
+                break
+            yield wrapped_msg.msg
 
     def remove_message_for_key(self, key: str, msg: OutboundMessage):
         """
@@ -142,10 +486,12 @@ class DeliveryQueue:
             key: The key to use for lookup
             msg: The message to remove from the queue
         """
-        if key in self.queue_by_key:
-            for wrapped_msg in self.queue_by_key[key]:
-                if wrapped_msg.msg == msg:
-                    self.queue_by_key[key].remove(wrapped_msg)
-                    if not self.queue_by_key[key]:
-                        del self.queue_by_key[key]
-                    break  # exit processing loop
+        for wrapped_msg in self._live_messages(key):
+            if wrapped_msg.msg == msg:
+                self._discard(wrapped_msg, key)
+                break  # exit processing loop
+
+    def close(self):
+        """Release the resources held by the store, if any."""
+        if self.store:
+            self.store.close()
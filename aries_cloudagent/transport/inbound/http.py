@@ -6,6 +6,8 @@ from aiohttp import web
 
 from ...messaging.error import MessageParseError
 
+from ..error import TransportBusyError
+
 from .base import BaseInboundTransport, InboundTransportSetupError
 
 LOGGER = logging.getLogger(__name__)
@@ -50,7 +52,12 @@ class HttpTransport(BaseInboundTransport):
         app = await self.make_application()
         runner = web.AppRunner(app)
         await runner.setup()
-        self.site = web.TCPSite(runner, host=self.host, port=self.port)
+        self.site = web.TCPSite(
+            runner,
+            host=self.host,
+            port=self.port,
+            reuse_port=self.reuse_port or None,
+        )
         try:
             await self.site.start()
         except OSError:
@@ -93,6 +100,8 @@ class HttpTransport(BaseInboundTransport):
                 inbound = await session.receive(body)
             except MessageParseError:
                 raise web.HTTPBadRequest()
+            except TransportBusyError:
+                raise web.HTTPServiceUnavailable(headers={"Retry-After": "1"})
 
             if inbound.receipt.direct_response_requested:
                 response = await session.wait_response()
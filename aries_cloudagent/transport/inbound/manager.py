@@ -10,6 +10,7 @@ from ...config.injection_context import InjectionContext
 from ...utils.classloader import ClassLoader, ModuleLoadError, ClassNotFoundError
 from ...utils.task_queue import CompletedTask, TaskQueue
 
+from ..error import WireFormatError
 from ..outbound.message import OutboundMessage
 from ..wire_format import BaseWireFormat
 
@@ -18,7 +19,7 @@ from .base import (
     InboundTransportConfiguration,
     InboundTransportRegistrationError,
 )
-from .delivery_queue import DeliveryQueue
+from .delivery_queue import DeliveryQueue, FileDeliveryStore
 from .message import InboundMessage
 from .session import InboundSession
 
@@ -63,8 +64,14 @@ class InboundTransportManager:
             )
 
         # Setup queue for undelivered messages
-        if self.context.settings.get("transport.enable_undelivered_queue"):
-            self.undelivered_queue = DeliveryQueue()
+        settings = self.context.settings
+        if settings.get("transport.enable_undelivered_queue"):
+            log_path = settings.get("transport.undelivered_queue_log")
+            self.undelivered_queue = DeliveryQueue(
+                FileDeliveryStore(log_path) if log_path else None,
+                max_per_key=settings.get("transport.undelivered_queue_max_per_key"),
+                max_total=settings.get("transport.undelivered_queue_max"),
+            )
 
         # self.session_limit = asyncio.Semaphore(50)
 
@@ -85,15 +92,14 @@ class InboundTransportManager:
                 f"Failed to load inbound transport {config.module}"
             ) from e
 
-        return self.register_transport(
-            imported_class(
-                config.host,
-                config.port,
-                self.create_session,
-                max_message_size=self.max_message_size,
-            ),
-            imported_class.__qualname__,
+        transport = imported_class(
+            config.host,
+            config.port,
+            self.create_session,
+            max_message_size=self.max_message_size,
         )
+        transport.reuse_port = bool(self.context.settings.get("transport.reuse_port"))
+        return self.register_transport(transport, imported_class.__qualname__)
 
     def register_transport(
         self, transport: BaseInboundTransport, transport_id: str
@@ -134,6 +140,8 @@ class InboundTransportManager:
         await self.task_queue.complete(None if wait else 0)
         for transport in self.running_transports.values():
             await transport.stop()
+        if self.undelivered_queue:
+            self.undelivered_queue.close()
 
     async def create_session(
         self,
@@ -219,13 +227,42 @@ class InboundTransportManager:
         Add an undelivered message to the undelivered queue.
 
         At this point the message could not be associated with an inbound
-        session and could not be delivered via an outbound transport.
+        session and could not be delivered via an outbound transport. When the
+        queue is retained on disk, the message is packed before it is queued.
         """
         if self.undelivered_queue:
-            self.undelivered_queue.add_message(outbound)
+            if self.undelivered_queue.store and not outbound.enc_payload:
+                self.task_queue.run(self.queue_encoded(outbound))
+            else:
+                self.undelivered_queue.add_message(outbound)
             return True
         return False
 
+    async def queue_encoded(self, outbound: OutboundMessage):
+        """Pack an undelivered message for its recipients and add it to the queue."""
+        targets = ([outbound.target] if outbound.target else []) + outbound.target_list
+        recipient_keys = []
+        for target in targets:
+            recipient_keys.extend(target.recipient_keys or ())
+        if outbound.reply_to_verkey:
+            recipient_keys.append(outbound.reply_to_verkey)
+        recipient_keys = list(dict.fromkeys(recipient_keys))
+        sender_key = next(
+            (target.sender_key for target in targets if target.sender_key),
+            outbound.reply_from_verkey,
+        )
+        if recipient_keys:
+            wire_format: BaseWireFormat = await self.context.inject(BaseWireFormat)
+            try:
+                # messages are picked up directly by the recipient, so no
+                # routing keys are applied
+                outbound.enc_payload = await wire_format.encode_message(
+                    self.context, outbound.payload, recipient_keys, None, sender_key
+                )
+            except WireFormatError as e:
+                LOGGER.warning("Error encoding undelivered message: %s", str(e))
+        self.undelivered_queue.add_message(outbound)
+
     def process_undelivered(self, session: InboundSession):
         """
         Interact with undelivered queue to find applicable messages.
@@ -234,14 +271,19 @@ class InboundTransportManager:
             session: The inbound session
         """
         if session and session.can_respond and self.undelivered_queue:
+            queue = self.undelivered_queue
             for key in session.reply_verkeys:
-                for (
-                    undelivered_message
-                ) in self.undelivered_queue.inspect_all_messages_for_key(key):
-                    if session.accept_response(undelivered_message):
+                while not session.response_buffer:
+                    messages = queue.get_messages_for_key(
+                        key, 1, select=session.select_outbound
+                    )
+                    if not messages:
+                        break
+                    if session.accept_response(messages[0]):
                         LOGGER.debug(
                             "Sending previously undelivered message via inbound session"
                         )
-                        self.undelivered_queue.remove_message_for_key(
-                            key, undelivered_message
-                        )
+                    else:
+                        # the session can only buffer one response at a time
+                        queue.requeue_messages_for_key(key, messages)
+                        return
@@ -6,7 +6,7 @@ from typing import Callable, Sequence, Union
 
 from ...config.injection_context import InjectionContext
 
-from ..error import WireFormatError
+from ..error import TransportBusyError, WireFormatError
 from ..outbound.message import OutboundMessage
 from ..wire_format import BaseWireFormat
 
@@ -181,9 +181,18 @@ class InboundSession:
         return message
 
     def receive_inbound(self, message: InboundMessage):
-        """Deliver the inbound message to the conductor."""
+        """
+        Deliver the inbound message to the conductor.
+
+        Raises:
+            TransportBusyError: If the message was refused and should be sent
+                again later
+
+        """
         self.process_inbound(message)
-        self.inbound_handler(message, can_respond=self.can_respond)
+        result = self.inbound_handler(message, can_respond=self.can_respond)
+        if isinstance(result, AcceptResult) and not result and result.retry:
+            raise TransportBusyError("Message refused, too many messages waiting")
 
     def select_outbound(self, message: OutboundMessage) -> bool:
         """Determine if an outbound message should be sent to this session.
@@ -1,4 +1,6 @@
 import asyncio
+import os
+import tempfile
 from unittest import mock, TestCase
 
 from asynctest import TestCase as AsyncTestCase
@@ -7,7 +9,7 @@ from asynctest import mock as async_mock
 from ....connections.models.connection_target import ConnectionTarget
 from ....transport.outbound.message import OutboundMessage
 
-from ..delivery_queue import DeliveryQueue
+from ..delivery_queue import DeliveryQueue, FileDeliveryStore
 
 
 class TestDeliveryQueue(AsyncTestCase):
@@ -64,3 +66,149 @@ class TestDeliveryQueue(AsyncTestCase):
     async def test_count_zero_with_no_items(self):
         queue = DeliveryQueue()
         assert queue.message_count_for_key("aaa") == 0
+
+    async def test_get_messages_for_key_fifo(self):
+        queue = DeliveryQueue()
+
+        msgs = [
+            OutboundMessage(
+                payload=str(i), target=ConnectionTarget(recipient_keys=["aaa"])
+            )
+            for i in range(5)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+        assert queue.get_messages_for_key("aaa", 3) == msgs[:3]
+        assert queue.get_messages_for_key("aaa", 3) == msgs[3:]
+        assert queue.get_messages_for_key("aaa", 3) == []
+        assert queue.stats["messages"] == 0
+
+    async def test_get_messages_for_key_select(self):
+        queue = DeliveryQueue()
+
+        msgs = [
+            OutboundMessage(
+                payload=str(i), target=ConnectionTarget(recipient_keys=["aaa"])
+            )
+            for i in range(4)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+        odd = lambda msg: int(msg.payload) % 2  # noqa: E731
+        assert queue.get_messages_for_key("aaa", 1, select=odd) == [msgs[1]]
+        assert queue.get_messages_for_key("aaa", 3, select=odd) == [msgs[3]]
+        assert queue.get_messages_for_key("aaa", 3, select=odd) == []
+        assert queue.message_count_for_key("aaa") == 2
+
+        queue.requeue_messages_for_key("aaa", [msgs[1]])
+        assert queue.get_messages_for_key("aaa", 3) == [msgs[1], msgs[0], msgs[2]]
+        assert queue.stats["messages"] == 0
+
+    async def test_shared_message_removed_per_key(self):
+        queue = DeliveryQueue()
+
+        t = ConnectionTarget(recipient_keys=["aaa", "bbb"])
+        msg = OutboundMessage(payload="x", target=t)
+        queue.add_message(msg)
+        queue.remove_message_for_key("aaa", msg)
+        assert queue.has_message_for_key("aaa") is False
+        assert queue.get_one_message_for_key("bbb") == msg
+        assert queue.stats == {"messages": 0, "keys": 0, "expired": 0, "dropped": 0}
+
+    async def test_quotas(self):
+        queue = DeliveryQueue(max_per_key=2, max_total=3)
+
+        msgs = [
+            OutboundMessage(
+                payload=str(i),
+                target=ConnectionTarget(recipient_keys=["aaa" if i < 3 else "bbb"]),
+            )
+            for i in range(5)
+        ]
+        for msg in msgs:
+            queue.add_message(msg)
+        assert list(queue.inspect_all_messages_for_key("aaa")) == [msgs[2]]
+        assert list(queue.inspect_all_messages_for_key("bbb")) == msgs[3:]
+        assert list(queue.inspect_all_messages_for_key("bbb", limit=1)) == msgs[3:4]
+        assert queue.stats["dropped"] == 2
+
+    async def test_expire_only_old(self):
+        queue = DeliveryQueue()
+
+        t = ConnectionTarget(recipient_keys=["aaa"])
+        old = OutboundMessage(payload="old", target=t)
+        new = OutboundMessage(payload="new", target=t)
+        queue.add_message(old)
+        queue.add_message(new)
+        next(iter(queue.messages.values())).timestamp -= queue.ttl_seconds + 1
+        assert queue.message_count_for_key("aaa") == 1
+        assert queue.get_one_message_for_key("aaa") == new
+        assert queue.stats["expired"] == 1
+
+    async def test_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "undelivered.jsonl")
+            queue = DeliveryQueue(FileDeliveryStore(path))
+            queue.add_message(
+                OutboundMessage(
+                    payload="x",
+                    enc_payload=b"\x01",
+                    target=ConnectionTarget(recipient_keys=["aaa", "bbb"]),
+                )
+            )
+            queue.add_message(
+                OutboundMessage(payload="y", enc_payload="Y", reply_to_verkey="ccc")
+            )
+            queue.add_message(
+                OutboundMessage(payload="z", enc_payload="Z", reply_to_verkey="ccc")
+            )
+            queue.add_message(
+                OutboundMessage(
+                    payload="w",
+                    enc_payload="W",
+                    target_list=[
+                        ConnectionTarget(endpoint="http://a", recipient_keys=["ddd"]),
+                        ConnectionTarget(endpoint="http://b", recipient_keys=["ddd"]),
+                    ],
+                )
+            )
+            # unencrypted messages are not written to the log
+            queue.add_message(OutboundMessage(payload="secret", reply_to_verkey="eee"))
+            queue.get_one_message_for_key("aaa")
+            queue.get_one_message_for_key("ccc")
+            queue.get_one_message_for_key("eee")
+            queue.close()
+            with open(path) as log:
+                assert "secret" not in log.read()
+
+            restored = DeliveryQueue(FileDeliveryStore(path))
+            assert restored.stats["messages"] == 3
+            assert restored.has_message_for_key("aaa") is False
+            msg = restored.get_one_message_for_key("bbb")
+            assert msg.payload is None
+            assert msg.enc_payload == b"\x01"
+            assert msg.target.recipient_keys == ["aaa", "bbb"]
+            assert restored.get_one_message_for_key("ccc").enc_payload == "Z"
+            msg = restored.get_one_message_for_key("ddd")
+            assert [target.endpoint for target in msg.target_list] == [
+                "http://a",
+                "http://b",
+            ]
+            restored.close()
+            with open(path) as log:
+                assert len(log.readlines()) == 6
+
+    async def test_store_compacts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "undelivered.jsonl")
+            queue = DeliveryQueue(FileDeliveryStore(path, compact_min=4))
+            for i in range(3):
+                queue.add_message(
+                    OutboundMessage(
+                        payload=str(i), enc_payload=str(i), reply_to_verkey="a"
+                    )
+                )
+            assert len(queue.get_messages_for_key("a", 2)) == 2
+            queue.close()
+            with open(path) as log:
+                assert len(log.readlines()) == 1
@@ -10,7 +10,7 @@ from ...wire_format import JsonWireFormat
 
 from ..http import HttpTransport
 from ..message import InboundMessage
-from ..session import InboundSession
+from ..session import AcceptResult, InboundSession
 
 
 class TestHttpTransport(AioHTTPTestCase):
@@ -22,6 +22,7 @@ class TestHttpTransport(AioHTTPTestCase):
         self.transport.wire_format = JsonWireFormat()
         self.result_event = None
         self.response_message = None
+        self.busy = False
         super(TestHttpTransport, self).setUp()
 
     def create_session(
@@ -54,6 +55,8 @@ class TestHttpTransport(AioHTTPTestCase):
             self.result_event.set()
         if self.response_message and self.session:
             self.session.set_response(self.response_message)
+        if self.busy:
+            return AcceptResult(False, retry=True)
 
     def get_application(self):
         return self.transport.make_application()
@@ -73,6 +76,17 @@ class TestHttpTransport(AioHTTPTestCase):
 
         await self.transport.stop()
 
+    @unittest_run_loop
+    async def test_send_message_busy(self):
+        await self.transport.start()
+
+        self.busy = True
+        async with self.client.post("/", json={"test": "message"}) as resp:
+            assert resp.status == 503
+            assert resp.headers["Retry-After"] == "1"
+
+        await self.transport.stop()
+
     @unittest_run_loop
     async def test_send_receive_message(self):
         await self.transport.start()
@@ -1,13 +1,18 @@
 import asyncio
+import os
+import tempfile
 
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
 from ....config.injection_context import InjectionContext
+from ....connections.models.connection_target import ConnectionTarget
 
 from ...outbound.message import OutboundMessage
+from ...wire_format import BaseWireFormat
 
 from ..base import InboundTransportConfiguration, InboundTransportRegistrationError
 from ..manager import InboundTransportManager
+from ..session import AcceptResult
 
 
 class TestInboundTransportManager(AsyncTestCase):
@@ -153,8 +158,75 @@ class TestInboundTransportManager(AsyncTestCase):
         session.add_reply_verkeys(test_verkey)
 
         with async_mock.patch.object(
+            session, "select_outbound", return_value=True
+        ), async_mock.patch.object(
             session, "accept_response", return_value=True
         ) as mock_accept:
             mgr.process_undelivered(session)
             mock_accept.assert_called_once_with(test_outbound)
         assert not mgr.undelivered_queue.has_message_for_key(test_verkey)
+
+    async def test_process_undelivered_retry(self):
+        context = InjectionContext()
+        context.update_settings({"transport.enable_undelivered_queue": True})
+        test_verkey = "test-verkey"
+        mgr = InboundTransportManager(context, None)
+        await mgr.setup()
+
+        test_outbounds = [OutboundMessage(payload=str(i)) for i in range(2)]
+        for test_outbound in test_outbounds:
+            test_outbound.reply_to_verkey = test_verkey
+            assert mgr.return_undelivered(test_outbound)
+
+        session = await mgr.create_session(
+            "http", can_respond=True, wire_format=async_mock.MagicMock()
+        )
+        session.add_reply_verkeys(test_verkey)
+
+        with async_mock.patch.object(
+            session, "select_outbound", return_value=True
+        ), async_mock.patch.object(
+            session, "accept_response", return_value=AcceptResult(False, True)
+        ) as mock_accept:
+            mgr.process_undelivered(session)
+            mock_accept.assert_called_once_with(test_outbounds[0])
+        assert mgr.undelivered_queue.get_messages_for_key(test_verkey, 2) == (
+            test_outbounds
+        )
+
+    async def test_return_undelivered_encoded(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            context = InjectionContext(enforce_typing=False)
+            context.update_settings(
+                {
+                    "transport.enable_undelivered_queue": True,
+                    "transport.undelivered_queue_log": os.path.join(
+                        temp_dir, "undelivered.log"
+                    ),
+                }
+            )
+            wire_format = async_mock.MagicMock(
+                encode_message=async_mock.CoroutineMock(return_value="packed")
+            )
+            context.injector.bind_instance(BaseWireFormat, wire_format)
+            mgr = InboundTransportManager(context, None)
+            await mgr.setup()
+
+            test_outbound = OutboundMessage(
+                payload="plain",
+                reply_from_verkey="sender",
+                target_list=[
+                    ConnectionTarget(recipient_keys=["a", "b"]),
+                    ConnectionTarget(recipient_keys=["a"]),
+                ],
+            )
+            assert mgr.return_undelivered(test_outbound)
+            await mgr.task_queue
+            wire_format.encode_message.assert_awaited_once_with(
+                context, "plain", ["a", "b"], None, "sender"
+            )
+            assert mgr.undelivered_queue.has_message_for_key("b")
+            await mgr.stop()
+
+            with open(os.path.join(temp_dir, "undelivered.log")) as log:
+                assert "plain" not in log.read()
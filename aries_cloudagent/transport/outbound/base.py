@@ -17,6 +17,7 @@ class BaseOutboundTransport(ABC):
         """Initialize a `BaseOutboundTransport` instance."""
         self._collector = None
         self._wire_format = wire_format
+        self.connection_limit_per_host: int = None
 
     @property
     def collector(self) -> Collector:
@@ -0,0 +1,111 @@
+"""Grouping of broadcast targets which can share a single packed message."""
+
+from typing import Iterable, Sequence, Tuple
+
+from ...connections.models.connection_target import ConnectionTarget
+
+
+class BroadcastGroup:
+    """
+    The connections receiving the same packed copy of a broadcast message.
+
+    The message is packed once for the recipient keys of every member and the
+    result is delivered to the endpoint of each member. Members share a sender
+    key and transport, and no two members share an endpoint: an agent receiving
+    a single copy would only process it for one of its connections.
+
+    The protected header of the packed message lists the recipient keys of all
+    the members, so each member learns the keys of the others. Unless sharing
+    between connections is enabled, a group only holds the targets of a single
+    connection.
+    """
+
+    def __init__(self, transport_id: str, sender_key: str, routing_keys=None):
+        """Initialize the broadcast group."""
+        self.transport_id = transport_id
+        self.sender_key = sender_key
+        self.routing_keys = list(routing_keys) if routing_keys else []
+        self.endpoints = set()
+        self.members = []
+        self.recipient_count = 0
+
+    @property
+    def recipient_keys(self) -> Sequence[str]:
+        """Accessor for the recipient keys of all members."""
+        keys = []
+        for _connection_id, target in self.members:
+            keys.extend(target.recipient_keys)
+        return keys
+
+    def accepts(self, target: ConnectionTarget, max_recipients: int) -> bool:
+        """Check whether a target may join the group."""
+        if not self.members:
+            return True
+        return (
+            target.endpoint not in self.endpoints
+            and self.recipient_count + len(target.recipient_keys) <= max_recipients
+        )
+
+    def add(self, connection_id: str, target: ConnectionTarget):
+        """Add a connection target to the group."""
+        self.endpoints.add(target.endpoint)
+        self.members.append((connection_id, target))
+        self.recipient_count += len(target.recipient_keys)
+
+
+def group_targets(
+    targets: Iterable[Tuple[str, ConnectionTarget, str]],
+    max_recipients: int,
+    shared: bool = False,
+) -> Sequence[BroadcastGroup]:
+    """
+    Group the targets of a broadcast message by the packed message they can share.
+
+    Args:
+        targets: The connection ID, selected target and transport ID of each
+            connection receiving the message
+        max_recipients: The maximum number of recipient keys in one packed message
+        shared: Whether targets of different connections may share a packed
+            message, which discloses their recipient keys to each other
+
+    Returns:
+        The broadcast groups, in the order of their first member
+
+    """
+    groups = []
+    candidates = {}
+    first_open = {}
+    next_slot = {}
+    for connection_id, target, transport_id in targets:
+        if target.routing_keys:
+            # a forward message names a single recipient key, so routed
+            # targets cannot share a packed message
+            group = BroadcastGroup(transport_id, target.sender_key, target.routing_keys)
+            group.add(connection_id, target)
+            groups.append(group)
+            continue
+
+        key = (transport_id, target.sender_key)
+        if not shared:
+            key += (connection_id,)
+        key_groups = candidates.setdefault(key, [])
+        index = max(next_slot.get((key, target.endpoint), 0), first_open.get(key, 0))
+        while index < len(key_groups) and not key_groups[index].accepts(
+            target, max_recipients
+        ):
+            index += 1
+        if index == len(key_groups):
+            group = BroadcastGroup(transport_id, target.sender_key)
+            key_groups.append(group)
+            groups.append(group)
+        key_groups[index].add(connection_id, target)
+        next_slot[(key, target.endpoint)] = index + 1
+
+        start = first_open.get(key, 0)
+        while (
+            start < len(key_groups)
+            and key_groups[start].recipient_count >= max_recipients
+        ):
+            start += 1
+        first_open[key] = start
+    return groups
@@ -25,7 +25,13 @@ class HttpTransport(BaseOutboundTransport):
     async def start(self):
         """Start the transport."""
         session_args = {}
-        self.connector = TCPConnector(limit=200, limit_per_host=50)
+        # keep-alive connections are pooled per host, sized to match the
+        # concurrent deliveries allowed for each endpoint
+        self.connector = TCPConnector(
+            limit=200,
+            limit_per_host=self.connection_limit_per_host or 50,
+            keepalive_timeout=30,
+        )
         if self.collector:
             session_args["trace_configs"] = [
                 StatsTracer(self.collector, "outbound-http:")
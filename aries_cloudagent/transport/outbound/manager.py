@@ -1,19 +1,24 @@
 """Outbound transport manager."""
 
 import asyncio
-import json
+import heapq
 import logging
+import random
 import time
+import uuid
 
-from typing import Callable, Type, Union
+from collections import deque
+from typing import Callable, Mapping, Sequence, Tuple, Type, Union
 from urllib.parse import urlparse
 
 from ...connections.models.connection_target import ConnectionTarget
 from ...config.injection_context import InjectionContext
 from ...utils.classloader import ClassLoader, ModuleLoadError, ClassNotFoundError
+from ...utils.json_codec import json_dumps
 from ...utils.stats import Collector
 from ...utils.task_queue import CompletedTask, TaskQueue, task_exc_info
 
+from ..stats import LatencyHistogram
 from ..wire_format import BaseWireFormat
 
 from .base import (
@@ -21,7 +26,14 @@ from .base import (
     OutboundDeliveryError,
     OutboundTransportRegistrationError,
 )
+from .broadcast import BroadcastGroup, group_targets
 from .message import OutboundMessage
+from .store import (
+    BaseOutboundStore,
+    FileOutboundStore,
+    MemoryOutboundStore,
+    StoredOutboundMessage,
+)
 
 LOGGER = logging.getLogger(__name__)
 MODULE_BASE_PATH = "aries_cloudagent.transport.outbound"
@@ -46,10 +58,13 @@ class QueuedOutboundMessage:
     ):
         """Initialize the queued outbound message."""
         self.context = context
+        self.durable = True
         self.endpoint = target and target.endpoint
+        self.delivery_start: float = None
         self.error: Exception = None
         self.message = message
         self.payload: Union[str, bytes] = None
+        self.queue_id = uuid.uuid4().hex
         self.retries = None
         self.retry_at: float = None
         self.state = self.STATE_NEW
@@ -57,10 +72,112 @@ class QueuedOutboundMessage:
         self.task: asyncio.Task = None
         self.transport_id: str = transport_id
 
+    def __lt__(self, other: "QueuedOutboundMessage") -> bool:
+        """Order messages with the same retry time arbitrarily but consistently."""
+        return self.queue_id < other.queue_id
+
+
+def endpoint_key(endpoint: str) -> str:
+    """Reduce an endpoint address to the scheme, host and port it is sent to."""
+    parsed = urlparse(endpoint)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class DeliveryLane:
+    """
+    The deliveries to a single endpoint, identified by scheme, host and port.
+
+    Each lane limits the number of concurrent deliveries to its endpoint, so that
+    one slow endpoint cannot occupy every slot of the shared task queue. After
+    repeated failures the lane is parked: its messages wait without consuming
+    retry attempts until the park time expires, when a single trial delivery
+    is made to test whether the endpoint has recovered.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        max_active: int = 20,
+        failure_threshold: int = 5,
+        park_duration: float = 30.0,
+        park_max: float = 600.0,
+    ):
+        """Initialize the delivery lane."""
+        self.key = key
+        self.max_active = max_active
+        self.failure_threshold = failure_threshold
+        self.park_duration = park_duration
+        self.park_max = park_max
+        self.active = 0
+        self.delivered = 0
+        self.failed = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+        self.parked_until: float = None
+        self.park_count = 0
+        self.pending = deque()
+
+    @property
+    def parked(self) -> bool:
+        """Accessor for the circuit breaker state."""
+        return self.parked_until is not None
+
+    def ready(self, now: float) -> bool:
+        """Check whether a pending message may be delivered now."""
+        if not self.pending:
+            return False
+        if self.parked:
+            # once the park time has expired, allow a single trial delivery
+            return now >= self.parked_until and not self.active
+        return self.active < self.max_active
+
+    def record_success(self, latency: float):
+        """Record a successful delivery, closing the circuit breaker."""
+        self.delivered += 1
+        self.failures = 0
+        self.latency.observe(latency)
+        self.parked_until = None
+        self.park_count = 0
+
+    def record_failure(self, now: float):
+        """Record a failed delivery, parking the lane if necessary."""
+        self.failed += 1
+        self.failures += 1
+        if self.parked or self.failures >= self.failure_threshold:
+            self.park_count += 1
+            self.parked_until = now + min(
+                self.park_max, self.park_duration * 2 ** min(self.park_count - 1, 16)
+            )
+            LOGGER.warning(
+                "Parking delivery to %s after %d failures", self.key, self.failures
+            )
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the lane statistics."""
+        return {
+            "pending": len(self.pending),
+            "active": self.active,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "parked": self.parked,
+            "latency": self.latency.to_dict(),
+        }
+
 
 class OutboundTransportManager:
     """Outbound transport manager class."""
 
+    RETRY_BASE_DELAY = 2.0
+    RETRY_MAX_DELAY = 300.0
+    LANE_MAX_ACTIVE = 20
+    LANE_FAILURE_THRESHOLD = 5
+    LANE_PARK_DURATION = 30.0
+    LANE_PARK_MAX = 600.0
+    LANE_LIMIT = 1000
+    BROADCAST_MAX_RECIPIENTS = 100
+
     def __init__(
         self, context: InjectionContext, handle_not_delivered: Callable = None
     ):
@@ -75,12 +192,20 @@ class OutboundTransportManager:
         self.context = context
         self.loop = asyncio.get_event_loop()
         self.handle_not_delivered = handle_not_delivered
-        self.outbound_buffer = []
+        self.lanes = {}
+        self.broadcast_shared = False
+        self.lane_max_active = self.LANE_MAX_ACTIVE
+        self.lane_prune_at = self.LANE_LIMIT
+        self.lanes_pending = set()
+        self.outbound_buffer = set()
         self.outbound_event = asyncio.Event()
         self.outbound_new = []
+        self.outbound_ready = deque()
+        self.outbound_retry = []
         self.registered_schemes = {}
         self.registered_transports = {}
         self.running_transports = {}
+        self.store: BaseOutboundStore = None
         self.task_queue = TaskQueue(max_active=200)
         self._process_task: asyncio.Task = None
 
@@ -92,6 +217,23 @@ class OutboundTransportManager:
         for outbound_transport in outbound_transports:
             self.register(outbound_transport)
 
+        self.lane_max_active = int(
+            self.context.settings.get(
+                "transport.outbound_endpoint_concurrency", self.LANE_MAX_ACTIVE
+            )
+        )
+
+        self.broadcast_shared = bool(
+            self.context.settings.get("transport.broadcast_shared_pack")
+        )
+
+        self.store = await self.context.inject(BaseOutboundStore, required=False)
+        if not self.store:
+            queue_log = self.context.settings.get("transport.outbound_queue_log")
+            self.store = (
+                FileOutboundStore(queue_log) if queue_log else MemoryOutboundStore()
+            )
+
     def register(self, module: str) -> str:
         """
         Register a new outbound transport by module path.
@@ -165,13 +307,45 @@ class OutboundTransportManager:
         """Start a registered transport."""
         transport = self.registered_transports[transport_id]()
         transport.collector = await self.context.inject(Collector, required=False)
+        transport.connection_limit_per_host = self.lane_max_active
         await transport.start()
         self.running_transports[transport_id] = transport
 
     async def start(self):
         """Start all transports and feed messages from the queue."""
-        for transport_id in self.registered_transports:
+        started = [
             self.task_queue.run(self.start_transport(transport_id))
+            for transport_id in self.registered_transports
+        ]
+        if self.store:
+            self.task_queue.run(self.replay_stored(started))
+
+    async def replay_stored(self, started: list = None):
+        """Requeue the messages left undelivered by a previous run."""
+        if started:
+            await asyncio.wait(started)
+        replayed = 0
+        for stored in self.store.load():
+            try:
+                transport_id = self.get_running_transport_for_endpoint(stored.endpoint)
+            except OutboundDeliveryError:
+                LOGGER.warning(
+                    "Dropping stored outbound message for unsupported endpoint: %s",
+                    stored.endpoint,
+                )
+                self.store.remove(stored.queue_id)
+                continue
+            queued = QueuedOutboundMessage(None, None, None, transport_id)
+            queued.queue_id = stored.queue_id
+            queued.endpoint = stored.endpoint
+            queued.payload = stored.payload
+            queued.retries = stored.retries
+            queued.state = QueuedOutboundMessage.STATE_PENDING
+            self.outbound_new.append(queued)
+            replayed += 1
+        if replayed:
+            LOGGER.info("Replaying %d undelivered outbound message(s)", replayed)
+            self.process_queued()
 
     async def stop(self, wait: bool = True):
         """Stop all running transports."""
@@ -181,6 +355,8 @@ class OutboundTransportManager:
         for transport in self.running_transports.values():
             await transport.stop()
         self.running_transports = {}
+        if self.store:
+            self.store.close()
 
     def get_registered_transport_for_scheme(self, scheme: str) -> str:
         """Find the registered transport ID for a given scheme."""
@@ -234,15 +410,7 @@ class OutboundTransportManager:
             outbound: The outbound message to deliver
         """
         targets = [outbound.target] if outbound.target else (outbound.target_list or [])
-        transport_id = None
-        for target in targets:
-            endpoint = target.endpoint
-            try:
-                transport_id = self.get_running_transport_for_endpoint(endpoint)
-            except OutboundDeliveryError:
-                pass
-            if transport_id:
-                break
+        target, transport_id = self.select_target(targets)
         if not transport_id:
             raise OutboundDeliveryError("No supported transport for outbound message")
 
@@ -251,6 +419,76 @@ class OutboundTransportManager:
         self.outbound_new.append(queued)
         self.process_queued()
 
+    def select_target(
+        self, targets: Sequence[ConnectionTarget]
+    ) -> Tuple[ConnectionTarget, str]:
+        """Find the first target with a running transport, and the transport ID."""
+        for target in targets:
+            try:
+                return target, self.get_running_transport_for_endpoint(target.endpoint)
+            except OutboundDeliveryError:
+                pass
+        return None, None
+
+    def enqueue_broadcast(
+        self,
+        context: InjectionContext,
+        payload: Union[str, bytes],
+        targets: Mapping[str, Sequence[ConnectionTarget]],
+    ) -> Sequence[str]:
+        """
+        Add a message sent to many connections to the queue.
+
+        The message is serialized once and encoded for each connection, and each
+        copy is then delivered through the lane for its endpoint. When the
+        `transport.broadcast_shared_pack` setting is enabled, connections which
+        can share a multi-recipient packed message are grouped and the message
+        is encoded once per group.
+
+        Args:
+            context: The context of the request
+            payload: The serialized message
+            targets: The connection targets, by connection ID
+
+        Returns:
+            The IDs of the connections with no supported transport
+
+        """
+        selected = []
+        unsupported = []
+        for connection_id, target_list in targets.items():
+            target, transport_id = self.select_target(target_list or ())
+            if transport_id:
+                selected.append((connection_id, target, transport_id))
+            else:
+                unsupported.append(connection_id)
+
+        for group in group_targets(
+            selected, self.BROADCAST_MAX_RECIPIENTS, self.broadcast_shared
+        ):
+            members = []
+            for connection_id, target in group.members:
+                outbound = OutboundMessage(
+                    connection_id=connection_id, payload=payload, target=target
+                )
+                queued = QueuedOutboundMessage(
+                    context, outbound, target, group.transport_id
+                )
+                queued.retries = 4
+                queued.state = QueuedOutboundMessage.STATE_ENCODE
+                self.outbound_buffer.add(queued)
+                members.append(queued)
+            task = self.task_queue.run(
+                self.perform_broadcast_encode(context, payload, group),
+                lambda completed, members=members: self.finished_broadcast_encode(
+                    members, completed
+                ),
+            )
+            for queued in members:
+                queued.task = task
+        self.process_queued()
+        return unsupported
+
     def enqueue_webhook(
         self, topic: str, payload: dict, endpoint: str, max_attempts: int = None
     ):
@@ -270,12 +508,96 @@ class OutboundTransportManager:
         transport_id = self.get_running_transport_for_endpoint(endpoint)
         queued = QueuedOutboundMessage(None, None, None, transport_id)
         queued.endpoint = f"{endpoint}/topic/{topic}/"
-        queued.payload = json.dumps(payload)
+        queued.payload = json_dumps(payload)
         queued.state = QueuedOutboundMessage.STATE_PENDING
         queued.retries = 4 if max_attempts is None else max_attempts - 1
+        # webhook payloads are not encrypted, so they are not written to the store
+        queued.durable = False
         self.outbound_new.append(queued)
         self.process_queued()
 
+    def persist_queued(self, queued: QueuedOutboundMessage):
+        """Retain an encoded message in the outbound store until it is finished."""
+        if self.store and queued.durable:
+            self.store.add(
+                StoredOutboundMessage(
+                    queued.queue_id, queued.endpoint, queued.payload, queued.retries
+                )
+            )
+
+    def retry_delay(self, queued: QueuedOutboundMessage) -> float:
+        """
+        Determine the delay before retrying delivery of a message.
+
+        The delay grows exponentially with the number of consecutive failures
+        for the endpoint, so that messages to an unresponsive endpoint back off
+        together, and is randomized to spread out the retries.
+        """
+        failures = max(self.lane_for(queued.endpoint).failures, 1)
+        delay = min(
+            self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** min(failures - 1, 16)
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    def lane_for(self, endpoint: str) -> DeliveryLane:
+        """Get the delivery lane for an endpoint, creating it if necessary."""
+        key = endpoint_key(endpoint)
+        lane = self.lanes.get(key)
+        if not lane:
+            if len(self.lanes) >= self.lane_prune_at:
+                self._prune_lanes()
+                # when most lanes are busy, wait for the number to double
+                # before scanning them again
+                self.lane_prune_at = max(self.LANE_LIMIT, 2 * len(self.lanes))
+            lane = DeliveryLane(
+                key,
+                max_active=self.lane_max_active,
+                failure_threshold=self.LANE_FAILURE_THRESHOLD,
+                park_duration=self.LANE_PARK_DURATION,
+                park_max=self.LANE_PARK_MAX,
+            )
+            self.lanes[key] = lane
+        return lane
+
+    def _prune_lanes(self):
+        """Discard the lanes for endpoints with no outstanding deliveries."""
+        for key, lane in list(self.lanes.items()):
+            if not (lane.pending or lane.active or lane.parked or lane.failures):
+                del self.lanes[key]
+
+    def lane_stats(self) -> dict:
+        """Get the statistics for each endpoint with outbound deliveries."""
+        return {key: lane.stats for key, lane in self.lanes.items()}
+
+    def _queue_delivery(self, queued: QueuedOutboundMessage):
+        """Add a message to the delivery lane for its endpoint."""
+        lane = self.lane_for(queued.endpoint)
+        queued.state = QueuedOutboundMessage.STATE_PENDING
+        lane.pending.append(queued)
+        self.lanes_pending.add(lane)
+
+    def _dispatch_lanes(self, now: float) -> float:
+        """
+        Start deliveries in each lane with pending messages, up to its limit.
+
+        Returns:
+            The earliest time at which a parked lane may resume, if any
+
+        """
+        resume_at = None
+        for lane in list(self.lanes_pending):
+            while lane.ready(now):
+                queued = lane.pending.popleft()
+                lane.active += 1
+                queued.state = QueuedOutboundMessage.STATE_DELIVER
+                self.deliver_queued_message(queued)
+            if not lane.pending:
+                self.lanes_pending.discard(lane)
+            elif lane.parked and not lane.active:
+                if resume_at is None or lane.parked_until < resume_at:
+                    resume_at = lane.parked_until
+        return resume_at
+
     def process_queued(self) -> asyncio.Task:
         """
         Start the process to deliver queued messages if necessary.
@@ -308,59 +630,48 @@ class OutboundTransportManager:
         while True:
             self.outbound_event.clear()
             loop_time = time.perf_counter()
-            upd_buffer = []
-
-            for queued in self.outbound_buffer:
-                if queued.state == QueuedOutboundMessage.STATE_DONE:
-                    if queued.error:
-                        LOGGER.exception(
-                            "Outbound message could not be delivered to %s",
-                            queued.endpoint,
-                            exc_info=queued.error,
-                        )
-                        if self.handle_not_delivered:
-                            self.handle_not_delivered(queued.context, queued.message)
-                    continue  # remove from buffer
-
-                deliver = False
-
-                if queued.state == QueuedOutboundMessage.STATE_PENDING:
-                    deliver = True
-                elif queued.state == QueuedOutboundMessage.STATE_RETRY:
-                    if queued.retry_at < loop_time:
-                        queued.retry_at = None
-                        deliver = True
-
-                if deliver:
-                    queued.state = QueuedOutboundMessage.STATE_DELIVER
-                    self.deliver_queued_message(queued)
-
-                upd_buffer.append(queued)
-
-            new_pending = 0
+
+            # messages awaiting retry are ordered by their retry time
+            while self.outbound_retry and self.outbound_retry[0][0] <= loop_time:
+                _, queued = heapq.heappop(self.outbound_retry)
+                queued.retry_at = None
+                self.outbound_ready.append(queued)
+
+            while self.outbound_ready:
+                self._queue_delivery(self.outbound_ready.popleft())
+
             new_messages = self.outbound_new
             self.outbound_new = []
 
             for queued in new_messages:
+                self.outbound_buffer.add(queued)
                 if queued.state == QueuedOutboundMessage.STATE_NEW:
                     if queued.message and queued.message.enc_payload:
                         queued.payload = queued.message.enc_payload
-                        queued.state = QueuedOutboundMessage.STATE_PENDING
-                        new_pending += 1
+                        self.persist_queued(queued)
+                        self._queue_delivery(queued)
                     else:
                         queued.state = QueuedOutboundMessage.STATE_ENCODE
                         self.encode_queued_message(queued)
                 else:
-                    new_pending += 1
+                    self._queue_delivery(queued)
 
-                upd_buffer.append(queued)
+            wake_at = self._dispatch_lanes(loop_time)
 
-            self.outbound_buffer = upd_buffer
-            if self.outbound_buffer:
-                if not new_pending:
-                    await self.outbound_event.wait()
-            else:
+            if not self.outbound_buffer:
                 break
+            if self.outbound_new or self.outbound_ready:
+                continue
+            if self.outbound_retry:
+                retry_at = self.outbound_retry[0][0]
+                wake_at = retry_at if wake_at is None else min(wake_at, retry_at)
+            timeout = None
+            if wake_at is not None:
+                timeout = max(wake_at - time.perf_counter(), 0)
+            try:
+                await asyncio.wait_for(self.outbound_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
     def encode_queued_message(self, queued: QueuedOutboundMessage) -> asyncio.Task:
         """Kick off encoding of a queued message."""
@@ -386,17 +697,53 @@ class OutboundTransportManager:
 
     def finished_encode(self, queued: QueuedOutboundMessage, completed: CompletedTask):
         """Handle completion of queued message encoding."""
+        queued.task = None
         if completed.exc_info:
             queued.error = completed.exc_info
-            queued.state = QueuedOutboundMessage.STATE_DONE
+            self.finished_queued(queued)
         else:
+            self.persist_queued(queued)
             queued.state = QueuedOutboundMessage.STATE_PENDING
-        queued.task = None
+            self.outbound_ready.append(queued)
+        self.process_queued()
+
+    async def perform_broadcast_encode(
+        self,
+        context: InjectionContext,
+        payload: Union[str, bytes],
+        group: BroadcastGroup,
+    ) -> Union[str, bytes]:
+        """Encode a broadcast message once for all the members of a group."""
+        transport = self.get_transport_instance(group.transport_id)
+        wire_format = transport.wire_format or await context.inject(BaseWireFormat)
+        return await wire_format.encode_message(
+            context,
+            payload,
+            group.recipient_keys,
+            group.routing_keys,
+            group.sender_key,
+        )
+
+    def finished_broadcast_encode(
+        self, members: Sequence[QueuedOutboundMessage], completed: CompletedTask
+    ):
+        """Handle completion of broadcast message encoding for a group."""
+        for queued in members:
+            queued.task = None
+            if completed.exc_info:
+                queued.error = completed.exc_info
+                self.finished_queued(queued)
+            else:
+                queued.payload = completed.task.result()
+                self.persist_queued(queued)
+                queued.state = QueuedOutboundMessage.STATE_PENDING
+                self.outbound_ready.append(queued)
         self.process_queued()
 
     def deliver_queued_message(self, queued: QueuedOutboundMessage) -> asyncio.Task:
         """Kick off delivery of a queued message."""
         transport = self.get_transport_instance(queued.transport_id)
+        queued.delivery_start = time.perf_counter()
         queued.task = self.task_queue.run(
             transport.handle_message(queued.payload, queued.endpoint),
             lambda completed: self.finished_deliver(queued, completed),
@@ -405,8 +752,13 @@ class OutboundTransportManager:
 
     def finished_deliver(self, queued: QueuedOutboundMessage, completed: CompletedTask):
         """Handle completion of queued message delivery."""
+        queued.task = None
+        now = time.perf_counter()
+        lane = self.lane_for(queued.endpoint)
+        lane.active = max(lane.active - 1, 0)
         if completed.exc_info:
             queued.error = completed.exc_info
+            lane.record_failure(now)
             LOGGER.exception(
                 "Outbound message could not be delivered", exc_info=queued.error,
             )
@@ -414,15 +766,32 @@ class OutboundTransportManager:
             if queued.retries:
                 queued.retries -= 1
                 queued.state = QueuedOutboundMessage.STATE_RETRY
-                queued.retry_at = time.perf_counter() + 10
+                queued.retry_at = now + self.retry_delay(queued)
+                heapq.heappush(self.outbound_retry, (queued.retry_at, queued))
+                self.persist_queued(queued)
             else:
-                queued.state = QueuedOutboundMessage.STATE_DONE
+                self.finished_queued(queued)
         else:
             queued.error = None
-            queued.state = QueuedOutboundMessage.STATE_DONE
-        queued.task = None
+            lane.record_success(now - (queued.delivery_start or now))
+            self.finished_queued(queued)
         self.process_queued()
 
+    def finished_queued(self, queued: QueuedOutboundMessage):
+        """Remove a message which has been delivered or abandoned from the queue."""
+        queued.state = QueuedOutboundMessage.STATE_DONE
+        self.outbound_buffer.discard(queued)
+        if self.store and queued.durable and queued.payload is not None:
+            self.store.remove(queued.queue_id)
+        if queued.error:
+            LOGGER.exception(
+                "Outbound message could not be delivered to %s",
+                queued.endpoint,
+                exc_info=queued.error,
+            )
+            if self.handle_not_delivered and queued.message:
+                self.handle_not_delivered(queued.context, queued.message)
+
     async def flush(self):
         """Wait for any queued messages to be delivered."""
         proc_task = self.process_queued()
@@ -0,0 +1,241 @@
+"""Storage for outbound messages awaiting delivery."""
+
+import asyncio
+import base64
+import logging
+import os
+import threading
+
+from abc import ABC, abstractmethod
+from collections import namedtuple, OrderedDict
+from typing import Sequence
+
+from ...utils.json_codec import json_dumps, json_loads
+
+LOGGER = logging.getLogger(__name__)
+
+
+StoredOutboundMessage = namedtuple(
+    "StoredOutboundMessage", "queue_id endpoint payload retries"
+)
+
+
+class BaseOutboundStore(ABC):
+    """Base class for the store of undelivered outbound messages."""
+
+    @abstractmethod
+    def add(self, message: StoredOutboundMessage):
+        """Retain an encoded message until it is removed."""
+
+    @abstractmethod
+    def remove(self, queue_id: str):
+        """Remove a message once it has been delivered or abandoned."""
+
+    @abstractmethod
+    def load(self) -> Sequence[StoredOutboundMessage]:
+        """Load the messages retained by a previous run."""
+
+    def close(self):
+        """Release any resources held by the store."""
+
+
+class MemoryOutboundStore(BaseOutboundStore):
+    """Outbound store which keeps nothing beyond the life of the process."""
+
+    def add(self, message: StoredOutboundMessage):
+        """Retain an encoded message until it is removed."""
+
+    def remove(self, queue_id: str):
+        """Remove a message once it has been delivered or abandoned."""
+
+    def load(self) -> Sequence[StoredOutboundMessage]:
+        """Load the messages retained by a previous run."""
+        return []
+
+
+class LogWrite:
+    """A batch of lines to append to the log, or its replacement contents."""
+
+    def __init__(self, lines: Sequence[str] = None, rewrite: Sequence[str] = None):
+        """Initialize the log write."""
+        self.lines = lines
+        self.rewrite = rewrite
+        self.done = False
+
+
+class FileOutboundStore(BaseOutboundStore):
+    """
+    Outbound store backed by an append-only log file.
+
+    Each added message and each removal is appended as a line of JSON. When
+    removed entries make up most of the log, it is rewritten to hold only the
+    messages still awaiting delivery.
+
+    Lines are written by a worker thread, one batch at a time, so that the
+    event loop does not wait on the disk. Entries recorded while a batch is
+    being written are collected into the next batch.
+    """
+
+    def __init__(self, path: str, *, compact_min: int = 1000):
+        """
+        Initialize a `FileOutboundStore` instance.
+
+        Args:
+            path: The path of the log file
+            compact_min: The minimum number of log lines before compaction
+
+        """
+        self.path = path
+        self.compact_min = compact_min
+        self._pending = OrderedDict()
+        self._lines = 0
+        self._file = None
+        self._buffer = []
+        self._compact_due = False
+        self._io_lock = threading.Lock()
+        self._job: LogWrite = None
+
+    @staticmethod
+    def encode_entry(message: StoredOutboundMessage) -> dict:
+        """Convert a message to a JSON-compatible log entry."""
+        entry = {
+            "op": "add",
+            "id": message.queue_id,
+            "endpoint": message.endpoint,
+            "retries": message.retries,
+        }
+        if isinstance(message.payload, bytes):
+            entry["payload_b64"] = base64.b64encode(message.payload).decode("ascii")
+        else:
+            entry["payload"] = message.payload
+        return entry
+
+    @staticmethod
+    def decode_entry(entry: dict) -> StoredOutboundMessage:
+        """Convert a log entry back to a message."""
+        if "payload_b64" in entry:
+            payload = base64.b64decode(entry["payload_b64"])
+        else:
+            payload = entry["payload"]
+        return StoredOutboundMessage(
+            entry["id"], entry["endpoint"], payload, entry["retries"]
+        )
+
+    def _open(self):
+        if not self._file:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._file = open(self.path, "a")
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _append(self, entry: dict):
+        self._buffer.append(json_dumps(entry) + "\n")
+        self._lines += 1
+        self._start_write()
+
+    def _take_write(self) -> LogWrite:
+        """Collect the buffered entries, or the compacted log, for writing."""
+        if self._compact_due:
+            # the compacted log reflects every buffered entry
+            self._compact_due = False
+            self._buffer = []
+            rewrite = [
+                json_dumps(self.encode_entry(message)) + "\n"
+                for message in self._pending.values()
+            ]
+            self._lines = len(rewrite)
+            return LogWrite(rewrite=rewrite)
+        lines, self._buffer = self._buffer, []
+        return LogWrite(lines=lines)
+
+    def _write(self, job: LogWrite):
+        """Perform a log write, unless already performed."""
+        with self._io_lock:
+            if job.done:
+                return
+            job.done = True
+            if job.rewrite is not None:
+                self._close_file()
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w") as log:
+                    log.write("".join(job.rewrite))
+                os.replace(temp_path, self.path)
+            elif job.lines:
+                self._open()
+                self._file.write("".join(job.lines))
+                self._file.flush()
+
+    def _start_write(self):
+        """Hand the buffered entries to a worker thread, if none is writing."""
+        if self._job or not (self._buffer or self._compact_due):
+            return
+        self._job = self._take_write()
+        future = asyncio.get_event_loop().run_in_executor(None, self._write, self._job)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future: asyncio.Future):
+        self._job = None
+        if not future.cancelled() and future.exception():
+            LOGGER.error(
+                "Error writing outbound queue log: %s", future.exception(),
+            )
+        self._start_write()
+
+    def add(self, message: StoredOutboundMessage):
+        """Retain an encoded message until it is removed."""
+        self._pending[message.queue_id] = message
+        self._append(self.encode_entry(message))
+
+    def remove(self, queue_id: str):
+        """Remove a message once it has been delivered or abandoned."""
+        if self._pending.pop(queue_id, None):
+            self._append({"op": "del", "id": queue_id})
+            if self._lines >= self.compact_min and self._lines > 2 * len(
+                self._pending
+            ):
+                self._compact_due = True
+                self._start_write()
+
+    def load(self) -> Sequence[StoredOutboundMessage]:
+        """Load the messages retained by a previous run."""
+        self.flush()
+        self._pending = OrderedDict()
+        self._lines = 0
+        if os.path.exists(self.path):
+            with open(self.path) as log:
+                for line in log:
+                    self._lines += 1
+                    try:
+                        entry = json_loads(line)
+                        if entry["op"] == "add":
+                            self._pending[entry["id"]] = self.decode_entry(entry)
+                        else:
+                            self._pending.pop(entry["id"], None)
+                    except (ValueError, KeyError, TypeError):
+                        LOGGER.warning("Skipping corrupt outbound queue entry")
+            if self._lines > len(self._pending):
+                self.compact()
+        return list(self._pending.values())
+
+    def compact(self):
+        """Rewrite the log to hold only the messages awaiting delivery."""
+        self._compact_due = True
+        self.flush()
+
+    def flush(self):
+        """Write all recorded entries, waiting for any write in progress."""
+        if self._job:
+            self._write(self._job)
+        if self._buffer or self._compact_due:
+            self._write(self._take_write())
+
+    def close(self):
+        """Write all recorded entries and close the log file."""
+        self.flush()
+        with self._io_lock:
+            self._close_file()
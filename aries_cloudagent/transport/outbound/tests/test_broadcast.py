@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from ....connections.models.connection_target import ConnectionTarget
+
+from ..broadcast import group_targets
+
+
+def make_target(endpoint: str, key: str, sender: str = "sender", routing=None):
+    return ConnectionTarget(
+        endpoint=endpoint,
+        recipient_keys=[key],
+        routing_keys=routing,
+        sender_key=sender,
+    )
+
+
+class TestGroupTargets(TestCase):
+    def test_group(self):
+        targets = [
+            ("a", make_target("http://a", "ka"), "http"),
+            ("b", make_target("http://b", "kb"), "http"),
+            ("c", make_target("http://c", "kc", sender="other"), "http"),
+            ("d", make_target("ws://d", "kd"), "ws"),
+            ("e", make_target("http://e", "ke", routing=["r"]), "http"),
+            ("f", make_target("http://f", "kf", routing=["r"]), "http"),
+        ]
+        groups = group_targets(targets, 10, True)
+        assert [[m[0] for m in group.members] for group in groups] == [
+            ["a", "b"],
+            ["c"],
+            ["d"],
+            ["e"],
+            ["f"],
+        ]
+        assert groups[0].recipient_keys == ["ka", "kb"]
+        assert groups[0].sender_key == "sender"
+        assert groups[3].routing_keys == ["r"]
+
+    def test_group_connections(self):
+        targets = [
+            ("a", make_target("http://a", "ka"), "http"),
+            ("b", make_target("http://b", "kb"), "http"),
+        ]
+        groups = group_targets(targets, 10)
+        assert [group.recipient_keys for group in groups] == [["ka"], ["kb"]]
+
+    def test_group_endpoints(self):
+        targets = [
+            (str(idx), make_target(f"http://{idx % 2}", f"k{idx}"), "http")
+            for idx in range(5)
+        ]
+        groups = group_targets(targets, 10, True)
+        assert [[m[0] for m in group.members] for group in groups] == [
+            ["0", "1"],
+            ["2", "3"],
+            ["4"],
+        ]
+        for group in groups:
+            assert len(group.endpoints) == len(group.members)
+
+    def test_group_max_recipients(self):
+        targets = [
+            (str(idx), make_target(f"http://{idx}", f"k{idx}"), "http")
+            for idx in range(7)
+        ]
+        groups = group_targets(targets, 3, True)
+        assert [group.recipient_count for group in groups] == [3, 3, 1]
@@ -1,5 +1,7 @@
 import asyncio
 import json
+import os
+import tempfile
 
 from asynctest import TestCase as AsyncTestCase, mock as async_mock
 
@@ -7,12 +9,14 @@ from ....config.injection_context import InjectionContext
 from ....connections.models.connection_target import ConnectionTarget
 
 from ..manager import (
+    DeliveryLane,
     OutboundDeliveryError,
     OutboundTransportManager,
     OutboundTransportRegistrationError,
     QueuedOutboundMessage,
 )
 from ..message import OutboundMessage
+from ..store import BaseOutboundStore, FileOutboundStore
 
 
 class TestOutboundTransportManager(AsyncTestCase):
@@ -115,3 +119,283 @@ class TestOutboundTransportManager(AsyncTestCase):
             assert json.loads(queued.payload) == test_payload
             assert queued.retries == test_attempts - 1
             assert queued.state == QueuedOutboundMessage.STATE_PENDING
+
+    async def make_manager(self, context: InjectionContext = None, handle_message=None):
+        mgr = OutboundTransportManager(context or InjectionContext())
+        transport = async_mock.MagicMock()
+        transport.handle_message = handle_message or async_mock.CoroutineMock()
+        transport.start = async_mock.CoroutineMock()
+        transport.stop = async_mock.CoroutineMock()
+        transport.schemes = ["http"]
+        transport_cls = async_mock.MagicMock()
+        transport_cls.schemes = ["http"]
+        transport_cls.return_value = transport
+        mgr.register_class(transport_cls, "transport_cls")
+        await mgr.setup()
+        return mgr, transport
+
+    async def test_enqueue_broadcast(self):
+        context = InjectionContext()
+        mgr, transport = await self.make_manager(context)
+        transport.wire_format.encode_message = async_mock.CoroutineMock(
+            side_effect=lambda context, payload, recips, routing, sender: (
+                ",".join(recips)
+            )
+        )
+        await mgr.start()
+        await mgr.task_queue
+
+        targets = {
+            "a": [ConnectionTarget(endpoint="http://a", recipient_keys=["ka"])],
+            "b": [
+                ConnectionTarget(endpoint="ws://b", recipient_keys=["kx"]),
+                ConnectionTarget(endpoint="http://b", recipient_keys=["kb"]),
+            ],
+            "c": [ConnectionTarget(endpoint="http://a", recipient_keys=["kc"])],
+            "d": [ConnectionTarget(endpoint="ws://d", recipient_keys=["kd"])],
+        }
+        unsupported = mgr.enqueue_broadcast(context, "{}", targets)
+        assert unsupported == ["d"]
+        await mgr.flush()
+
+        assert transport.wire_format.encode_message.call_count == 3
+        delivered = sorted(call[0] for call in transport.handle_message.call_args_list)
+        assert delivered == [
+            ("ka", "http://a"),
+            ("kb", "http://b"),
+            ("kc", "http://a"),
+        ]
+
+        transport.handle_message.reset_mock()
+        transport.wire_format.encode_message.reset_mock()
+        mgr.broadcast_shared = True
+        mgr.enqueue_broadcast(context, "{}", targets)
+        await mgr.flush()
+
+        assert transport.wire_format.encode_message.call_count == 2
+        delivered = sorted(call[0] for call in transport.handle_message.call_args_list)
+        assert delivered == [
+            ("ka,kb", "http://a"),
+            ("ka,kb", "http://b"),
+            ("kc", "http://a"),
+        ]
+        assert not mgr.outbound_buffer
+        await mgr.stop()
+
+    async def test_enqueue_broadcast_encode_error(self):
+        context = InjectionContext()
+        not_delivered = async_mock.MagicMock()
+        mgr, transport = await self.make_manager(context)
+        mgr.handle_not_delivered = not_delivered
+        transport.wire_format.encode_message = async_mock.CoroutineMock(
+            side_effect=ValueError()
+        )
+        await mgr.start()
+        await mgr.task_queue
+
+        mgr.enqueue_broadcast(
+            context,
+            "{}",
+            {
+                "a": [ConnectionTarget(endpoint="http://a", recipient_keys=["ka"])],
+                "b": [ConnectionTarget(endpoint="http://b", recipient_keys=["kb"])],
+            },
+        )
+        await mgr.flush()
+        transport.handle_message.assert_not_called()
+        assert sorted(
+            call[0][1].connection_id for call in not_delivered.call_args_list
+        ) == ["a", "b"]
+        await mgr.stop()
+
+    async def test_prune_lanes(self):
+        mgr = OutboundTransportManager(InjectionContext())
+        mgr.LANE_LIMIT = 4
+        mgr.lane_prune_at = 4
+        for idx in range(4):
+            mgr.lane_for(f"http://{idx}").pending.append(object())
+        mgr.lane_for("http://4")
+        assert len(mgr.lanes) == 5 and mgr.lane_prune_at == 8
+        for lane in mgr.lanes.values():
+            lane.pending.clear()
+        for idx in range(5, 9):
+            mgr.lane_for(f"http://{idx}")
+        assert len(mgr.lanes) == 1 and mgr.lane_prune_at == 4
+
+    async def test_retry_backoff(self):
+        attempts = []
+
+        async def handle_message(payload, endpoint):
+            attempts.append(endpoint)
+            if len(attempts) < 3:
+                raise OutboundDeliveryError("failed")
+
+        mgr, transport = await self.make_manager(handle_message=handle_message)
+        mgr.RETRY_BASE_DELAY = 0.01
+        await mgr.start()
+        await mgr.task_queue
+        mgr.enqueue_webhook("topic", {}, "http://example", max_attempts=3)
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert len(attempts) == 3
+        assert not mgr.outbound_buffer
+        lane = mgr.lanes["http://example"]
+        assert not lane.failures
+        assert lane.stats["delivered"] == 1 and lane.stats["failed"] == 2
+
+        lane.failures = 4
+        queued = QueuedOutboundMessage(None, None, None, None)
+        queued.endpoint = "http://example/path"
+        assert 0.04 <= mgr.retry_delay(queued) <= 0.08
+        lane.failures = 100
+        assert mgr.retry_delay(queued) <= mgr.RETRY_MAX_DELAY
+        await mgr.stop()
+
+    async def test_not_delivered(self):
+        mgr, transport = await self.make_manager(
+            handle_message=async_mock.CoroutineMock(
+                side_effect=OutboundDeliveryError("failed")
+            )
+        )
+        mgr.handle_not_delivered = async_mock.MagicMock()
+        await mgr.start()
+        await mgr.task_queue
+        context = InjectionContext()
+        message = OutboundMessage(payload="{}", enc_payload=b"{}")
+        message.target = ConnectionTarget(endpoint="http://localhost")
+        with async_mock.patch.object(mgr, "retry_delay", return_value=0.01):
+            mgr.enqueue_message(context, message)
+            await asyncio.wait_for(mgr.flush(), 5)
+        assert transport.handle_message.call_count == 5
+        mgr.handle_not_delivered.assert_called_once_with(context, message)
+        await mgr.stop()
+
+    async def test_replay_stored(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "outbound.log")
+            context = InjectionContext()
+            context.update_settings({"transport.outbound_queue_log": path})
+
+            failing = async_mock.CoroutineMock(
+                side_effect=OutboundDeliveryError("failed")
+            )
+            mgr, transport = await self.make_manager(context, failing)
+            assert isinstance(mgr.store, FileOutboundStore)
+            await mgr.start()
+            await mgr.task_queue
+            mgr.enqueue_webhook("topic", {"a": 1}, "http://example")
+            message = OutboundMessage(payload="{}", enc_payload=b"\x01")
+            message.target = ConnectionTarget(endpoint="http://localhost")
+            mgr.enqueue_message(context, message)
+            while failing.call_count < 2:
+                await asyncio.sleep(0.01)
+            # simulate a restart with messages awaiting retry
+            await mgr.stop(wait=False)
+
+            mgr, transport = await self.make_manager(context)
+            await mgr.start()
+            await mgr.task_queue
+            await mgr.flush()
+            # webhooks are not retained
+            transport.handle_message.assert_awaited_once_with(
+                b"\x01", "http://localhost"
+            )
+            await mgr.stop()
+            assert FileOutboundStore(path).load() == []
+
+    async def test_injected_store(self):
+        context = InjectionContext(enforce_typing=False)
+        store = async_mock.MagicMock(BaseOutboundStore)
+        store.load.return_value = []
+        context.injector.bind_instance(BaseOutboundStore, store)
+        mgr, transport = await self.make_manager(context)
+        assert mgr.store is store
+        await mgr.start()
+        await mgr.task_queue
+        mgr.enqueue_webhook("topic", {}, "http://example")
+        await mgr.flush()
+        store.add.assert_not_called()
+        message = OutboundMessage(payload="{}", enc_payload=b"\x01")
+        message.target = ConnectionTarget(endpoint="http://localhost")
+        mgr.enqueue_message(context, message)
+        await mgr.flush()
+        store.add.assert_called_once()
+        store.remove.assert_called_once_with(store.add.call_args[0][0].queue_id)
+        await mgr.stop()
+
+    async def test_lane_concurrency(self):
+        context = InjectionContext()
+        context.update_settings({"transport.outbound_endpoint_concurrency": 2})
+        active = {}
+        peak = {}
+        release = asyncio.Event()
+
+        async def handle_message(payload, endpoint):
+            active[endpoint] = active.get(endpoint, 0) + 1
+            peak[endpoint] = max(peak.get(endpoint, 0), active[endpoint])
+            if endpoint.startswith("http://slow"):
+                await release.wait()
+            active[endpoint] -= 1
+
+        mgr, transport = await self.make_manager(context, handle_message)
+        await mgr.start()
+        await mgr.task_queue
+        assert transport.connection_limit_per_host == 2
+        for _ in range(5):
+            mgr.enqueue_webhook("topic", {}, "http://slow")
+        mgr.enqueue_webhook("topic", {}, "http://fast")
+        while not mgr.lanes.get("http://fast") or mgr.lanes["http://fast"].active:
+            await asyncio.sleep(0.01)
+        assert mgr.lanes["http://fast"].delivered == 1
+        stats = mgr.lane_stats()["http://slow"]
+        assert stats["active"] == 2 and stats["pending"] == 3
+        release.set()
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert peak["http://slow/topic/topic/"] == 2
+        await mgr.stop()
+
+    async def test_lane_circuit_breaker(self):
+        mgr, transport = await self.make_manager(
+            handle_message=async_mock.CoroutineMock(
+                side_effect=OutboundDeliveryError("failed")
+            )
+        )
+        mgr.RETRY_BASE_DELAY = 0.001
+        mgr.LANE_FAILURE_THRESHOLD = 2
+        mgr.LANE_PARK_DURATION = 0.2
+        await mgr.start()
+        await mgr.task_queue
+        mgr.enqueue_webhook("topic", {}, "http://example", max_attempts=10)
+        lane = mgr.lane_for("http://example")
+        while not lane.parked:
+            await asyncio.sleep(0.01)
+        attempts = transport.handle_message.call_count
+        assert attempts == 2
+        await asyncio.sleep(0.1)
+        # no retries are spent while the lane is parked
+        assert transport.handle_message.call_count == attempts
+        transport.handle_message.side_effect = None
+        await asyncio.wait_for(mgr.flush(), 5)
+        assert transport.handle_message.call_count == attempts + 1
+        assert not lane.parked
+        await mgr.stop()
+
+
+class TestDeliveryLane(AsyncTestCase):
+    def test_park(self):
+        lane = DeliveryLane("http://a", max_active=1, failure_threshold=2)
+        lane.pending.append(object())
+        assert lane.ready(0)
+        lane.active = 1
+        assert not lane.ready(0)
+        lane.active = 0
+        lane.record_failure(0)
+        assert not lane.parked
+        lane.record_failure(0)
+        assert lane.parked and lane.parked_until == 30.0
+        assert not lane.ready(10)
+        assert lane.ready(30)
+        lane.record_failure(30)
+        assert lane.parked_until == 90.0
+        lane.record_success(0.01)
+        assert not lane.parked and not lane.failures
+        assert lane.stats["latency"]["count"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import tempfile
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..store import FileOutboundStore, MemoryOutboundStore, StoredOutboundMessage
+
+
+class TestFileOutboundStore(AsyncTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "queue", "outbound.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_add_remove_load(self):
+        store = FileOutboundStore(self.path)
+        assert store.load() == []
+        store.add(StoredOutboundMessage("1", "http://a", "{}", 4))
+        store.add(StoredOutboundMessage("2", "http://b", b"\x00\x01", 4))
+        store.add(StoredOutboundMessage("1", "http://a", "{}", 3))
+        store.remove("3")
+        store.remove("2")
+        store.close()
+        with open(self.path, "a") as log:
+            log.write("{corrupt\n")
+
+        restored = FileOutboundStore(self.path)
+        assert restored.load() == [StoredOutboundMessage("1", "http://a", "{}", 3)]
+        with open(self.path) as log:
+            assert len(log.readlines()) == 1
+
+    def test_binary_payload(self):
+        store = FileOutboundStore(self.path)
+        store.add(StoredOutboundMessage("1", "http://a", b"\x00\xff", 0))
+        store.close()
+        assert FileOutboundStore(self.path).load()[0].payload == b"\x00\xff"
+
+    def test_compact(self):
+        store = FileOutboundStore(self.path, compact_min=10)
+        for idx in range(10):
+            store.add(StoredOutboundMessage(str(idx), "http://a", "{}", 0))
+        for idx in range(9):
+            store.remove(str(idx))
+        store.close()
+        with open(self.path) as log:
+            assert len(log.readlines()) < 10
+        assert [msg.queue_id for msg in FileOutboundStore(self.path).load()] == ["9"]
+
+    async def test_background_write(self):
+        store = FileOutboundStore(self.path, compact_min=4)
+        for idx in range(4):
+            store.add(StoredOutboundMessage(str(idx), "http://a", "{}", 0))
+        while store._job:
+            await asyncio.sleep(0.01)
+        with open(self.path) as log:
+            assert len(log.readlines()) == 4
+        for idx in range(3):
+            store.remove(str(idx))
+        while store._job:
+            await asyncio.sleep(0.01)
+        with open(self.path) as log:
+            assert len(log.readlines()) == 1
+        store.add(StoredOutboundMessage("4", "http://a", "{}", 0))
+        store.close()
+        assert [msg.queue_id for msg in FileOutboundStore(self.path).load()] == [
+            "3",
+            "4",
+        ]
+
+
+class TestMemoryOutboundStore(AsyncTestCase):
+    def test_memory(self):
+        store = MemoryOutboundStore()
+        store.add(StoredOutboundMessage("1", "http://a", "{}", 0))
+        store.remove("1")
+        assert store.load() == []
+        store.close()
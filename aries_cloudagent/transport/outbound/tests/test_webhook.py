@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..webhook import WebhookDispatcher
+
+
+class TestWebhookDispatcher(AsyncTestCase):
+    def setUp(self):
+        self.delivered = []
+        self.fail = 0
+
+    async def deliver(self, url: str, payload: str):
+        if self.fail:
+            self.fail -= 1
+            raise Exception("delivery failed")
+        self.delivered.append((url, json.loads(payload)))
+
+    async def test_batch_size(self):
+        dispatcher = WebhookDispatcher(self.deliver, batch_size=2, batch_window=10)
+        for idx in range(3):
+            dispatcher.enqueue("topic", {"idx": idx}, "http://target")
+        await asyncio.sleep(0.01)
+        assert self.delivered == [
+            ("http://target/topic/topic/", [{"idx": 0}, {"idx": 1}])
+        ]
+        assert dispatcher.pending_count == 1
+
+        await dispatcher.flush()
+        assert self.delivered[1] == ("http://target/topic/topic/", [{"idx": 2}])
+        stats = dispatcher.stats()["targets"]["http://target"]
+        assert stats["delivered"] == 3
+        assert stats["batches"] == 2
+        assert stats["latency"]["count"] == 3
+
+    async def test_batch_window(self):
+        dispatcher = WebhookDispatcher(self.deliver, batch_size=10, batch_window=0.05)
+        dispatcher.enqueue("one", {"idx": 0}, "http://target")
+        dispatcher.enqueue("two", {"idx": 1}, "http://target")
+        dispatcher.enqueue("one", {"idx": 2}, "http://target")
+        await asyncio.sleep(0.01)
+        assert not self.delivered
+        await asyncio.sleep(0.1)
+        assert sorted(self.delivered) == [
+            ("http://target/topic/one/", [{"idx": 0}, {"idx": 2}]),
+            ("http://target/topic/two/", [{"idx": 1}]),
+        ]
+
+    async def test_coalesce(self):
+        dispatcher = WebhookDispatcher(
+            self.deliver, batch_size=10, batch_window=10, coalesce=True
+        )
+        for state in ("request", "response", "active"):
+            dispatcher.enqueue(
+                "connections", {"connection_id": "a", "state": state}, "http://target"
+            )
+        dispatcher.enqueue(
+            "connections", {"connection_id": "b", "state": "init"}, "http://target"
+        )
+        dispatcher.enqueue("basicmessages", {"content": "hi"}, "http://target")
+        dispatcher.enqueue("basicmessages", {"content": "hi"}, "http://target")
+        await dispatcher.flush()
+        assert sorted(self.delivered) == [
+            ("http://target/topic/basicmessages/", [{"content": "hi"}] * 2),
+            (
+                "http://target/topic/connections/",
+                [
+                    {"connection_id": "a", "state": "active"},
+                    {"connection_id": "b", "state": "init"},
+                ],
+            ),
+        ]
+        stats = dispatcher.stats()["targets"]["http://target"]
+        assert stats["coalesced"] == 2
+        assert stats["delivered"] == 4
+
+    async def test_coalesce_individual(self):
+        dispatcher = WebhookDispatcher(
+            self.deliver, batch_size=10, coalesce=True, post_arrays=False
+        )
+        assert dispatcher.batch_size == 1
+        for state in ("request", "response", "active"):
+            dispatcher.enqueue(
+                "connections", {"connection_id": "a", "state": state}, "http://target"
+            )
+        await dispatcher.flush()
+        assert self.delivered == [
+            (
+                "http://target/topic/connections/",
+                {"connection_id": "a", "state": "active"},
+            )
+        ]
+        stats = dispatcher.stats()["targets"]["http://target"]
+        assert stats["coalesced"] == 2
+
+    async def test_queue_limit(self):
+        dispatcher = WebhookDispatcher(
+            self.deliver, batch_size=10, batch_window=10, queue_limit=2
+        )
+        assert dispatcher.enqueue("topic", {"idx": 0}, "http://one")
+        assert dispatcher.enqueue("topic", {"idx": 1}, "http://two")
+        assert not dispatcher.enqueue("topic", {"idx": 2}, "http://two")
+        await dispatcher.flush()
+        stats = dispatcher.stats()["targets"]
+        assert stats["http://one"]["dropped"] == 0
+        assert stats["http://two"]["dropped"] == 1
+        assert stats["http://two"]["delivered"] == 1
+        assert dispatcher.enqueue("topic", {"idx": 3}, "http://two")
+        await dispatcher.stop()
+
+    async def test_retry(self):
+        dispatcher = WebhookDispatcher(self.deliver, batch_size=1)
+        dispatcher.retry_delay = lambda attempt: 0
+        self.fail = 2
+        dispatcher.enqueue("topic", {"idx": 0}, "http://target")
+        await dispatcher.flush()
+        assert self.delivered == [("http://target/topic/topic/", [{"idx": 0}])]
+
+        self.fail = 2
+        dispatcher.enqueue("topic", {"idx": 1}, "http://target", max_attempts=2)
+        await dispatcher.flush()
+        stats = dispatcher.stats()["targets"]["http://target"]
+        assert stats["failed"] == 4
+        assert stats["dropped"] == 1
+        assert stats["delivered"] == 1
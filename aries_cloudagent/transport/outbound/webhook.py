@@ -0,0 +1,309 @@
+"""Batched delivery of admin webhooks."""
+
+import asyncio
+import logging
+import random
+import time
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Mapping, Sequence, Tuple
+
+from ...utils.json_codec import json_dumps
+
+from ..stats import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+# the identifier field of the records sent with each webhook topic, used to
+# coalesce successive updates to the same record
+RECORD_ID_FIELDS = {
+    "connections": "connection_id",
+    "credentials": "credential_exchange_id",
+    "issue_credential": "credential_exchange_id",
+    "presentations": "presentation_exchange_id",
+    "present_proof": "presentation_exchange_id",
+}
+
+
+class WebhookTargetStats:
+    """Delivery statistics for a single webhook target."""
+
+    def __init__(self):
+        """Initialize the `WebhookTargetStats` instance."""
+        self.queued = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> dict:
+        """Summarize the statistics."""
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class WebhookChannel:
+    """The pending webhooks for one topic of a webhook target."""
+
+    def __init__(self, endpoint: str, topic: str, max_attempts: int = None):
+        """Initialize the `WebhookChannel` instance."""
+        self.endpoint = endpoint
+        self.topic = topic
+        self.max_attempts = max_attempts
+        self.event = asyncio.Event()
+        # pending payloads with the time they were queued, keyed by record
+        # or by sequence number, in the order they were first queued
+        self.pending: Mapping[object, Tuple[float, dict]] = OrderedDict()
+        self.sequence = 0
+        self.task: asyncio.Task = None
+
+    @property
+    def url(self) -> str:
+        """Accessor for the URL the channel's batches are posted to."""
+        return f"{self.endpoint}/topic/{self.topic}/"
+
+    def take(self, count: int) -> Sequence[Tuple[float, dict]]:
+        """Remove up to `count` of the oldest pending webhooks."""
+        return [
+            self.pending.popitem(last=False)[1]
+            for _ in range(min(count, len(self.pending)))
+        ]
+
+
+class WebhookDispatcher:
+    """
+    Deliver webhooks in batches, separately from the DIDComm outbound queue.
+
+    Webhooks for each target and topic are collected until the batch is full
+    or the oldest has waited for the batch window, and then posted as a JSON
+    array, or one at a time as bare objects when batches are not posted as
+    arrays. Each channel has at most one batch in flight, so webhooks are
+    delivered in order. When coalescing is enabled, a record update replaces
+    any earlier update for the same record which has not been sent yet.
+    """
+
+    RETRY_BASE_DELAY = 2.0
+    RETRY_MAX_DELAY = 60.0
+
+    def __init__(
+        self,
+        deliver: Callable[[str, str], Awaitable],
+        *,
+        batch_size: int = 10,
+        batch_window: float = 0.5,
+        coalesce: bool = False,
+        post_arrays: bool = True,
+        queue_limit: int = 1000,
+        max_attempts: int = 4,
+        record_id_fields: Mapping[str, str] = None,
+    ):
+        """
+        Initialize the `WebhookDispatcher` instance.
+
+        Args:
+            deliver: Coroutine posting a JSON payload to a URL, which raises an
+                exception if the delivery failed
+            batch_size: The maximum number of webhooks in one delivery
+            batch_window: The longest time in seconds a webhook waits for its
+                batch to fill
+            coalesce: Replace pending updates to a record with the latest one
+            post_arrays: Post each batch as a JSON array, even if it holds a
+                single webhook. If False, the batch size must be 1 and each
+                webhook is posted as a bare object
+            queue_limit: The maximum number of webhooks waiting for delivery,
+                after which new webhooks are dropped
+            max_attempts: The default number of attempts to deliver a batch
+            record_id_fields: The record identifier field for each topic
+
+        """
+        self.deliver = deliver
+        self.batch_size = max(batch_size, 1) if post_arrays else 1
+        self.batch_window = batch_window
+        self.coalesce = coalesce
+        self.post_arrays = post_arrays
+        self.queue_limit = queue_limit
+        self.max_attempts = max_attempts
+        self.record_id_fields = (
+            RECORD_ID_FIELDS if record_id_fields is None else record_id_fields
+        )
+        self.channels = {}
+        self.targets = {}
+        self.pending_count = 0
+        self._flushing = False
+
+    def coalesce_key(self, topic: str, payload: dict):
+        """Get the key identifying the record updated by a webhook, if any."""
+        if not self.coalesce or not isinstance(payload, dict):
+            return None
+        id_field = self.record_id_fields.get(topic)
+        record_id = id_field and payload.get(id_field)
+        return (topic, record_id) if record_id else None
+
+    def target_stats(self, endpoint: str) -> WebhookTargetStats:
+        """Get the delivery statistics for a webhook target."""
+        stats = self.targets.get(endpoint)
+        if not stats:
+            stats = self.targets[endpoint] = WebhookTargetStats()
+        return stats
+
+    def enqueue(
+        self, topic: str, payload: dict, endpoint: str, max_attempts: int = None
+    ) -> bool:
+        """
+        Add a webhook to the batch for its target and topic.
+
+        Args:
+            topic: The webhook topic
+            payload: The webhook payload
+            endpoint: The webhook endpoint
+            max_attempts: Override the maximum number of attempts
+
+        Returns:
+            False if the webhook was dropped because the queue is full
+
+        """
+        stats = self.target_stats(endpoint)
+        channel = self.channels.get((endpoint, topic))
+        if not channel:
+            channel = self.channels[(endpoint, topic)] = WebhookChannel(endpoint, topic)
+        if max_attempts:
+            channel.max_attempts = max_attempts
+
+        key = self.coalesce_key(topic, payload)
+        if key is not None and key in channel.pending:
+            # keep the position and queue time of the earlier update
+            queued_at, _ = channel.pending[key]
+            channel.pending[key] = (queued_at, payload)
+            stats.coalesced += 1
+            return True
+
+        if self.pending_count >= self.queue_limit:
+            stats.dropped += 1
+            LOGGER.warning("Webhook queue is full, dropping webhook for %s", endpoint)
+            return False
+
+        if key is None:
+            channel.sequence += 1
+            key = channel.sequence
+        channel.pending[key] = (time.perf_counter(), payload)
+        self.pending_count += 1
+        stats.queued += 1
+
+        if len(channel.pending) >= self.batch_size:
+            channel.event.set()
+        if not channel.task:
+            channel.task = asyncio.get_event_loop().create_task(
+                self._run_channel(channel)
+            )
+        return True
+
+    async def _run_channel(self, channel: WebhookChannel):
+        """Deliver the batches of a channel until none are pending."""
+        try:
+            while channel.pending:
+                if len(channel.pending) < self.batch_size and not self._flushing:
+                    first_at, _ = next(iter(channel.pending.values()))
+                    remaining = first_at + self.batch_window - time.perf_counter()
+                    if remaining > 0:
+                        channel.event.clear()
+                        try:
+                            await asyncio.wait_for(channel.event.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                batch = channel.take(self.batch_size)
+                self.pending_count -= len(batch)
+                await self.deliver_batch(channel, batch)
+        finally:
+            channel.task = None
+
+    def retry_delay(self, attempt: int) -> float:
+        """Determine the randomized delay before retrying a delivery."""
+        delay = min(
+            self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** min(attempt - 1, 16)
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    async def deliver_batch(
+        self, channel: WebhookChannel, batch: Sequence[Tuple[float, dict]]
+    ) -> bool:
+        """
+        Post a batch of webhooks, retrying failed deliveries.
+
+        Returns:
+            False if the batch was dropped after its final attempt
+
+        """
+        stats = self.target_stats(channel.endpoint)
+        if self.post_arrays:
+            payload = json_dumps([item for (_, item) in batch])
+        else:
+            payload = json_dumps(batch[0][1])
+        attempts = channel.max_attempts or self.max_attempts
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self.deliver(channel.url, payload)
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stats.failed += 1
+                if attempt >= attempts:
+                    LOGGER.exception(
+                        "Dropping %d webhook(s) which could not be delivered to %s",
+                        len(batch),
+                        channel.url,
+                    )
+                    stats.dropped += len(batch)
+                    return False
+            await asyncio.sleep(self.retry_delay(attempt))
+
+        now = time.perf_counter()
+        stats.batches += 1
+        stats.delivered += len(batch)
+        for queued_at, _ in batch:
+            stats.latency.observe(now - queued_at)
+        return True
+
+    async def flush(self):
+        """Deliver all pending webhooks without waiting for the batch windows."""
+        self._flushing = True
+        try:
+            while True:
+                tasks = [
+                    channel.task for channel in self.channels.values() if channel.task
+                ]
+                if not tasks:
+                    break
+                for channel in self.channels.values():
+                    channel.event.set()
+                await asyncio.wait(tasks)
+        finally:
+            self._flushing = False
+
+    async def stop(self, wait: bool = True):
+        """Stop delivering webhooks, optionally delivering those pending."""
+        if wait:
+            await self.flush()
+        for channel in self.channels.values():
+            if channel.task:
+                channel.task.cancel()
+
+    def stats(self) -> dict:
+        """Get the delivery statistics for each webhook target."""
+        return {
+            "pending": self.pending_count,
+            "targets": {
+                endpoint: stats.to_dict() for endpoint, stats in self.targets.items()
+            },
+        }
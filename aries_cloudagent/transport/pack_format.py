@@ -1,6 +1,5 @@
 """Standard packed message format classes."""
 
-import json
 import logging
 from typing import Sequence, Tuple, Union
 
@@ -8,7 +7,8 @@ from ..config.base import InjectorError
 from ..config.injection_context import InjectionContext
 from ..protocols.routing.messages.forward import Forward
 from ..messaging.util import time_now
-from ..utils.task_queue import TaskQueue
+from ..utils.json_codec import json_loads
+from ..utils.task_queue import TaskQueue, TASK_CLASS_CRYPTO
 from ..wallet.base import BaseWallet
 from ..wallet.error import WalletError
 
@@ -27,6 +27,13 @@ class PackWireFormat(BaseWireFormat):
         super().__init__()
         self.task_queue: TaskQueue = None
 
+    async def run_crypto(self, coro):
+        """Run a pack or unpack operation within the crypto task budget."""
+        if not self.task_queue:
+            return await coro
+        task = await self.task_queue.put(coro, task_class=TASK_CLASS_CRYPTO)
+        return await task
+
     async def parse_message(
         self, context: InjectionContext, message_body: Union[str, bytes],
     ) -> Tuple[dict, MessageReceipt]:
@@ -50,37 +57,25 @@ class PackWireFormat(BaseWireFormat):
         receipt.in_time = time_now()
         receipt.raw_message = message_body
 
-        message_dict = None
-        message_json = message_body
-
-        if not message_json:
+        if not message_body:
             raise MessageParseError("Message body is empty")
 
-        try:
-            message_dict = json.loads(message_json)
-        except ValueError:
-            raise MessageParseError("Message JSON parsing failed")
-        if not isinstance(message_dict, dict):
-            raise MessageParseError("Message JSON result is not an object")
+        message_dict = None
+        if not self.is_packed(message_body):
+            message_dict = self.load_message(message_body)
 
         # packed messages are detected by the absence of @type
-        if "@type" not in message_dict:
-
+        if message_dict is None or "@type" not in message_dict:
             try:
                 unpack = self.unpack(context, message_body, receipt)
-                message_json = await (
-                    self.task_queue and self.task_queue.run(unpack) or unpack
-                )
+                message_json = await self.run_crypto(unpack)
             except MessageParseError:
                 LOGGER.debug("Message unpack failed, falling back to JSON")
+                if message_dict is None:
+                    message_dict = self.load_message(message_body)
             else:
                 receipt.raw_message = message_json
-                try:
-                    message_dict = json.loads(message_json)
-                except ValueError:
-                    raise MessageParseError("Message JSON parsing failed")
-                if not isinstance(message_dict, dict):
-                    raise MessageParseError("Message JSON result is not an object")
+                message_dict = self.load_message(message_json)
 
         # parse thread ID
         thread_dec = message_dict.get("~thread")
@@ -97,6 +92,29 @@ class PackWireFormat(BaseWireFormat):
 
         return message_dict, receipt
 
+    @staticmethod
+    def is_packed(message_body: Union[str, bytes]) -> bool:
+        """
+        Check whether a message body appears to be packed, without parsing it.
+
+        The packed envelope holds only base64 values, so a message body which
+        does not mention `@type` anywhere cannot be a plaintext message.
+        """
+        if isinstance(message_body, bytes):
+            return b'"@type"' not in message_body
+        return '"@type"' not in message_body
+
+    @staticmethod
+    def load_message(message_json: Union[str, bytes]) -> dict:
+        """Parse a message body, which must be a JSON object."""
+        try:
+            message_dict = json_loads(message_json)
+        except ValueError:
+            raise MessageParseError("Message JSON parsing failed")
+        if not isinstance(message_dict, dict):
+            raise MessageParseError("Message JSON result is not an object")
+        return message_dict
+
     async def unpack(
         self,
         context: InjectionContext,
@@ -146,7 +164,7 @@ class PackWireFormat(BaseWireFormat):
             pack = self.pack(
                 context, message_json, recipient_keys, routing_keys, sender_key
             )
-            message = await (self.task_queue and self.task_queue.run(pack) or pack)
+            message = await self.run_crypto(pack)
         else:
             message = message_json
         return message
@@ -1,10 +1,42 @@
 """aiohttp stats collector support."""
 
+import bisect
+
+from typing import Sequence
+
 import aiohttp
 
 from ..utils.stats import Collector
 
 
+class LatencyHistogram:
+    """Count observed latencies in fixed buckets."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Sequence[float] = None):
+        """Initialize the `LatencyHistogram` instance."""
+        self.buckets = tuple(buckets or self.BUCKETS)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, latency: float):
+        """Record a latency in seconds."""
+        self.counts[bisect.bisect_left(self.buckets, latency)] += 1
+        self.count += 1
+        self.total += latency
+
+    def to_dict(self) -> dict:
+        """Summarize the histogram, keyed by the upper bound of each bucket."""
+        bounds = [f"{b:g}" for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 6) if self.count else 0,
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
 class StatsTracer(aiohttp.TraceConfig):
     """Attach hooks to client session events and report statistics."""
 
@@ -66,6 +66,35 @@ class TestPackWireFormat(AsyncTestCase):
         assert delivery.raw_message == message_json
         assert message_dict == message
 
+    async def test_is_packed(self):
+        serializer = PackWireFormat()
+        local_did = await self.wallet.create_local_did(self.test_seed)
+        message_json = json.dumps(self.test_message)
+        packed = await serializer.encode_message(
+            self.context, message_json, [local_did.verkey], [], local_did.verkey
+        )
+        assert serializer.is_packed(packed)
+        assert serializer.is_packed(packed.decode("ascii"))
+        assert not serializer.is_packed(message_json)
+        assert not serializer.is_packed(message_json.encode("utf-8"))
+
+    async def test_unpack_single_parse(self):
+        serializer = PackWireFormat()
+        local_did = await self.wallet.create_local_did(self.test_seed)
+        message_json = json.dumps(self.test_message)
+        packed = await serializer.encode_message(
+            self.context, message_json, [local_did.verkey], [], local_did.verkey
+        )
+        with async_mock.patch.object(
+            serializer, "load_message", wraps=serializer.load_message
+        ) as load_message:
+            message_dict, delivery = await serializer.parse_message(
+                self.context, packed
+            )
+        load_message.assert_called_once_with(message_json)
+        assert message_dict == self.test_message
+        assert delivery.raw_message == message_json
+
     async def test_encode_decode(self):
         local_did = await self.wallet.create_local_did(self.test_seed)
         serializer = PackWireFormat()
@@ -0,0 +1,19 @@
+from asynctest import TestCase as AsyncTestCase
+
+from ..stats import LatencyHistogram
+
+
+class TestLatencyHistogram(AsyncTestCase):
+    def test_observe(self):
+        histogram = LatencyHistogram((0.1, 1.0))
+        assert histogram.to_dict() == {
+            "count": 0,
+            "avg": 0,
+            "buckets": {"0.1": 0, "1": 0, "+Inf": 0},
+        }
+        for latency in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(latency)
+        result = histogram.to_dict()
+        assert result["count"] == 4
+        assert result["avg"] == 0.6625
+        assert result["buckets"] == {"0.1": 2, "1": 1, "+Inf": 1}
@@ -1,6 +1,5 @@
 """Abstract wire format classes."""
 
-import json
 import logging
 
 from abc import abstractmethod
@@ -8,6 +7,7 @@ from typing import Sequence, Tuple, Union
 
 from ..config.injection_context import InjectionContext
 from ..messaging.util import time_now
+from ..utils.json_codec import json_loads
 
 from .inbound.receipt import MessageReceipt
 from .error import MessageParseError
@@ -100,7 +100,7 @@ class JsonWireFormat(BaseWireFormat):
             raise MessageParseError("Message body is empty")
 
         try:
-            message_dict = json.loads(message_json)
+            message_dict = json_loads(message_json)
         except ValueError:
             raise MessageParseError("Message JSON parsing failed")
         if not isinstance(message_dict, dict):
@@ -0,0 +1,148 @@
+"""JSON encoding and decoding with a selectable backend."""
+
+import json
+import logging
+
+from typing import Any, Callable, Sequence, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+LOGGER = logging.getLogger(__name__)
+
+BACKEND_AUTO = "auto"
+BACKEND_JSON = "json"
+BACKEND_ORJSON = "orjson"
+BACKEND_UJSON = "ujson"
+
+
+class JsonCodec:
+    """A JSON backend, providing str and bytes encoders and a decoder."""
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Union[str, bytes]], Any],
+        dumps: Callable[[Any], str],
+        dumps_bytes: Callable[[Any], bytes],
+    ):
+        """
+        Initialize a `JsonCodec` instance.
+
+        Args:
+            name: The name of the backend
+            loads: Decode JSON from a str or bytes value
+            dumps: Encode a value as a JSON str
+            dumps_bytes: Encode a value as JSON bytes
+
+        """
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.dumps_bytes = dumps_bytes
+
+    def __repr__(self) -> str:
+        """Return a human readable representation of the codec."""
+        return "<JsonCodec({})>".format(self.name)
+
+
+def _stdlib_codec() -> JsonCodec:
+    return JsonCodec(
+        BACKEND_JSON,
+        json.loads,
+        json.dumps,
+        lambda value: json.dumps(value).encode("utf-8"),
+    )
+
+
+def _orjson_codec() -> JsonCodec:
+    def dumps_bytes(value):
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    return JsonCodec(
+        BACKEND_ORJSON,
+        orjson.loads,
+        lambda value: dumps_bytes(value).decode("utf-8"),
+        dumps_bytes,
+    )
+
+
+def _ujson_codec() -> JsonCodec:
+    def dumps(value):
+        return ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False)
+
+    return JsonCodec(
+        BACKEND_UJSON, ujson.loads, dumps, lambda value: dumps(value).encode("utf-8"),
+    )
+
+
+BACKENDS = {BACKEND_JSON: _stdlib_codec}
+if orjson:
+    BACKENDS[BACKEND_ORJSON] = _orjson_codec
+if ujson:
+    BACKENDS[BACKEND_UJSON] = _ujson_codec
+
+
+def available_backends() -> Sequence[str]:
+    """Get the names of the installed JSON backends, fastest first."""
+    return [
+        name
+        for name in (BACKEND_ORJSON, BACKEND_UJSON, BACKEND_JSON)
+        if name in BACKENDS
+    ]
+
+
+def select_backend(name: str = None) -> JsonCodec:
+    """
+    Create the codec for a JSON backend.
+
+    Args:
+        name: The backend name, or `auto` or `None` for the fastest installed
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+
+    """
+    if not name or name == BACKEND_AUTO:
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError("JSON backend not available: {}".format(name))
+    return BACKENDS[name]()
+
+
+CODEC = select_backend()
+
+
+def set_json_backend(name: str = None) -> JsonCodec:
+    """Select the JSON backend used by the agent."""
+    global CODEC
+    CODEC = select_backend(name)
+    LOGGER.debug("Using JSON backend: %s", CODEC.name)
+    return CODEC
+
+
+def get_json_backend() -> str:
+    """Get the name of the JSON backend in use."""
+    return CODEC.name
+
+
+def json_loads(value: Union[str, bytes]) -> Any:
+    """Decode JSON from a str or bytes value."""
+    return CODEC.loads(value)
+
+
+def json_dumps(value: Any) -> str:
+    """Encode a value as a JSON str."""
+    return CODEC.dumps(value)
+
+
+def json_dumps_bytes(value: Any) -> bytes:
+    """Encode a value as JSON bytes."""
+    return CODEC.dumps_bytes(value)
@@ -3,10 +3,16 @@
 import asyncio
 import logging
 import time
-from typing import Callable, Coroutine, Tuple
+from collections import deque
+from typing import Any, Callable, Coroutine, Iterable, Sequence, Tuple
 
 LOGGER = logging.getLogger(__name__)
 
+TASK_CLASS_ADMIN = "admin"
+TASK_CLASS_CRYPTO = "crypto"
+TASK_CLASS_INBOUND = "inbound"
+TASK_CLASS_OUTBOUND = "outbound"
+
 
 def coro_ident(coro: Coroutine):
     """Extract an identifier for a coroutine."""
@@ -22,6 +28,31 @@ async def coro_timed(coro: Coroutine, timing: dict):
         timing["ended"] = time.perf_counter()
 
 
+async def gather_bounded(
+    func: Callable[[Any], Coroutine], items: Iterable, limit: int = None
+) -> Sequence:
+    """
+    Await `func(item)` for each item concurrently, with at most `limit` active.
+
+    Results are returned in the order of the items. The first exception raised
+    is propagated after cancelling any outstanding calls.
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(item):
+        if not semaphore:
+            return await func(item)
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 def task_exc_info(task: asyncio.Task):
     """Extract exception info from an asyncio task."""
     if not task or not task.done():
@@ -43,11 +74,13 @@ class CompletedTask:
         exc_info: Tuple,
         ident: str = None,
         timing: dict = None,
+        task_class: str = None,
     ):
         """Initialize the completed task."""
         self.exc_info = exc_info
         self.ident = ident
         self.task = task
+        self.task_class = task_class
         self.timing = timing
 
     def __repr__(self) -> str:
@@ -65,6 +98,7 @@ class PendingTask:
         ident: str = None,
         task_future: asyncio.Future = None,
         queued_time: float = None,
+        task_class: str = None,
     ):
         """
         Initialize the pending task.
@@ -75,6 +109,7 @@ class PendingTask:
             ident: A string identifier for the task
             task_future: A future to be resolved to the asyncio Task
             queued_time: When the pending task was added to the queue
+            task_class: The name of the task class to schedule the task in
         """
         if not asyncio.iscoroutine(coro):
             raise ValueError(f"Expected coroutine, got {coro}")
@@ -84,6 +119,7 @@ class PendingTask:
         self.queued_time: float = queued_time
         self.unqueued_time: float = None
         self.ident = ident or coro_ident(coro)
+        self.task_class = task_class
         self.task_future = task_future or asyncio.get_event_loop().create_future()
 
     def cancel(self):
@@ -121,11 +157,64 @@ class PendingTask:
         return f"<{self.__class__.__name__} ident={self.ident}>"
 
 
+class TaskClass:
+    """
+    A class of tasks scheduled together in a task queue.
+
+    Each class has its own concurrency budget and pending tasks are started in
+    the order they were added. When several classes have pending tasks, those
+    with a lower priority value are started first.
+    """
+
+    def __init__(self, name: str, max_active: int = 0, priority: int = 0):
+        """
+        Initialize the task class.
+
+        Args:
+            name: The name of the task class
+            max_active: The maximum number of active tasks in the class
+            priority: The scheduling priority, where lower values run first
+        """
+        self.name = name
+        self.max_active = max_active
+        self.priority = priority
+        self.pending = deque()
+        self.active = 0
+        self.total_started = 0
+
+    @property
+    def ready(self) -> bool:
+        """Check whether another task of this class may be started."""
+        return not self.max_active or self.active < self.max_active
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the task class statistics."""
+        return {
+            "active": self.active,
+            "pending": len(self.pending),
+            "started": self.total_started,
+        }
+
+    def __repr__(self) -> str:
+        """Generate string representation for logging."""
+        return (
+            f"<{self.__class__.__name__} name={self.name} "
+            f"max_active={self.max_active} priority={self.priority}>"
+        )
+
+
 class TaskQueue:
     """A class for managing a set of asyncio tasks."""
 
+    DEFAULT_CLASS = "default"
+
     def __init__(
-        self, max_active: int = 0, timed: bool = False, trace_fn: Callable = None
+        self,
+        max_active: int = 0,
+        timed: bool = False,
+        trace_fn: Callable = None,
+        task_classes: Sequence[TaskClass] = None,
     ):
         """
         Initialize the task queue.
@@ -134,10 +223,11 @@ class TaskQueue:
             max_active: The maximum number of tasks to automatically run
             timed: A flag indicating that timing should be collected for tasks
             trace_fn: A callback for all completed tasks
+            task_classes: Task classes with their own concurrency budgets, in
+                addition to the default class
         """
         self.loop = asyncio.get_event_loop()
-        self.active_tasks = []
-        self.pending_tasks = []
+        self.active_tasks = set()
         self.timed = timed
         self.total_done = 0
         self.total_failed = 0
@@ -147,6 +237,22 @@ class TaskQueue:
         self._drain_evt = asyncio.Event()
         self._drain_task: asyncio.Task = None
         self._max_active = max_active
+        self._pending_count = 0
+        self.task_classes = {}
+        self.add_task_class(TaskClass(self.DEFAULT_CLASS))
+        for task_class in task_classes or ():
+            self.add_task_class(task_class)
+
+    def add_task_class(self, task_class: TaskClass):
+        """Register a task class, replacing any existing class with the same name."""
+        self.task_classes[task_class.name] = task_class
+        self._class_order = sorted(
+            self.task_classes.values(), key=lambda cls: cls.priority
+        )
+
+    def get_task_class(self, name: str = None) -> TaskClass:
+        """Look up a task class by name, falling back to the default class."""
+        return self.task_classes.get(name) or self.task_classes[self.DEFAULT_CLASS]
 
     @property
     def cancelled(self) -> bool:
@@ -167,6 +273,15 @@ class TaskQueue:
             or self.current_size < self._max_active
         )
 
+    def class_ready(self, task_class: TaskClass) -> bool:
+        """Check whether a task of the given class may be started immediately."""
+        return (
+            not self._cancelled
+            and (not self._max_active or len(self.active_tasks) < self._max_active)
+            and task_class.ready
+            and not task_class.pending
+        )
+
     @property
     def current_active(self) -> int:
         """Accessor for the current number of active tasks in the queue."""
@@ -175,12 +290,22 @@ class TaskQueue:
     @property
     def current_pending(self) -> int:
         """Accessor for the current number of pending tasks in the queue."""
-        return len(self.pending_tasks)
+        return self._pending_count
 
     @property
     def current_size(self) -> int:
         """Accessor for the total number of tasks in the queue."""
-        return len(self.active_tasks) + len(self.pending_tasks)
+        return len(self.active_tasks) + self._pending_count
+
+    @property
+    def pending_tasks(self) -> Sequence[PendingTask]:
+        """Accessor for the pending tasks of all classes, in scheduling order."""
+        return [pending for cls in self._class_order for pending in cls.pending]
+
+    @property
+    def class_stats(self) -> dict:
+        """Accessor for the statistics of each task class."""
+        return {name: cls.stats for name, cls in self.task_classes.items()}
 
     def __bool__(self) -> bool:
         """
@@ -198,7 +323,7 @@ class TaskQueue:
         """Start the process to run queued tasks."""
         if self._drain_task and not self._drain_task.done():
             self._drain_evt.set()
-        elif self.pending_tasks:
+        elif self._pending_count:
             self._drain_task = self.loop.create_task(self._drain_loop())
             self._drain_task.add_done_callback(lambda task: self._drain_done(task))
         return self._drain_task
@@ -211,16 +336,26 @@ class TaskQueue:
         if self._drain_task and self._drain_task.done():
             self._drain_task = None
 
+    def _next_pending(self) -> PendingTask:
+        """Take the next pending task which may be started, if any."""
+        if self._max_active and len(self.active_tasks) >= self._max_active:
+            return None
+        for cls in self._class_order:
+            if cls.pending and cls.ready:
+                self._pending_count -= 1
+                return cls.pending.popleft()
+        return None
+
     async def _drain_loop(self):
         """Run pending tasks while there is room in the queue."""
         # Note: this method should not call async methods apart from
         # waiting for the drain event, to avoid yielding to other queue methods
         while True:
             self._drain_evt.clear()
-            while self.pending_tasks and (
-                not self._max_active or len(self.active_tasks) < self._max_active
-            ):
-                pending: PendingTask = self.pending_tasks.pop(0)
+            while True:
+                pending = self._next_pending()
+                if not pending:
+                    break
                 if pending.queued_time:
                     pending.unqueued_time = time.perf_counter()
                     timing = {
@@ -230,13 +365,17 @@ class TaskQueue:
                 else:
                     timing = None
                 task = self.run(
-                    pending.coro, pending.complete_hook, pending.ident, timing
+                    pending.coro,
+                    pending.complete_hook,
+                    pending.ident,
+                    timing,
+                    pending.task_class,
                 )
                 try:
                     pending.task = task
                 except ValueError:
                     LOGGER.warning("Pending task future already fulfilled")
-            if self.pending_tasks:
+            if self._pending_count:
                 await self._drain_evt.wait()
             else:
                 break
@@ -250,7 +389,8 @@ class TaskQueue:
         """
         if self.timed and not pending.queued_time:
             pending.queued_time = time.perf_counter()
-        self.pending_tasks.append(pending)
+        self.get_task_class(pending.task_class).pending.append(pending)
+        self._pending_count += 1
         self.drain()
 
     def add_active(
@@ -259,6 +399,7 @@ class TaskQueue:
         task_complete: Callable = None,
         ident: str = None,
         timing: dict = None,
+        task_class: str = None,
     ) -> asyncio.Task:
         """
         Register an active async task with an optional completion callback.
@@ -268,10 +409,16 @@ class TaskQueue:
             task_complete: An optional callback to run on completion
             ident: A string identifer for the task
             timing: An optional dictionary of timing information
+            task_class: The name of the task class of the task
         """
-        self.active_tasks.append(task)
+        cls = self.get_task_class(task_class)
+        cls.active += 1
+        cls.total_started += 1
+        self.active_tasks.add(task)
         task.add_done_callback(
-            lambda fut: self.completed_task(task, task_complete, ident, timing)
+            lambda fut: self.completed_task(
+                task, task_complete, ident, timing, cls.name
+            )
         )
         self.total_started += 1
         return task
@@ -282,6 +429,7 @@ class TaskQueue:
         task_complete: Callable = None,
         ident: str = None,
         timing: dict = None,
+        task_class: str = None,
     ) -> asyncio.Task:
         """
         Start executing a coroutine as an async task, bypassing the pending queue.
@@ -291,6 +439,7 @@ class TaskQueue:
             task_complete: An optional callback to run on completion
             ident: A string identifier for the task
             timing: An optional dictionary of timing information
+            task_class: The name of the task class of the task
 
         Returns: the new asyncio task instance
 
@@ -306,10 +455,14 @@ class TaskQueue:
                 timing = dict()
             coro = coro_timed(coro, timing)
         task = self.loop.create_task(coro)
-        return self.add_active(task, task_complete, ident, timing)
+        return self.add_active(task, task_complete, ident, timing, task_class)
 
     def put(
-        self, coro: Coroutine, task_complete: Callable = None, ident: str = None
+        self,
+        coro: Coroutine,
+        task_complete: Callable = None,
+        ident: str = None,
+        task_class: str = None,
     ) -> PendingTask:
         """
         Add a new task to the queue, delaying execution if busy.
@@ -318,18 +471,33 @@ class TaskQueue:
             coro: The coroutine to run
             task_complete: A callback to run on completion
             ident: A string identifier for the task
+            task_class: The name of the task class to schedule the task in
 
         Returns: a future resolving to the asyncio task instance once queued
 
         """
-        pending = PendingTask(coro, task_complete, ident)
+        pending = PendingTask(coro, task_complete, ident, task_class=task_class)
+        self.schedule(pending)
+        return pending
+
+    def schedule(self, pending: PendingTask):
+        """
+        Start a pending task, or add it to the queue if busy.
+
+        Args:
+            pending: The `PendingTask` to schedule
+        """
         if self._cancelled:
             pending.cancel()
-        elif self.ready:
-            pending.task = self.run(coro, task_complete, pending.ident)
+        elif self.class_ready(self.get_task_class(pending.task_class)):
+            pending.task = self.run(
+                pending.coro,
+                pending.complete_hook,
+                pending.ident,
+                task_class=pending.task_class,
+            )
         else:
             self.add_pending(pending)
-        return pending
 
     def completed_task(
         self,
@@ -337,6 +505,7 @@ class TaskQueue:
         task_complete: Callable,
         ident: str,
         timing: dict = None,
+        task_class: str = None,
     ):
         """Clean up after a task has completed and run callbacks."""
         exc_info = task_exc_info(task)
@@ -349,7 +518,7 @@ class TaskQueue:
         else:
             self.total_done += 1
         if task_complete or self._trace_fn:
-            completed = CompletedTask(task, exc_info, ident, timing)
+            completed = CompletedTask(task, exc_info, ident, timing, task_class)
             try:
                 if task_complete:
                     task_complete(completed)
@@ -357,10 +526,9 @@ class TaskQueue:
                     self._trace_fn(completed)
             except Exception:
                 LOGGER.exception("Error finalizing task %s", completed)
-        try:
-            self.active_tasks.remove(task)
-        except ValueError:
-            pass
+        if task in self.active_tasks:
+            self.active_tasks.discard(task)
+            self.get_task_class(task_class).active -= 1
         self.drain()
 
     def cancel_pending(self):
@@ -368,9 +536,10 @@ class TaskQueue:
         if self._drain_task:
             self._drain_task.cancel()
             self._drain_task = None
-        for pending in self.pending_tasks:
-            pending.cancel()
-        self.pending_tasks = []
+        for cls in self._class_order:
+            while cls.pending:
+                cls.pending.popleft().cancel()
+        self._pending_count = 0
 
     def cancel(self):
         """Cancel any pending or active tasks in the queue."""
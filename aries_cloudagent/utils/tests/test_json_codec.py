@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from .. import json_codec as test_module
+
+
+class TestJsonCodec(TestCase):
+    def tearDown(self):
+        test_module.set_json_backend()
+
+    def test_available(self):
+        backends = test_module.available_backends()
+        assert backends[-1] == test_module.BACKEND_JSON
+        assert test_module.select_backend().name == backends[0]
+        assert test_module.select_backend("auto").name == backends[0]
+
+    def test_stdlib(self):
+        codec = test_module.set_json_backend(test_module.BACKEND_JSON)
+        assert test_module.get_json_backend() == test_module.BACKEND_JSON
+        value = {"a": [1, 2.5, None, True], "b": "é"}
+        assert test_module.json_loads(test_module.json_dumps(value)) == value
+        encoded = test_module.json_dumps_bytes(value)
+        assert isinstance(encoded, bytes)
+        assert test_module.json_loads(encoded) == value
+        assert "json" in repr(codec)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            test_module.set_json_backend("unknown")
+        assert test_module.get_json_backend() in test_module.available_backends()
+
+    def test_all_backends(self):
+        value = {"@type": "test", "items": [{"id": idx} for idx in range(3)]}
+        for name in test_module.available_backends():
+            test_module.set_json_backend(name)
+            encoded = test_module.json_dumps(value)
+            assert isinstance(encoded, str)
+            assert test_module.json_loads(encoded) == value
+            assert test_module.json_loads(test_module.json_dumps_bytes(value)) == value
@@ -1,7 +1,14 @@
 import asyncio
 from asynctest import TestCase
 
-from ..task_queue import CompletedTask, PendingTask, TaskQueue, task_exc_info
+from ..task_queue import (
+    CompletedTask,
+    PendingTask,
+    TaskClass,
+    TaskQueue,
+    gather_bounded,
+    task_exc_info,
+)
 
 
 async def retval(val, *, delay=0):
@@ -191,3 +198,93 @@ class TestTaskQueue(TestCase):
         assert len(completed) == 2
         assert "queued" not in completed[0][1]
         assert "queued" in completed[1][1]
+
+    async def test_task_classes(self):
+        started = []
+
+        async def record(val):
+            started.append(val)
+            await asyncio.sleep(0.01)
+
+        completed = []
+        queue = TaskQueue(
+            max_active=2,
+            trace_fn=completed.append,
+            task_classes=(
+                TaskClass("inbound", max_active=1, priority=0),
+                TaskClass("admin", max_active=1, priority=1),
+            ),
+        )
+        for i in range(3):
+            queue.put(record(f"admin{i}"), task_class="admin")
+        for i in range(2):
+            queue.put(record(f"in{i}"), task_class="inbound")
+        assert queue.current_active == 2
+        assert queue.class_stats["admin"] == {"active": 1, "pending": 2, "started": 1}
+        assert [p.task_class for p in queue.pending_tasks] == [
+            "inbound",
+            "admin",
+            "admin",
+        ]
+        await queue.flush()
+        # one task of each class runs at a time, in order within the class
+        assert started[:2] == ["admin0", "in0"]
+        assert [s for s in started if s.startswith("admin")] == [
+            "admin0",
+            "admin1",
+            "admin2",
+        ]
+        assert [c.task_class for c in completed].count("inbound") == 2
+        assert queue.class_stats["inbound"] == {"active": 0, "pending": 0, "started": 2}
+
+    async def test_task_class_priority(self):
+        started = []
+
+        async def record(val):
+            started.append(val)
+
+        queue = TaskQueue(
+            max_active=1,
+            task_classes=(
+                TaskClass("high", priority=1),
+                TaskClass("low", priority=2),
+            ),
+        )
+        blocker = queue.run(asyncio.sleep(0.01))
+        queue.put(record("low"), task_class="low")
+        queue.put(record("high"), task_class="high")
+        queue.put(record("default"))
+        await blocker
+        await queue.flush()
+        assert started == ["default", "high", "low"]
+
+
+class TestGatherBounded(TestCase):
+    async def test_gather_bounded(self):
+        active = []
+        peak = []
+
+        async def fetch(item):
+            active.append(item)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(item)
+            return item * 2
+
+        assert await gather_bounded(fetch, range(10), 3) == list(range(0, 20, 2))
+        assert max(peak) == 3
+        assert await gather_bounded(fetch, []) == []
+
+    async def test_gather_bounded_error(self):
+        started = []
+
+        async def fetch(item):
+            started.append(item)
+            if item == 1:
+                raise ValueError("failed")
+            await asyncio.sleep(1)
+
+        with self.assertRaises(ValueError):
+            await gather_bounded(fetch, range(4), 2)
+        await asyncio.sleep(0.01)
+        assert 3 not in started
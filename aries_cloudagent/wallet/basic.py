@@ -1,6 +1,5 @@
 """In-memory implementation of BaseWallet interface."""
 
-import asyncio
 from typing import Sequence
 
 from .base import BaseWallet, KeyInfo, DIDInfo
@@ -11,8 +10,10 @@ from .crypto import (
     sign_message,
     verify_signed_message,
     encode_pack_message,
-    decode_pack_message,
+    decode_pack_message_outer,
+    decode_pack_message_for_recipient,
 )
+from .crypto_engine import CryptoEngine
 from .error import WalletError, WalletDuplicateError, WalletNotFoundError
 from .util import b58_to_bytes, bytes_to_b58
 
@@ -27,7 +28,8 @@ class BasicWallet(BaseWallet):
         Initialize a `BasicWallet` instance.
 
         Args:
-            config: {name, key, seed, did, auto-create, auto-remove}
+            config: {name, key, seed, did, auto-create, auto-remove,
+                crypto_processes}
 
         """
         if not config:
@@ -37,6 +39,8 @@ class BasicWallet(BaseWallet):
         self._keys = {}
         self._local_dids = {}
         self._pair_dids = {}
+        self._secrets = {}
+        self._crypto = CryptoEngine(config.get("crypto_processes") or 0)
 
     @property
     def name(self) -> str:
@@ -64,8 +68,8 @@ class BasicWallet(BaseWallet):
         pass
 
     async def close(self):
-        """Not applicable to in-memory wallet."""
-        pass
+        """Stop the crypto engine, if it is running a process pool."""
+        self._crypto.close()
 
     async def create_signing_key(
         self, seed: str = None, metadata: dict = None
@@ -95,6 +99,7 @@ class BasicWallet(BaseWallet):
             "verkey": verkey_enc,
             "metadata": metadata.copy() if metadata else {},
         }
+        self._secrets[verkey_enc] = secret
         return KeyInfo(verkey_enc, self._keys[verkey_enc]["metadata"].copy())
 
     async def get_signing_key(self, verkey: str) -> KeyInfo:
@@ -163,6 +168,7 @@ class BasicWallet(BaseWallet):
             "verkey": verkey_enc,
             "metadata": metadata.copy() if metadata else {},
         }
+        self._secrets[verkey_enc] = secret
         return DIDInfo(did, verkey_enc, self._local_dids[did]["metadata"].copy())
 
     def _get_did_info(self, did: str) -> DIDInfo:
@@ -243,6 +249,10 @@ class BasicWallet(BaseWallet):
             raise WalletNotFoundError("Unknown DID: {}".format(did))
         self._local_dids[did]["metadata"] = metadata.copy() if metadata else {}
 
+    def _find_private_key(self, verkey: str) -> bytes:
+        """Resolve the private key for a verkey, returning `None` if not found."""
+        return self._secrets.get(verkey)
+
     def _get_private_key(self, verkey: str) -> bytes:
         """
         Resolve private key for a wallet DID.
@@ -260,10 +270,9 @@ class BasicWallet(BaseWallet):
 
         """
 
-        keys_and_dids = list(self._local_dids.values()) + list(self._keys.values())
-        for info in keys_and_dids:
-            if info["verkey"] == verkey:
-                return info["secret"]
+        secret = self._secrets.get(verkey)
+        if secret:
+            return secret
 
         raise WalletError("Private key not found for verkey: {}".format(verkey))
 
@@ -338,9 +347,7 @@ class BasicWallet(BaseWallet):
         """
         keys_bin = [b58_to_bytes(key) for key in to_verkeys]
         secret = self._get_private_key(from_verkey) if from_verkey else None
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: encode_pack_message(message, keys_bin, secret)
-        )
+        result = await self._crypto.run(encode_pack_message, message, keys_bin, secret)
         return result
 
     async def unpack_message(self, enc_message: bytes) -> (str, str, str):
@@ -361,12 +368,21 @@ class BasicWallet(BaseWallet):
         if not enc_message:
             raise WalletError("Message not provided")
         try:
-            (
-                message,
-                from_verkey,
-                to_verkey,
-            ) = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: decode_pack_message(enc_message, self._get_private_key)
+            wrapper, recips, is_authcrypt = decode_pack_message_outer(enc_message)
+            for to_verkey in recips:
+                secret = self._find_private_key(to_verkey)
+                if secret:
+                    break
+            else:
+                raise WalletError(
+                    "No corresponding recipient key found in {}".format(tuple(recips))
+                )
+            message, from_verkey = await self._crypto.run(
+                decode_pack_message_for_recipient,
+                wrapper,
+                recips[to_verkey],
+                secret,
+                is_authcrypt,
             )
         except ValueError as e:
             raise WalletError("Message could not be unpacked: {}".format(str(e)))
@@ -1,7 +1,7 @@
 """Cryptography functions used by BasicWallet."""
 
 from collections import OrderedDict
-import json
+from functools import lru_cache
 from typing import Callable, Optional, Sequence, Tuple
 
 from marshmallow import fields, Schema, ValidationError
@@ -9,9 +9,14 @@ import nacl.bindings
 import nacl.exceptions
 import nacl.utils
 
+from ..utils.json_codec import json_dumps, json_dumps_bytes, json_loads
+
 from .error import WalletError
 from .util import bytes_to_b58, bytes_to_b64, b64_to_bytes, b58_to_bytes
 
+# the number of converted keys and shared keys retained for repeat peers
+KEY_CACHE_SIZE = 4096
+
 
 class PackMessageSchema(Schema):
     """Packed message schema."""
@@ -46,6 +51,11 @@ class PackRecipientsSchema(Schema):
     recipients = fields.List(fields.Nested(PackRecipientSchema()), required=True)
 
 
+# the schemas hold no state, so one instance of each is shared
+PACK_MESSAGE_SCHEMA = PackMessageSchema()
+PACK_RECIPIENTS_SCHEMA = PackRecipientsSchema()
+
+
 def create_keypair(seed: bytes = None) -> Tuple[bytes, bytes]:
     """
     Create a public and private signing keypair from a seed value.
@@ -97,6 +107,53 @@ def sign_pk_from_sk(secret: bytes) -> bytes:
     return secret[seed_len:]
 
 
+def ed25519_pk_to_curve25519(verkey: bytes) -> bytes:
+    """Convert an Ed25519 verkey to an X25519 public key."""
+    return nacl.bindings.crypto_sign_ed25519_pk_to_curve25519(verkey)
+
+
+def ed25519_sk_to_curve25519(secret: bytes) -> bytes:
+    """Convert an Ed25519 secret key to an X25519 secret key."""
+    return nacl.bindings.crypto_sign_ed25519_sk_to_curve25519(secret)
+
+
+def box_shared_key(public: bytes, secret: bytes) -> bytes:
+    """Precompute the crypto_box shared key for a pair of X25519 keys."""
+    return nacl.bindings.crypto_box_beforenm(public, secret)
+
+
+class KeyCache:
+    """
+    Converted keys and shared keys retained for repeat peers.
+
+    Each wallet holds its own cache and clears it when closed, so that keys
+    derived from its secrets are not kept beyond the life of the wallet.
+    """
+
+    FUNCTIONS = (ed25519_pk_to_curve25519, ed25519_sk_to_curve25519, box_shared_key)
+
+    def __init__(self, maxsize: int = KEY_CACHE_SIZE):
+        """Initialize the key cache, holding up to `maxsize` keys of each kind."""
+        for fn in self.FUNCTIONS:
+            setattr(self, fn.__name__, lru_cache(maxsize=maxsize)(fn))
+
+    def info(self) -> dict:
+        """Report the hits, misses and size of the key caches."""
+        return {
+            fn.__name__: getattr(self, fn.__name__).cache_info()._asdict()
+            for fn in self.FUNCTIONS
+        }
+
+    def clear(self):
+        """Remove all cached keys."""
+        for fn in self.FUNCTIONS:
+            getattr(self, fn.__name__).cache_clear()
+
+
+# used when no key cache is given
+NO_KEY_CACHE = KeyCache(0)
+
+
 def validate_seed(seed: (str, bytes)) -> bytes:
     """
     Convert a seed parameter to standard format and check length.
@@ -159,7 +216,7 @@ def verify_signed_message(signed: bytes, verkey: bytes) -> bool:
 
 
 def prepare_pack_recipient_keys(
-    to_verkeys: Sequence[bytes], from_secret: bytes = None
+    to_verkeys: Sequence[bytes], from_secret: bytes = None, key_cache: KeyCache = None,
 ) -> Tuple[str, bytes]:
     """
     Assemble the recipients block of a packed message.
@@ -167,24 +224,27 @@ def prepare_pack_recipient_keys(
     Args:
         to_verkeys: Verkeys of recipients
         from_secret: Secret to use for signing keys
+        key_cache: The cache of converted and shared keys to use
 
     Returns:
         A tuple of (json result, key)
 
     """
+    key_cache = key_cache or NO_KEY_CACHE
     cek = nacl.bindings.crypto_secretstream_xchacha20poly1305_keygen()
     recips = []
+    if from_secret:
+        sender_vk = bytes_to_b58(sign_pk_from_sk(from_secret)).encode("ascii")
+        sk = key_cache.ed25519_sk_to_curve25519(from_secret)
 
     for target_vk in to_verkeys:
-        target_pk = nacl.bindings.crypto_sign_ed25519_pk_to_curve25519(target_vk)
+        target_pk = key_cache.ed25519_pk_to_curve25519(target_vk)
         if from_secret:
-            sender_pk = sign_pk_from_sk(from_secret)
-            sender_vk = bytes_to_b58(sender_pk).encode("ascii")
             enc_sender = nacl.bindings.crypto_box_seal(sender_vk, target_pk)
-            sk = nacl.bindings.crypto_sign_ed25519_sk_to_curve25519(from_secret)
-
             nonce = nacl.utils.random(nacl.bindings.crypto_box_NONCEBYTES)
-            enc_cek = nacl.bindings.crypto_box(cek, nonce, target_pk, sk)
+            enc_cek = nacl.bindings.crypto_box_afternm(
+                cek, nonce, key_cache.box_shared_key(target_pk, sk)
+            )
         else:
             enc_sender = None
             nonce = None
@@ -226,7 +286,7 @@ def prepare_pack_recipient_keys(
             ("recipients", recips),
         ]
     )
-    return json.dumps(data), cek
+    return json_dumps(data), cek
 
 
 # def locate_pack_recipient_key(
@@ -333,7 +393,10 @@ def decrypt_plaintext(
 
 
 def encode_pack_message(
-    message: str, to_verkeys: Sequence[bytes], from_secret: bytes = None
+    message: str,
+    to_verkeys: Sequence[bytes],
+    from_secret: bytes = None,
+    key_cache: KeyCache = None,
 ) -> bytes:
     """
     Assemble a packed message for a set of recipients, optionally including the sender.
@@ -342,12 +405,13 @@ def encode_pack_message(
         message: The message to pack
         to_verkeys: The verkeys to pack the message for
         from_secret: The sender secret
+        key_cache: The cache of converted and shared keys to use
 
     Returns:
         The encoded message
 
     """
-    recips_json, cek = prepare_pack_recipient_keys(to_verkeys, from_secret)
+    recips_json, cek = prepare_pack_recipient_keys(to_verkeys, from_secret, key_cache)
     recips_b64 = bytes_to_b64(recips_json.encode("ascii"), urlsafe=True)
 
     ciphertext, nonce, tag = encrypt_plaintext(message, recips_b64.encode("ascii"), cek)
@@ -360,11 +424,11 @@ def encode_pack_message(
             ("tag", bytes_to_b64(tag, urlsafe=True)),
         ]
     )
-    return json.dumps(data).encode("ascii")
+    return json_dumps_bytes(data)
 
 
 def decode_pack_message(
-    enc_message: bytes, find_key: Callable
+    enc_message: bytes, find_key: Callable, key_cache: KeyCache = None
 ) -> Tuple[str, Optional[str], str]:
     """
     Decode a packed message.
@@ -376,6 +440,7 @@ def decode_pack_message(
     Args:
         enc_message: The encrypted message
         find_key: Function to retrieve private key
+        key_cache: The cache of converted and shared keys to use
 
     Returns:
         A tuple of (message, sender_vk, recip_vk)
@@ -388,22 +453,48 @@ def decode_pack_message(
 
     """
     wrapper, recips, is_authcrypt = decode_pack_message_outer(enc_message)
-    payload_key, sender_vk = None, None
     for recip_vk in recips:
         recip_secret = find_key(recip_vk)
         if recip_secret:
-            payload_key, sender_vk = extract_payload_key(recips[recip_vk], recip_secret)
             break
-
-    if not payload_key:
+    else:
         raise ValueError(
             "No corresponding recipient key found in {}".format(tuple(recips))
         )
+
+    message, sender_vk = decode_pack_message_for_recipient(
+        wrapper, recips[recip_vk], recip_secret, is_authcrypt, key_cache
+    )
+    return message, sender_vk, recip_vk
+
+
+def decode_pack_message_for_recipient(
+    wrapper: dict,
+    sender_cek: dict,
+    recip_secret: bytes,
+    is_authcrypt: bool,
+    key_cache: KeyCache = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Decrypt a packed message once the recipient has been located.
+
+    Args:
+        wrapper: The decoded message wrapper
+        sender_cek: The recipient details from `extract_pack_recipients`
+        recip_secret: The secret key of the recipient
+        is_authcrypt: Whether the message was packed with Authcrypt
+        key_cache: The cache of converted and shared keys to use
+
+    Returns:
+        A tuple of (message, sender_vk)
+
+    """
+    payload_key, sender_vk = extract_payload_key(sender_cek, recip_secret, key_cache)
     if not sender_vk and is_authcrypt:
         raise ValueError("Sender public key not provided for Authcrypt message")
 
     message = decode_pack_message_payload(wrapper, payload_key)
-    return message, sender_vk, recip_vk
+    return message, sender_vk
 
 
 def decode_pack_message_outer(enc_message: bytes) -> Tuple[dict, dict, bool]:
@@ -417,13 +508,13 @@ def decode_pack_message_outer(enc_message: bytes) -> Tuple[dict, dict, bool]:
 
     """
     try:
-        wrapper = PackMessageSchema().loads(enc_message)
+        wrapper = PACK_MESSAGE_SCHEMA.load(json_loads(enc_message))
     except ValidationError:
         raise ValueError("Invalid packed message")
 
-    recips_json = b64_to_bytes(wrapper["protected"], urlsafe=True).decode("ascii")
+    recips_json = b64_to_bytes(wrapper["protected"], urlsafe=True)
     try:
-        recips_outer = PackRecipientsSchema().loads(recips_json)
+        recips_outer = PACK_RECIPIENTS_SCHEMA.load(json_loads(recips_json))
     except ValidationError:
         raise ValueError("Invalid packed message recipients")
 
@@ -497,26 +588,29 @@ def extract_pack_recipients(recipients: Sequence[dict]) -> dict:
     return result
 
 
-def extract_payload_key(sender_cek: dict, recip_secret: bytes) -> Tuple[bytes, str]:
+def extract_payload_key(
+    sender_cek: dict, recip_secret: bytes, key_cache: KeyCache = None
+) -> Tuple[bytes, str]:
     """
     Extract the payload key from pack recipient details.
 
     Returns: A tuple of the CEK and sender verkey
     """
+    key_cache = key_cache or NO_KEY_CACHE
     recip_vk = sign_pk_from_sk(recip_secret)
-    recip_pk = nacl.bindings.crypto_sign_ed25519_pk_to_curve25519(recip_vk)
-    recip_sk = nacl.bindings.crypto_sign_ed25519_sk_to_curve25519(recip_secret)
+    recip_pk = key_cache.ed25519_pk_to_curve25519(recip_vk)
+    recip_sk = key_cache.ed25519_sk_to_curve25519(recip_secret)
 
     if sender_cek["nonce"] and sender_cek["sender"]:
         sender_vk_bin = nacl.bindings.crypto_box_seal_open(
             sender_cek["sender"], recip_pk, recip_sk
         )
         sender_vk = sender_vk_bin.decode("ascii")
-        sender_pk = nacl.bindings.crypto_sign_ed25519_pk_to_curve25519(
-            b58_to_bytes(sender_vk_bin)
-        )
-        cek = nacl.bindings.crypto_box_open(
-            sender_cek["key"], sender_cek["nonce"], sender_pk, recip_sk
+        sender_pk = key_cache.ed25519_pk_to_curve25519(b58_to_bytes(sender_vk_bin))
+        cek = nacl.bindings.crypto_box_open_afternm(
+            sender_cek["key"],
+            sender_cek["nonce"],
+            key_cache.box_shared_key(sender_pk, recip_sk),
         )
     else:
         sender_vk = None
@@ -0,0 +1,160 @@
+"""Run wallet cryptography in batches, optionally in a pool of processes."""
+
+import asyncio
+import logging
+import multiprocessing
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Sequence, Tuple
+
+from .crypto import KeyCache
+
+LOGGER = logging.getLogger(__name__)
+
+# the key cache of a pool process, which exits when the pool is shut down
+_POOL_KEY_CACHE: KeyCache = None
+
+
+def run_batch(jobs: Sequence[Tuple[Callable, tuple]]) -> Sequence[Tuple[bool, object]]:
+    """
+    Run a batch of jobs in a pool process, collecting the result or exception of each.
+
+    Args:
+        jobs: A sequence of (function, arguments) pairs
+
+    Returns:
+        A list of (success, result or exception) pairs in the order of the jobs
+
+    """
+    global _POOL_KEY_CACHE
+    if not _POOL_KEY_CACHE:
+        _POOL_KEY_CACHE = KeyCache()
+    results = []
+    for fn, args in jobs:
+        try:
+            results.append((True, fn(*args, key_cache=_POOL_KEY_CACHE)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class CryptoEngine:
+    """
+    Execute pack and unpack operations away from the event loop.
+
+    When a number of processes is configured, jobs are run in a process pool
+    which allows cryptography to use more than one CPU core. Jobs submitted
+    within the same iteration of the event loop are collected into a single
+    batch, so that many messages may be handled with one submission to the
+    pool. Otherwise each job is run separately in the default thread executor,
+    so that concurrent jobs are not serialized behind each other.
+
+    Jobs are passed a `key_cache` keyword argument. Threads share the cache of
+    the engine, and each pool process has its own, so that the keys derived
+    from the secrets of the wallet are dropped when the engine is closed.
+    """
+
+    def __init__(self, processes: int = 0, *, batch_size: int = 64):
+        """
+        Initialize a `CryptoEngine` instance.
+
+        Args:
+            processes: The number of worker processes, or 0 to use threads
+            batch_size: The maximum number of jobs in one batch
+
+        """
+        self.processes = processes
+        self.batch_size = batch_size
+        self.executor: Executor = None
+        self.key_cache = KeyCache()
+        self.jobs_run = 0
+        self.batches_run = 0
+        self._pending = []
+        self._flush_handle: asyncio.Handle = None
+
+    def start(self):
+        """Start the process pool, if configured."""
+        if self.processes and not self.executor:
+            # spawn rather than fork, as the parent is running an event loop
+            self.executor = ProcessPoolExecutor(
+                self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+            LOGGER.info("Started crypto process pool with %d workers", self.processes)
+
+    async def run(self, fn: Callable, *args):
+        """
+        Run a job and wait for the result.
+
+        Args:
+            fn: A module-level function, which must be picklable if a process
+                pool is in use
+            args: The arguments to the function
+
+        """
+        loop = asyncio.get_event_loop()
+        if not self.processes:
+            self.jobs_run += 1
+            return await loop.run_in_executor(
+                None, partial(fn, *args, key_cache=self.key_cache)
+            )
+        future = loop.create_future()
+        self._pending.append((fn, args, future))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif not self._flush_handle:
+            self._flush_handle = loop.call_soon(self.flush)
+        return await future
+
+    def flush(self):
+        """Submit the pending jobs as one batch."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.processes and not self.executor:
+            self.start()
+        jobs = [(fn, args) for (fn, args, _future) in pending]
+        futures = [future for (_fn, _args, future) in pending]
+        batch = asyncio.get_event_loop().run_in_executor(
+            self.executor, run_batch, jobs
+        )
+        batch.add_done_callback(partial(self._resolve, futures))
+        self.jobs_run += len(jobs)
+        self.batches_run += 1
+
+    @staticmethod
+    def _resolve(futures: Sequence[asyncio.Future], batch: asyncio.Future):
+        """Deliver the results of a completed batch."""
+        if batch.cancelled():
+            results = [(False, asyncio.CancelledError())] * len(futures)
+        elif batch.exception():
+            results = [(False, batch.exception())] * len(futures)
+        else:
+            results = batch.result()
+        for future, (success, result) in zip(futures, results):
+            if future.done():
+                continue
+            if success:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    @property
+    def stats(self) -> dict:
+        """Accessor for the engine counters."""
+        return {
+            "processes": self.processes,
+            "jobs": self.jobs_run,
+            "batches": self.batches_run,
+        }
+
+    def close(self):
+        """Submit any pending jobs, shut down the process pool and clear the keys."""
+        self.flush()
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+        self.key_cache.clear()
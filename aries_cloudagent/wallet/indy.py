@@ -9,6 +9,8 @@ import indy.did
 import indy.crypto
 from indy.error import IndyError, ErrorCode
 
+from ..holder.search import CredentialSearchRegistry
+
 from .base import BaseWallet, KeyInfo, DIDInfo
 from .crypto import validate_seed
 from .error import WalletError, WalletDuplicateError, WalletNotFoundError
@@ -58,6 +60,8 @@ class IndyWallet(BaseWallet):
         self._storage_config = config.get("storage_config", None)
         self._storage_creds = config.get("storage_creds", None)
         self._master_secret_id = None
+        # the credential searches of the holder, retained between page requests
+        self.credential_searches = CredentialSearchRegistry()
 
         if self._storage_type == "postgres_storage":
             load_postgres_plugin()
@@ -254,6 +258,7 @@ class IndyWallet(BaseWallet):
     async def close(self):
         """Close previously-opened wallet, removing it if so configured."""
         if self._handle:
+            await self.credential_searches.close_all()
             await indy.wallet.close_wallet(self._handle)
             if self._auto_remove:
                 await self.remove()
@@ -1,3 +1,4 @@
+import asyncio
 import time
 
 import pytest
@@ -217,6 +218,49 @@ class TestBasicWallet:
         with pytest.raises(WalletError):
             unpacked_auth, from_verkey, to_verkey = await wallet.unpack_message(b"{}")
 
+    @pytest.mark.asyncio
+    async def test_pack_unpack_multiple_recipients(self, wallet):
+        await wallet.create_local_did(self.test_seed, self.test_did)
+        await wallet.create_local_did(self.test_target_seed, self.test_target_did)
+        packed = await wallet.pack_message(
+            self.test_message,
+            [self.missing_verkey, self.test_target_verkey],
+            self.test_verkey,
+        )
+        unpacked, from_verkey, to_verkey = await wallet.unpack_message(packed)
+        assert unpacked == self.test_message
+        assert from_verkey == self.test_verkey
+        assert to_verkey == self.test_target_verkey
+
+        packed = await wallet.pack_message(self.test_message, [self.missing_verkey])
+        with pytest.raises(WalletError):
+            await wallet.unpack_message(packed)
+
+    @pytest.mark.asyncio
+    async def test_pack_unpack_concurrent(self, wallet):
+        await wallet.create_local_did(self.test_seed, self.test_did)
+        await wallet.create_local_did(self.test_target_seed, self.test_target_did)
+        packed = await asyncio.gather(
+            *(
+                wallet.pack_message(
+                    f"{self.test_message} {index}",
+                    [self.test_target_verkey],
+                    self.test_verkey,
+                )
+                for index in range(5)
+            )
+        )
+        unpacked = await asyncio.gather(
+            *(wallet.unpack_message(message) for message in packed)
+        )
+        assert [message for (message, _, _) in unpacked] == [
+            f"{self.test_message} {index}" for index in range(5)
+        ]
+        assert wallet._crypto.stats["jobs"] == 10
+        assert wallet._crypto.key_cache.info()["box_shared_key"]["currsize"]
+        await wallet.close()
+        assert not wallet._crypto.key_cache.info()["box_shared_key"]["currsize"]
+
     @pytest.mark.asyncio
     async def test_signature_round_trip(self, wallet):
         key_info = await wallet.create_signing_key()
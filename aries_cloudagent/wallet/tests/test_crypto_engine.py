@@ -0,0 +1,76 @@
+import asyncio
+
+from asynctest import TestCase as AsyncTestCase
+
+from ..crypto import (
+    KeyCache,
+    create_keypair,
+    decode_pack_message,
+    encode_pack_message,
+)
+from ..crypto_engine import CryptoEngine, run_batch
+
+
+def length(value, key_cache: KeyCache):
+    assert isinstance(key_cache, KeyCache)
+    return len(value)
+
+
+def fail(message: str, key_cache: KeyCache):
+    raise ValueError(message)
+
+
+class TestCryptoEngine(AsyncTestCase):
+    def test_run_batch(self):
+        results = run_batch([(length, ("abc",)), (fail, ("failed",))])
+        assert results[0] == (True, 3)
+        assert results[1][0] is False
+        assert isinstance(results[1][1], ValueError)
+
+    async def test_run_threads(self):
+        engine = CryptoEngine()
+        results = await asyncio.gather(
+            *(engine.run(length, "a" * index) for index in range(3))
+        )
+        assert results == [0, 1, 2]
+        with self.assertRaises(ValueError):
+            await engine.run(fail, "failed")
+        # jobs are run separately in threads rather than batched
+        assert engine.stats == {"processes": 0, "jobs": 4, "batches": 0}
+        engine.close()
+
+    async def test_run_processes(self):
+        engine = CryptoEngine(1, batch_size=2)
+        try:
+            verkey, secret = create_keypair()
+            packed = await engine.run(encode_pack_message, "message", [verkey], None)
+            message, sender, _recip = decode_pack_message(packed, lambda _: secret)
+            assert message == "message" and sender is None
+            results = await asyncio.gather(
+                *(engine.run(length, "a" * index) for index in range(5))
+            )
+            assert results == [0, 1, 2, 3, 4]
+            assert engine.stats["batches"] == 4
+        finally:
+            engine.close()
+        assert engine.executor is None
+
+    async def test_key_cache(self):
+        engine = CryptoEngine()
+        sender_vk, sender_sk = create_keypair()
+        recip_vk, recip_sk = create_keypair()
+        for _ in range(3):
+            packed = await engine.run(
+                encode_pack_message, "message", [recip_vk], sender_sk
+            )
+            message, _, _ = decode_pack_message(
+                packed, lambda _: recip_sk, engine.key_cache
+            )
+            assert message == "message"
+        info = engine.key_cache.info()
+        assert info["box_shared_key"]["misses"] == 2
+        assert info["box_shared_key"]["hits"] == 4
+        # the keys are not retained beyond the life of the wallet
+        engine.close()
+        assert engine.key_cache.info()["box_shared_key"]["currsize"] == 0
+        assert KeyCache().info()["box_shared_key"]["currsize"] == 0
@@ -137,13 +137,15 @@ class BaseAgent(DemoAgent):
 
 
 class AliceAgent(BaseAgent):
-    def __init__(self, port: int, **kwargs):
+    def __init__(self, port: int, workers: int = 1, **kwargs):
         super().__init__("Alice", port, seed=None, **kwargs)
         self.extra_args = [
             "--auto-respond-credential-offer",
             "--auto-store-credential",
             "--monitor-ping",
         ]
+        if workers > 1:
+            self.extra_args.extend(("--inbound-workers", str(workers)))
         self.timing_log = "logs/alice_perf.log"
 
     async def set_tag_policy(self, cred_def_id, taggables):
@@ -213,6 +215,7 @@ async def main(
     show_timing: bool = False,
     routing: bool = False,
     issue_count: int = 300,
+    workers: int = 1,
 ):
 
     genesis = await default_genesis_txns()
@@ -227,7 +230,9 @@ async def main(
     run_timer.start()
 
     try:
-        alice = AliceAgent(start_port, genesis_data=genesis, timing=show_timing)
+        alice = AliceAgent(
+            start_port, workers, genesis_data=genesis, timing=show_timing
+        )
         await alice.listen_webhooks(start_port + 2)
 
         faber = FaberAgent(start_port + 3, genesis_data=genesis, timing=show_timing)
@@ -490,6 +495,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--timing", action="store_true", help="Enable detailed timing report"
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Set the number of processes handling inbound messages for Alice."
+        " Compare --ping runs with 1 and N workers to measure the throughput of"
+        " the multi-process mode",
+    )
     args = parser.parse_args()
 
     require_indy()
@@ -503,6 +517,7 @@ if __name__ == "__main__":
                 args.timing,
                 args.routing,
                 args.count,
+                args.workers,
             )
         )
     except KeyboardInterrupt:
@@ -0,0 +1,69 @@
+"""Measure BasicStorage tag lookup latency as the store grows."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.storage.basic import BasicStorage  # noqa: E402
+from aries_cloudagent.storage.record import StorageRecord  # noqa: E402
+
+RECORD_TYPE = "connection"
+LOOKUPS = 1000
+
+
+async def fill(storage: BasicStorage, start: int, end: int):
+    for idx in range(start, end):
+        await storage.add_record(
+            StorageRecord(
+                RECORD_TYPE,
+                "{}",
+                {
+                    "my_did": "did-{}".format(idx),
+                    "state": ("active", "invited")[idx % 2],
+                },
+                "rec-{}".format(idx),
+            )
+        )
+
+
+async def lookup(storage: BasicStorage, size: int) -> float:
+    start = time.perf_counter()
+    for idx in range(LOOKUPS):
+        tag_filter = {"my_did": "did-{}".format((idx * 7919) % size)}
+        await storage.search_records(RECORD_TYPE, tag_filter).fetch_single()
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+async def main(sizes):
+    storage = BasicStorage()
+    current = 0
+    print("{:>10} {:>14} {:>14}".format("records", "fill (s)", "lookup (us)"))
+    for size in sizes:
+        start = time.perf_counter()
+        await fill(storage, current, size)
+        fill_time = time.perf_counter() - start
+        current = size
+        latency = await lookup(storage, size)
+        print("{:>10} {:>14.2f} {:>14.2f}".format(size, fill_time, latency * 1e6))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a BasicStorage tag lookup benchmark."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[1000, 10000, 100000, 1000000],
+        help="Store sizes to measure, in ascending order",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(sorted(args.sizes)))
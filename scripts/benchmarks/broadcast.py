@@ -0,0 +1,159 @@
+"""Compare sending one message to many connections with and without broadcast."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.connections.models.connection_target import (  # noqa: E402
+    ConnectionTarget,
+)
+from aries_cloudagent.protocols.basicmessage.messages.basicmessage import (  # noqa
+    BasicMessage,
+)
+from aries_cloudagent.transport.outbound.base import BaseOutboundTransport  # noqa: E402
+from aries_cloudagent.transport.outbound.manager import (  # noqa: E402
+    OutboundTransportManager,
+)
+from aries_cloudagent.transport.outbound.message import OutboundMessage  # noqa: E402
+from aries_cloudagent.transport.pack_format import PackWireFormat  # noqa: E402
+from aries_cloudagent.transport.wire_format import BaseWireFormat  # noqa: E402
+from aries_cloudagent.wallet.base import BaseWallet  # noqa: E402
+from aries_cloudagent.wallet.basic import BasicWallet  # noqa: E402
+
+
+class NullTransport(BaseOutboundTransport):
+    """An outbound transport which only counts the messages it is given."""
+
+    schemes = ("http",)
+    delivered = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def handle_message(self, payload, endpoint: str):
+        NullTransport.delivered += 1
+
+
+class CountingWallet(BasicWallet):
+    """A wallet counting the pack operations performed."""
+
+    packed = 0
+
+    async def pack_message(self, message, to_verkeys, from_verkey=None):
+        CountingWallet.packed += 1
+        return await super().pack_message(message, to_verkeys, from_verkey)
+
+
+async def make_targets(wallet: BaseWallet, count: int, pairwise: bool):
+    sender_key = None
+    targets = {}
+    for idx in range(count):
+        if pairwise or not sender_key:
+            sender_key = (await wallet.create_local_did()).verkey
+        recipient = await wallet.create_signing_key()
+        targets[f"conn-{idx}"] = [
+            ConnectionTarget(
+                endpoint=f"http://agent-{idx}.example:8020",
+                recipient_keys=[recipient.verkey],
+                sender_key=sender_key,
+            )
+        ]
+    return targets
+
+
+async def measure(count: int, pairwise: bool, broadcast: bool, shared: bool = False):
+    context = InjectionContext(enforce_typing=False)
+    wallet = CountingWallet()
+    context.injector.bind_instance(BaseWallet, wallet)
+    context.injector.bind_instance(BaseWireFormat, PackWireFormat())
+    targets = await make_targets(wallet, count, pairwise)
+
+    mgr = OutboundTransportManager(context)
+    mgr.register_class(NullTransport, "null")
+    await mgr.setup()
+    mgr.broadcast_shared = shared
+    await mgr.start()
+    await mgr.task_queue
+    NullTransport.delivered = 0
+    CountingWallet.packed = 0
+
+    message = BasicMessage(content="Scheduled maintenance tonight at 22:00 UTC")
+    start = time.perf_counter()
+    if broadcast:
+        mgr.enqueue_broadcast(context, message.to_json(), targets)
+    else:
+        for connection_id, target_list in targets.items():
+            mgr.enqueue_message(
+                context,
+                OutboundMessage(
+                    connection_id=connection_id,
+                    payload=message.to_json(),
+                    target_list=target_list,
+                ),
+            )
+    await mgr.flush()
+    elapsed = time.perf_counter() - start
+    await mgr.stop()
+    assert NullTransport.delivered == count
+    return elapsed, CountingWallet.packed
+
+
+async def main(sizes):
+    print(
+        "{:>8} {:>9} {:>12} {:>8} {:>14} {:>8} {:>12} {:>8}".format(
+            "conns",
+            "senders",
+            "serial (ms)",
+            "packs",
+            "broadcast (ms)",
+            "packs",
+            "shared (ms)",
+            "packs",
+        )
+    )
+    for size in sizes:
+        for pairwise in (False, True):
+            serial, serial_packs = await measure(size, pairwise, False)
+            batch, batch_packs = await measure(size, pairwise, True)
+            shared, shared_packs = await measure(size, pairwise, True, True)
+            print(
+                "{:>8} {:>9} {:>12.1f} {:>8} {:>14.1f} {:>8} {:>12.1f} {:>8}".format(
+                    size,
+                    "pairwise" if pairwise else "shared",
+                    serial * 1e3,
+                    serial_packs,
+                    batch * 1e3,
+                    batch_packs,
+                    shared * 1e3,
+                    shared_packs,
+                )
+            )
+    print("(broadcast packs once per connection and only shares the serialized")
+    print(" message; with --broadcast-shared-pack, connections with a shared sender")
+    print(" key share a multi-recipient pack, disclosing their keys to each other)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of broadcast message delivery."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[1000, 10000],
+        help="Numbers of connections to measure",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(sorted(args.sizes)))
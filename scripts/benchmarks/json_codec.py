@@ -0,0 +1,110 @@
+"""Measure record queries and message round trips under each JSON backend."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.connections.models.connection_record import (  # noqa: E402
+    ConnectionRecord,
+)
+from aries_cloudagent.protocols.basicmessage.messages.basicmessage import (  # noqa
+    BasicMessage,
+)
+from aries_cloudagent.storage.base import BaseStorage  # noqa: E402
+from aries_cloudagent.storage.basic import BasicStorage  # noqa: E402
+from aries_cloudagent.transport.pack_format import PackWireFormat  # noqa: E402
+from aries_cloudagent.utils.json_codec import (  # noqa: E402
+    available_backends,
+    set_json_backend,
+)
+from aries_cloudagent.wallet.base import BaseWallet  # noqa: E402
+from aries_cloudagent.wallet.basic import BasicWallet  # noqa: E402
+
+
+async def build_context(records: int) -> InjectionContext:
+    context = InjectionContext(enforce_typing=False)
+    context.injector.bind_instance(BaseStorage, BasicStorage())
+    context.injector.bind_instance(BaseWallet, BasicWallet())
+    for idx in range(records):
+        await ConnectionRecord(
+            my_did=f"did-{idx}",
+            their_label=f"Agent {idx}",
+            state=ConnectionRecord.STATE_ACTIVE,
+        ).save(context)
+    return context
+
+
+async def query(context: InjectionContext, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await ConnectionRecord.query(context)
+    return (time.perf_counter() - start) / count
+
+
+async def round_trip(context: InjectionContext, count: int) -> float:
+    message = BasicMessage(content="x" * 4096)
+    start = time.perf_counter()
+    for _ in range(count):
+        BasicMessage.from_json(message.to_json())
+    return (time.perf_counter() - start) / count
+
+
+async def packed_round_trip(context: InjectionContext, count: int) -> float:
+    wallet: BasicWallet = await context.inject(BaseWallet)
+    verkey = (await wallet.create_signing_key()).verkey
+    wire_format = PackWireFormat()
+    message_json = BasicMessage(content="x" * 4096).to_json()
+    start = time.perf_counter()
+    for _ in range(count):
+        packed = await wire_format.encode_message(
+            context, message_json, [verkey], [], verkey
+        )
+        await wire_format.parse_message(context, packed)
+    return (time.perf_counter() - start) / count
+
+
+async def main(records: int, count: int):
+    context = await build_context(records)
+    columns = ("query (ms)", "message (us)", "packed (us)")
+    print("{:>10} ".format("backend") + " ".join(f"{c:>14}" for c in columns))
+    for backend in available_backends():
+        set_json_backend(backend)
+        timings = (
+            await query(context, max(count // 100, 1)) * 1e3,
+            await round_trip(context, count) * 1e6,
+            await packed_round_trip(context, count) * 1e6,
+        )
+        print(
+            "{:>10} ".format(backend)
+            + " ".join("{:>14.1f}".format(timing) for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of the installed JSON backends."
+    )
+    parser.add_argument(
+        "-r",
+        "--records",
+        type=int,
+        default=1000,
+        help="The number of connection records returned by each query",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=1000,
+        help="The number of message round trips measured",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.records, args.count))
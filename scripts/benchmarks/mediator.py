@@ -0,0 +1,119 @@
+"""Measure the forward message throughput of a mediator by number of routes."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.core.dispatcher import Dispatcher  # noqa: E402
+from aries_cloudagent.core.protocol_registry import ProtocolRegistry  # noqa: E402
+from aries_cloudagent.protocols.routing.manager import (  # noqa: E402
+    RoutingManager,
+    RouteTable,
+)
+from aries_cloudagent.protocols.routing.message_types import (  # noqa: E402
+    FORWARD,
+    MESSAGE_TYPES,
+)
+from aries_cloudagent.storage.base import BaseStorage  # noqa: E402
+from aries_cloudagent.storage.basic import BasicStorage  # noqa: E402
+from aries_cloudagent.storage.record import StorageRecord  # noqa: E402
+from aries_cloudagent.transport.inbound.message import InboundMessage  # noqa: E402
+from aries_cloudagent.transport.inbound.receipt import MessageReceipt  # noqa: E402
+from aries_cloudagent.wallet.base import BaseWallet  # noqa: E402
+from aries_cloudagent.wallet.basic import BasicWallet  # noqa: E402
+
+# the size of a typical packed message for a single recipient
+PACKED = '{"protected": "' + "x" * 400 + '", "ciphertext": "' + "x" * 600 + '"}'
+
+
+async def make_context(routes: int, fast: bool) -> InjectionContext:
+    context = InjectionContext(enforce_typing=False)
+    wallet = BasicWallet()
+    context.injector.bind_instance(BaseWallet, wallet)
+    registry = ProtocolRegistry()
+    registry.register_message_types(MESSAGE_TYPES)
+    context.injector.bind_instance(ProtocolRegistry, registry)
+    storage = BasicStorage()
+    context.injector.bind_instance(BaseStorage, storage)
+    async with storage.batch() as batch:
+        for idx in range(routes):
+            batch.add_record(
+                StorageRecord(
+                    RoutingManager.RECORD_TYPE,
+                    '{"created_at": null, "updated_at": null}',
+                    {"connection_id": f"conn-{idx}", "recipient_key": f"key-{idx}"},
+                )
+            )
+    if fast:
+        context.injector.bind_instance(RouteTable, RouteTable())
+    return context
+
+
+async def measure(routes: int, count: int, fast: bool) -> float:
+    context = await make_context(routes, fast)
+    wallet: BaseWallet = await context.inject(BaseWallet)
+    mediator_key = (await wallet.create_local_did()).verkey
+    dispatcher = Dispatcher(context)
+    await dispatcher.setup()
+    sent = []
+
+    async def send_outbound(context, outbound, inbound=None):
+        sent.append(outbound)
+
+    def forward(idx: int) -> InboundMessage:
+        message = {
+            "@type": FORWARD,
+            "@id": str(idx),
+            "to": "key-{}".format((idx * 7919) % routes),
+            "msg": PACKED,
+        }
+        receipt = MessageReceipt(recipient_verkey=mediator_key)
+        return InboundMessage(message, receipt)
+
+    # the first message loads the route table
+    await dispatcher.handle_message(forward(0), send_outbound)
+    messages = [forward(idx) for idx in range(count)]
+    start = time.perf_counter()
+    for message in messages:
+        await dispatcher.handle_message(message, send_outbound)
+    elapsed = time.perf_counter() - start
+    assert len(sent) == count + 1
+    return count / elapsed
+
+
+async def main(sizes, count: int):
+    print("{:>10} {:>16} {:>16}".format("routes", "handler (msg/s)", "fast (msg/s)"))
+    for size in sizes:
+        slow = await measure(size, count, False)
+        fast = await measure(size, count, True)
+        print("{:>10} {:>16.0f} {:>16.0f}".format(size, slow, fast))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of forward message handling."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[100, 10000, 100000],
+        help="Numbers of routes to measure",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=5000,
+        help="The number of forward messages handled for each size",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(sorted(args.sizes), args.count))
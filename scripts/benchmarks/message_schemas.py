@@ -0,0 +1,102 @@
+"""Measure serialization of every registered message type, with and without pooling."""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.core.plugin_registry import PluginRegistry  # noqa: E402
+from aries_cloudagent.core.protocol_registry import ProtocolRegistry  # noqa: E402
+from aries_cloudagent.messaging.models.base import SCHEMA_POOL  # noqa: E402
+
+
+async def load_registry() -> ProtocolRegistry:
+    context = InjectionContext()
+    registry = ProtocolRegistry()
+    context.injector.bind_instance(ProtocolRegistry, registry)
+    plugins = PluginRegistry()
+    plugins.register_package("aries_cloudagent.protocols")
+    await plugins.init_context(context)
+    return registry
+
+
+def timed(fn, count: int, pooled: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        if not pooled:
+            SCHEMA_POOL.clear()
+        fn()
+    return (time.perf_counter() - start) / count
+
+
+def measure(message_class, count: int):
+    # messages which cannot be created or loaded with default values are
+    # measured for the operations which succeed
+    message = message_class()
+    serialized = message.serialize()
+    result = [
+        timed(message.serialize, count, False),
+        timed(message.serialize, count, True),
+    ]
+    try:
+        message_class.deserialize(serialized)
+    except Exception:
+        return result + [None, None]
+    load = lambda: message_class.deserialize(dict(serialized))  # noqa: E731
+    return result + [timed(load, count, False), timed(load, count, True)]
+
+
+def short_type(message_type: str) -> str:
+    return message_type.split(";spec/")[-1]
+
+
+async def main(count: int):
+    # the validation errors of messages without default values are expected
+    logging.disable(logging.ERROR)
+    registry = await load_registry()
+    columns = ("dump", "dump pooled", "load", "load pooled")
+    print("{:<45} ".format("message type") + " ".join(f"{c:>12}" for c in columns))
+    totals = [0.0] * len(columns)
+    for message_type in sorted(registry.message_types):
+        try:
+            timings = measure(registry.resolve_message_class(message_type), count)
+        except Exception:
+            print("{:<45} (skipped)".format(short_type(message_type)))
+            continue
+        for idx, value in enumerate(timings):
+            totals[idx] += value or 0.0
+        print(
+            "{:<45} ".format(short_type(message_type))
+            + " ".join(
+                "{:>12.1f}".format(t * 1e6) if t is not None else "{:>12}".format("-")
+                for t in timings
+            )
+        )
+    print(
+        "{:<45} ".format("total")
+        + " ".join("{:>12.1f}".format(t * 1e6) for t in totals)
+    )
+    print("(timings in microseconds per operation)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a message serialization benchmark over registered types."
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=1000,
+        help="The number of operations measured for each message type",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(args.count))
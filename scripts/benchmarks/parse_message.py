@@ -0,0 +1,106 @@
+"""Measure the stages of parsing an inbound packed message."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.transport.pack_format import PackWireFormat  # noqa: E402
+from aries_cloudagent.wallet.base import BaseWallet  # noqa: E402
+from aries_cloudagent.wallet.basic import BasicWallet  # noqa: E402
+from aries_cloudagent.wallet.crypto import (  # noqa: E402
+    decode_pack_message_for_recipient,
+    decode_pack_message_outer,
+)
+
+MESSAGE = {
+    "@type": "did:sov:BzCbsNYhMrjHiqZDTUASHg;spec/basicmessage/1.0/message",
+    "@id": "b7a5f9f8-6e4a-4bd1-9d3c-d26a1f2b4c9e",
+    "sent_time": "2020-01-01T00:00:00Z",
+    "content": "x" * 512,
+}
+
+
+def timed(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count
+
+
+async def main(sizes, count: int):
+    wallet = BasicWallet()
+    context = InjectionContext()
+    context.injector.bind_instance(BaseWallet, wallet)
+    wire_format = PackWireFormat()
+    sender = (await wallet.create_signing_key()).verkey
+    recips = [(await wallet.create_signing_key()).verkey for _ in range(max(sizes))]
+    message_json = json.dumps(MESSAGE)
+
+    print(
+        "{:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+            "recipients", "sniff", "outer", "lookup", "decrypt", "json", "total"
+        )
+    )
+    for size in sizes:
+        packed = await wallet.pack_message(message_json, recips[:size], sender)
+        wrapper, recip_info, is_authcrypt = decode_pack_message_outer(packed)
+
+        def lookup():
+            for recip_vk in recip_info:
+                if wallet._find_private_key(recip_vk):
+                    return recip_vk
+
+        recip_vk = lookup()
+        secret = wallet._find_private_key(recip_vk)
+        stages = (
+            lambda: wire_format.is_packed(packed),
+            lambda: decode_pack_message_outer(packed),
+            lookup,
+            lambda: decode_pack_message_for_recipient(
+                wrapper, recip_info[recip_vk], secret, is_authcrypt
+            ),
+            lambda: wire_format.load_message(message_json),
+        )
+        timings = [timed(stage, count) for stage in stages]
+
+        start = time.perf_counter()
+        for _ in range(count):
+            await wire_format.parse_message(context, packed)
+        timings.append((time.perf_counter() - start) / count)
+        print(
+            "{:>10} {}".format(
+                size, " ".join("{:>10.1f}".format(t * 1e6) for t in timings)
+            )
+        )
+    print("(timings in microseconds per message)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of the inbound message parse stages."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[1, 10, 100],
+        help="Numbers of recipients to measure",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=500,
+        help="The number of messages parsed for each size",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(main(sorted(args.sizes), args.count))
@@ -0,0 +1,161 @@
+"""Measure mediator route updates and keylist synchronization by keylist size."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.config.injection_context import InjectionContext  # noqa: E402
+from aries_cloudagent.protocols.routing.keylist import (  # noqa: E402
+    bucket_digests,
+    bucket_keys,
+    keylist_updates,
+)
+from aries_cloudagent.protocols.routing.manager import RoutingManager  # noqa: E402
+from aries_cloudagent.protocols.routing.models.route_update import (  # noqa: E402
+    RouteUpdate,
+)
+from aries_cloudagent.storage.base import BaseStorage  # noqa: E402
+from aries_cloudagent.storage.basic import BasicStorage  # noqa: E402
+from aries_cloudagent.storage.sqlite import SqliteStorage  # noqa: E402
+
+BACKENDS = ("basic", "sqlite")
+CONN_ID = "client"
+
+
+def make_storage(name: str, directory: str) -> BaseStorage:
+    if name == "basic":
+        return BasicStorage()
+    return SqliteStorage(path=os.path.join(directory, f"routes-{time.time()}.sqlite"))
+
+
+async def measure(name: str, directory: str, size: int, changed: float):
+    storage = make_storage(name, directory)
+    context = InjectionContext(enforce_typing=False)
+    context.injector.bind_instance(BaseStorage, storage)
+    mgr = RoutingManager(context)
+    keys = ["key-{}".format(idx) for idx in range(size)]
+    timings = {}
+
+    start = time.perf_counter()
+    for key in keys:
+        await mgr.create_route_record(CONN_ID, key)
+    timings["serial"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await mgr.update_routes(
+        CONN_ID,
+        [
+            RouteUpdate(recipient_key=key, action=RouteUpdate.ACTION_DELETE)
+            for key in keys
+        ],
+    )
+    timings["batch delete"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await mgr.update_routes(
+        CONN_ID,
+        [
+            RouteUpdate(recipient_key=key, action=RouteUpdate.ACTION_CREATE)
+            for key in keys
+        ],
+    )
+    timings["batch create"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count = 0
+    async for _ in mgr.iter_routes(CONN_ID):
+        count += 1
+    timings["iterate"] = time.perf_counter() - start
+    assert count == size
+
+    # the client keylist has a share of its keys rotated since the last sync
+    rotated = int(size * changed)
+    client_keys = keys[rotated:] + ["new-key-{}".format(idx) for idx in range(rotated)]
+    start = time.perf_counter()
+    buckets = bucket_keys(client_keys)
+    digests = bucket_digests(buckets)
+    _, mediator_buckets = await mgr.sync_routes(CONN_ID, digests)
+    updates = keylist_updates(buckets, mediator_buckets)
+    timings["sync"] = time.perf_counter() - start
+    returned = sum(len(bucket) for bucket in mediator_buckets.values())
+
+    start = time.perf_counter()
+    await mgr.update_routes(CONN_ID, updates)
+    timings["sync update"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, mediator_buckets = await mgr.sync_routes(CONN_ID, digests)
+    timings["in sync"] = time.perf_counter() - start
+    assert not mediator_buckets
+
+    if name == "sqlite":
+        await storage.close()
+    return timings, returned, len(updates)
+
+
+async def main(backends, sizes, changed: float):
+    columns = (
+        "serial",
+        "batch create",
+        "batch delete",
+        "iterate",
+        "sync",
+        "sync update",
+        "in sync",
+    )
+    print(
+        "{:>8} {:>8} ".format("backend", "keys")
+        + " ".join(f"{c:>12}" for c in columns)
+        + " {:>9} {:>8}".format("returned", "updates")
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for name in backends:
+            for size in sizes:
+                timings, returned, updates = await measure(
+                    name, directory, size, changed
+                )
+                print(
+                    "{:>8} {:>8} ".format(name, size)
+                    + " ".join("{:>12.1f}".format(timings[c] * 1e3) for c in columns)
+                    + " {:>9} {:>8}".format(returned, updates)
+                )
+    print("(times in milliseconds; returned is the number of keys in the buckets")
+    print(" sent by the mediator, of which updates differ from the client keylist)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of mediator route updates."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[1000, 10000],
+        help="Keylist sizes to measure",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        action="append",
+        choices=BACKENDS,
+        help="A storage backend to measure, by default all of them",
+    )
+    parser.add_argument(
+        "--changed",
+        type=float,
+        default=0.001,
+        help="The share of the keylist rotated before synchronizing",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(
+        main(args.backend or BACKENDS, sorted(args.sizes), args.changed)
+    )
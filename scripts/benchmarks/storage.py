@@ -0,0 +1,157 @@
+"""Compare the add, get, search and update latency of the storage backends."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.storage.base import BaseStorage  # noqa: E402
+from aries_cloudagent.storage.basic import BasicStorage  # noqa: E402
+from aries_cloudagent.storage.record import StorageRecord  # noqa: E402
+from aries_cloudagent.storage.sqlite import SqliteStorage  # noqa: E402
+
+RECORD_TYPE = "connection"
+BACKENDS = ("basic", "sqlite", "indy")
+
+
+def make_record(idx: int) -> StorageRecord:
+    return StorageRecord(
+        RECORD_TYPE,
+        '{"their_label": "Agent %d"}' % idx,
+        {"my_did": "did-{}".format(idx), "state": ("active", "invited")[idx % 2]},
+        "rec-{}".format(idx),
+    )
+
+
+async def open_backend(name: str, directory: str):
+    """Create a storage backend, returning it with a function to close it."""
+    if name == "basic":
+        return BasicStorage(), None
+    if name == "sqlite":
+        storage = SqliteStorage(path=os.path.join(directory, "storage.sqlite"))
+        return storage, storage.close
+    try:
+        from aries_cloudagent.storage.indy import IndyStorage
+        from aries_cloudagent.wallet.indy import IndyWallet
+    except ImportError:
+        return None, None
+    wallet = IndyWallet(
+        {"name": "storage-benchmark", "key": "benchmark", "auto_remove": True}
+    )
+    await wallet.open()
+    return IndyStorage(wallet), wallet.close
+
+
+async def fill(storage: BaseStorage, start: int, end: int, batch_size: int):
+    for offset in range(start, end, batch_size):
+        async with storage.batch() as batch:
+            for idx in range(offset, min(offset + batch_size, end)):
+                batch.add_record(make_record(idx))
+
+
+async def timed(fn, count: int) -> float:
+    start = time.perf_counter()
+    for idx in range(count):
+        await fn(idx)
+    return (time.perf_counter() - start) / count
+
+
+async def measure(storage: BaseStorage, size: int, count: int):
+    def pick(idx: int) -> int:
+        return (idx * 7919) % size
+
+    async def add(idx: int):
+        await storage.add_record(make_record(size + idx))
+
+    async def get(idx: int):
+        await storage.get_record(RECORD_TYPE, "rec-{}".format(pick(idx)))
+
+    async def search(idx: int):
+        tag_filter = {"my_did": "did-{}".format(pick(idx))}
+        await storage.search_records(RECORD_TYPE, tag_filter).fetch_single()
+
+    async def update(idx: int):
+        record = make_record(pick(idx))
+        await storage.update_record(record, record.value, record.tags)
+
+    timings = [
+        await timed(add, count),
+        await timed(get, count),
+        await timed(search, count),
+        await timed(update, count),
+    ]
+    for idx in range(count):
+        await storage.delete_record(make_record(size + idx))
+    return timings
+
+
+async def main(backends, sizes, count: int, batch_size: int):
+    columns = ("fill (s)", "add", "get", "search", "update")
+    print(
+        "{:>8} {:>10} ".format("backend", "records")
+        + " ".join(f"{c:>10}" for c in columns)
+    )
+    for name in backends:
+        with tempfile.TemporaryDirectory() as directory:
+            storage, close = await open_backend(name, directory)
+            if not storage:
+                print("{:>8} (not installed)".format(name))
+                continue
+            current = 0
+            for size in sizes:
+                start = time.perf_counter()
+                await fill(storage, current, size, batch_size)
+                fill_time = time.perf_counter() - start
+                current = size
+                timings = await measure(storage, size, count)
+                print(
+                    "{:>8} {:>10} {:>10.2f} ".format(name, size, fill_time)
+                    + " ".join("{:>10.1f}".format(t * 1e6) for t in timings)
+                )
+            if close:
+                await close()
+    print("(latencies in microseconds per operation)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a benchmark of the storage backends."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[10000, 100000, 1000000],
+        help="Store sizes to measure, in ascending order",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        action="append",
+        choices=BACKENDS,
+        help="A backend to measure, by default all of them",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=1000,
+        help="The number of operations measured at each size",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="The number of records added in each batch while filling the store",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(
+        main(args.backend or BACKENDS, sorted(args.sizes), args.count, args.batch_size)
+    )
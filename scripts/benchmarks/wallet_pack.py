@@ -0,0 +1,76 @@
+"""Measure BasicWallet pack and unpack throughput by number of recipients."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)  # noqa
+
+from aries_cloudagent.wallet.basic import BasicWallet  # noqa: E402
+
+MESSAGE = '{"@type": "benchmark", "content": "' + "x" * 512 + '"}'
+
+
+async def measure(wallet: BasicWallet, sender: str, recips: list, count: int):
+    # the first pack and unpack fill the key caches
+    packed = await wallet.pack_message(MESSAGE, recips, sender)
+    await wallet.unpack_message(packed)
+
+    start = time.perf_counter()
+    packed = await asyncio.gather(
+        *(wallet.pack_message(MESSAGE, recips, sender) for _ in range(count))
+    )
+    pack_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(wallet.unpack_message(message) for message in packed))
+    unpack_time = time.perf_counter() - start
+    return pack_time / count, unpack_time / count
+
+
+async def main(sizes, count: int, processes: int):
+    wallet = BasicWallet({"crypto_processes": processes})
+    sender = (await wallet.create_signing_key()).verkey
+    recips = [(await wallet.create_signing_key()).verkey for _ in range(max(sizes))]
+    print("{:>10} {:>14} {:>14}".format("recipients", "pack (ms)", "unpack (ms)"))
+    for size in sizes:
+        wallet._crypto.key_cache.clear()
+        pack, unpack = await measure(wallet, sender, recips[:size], count)
+        print("{:>10} {:>14.3f} {:>14.3f}".format(size, pack * 1e3, unpack * 1e3))
+    await wallet.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Runs a BasicWallet pack and unpack benchmark."
+    )
+    parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=[1, 10, 100],
+        help="Numbers of recipients to measure",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=200,
+        help="The number of messages packed and unpacked for each size",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=0,
+        help="The number of crypto processes, or 0 to use a thread",
+    )
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(
+        main(sorted(args.sizes), args.count, args.processes)
+    )
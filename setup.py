@@ -34,6 +34,8 @@ if __name__ == "__main__":
         extras_require={
             "indy": parse_requirements("requirements.indy.txt"),
             "uvloop": {"uvloop": "^=0.14.0"},
+            "orjson": ["orjson>=3.0"],
+            "ujson": ["ujson>=2.0"],
         },
         python_requires=">=3.6.3",
         classifiers=[